@@ -1,7 +1,9 @@
 import pandas as pd
+import numpy as np
 import os
 from nautilus_trader.model.enums import OrderSide
-from  tools.help_funcs.help_funcs_strategy import extract_interval_from_bar_type
+from  tools.help_funcs.help_funcs_strategy import interval_from_bar_type
+from tools.help_funcs.trade_metrics import compute_trade_metrics
 
 class TradeInstance:
     def __init__(self, order):
@@ -57,11 +59,53 @@ class IndicatorInstance:
         self.plot_number = plot_number  # 0 -> in (bar) chart, 1 -> metrik plot 1 etc...
 
 
+class BarBuffer:
+    """pre-allocated typed column buffer for one timeframe (no dict per bar)"""
+    COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamp = np.empty(capacity, dtype=np.int64)
+        self.open = np.empty(capacity, dtype=np.float64)
+        self.high = np.empty(capacity, dtype=np.float64)
+        self.low = np.empty(capacity, dtype=np.float64)
+        self.close = np.empty(capacity, dtype=np.float64)
+        self.volume = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+        self.last_timestamp = None  # bleibt auch nach flush erhalten
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp, open_, high, low, close, volume):
+        i = self.size
+        self.timestamp[i] = timestamp
+        self.open[i] = open_
+        self.high[i] = high
+        self.low[i] = low
+        self.close[i] = close
+        self.volume[i] = volume
+        self.size = i + 1
+        self.last_timestamp = timestamp
+
+    def columns(self):
+        """views on the filled part, valid until the next clear()"""
+        n = self.size
+        return {c: getattr(self, c)[:n] for c in self.COLUMNS}
+
+    def clear(self):
+        self.size = 0
+
+
+def _as_double(value):
+    return value.as_double() if hasattr(value, "as_double") else float(value)
+
+
 class BacktestDataCollector:
     def __init__(self, name, run_id, batch_size=5000): 
         self.name = name
         # Bars pro Timeframe
-        self.bars = {}              # timeframe -> List[bar_dict]
+        self.bars = {}              # timeframe -> BarBuffer
         self.trades = []
         self.run_id = run_id
         self.indicators = {}
@@ -81,6 +125,10 @@ class BacktestDataCollector:
         if self.path.exists() and self.path.is_dir():
             shutil.rmtree(self.path)
         (self.path / "indicators").mkdir(parents=True, exist_ok=True)
+
+    @property
+    def run_dir(self):
+        return self._results_root
  
     def initialise_logging_indicator(self, name, plot_number): #indicator -> [indicator_name, plot_number]
         self.indicators[name] = []
@@ -90,22 +138,27 @@ class BacktestDataCollector:
         self.indicator_plot_number[name] = plot_number
 
     def add_bar(self, timestamp, open_, high, low, close, volume, bar_type):
-        timeframe = extract_interval_from_bar_type(str(bar_type), str(bar_type.instrument_id))
-        if timeframe not in self.bars:
-            self.bars[timeframe] = []
-        bar_dict = {
-            'timestamp': timestamp,
-            'open': open_,
-            'high': high,
-            'low': low,
-            'close': close,
-            'volume': volume,
-        }
-        self.bars[timeframe].append(bar_dict)
+        timeframe = interval_from_bar_type(bar_type)
+        buffer = self.bars.get(timeframe)
+        if buffer is None:
+            buffer = self.bars[timeframe] = BarBuffer(self.batch_size)
+        buffer.append(
+            timestamp,
+            _as_double(open_),
+            _as_double(high),
+            _as_double(low),
+            _as_double(close),
+            _as_double(volume),
+        )
         # flush when batch is full
-        if len(self.bars[timeframe]) >= self.batch_size:
+        if buffer.size >= self.batch_size:
             self.flush_bars(timeframe)
 
+    def last_bar_timestamp(self):
+        """latest bar timestamp over all timeframes (also after flushes), None if no bars"""
+        timestamps = [b.last_timestamp for b in self.bars.values() if b.last_timestamp is not None]
+        return max(timestamps) if timestamps else None
+
     def add_indicator(self, name, timestamp, value):
         plot_number = self.indicator_plot_number.get(name, 0)
         if name not in self.indicators:
@@ -123,37 +176,28 @@ class BacktestDataCollector:
         header = not file_path.exists()
         df.to_csv(file_path, mode='a', header=header, index=False)
 
+    def _append_columns(self, file_path, columns):
+        # numpy arrays gehen direkt als Spalten an den Writer
+        self._append_df(file_path, pd.DataFrame(columns, copy=False))
+
     def flush_bars(self, timeframe, force=False):
         """
         Schreibt einen Batch Bars für ein Timeframe in CSV.
         Bei force=True werden alle restlichen Bars geschrieben.
         """
-        if timeframe not in self.bars or not self.bars[timeframe]:
+        buffer = self.bars.get(timeframe)
+        if buffer is None or buffer.size == 0:
             return
-        entries = self.bars[timeframe]
-        if not force and len(entries) < self.batch_size:
+        if not force and buffer.size < self.batch_size:
             return
-        batch_size = len(entries) if force else self.batch_size
-        batch = entries[:batch_size]
-        # DataFrame mit konsistenter Reihenfolge
-        df = pd.DataFrame(batch)
-        cols = ["timestamp", "open", "high", "low", "close", "volume"]
-        for c in cols:
-            if c not in df.columns:
-                df[c] = None
-        df = df[cols]
         file_path = self.path / f"bars-{timeframe}.csv"
-        self._append_df(file_path, df)
-        del entries[:batch_size]
+        self._append_columns(file_path, buffer.columns())
+        buffer.clear()
 
     def flush_all_bars(self, force=False):
+        # a buffer never holds more than batch_size bars -> one flush per timeframe is enough
         for tf in list(self.bars.keys()):
-            while True:
-                before = len(self.bars[tf])
-                self.flush_bars(tf, force=force)
-                # Wenn force: nur einmal ausführen
-                if force or len(self.bars[tf]) == before or len(self.bars[tf]) < self.batch_size:
-                    break
+            self.flush_bars(tf, force=force)
 
     def flush_indicators(self, name, force=False):
         if name not in self.indicators or not self.indicators[name]:
@@ -254,101 +298,28 @@ class BacktestDataCollector:
         Auch wenn keine Trades existieren, werden alle Keys mit 0 zurückgegeben
         (Placeholder), damit trade_metrics.csv immer erzeugt wird.
         """
-        if not self.trades:
-            return {
-                "final_realized_pnl": 0.0,
-                "winrate": 0.0,
-                "winrate_long": 0.0,
-                "winrate_short": 0.0,
-                "pnl_long": 0.0,
-                "pnl_short": 0.0,
-                "long_short_ratio": 0.0,
-                "n_trades": 0,
-                "n_long_trades": 0,
-                "n_short_trades": 0,
-                "avg_win": 0.0,
-                "avg_loss": 0.0,
-                "max_win": 0.0,
-                "max_loss": 0.0,
-                "max_consecutive_wins": 0,
-                "max_consecutive_losses": 0,
-                "commissions": 0.0,
-            }
-
         def to_float(val):
+            if val is None:
+                return np.nan
             if hasattr(val, "amount"):
                 return float(val.amount)
             try:
                 return float(val)
             except Exception:
-                return 0.0
-
-        n_trades = len(self.trades)
-        long_trades = [t for t in self.trades if t.action == "BUY"]
-        short_trades = [t for t in self.trades if t.action == "SHORT"]
-        n_long = len(long_trades)
-        n_short = len(short_trades)
-
-        # Aggregiertes PnL nach Richtung (neu)
-        pnl_long = sum(to_float(t.realized_pnl) for t in long_trades)
-        pnl_short = sum(to_float(t.realized_pnl) for t in short_trades)
-
-        long_wins = [to_float(t.realized_pnl) for t in long_trades if to_float(t.realized_pnl) > 0]
-        short_wins = [to_float(t.realized_pnl) for t in short_trades if to_float(t.realized_pnl) > 0]
-
-        wins = [to_float(t.realized_pnl) for t in self.trades if to_float(t.realized_pnl) > 0]
-        losses = [to_float(t.realized_pnl) for t in self.trades if to_float(t.realized_pnl) < 0]
-        n_wins = len(wins)
-        n_losses = len(losses)
-
-        winrate = n_wins / n_trades if n_trades > 0 else 0.0
-        winrate_long = len(long_wins) / n_long if n_long > 0 else 0.0
-        winrate_short = len(short_wins) / n_short if n_short > 0 else 0.0
-        long_short_ratio = n_long / n_short if n_short > 0 else float('inf') if n_long > 0 else 0.0
-        avg_win = sum(wins) / n_wins if n_wins > 0 else 0.0
-        avg_loss = sum(losses) / n_losses if n_losses > 0 else 0.0
-        max_win = max(wins) if wins else 0.0
-        max_loss = min(losses) if losses else 0.0
-        commissions = sum([to_float(t.fee) for t in self.trades if t.fee is not None])
-
-        # Max consecutive wins/losses
-        max_consec_wins = max_consec_losses = 0
-        curr_wins = curr_losses = 0
-        for t in self.trades:
-            pnl = to_float(t.realized_pnl)
-            if pnl > 0:
-                curr_wins += 1
-                curr_losses = 0
-            elif pnl < 0:
-                curr_losses += 1
-                curr_wins = 0
-            else:
-                curr_wins = 0
-                curr_losses = 0
-            max_consec_wins = max(max_consec_wins, curr_wins)
-            max_consec_losses = max(max_consec_losses, curr_losses)
-
-        final_realized_pnl = sum(to_float(t.realized_pnl) for t in self.trades)
-        result = {
-            "final_realized_pnl": final_realized_pnl,
-            "winrate": winrate,
-            "winrate_long": winrate_long,
-            "winrate_short": winrate_short,
-            "pnl_long": pnl_long,
-            "pnl_short": pnl_short,
-            "long_short_ratio": long_short_ratio,
-            "n_trades": n_trades,
-            "n_long_trades": n_long,
-            "n_short_trades": n_short,
-            "avg_win": avg_win,
-            "avg_loss": avg_loss,
-            "max_win": max_win,
-            "max_loss": max_loss,
-            "max_consecutive_wins": max_consec_wins,
-            "max_consecutive_losses": max_consec_losses,
-            "commissions": commissions,
-        }
-        return result
+                return np.nan
+
+        trades = self.trades
+        return compute_trade_metrics(
+            realized_pnl=np.nan_to_num([to_float(t.realized_pnl) for t in trades]),
+            fees=np.nan_to_num([to_float(t.fee) for t in trades]),
+            direction=[1 if t.action == "BUY" else -1 if t.action == "SHORT" else 0 for t in trades],
+            entry_price=[to_float(t.open_price_actual) for t in trades],
+            exit_price=[to_float(t.close_price_actual) for t in trades],
+            qty=[to_float(t.tradesize) for t in trades],
+            sl=[to_float(t.sl) for t in trades],
+            entry_ts=[to_float(t.timestamp) for t in trades],
+            exit_ts=[to_float(t.closed_timestamp) for t in trades],
+        )
 
     def trades_to_csv(self):
         # Immer erstellen, auch wenn keine Trades vorhanden sind
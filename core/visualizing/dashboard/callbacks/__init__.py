@@ -1,4 +1,7 @@
+from pathlib import Path
+
 from core.visualizing.dashboard.param_analysis.service import ParameterAnalysisService
+from core.visualizing.dashboard.param_analysis.cube import CUBE_DIR_NAME
 
 from .menu import register_menu_callbacks
 from .param_analyzer import register_param_analyzer_callbacks
@@ -20,7 +23,7 @@ def register_callbacks(app, repo, dash_data=None):
             state["runs_cache"][rid] = dash_data
             state["active_runs"] = [rid]
 
-    analysis_service = ParameterAnalysisService()
+    analysis_service = ParameterAnalysisService(cube_dir=Path(repo.results_root) / CUBE_DIR_NAME)
 
     register_menu_callbacks(app, repo, state)
     register_param_analyzer_callbacks(app, repo, analysis_service)
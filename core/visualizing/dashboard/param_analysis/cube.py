@@ -0,0 +1,215 @@
+import json
+import itertools
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# mergeable stats per cell -> mean/std/sum/min/max/count without touching the raw runs again
+# m2 = Summe der quadrierten Abweichungen vom Zellen-Mittelwert (Welford/Chan), kein sumsq - sum²/n
+CUBE_STATS = ("count", "sum", "m2", "min", "max")
+CUBE_AGGS = ("mean", "std", "sum", "min", "max", "count")
+CUBE_DIR_NAME = "param_cube"
+CUBE_VERSION = 2
+
+
+class ParamCube:
+    """
+    precomputed aggregation cube over parameter dimensions x metrics x stats
+    - all single params and all param pairs are built up front, triples on first request
+    - runs are identified by run_id + content hash of their params/metrics (überschriebener Run -> rebuild)
+    - update() only aggregates runs that are not in the cube yet and merges the stats pairwise
+    - medians are not mergeable -> callers fall back to the raw runs
+    """
+
+    def __init__(self, params: List[str], metrics: List[str]):
+        self.params = list(params)
+        self.metrics = list(metrics)
+        self.runs: Dict[str, str] = {}  # run_id -> content hash
+        self._stats: Dict[Tuple[str, ...], pd.DataFrame] = {}
+
+    @property
+    def run_ids(self) -> set:
+        return set(self.runs)
+
+    @staticmethod
+    def run_keys(df: pd.DataFrame, params: List[str], metrics: List[str]) -> pd.Series:
+        """content hash per run (index = run_id, oder Zeilenindex ohne run_id)"""
+        cols = [c for c in list(params) + list(metrics) if c in df.columns]
+        ids = df["run_id"].astype(str) if "run_id" in df.columns else pd.Series(df.index.astype(str), index=df.index)
+        if cols:
+            hashes = pd.util.hash_pandas_object(df[cols], index=False).map(lambda h: f"{h:016x}")
+        else:
+            hashes = pd.Series("", index=df.index)
+        return pd.Series(hashes.to_numpy(), index=ids.to_numpy())
+
+    @staticmethod
+    def _key(dims: Iterable[str]) -> Tuple[str, ...]:
+        return tuple(sorted(dims))
+
+    def _default_dims(self) -> List[Tuple[str, ...]]:
+        return [(p,) for p in self.params] + [self._key(pair) for pair in itertools.combinations(self.params, 2)]
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        work = df[[c for c in self.params + self.metrics if c in df.columns]].copy()
+        for m in self.metrics:
+            if m in work.columns:
+                work[m] = pd.to_numeric(work[m], errors="coerce")
+        return work
+
+    def _aggregate(self, work: pd.DataFrame, dims: Tuple[str, ...]) -> pd.DataFrame:
+        metrics = [m for m in self.metrics if m in work.columns]
+        if any(d not in work.columns for d in dims) or not metrics:
+            return pd.DataFrame()
+        grouped = work[list(dims) + metrics].groupby(list(dims))
+        count = grouped[metrics].count()
+        parts = {
+            "count": count,
+            "sum": grouped[metrics].sum(),
+            "m2": (grouped[metrics].var(ddof=0) * count).fillna(0.0),
+            "min": grouped[metrics].min(),
+            "max": grouped[metrics].max(),
+        }
+        stats = pd.concat(parts, axis=1).swaplevel(0, 1, axis=1)
+        return stats.sort_index(axis=1)
+
+    @staticmethod
+    def _combine(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        if old is None or old.empty:
+            return new
+        if new is None or new.empty:
+            return old
+        index = old.index.union(new.index)
+        columns = old.columns.union(new.columns)
+        a = old.reindex(index=index, columns=columns)
+        b = new.reindex(index=index, columns=columns)
+        out = a.copy()
+        metrics = sorted({c[0] for c in columns})
+        for m in metrics:
+            na, nb = a[(m, "count")].fillna(0).to_numpy(), b[(m, "count")].fillna(0).to_numpy()
+            sa, sb = a[(m, "sum")].fillna(0).to_numpy(), b[(m, "sum")].fillna(0).to_numpy()
+            n = na + nb
+            with np.errstate(invalid="ignore", divide="ignore"):
+                # Chan et al.: m2 = m2_a + m2_b + delta² * na * nb / n
+                delta = np.where((na > 0) & (nb > 0), sb / np.where(nb > 0, nb, 1) - sa / np.where(na > 0, na, 1), 0.0)
+                cross = np.where(n > 0, delta ** 2 * na * nb / np.where(n > 0, n, 1), 0.0)
+            out[(m, "count")] = n
+            out[(m, "sum")] = sa + sb
+            out[(m, "m2")] = a[(m, "m2")].fillna(0).to_numpy() + b[(m, "m2")].fillna(0).to_numpy() + cross
+        min_cols = [c for c in columns if c[1] == "min"]
+        max_cols = [c for c in columns if c[1] == "max"]
+        out[min_cols] = np.fmin(a[min_cols].to_numpy(), b[min_cols].to_numpy())
+        out[max_cols] = np.fmax(a[max_cols].to_numpy(), b[max_cols].to_numpy())
+        return out
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, params: List[str], metrics: List[str]) -> "ParamCube":
+        cube = cls(params, metrics)
+        cube.update(df)
+        return cube
+
+    def update(self, df: pd.DataFrame, keys: Optional[pd.Series] = None) -> int:
+        """adds runs not yet in the cube, returns the number of new runs"""
+        if keys is None:
+            keys = self.run_keys(df, self.params, self.metrics)
+        if "run_id" not in df.columns and self.runs:
+            return 0
+        new_mask = ~keys.index.isin(list(self.runs))
+        new_runs = df.loc[new_mask]
+        if new_runs.empty:
+            return 0
+        work = self._prepare(new_runs)
+        dims_list = set(self._default_dims()) | set(self._stats.keys())
+        for dims in dims_list:
+            self._stats[dims] = self._combine(self._stats.get(dims), self._aggregate(work, dims))
+        self.runs.update(zip(keys.index[new_mask], keys.to_numpy()[new_mask]))
+        return len(new_runs)
+
+    def covers(self, df: pd.DataFrame, keys: Optional[pd.Series] = None) -> bool:
+        """
+        true if every run in the cube is still in df with the same content
+        (run removed oder unter gleicher run_id neu geschrieben -> cube must be rebuilt)
+        """
+        if "run_id" not in df.columns:
+            return False
+        if keys is None:
+            keys = self.run_keys(df, self.params, self.metrics)
+        current = dict(zip(keys.index, keys.to_numpy()))
+        return all(current.get(run_id) == digest for run_id, digest in self.runs.items())
+
+    def stats(self, dims: Iterable[str], df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        key = self._key(dims)
+        if key not in self._stats:
+            if df is None:
+                return pd.DataFrame()
+            # triples etc. werden beim ersten Zugriff gebaut und ab dann mit aktualisiert
+            self._stats[key] = self._aggregate(self._prepare(df), key)
+        return self._stats[key]
+
+    def grouped(self, metric: str, dims: List[str], agg: str, df: Optional[pd.DataFrame] = None) -> pd.Series:
+        """aggregated metric per parameter cell, index levels in the order of `dims`"""
+        if agg not in CUBE_AGGS:
+            raise ValueError(f"Aggregation '{agg}' not available from cube")
+        stats = self.stats(dims, df)
+        if stats.empty or metric not in stats.columns.get_level_values(0):
+            return pd.Series(dtype="float64")
+        s = stats[metric]
+        s = s[s["count"] > 0]
+        n = s["count"]
+        if agg == "mean":
+            out = s["sum"] / n
+        elif agg == "std":
+            var = s["m2"] / (n - 1)
+            out = np.sqrt(var.clip(lower=0)).where(n > 1)
+        elif agg == "count":
+            out = n.astype("int64")
+        else:
+            out = s[agg]
+        out.name = metric
+        if len(dims) > 1:
+            out = out.reorder_levels(list(dims)).sort_index()
+        return out
+
+    def pivot(self, metric: str, x: str, y: str, agg: str, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """same layout as groupby([y, x]).agg(agg).unstack()"""
+        series = self.grouped(metric, [y, x], agg, df)
+        if series.empty:
+            return pd.DataFrame()
+        return series.unstack()
+
+    # persistence -----------------------------------------------------------------
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for i, (dims, stats) in enumerate(sorted(self._stats.items(), key=lambda kv: kv[0])):
+            if stats.empty:
+                continue
+            flat = stats.copy()
+            flat.columns = [f"{m}|{st}" for m, st in flat.columns]
+            name = f"dims_{i}.parquet"
+            flat.reset_index().to_parquet(directory / name, index=False)
+            files[name] = list(dims)
+        meta = {"version": CUBE_VERSION, "params": self.params, "metrics": self.metrics, "runs": self.runs,
+                "files": files}
+        (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["ParamCube"]:
+        directory = Path(directory)
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != CUBE_VERSION:
+            return None  # altes Format (sumsq, nur run_ids) -> neu bauen
+        cube = cls(meta["params"], meta["metrics"])
+        cube.runs = dict(meta["runs"])
+        for name, dims in meta["files"].items():
+            flat = pd.read_parquet(directory / name).set_index(dims)
+            flat.columns = pd.MultiIndex.from_tuples([tuple(c.split("|", 1)) for c in flat.columns])
+            cube._stats[tuple(dims)] = flat
+        return cube
+
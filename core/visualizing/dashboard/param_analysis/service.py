@@ -1,10 +1,13 @@
 import pandas as pd
 import itertools
+import weakref
+from pathlib import Path
 from dash import html, dcc
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import dash_table
 from plotly.subplots import make_subplots
+from .cube import ParamCube, CUBE_AGGS
 
 PERF_COLS = {
     "Sharpe","Total Return","USDT_PnL% (total)","Max Drawdown","USDT_Win Rate","USDT_Expectancy",
@@ -14,6 +17,51 @@ PERF_COLS = {
 META_COLS = {"run_id","run_index","run_started","run_finished","backtest_start","backtest_end","elapsed_time"}
 
 class ParameterAnalysisService:
+    def __init__(self, cube_dir: Path | None = None):
+        # persisted cube (results/param_cube), views become slices of it instead of re-pivoting the runs
+        self.cube_dir = Path(cube_dir) if cube_dir else None
+        self._cube: ParamCube | None = None
+        self._cube_source = None  # weakref auf das df, gegen das der Cube zuletzt abgeglichen wurde
+
+    def refresh_cube(self, df: pd.DataFrame) -> ParamCube | None:
+        """loads/builds the cube for df, only runs not yet in the cube (or with changed content) are aggregated"""
+        if 'run_id' not in df.columns:
+            return None
+        params = self.run_param_columns(df)
+        metrics = sorted(self.available_metrics(df))
+        cube = self._cube
+        if cube is None and self.cube_dir is not None:
+            cube = ParamCube.load(self.cube_dir)
+        keys = ParamCube.run_keys(df, params, metrics)
+        if cube is None or cube.params != params or cube.metrics != metrics or not cube.covers(df, keys):
+            cube = ParamCube(params, metrics)
+        added = cube.update(df, keys)
+        if added and self.cube_dir is not None:
+            cube.save(self.cube_dir)
+            print(f"[ParamCube] {added} runs added, {len(cube.run_ids)} runs in cube")
+        self._cube = cube
+        self._cube_source = weakref.ref(df)
+        return cube
+
+    def _cube_for(self, df: pd.DataFrame) -> ParamCube | None:
+        """cube for df, abgeglichen nur einmal pro geladenem runs_df (nicht bei jedem Slice)"""
+        if self._cube is not None and self._cube_source is not None and self._cube_source() is df:
+            return self._cube
+        return self.refresh_cube(df)
+
+    def _cube_slice(self, df: pd.DataFrame, metric: str, dims: list, agg: str) -> pd.Series | None:
+        """aggregated metric per parameter cell from the cube, None -> caller uses the raw runs"""
+        if agg not in CUBE_AGGS or len(set(dims)) != len(dims):
+            return None
+        try:
+            cube = self._cube_for(df)
+            if cube is None or metric not in cube.metrics or any(d not in cube.params for d in dims):
+                return None
+            return cube.grouped(metric, dims, agg, df)
+        except Exception as e:
+            print(f"[ParamCube] fallback to raw runs: {e}")
+            return None
+
     def detect_parameter_columns(self, df: pd.DataFrame) -> list:
         cols = []
         for c in df.columns:
@@ -57,6 +105,9 @@ class ParameterAnalysisService:
         return out
 
     def _pivot_metric(self, df: pd.DataFrame, metric: str, x: str, y: str, agg: str):
+        sliced = self._cube_slice(df, metric, [y, x], agg)
+        if sliced is not None:
+            return sliced.unstack() if not sliced.empty else pd.DataFrame()
         subset = df[[x,y,metric]].dropna()
         # ensure numeric
         subset = subset.copy()
@@ -142,6 +193,31 @@ class ParameterAnalysisService:
             print(f"[Surface Error] {e}")
             return html.Div(f"3D plot error: {e}", style={'color': '#f87171'})
 
+    @staticmethod
+    def _soft_numeric(series: pd.Series) -> pd.Series:
+        """soft cast strings like "0,75" / " 0.75 " to float, the rest becomes NaN"""
+        return pd.to_numeric(series.astype(str).str.replace(',', '.').str.strip(), errors='coerce')
+
+    def _grouped_3d(self, df: pd.DataFrame, metric: str, x: str, y: str, z: str, agg: str = 'mean') -> pd.DataFrame | None:
+        """aggregated metric per (x, y, z) combination, from the cube if possible"""
+        agg = agg if agg in ('mean', 'median', 'max', 'min', 'std') else 'mean'
+        sliced = self._cube_slice(df, metric, [x, y, z], agg)
+        if sliced is not None:
+            grouped = sliced.dropna().reset_index()
+            # gleiche Param-Koerzierung wie der Rohdaten-Pfad
+            for col in [x, y, z]:
+                grouped[col] = self._soft_numeric(grouped[col])
+            grouped = grouped.dropna(subset=[x, y, z])
+            return grouped if not grouped.empty else None
+
+        work = df[[x, y, z, metric]].copy()
+        for col in [x, y, z, metric]:
+            work[col] = self._soft_numeric(work[col])
+        work = work.dropna(subset=[x, y, z, metric])
+        if work.empty:
+            return None
+        return getattr(work.groupby([x, y, z])[metric], agg)().reset_index()
+
     def _scatter_3d(self, df: pd.DataFrame, metric: str, x: str, y: str, z: str, agg: str = 'mean'):
         """
         Interaktiver 3D Scatter:
@@ -151,25 +227,9 @@ class ParameterAnalysisService:
         """
         if any(p not in df.columns for p in [x, y, z, metric]):
             return html.Div("Missing columns for 3D plot", style={'color': '#f87171'})
-        work = df[[x, y, z, metric]].copy()
-        # Soft cast strings like "0.75", remove commas, strip
-        for col in [x, y, z, metric]:
-            work[col] = work[col].astype(str).str.replace(',', '.').str.strip()
-            work[col] = pd.to_numeric(work[col], errors='coerce')
-        work = work.dropna(subset=[x, y, z, metric])
-        if work.empty:
+        grouped = self._grouped_3d(df, metric, x, y, z, agg)
+        if grouped is None:
             return html.Div("No numeric data (after conversion) for 3D plot", style={'color': '#f87171'})
-
-        # Aggregation
-        agg_func_map = {
-            'mean': 'mean',
-            'median': 'median',
-            'max': 'max',
-            'min': 'min',
-            'std': 'std'
-        }
-        func = agg_func_map.get(agg, 'mean')
-        grouped = getattr(work.groupby([x, y, z])[metric], func)().reset_index()
         grouped = grouped.sort_values(metric, ascending=False)
 
         if grouped.empty:
@@ -320,16 +380,10 @@ class ParameterAnalysisService:
         scatter_3d = self._scatter_3d(df, metric, x, y, z, agg)
 
         # Prepare best point (reuse aggregation logic)
-        work = df[[x, y, z, metric]].copy()
-        for col in [x, y, z, metric]:
-            work[col] = work[col].astype(str).str.replace(',', '.').str.strip()
-            work[col] = pd.to_numeric(work[col], errors='coerce')
-        work = work.dropna()
-        if work.empty:
+        grouped = self._grouped_3d(df, metric, x, y, z, agg)
+        if grouped is None:
             best_stats = html.Div("No data for best point", style={'color': '#f87171'})
         else:
-            grouped = getattr(work.groupby([x, y, z])[metric], {'mean':'mean','median':'median',
-                                                                 'max':'max','min':'min','std':'std'}.get(agg,'mean'))().reset_index()
             if grouped.empty:
                 best_stats = html.Div("No aggregated data", style={'color': '#f87171'})
             else:
@@ -378,6 +432,19 @@ class ParameterAnalysisService:
             })
         ]
 
+    def _pair_cells(self, df: pd.DataFrame, data: pd.DataFrame, metric: str, px_: str, py: str) -> pd.DataFrame:
+        """mean metric + run count per (px_, py) cell, cube groupby if possible, sonst aus den Rohdaten"""
+        means = self._cube_slice(df, metric, [px_, py], 'mean')
+        counts = self._cube_slice(df, metric, [px_, py], 'count')
+        if means is not None and counts is not None:
+            cells = pd.DataFrame({'mean': means, 'count': counts})
+        else:
+            cells = data.groupby([px_, py])[metric].agg(['mean', 'count'])
+        cells = cells.dropna(subset=['mean']).reset_index()
+        for col in (px_, py):
+            cells[col] = self._soft_numeric(cells[col])
+        return cells.dropna(subset=[px_, py])
+
     def _pairplot_matrix(self, df: pd.DataFrame, params: list[str], metric: str):
         n = len(params)
         if n < 2:
@@ -396,12 +463,33 @@ class ParameterAnalysisService:
             vertical_spacing=0.01
         )
 
+        # off-diagonals: ein Punkt pro Parameter-Paar-Zelle (Mittelwert aus dem Cube), gemeinsame Farbskala
+        cells = {
+            (px_, py): self._pair_cells(df, data, metric, px_, py)
+            for px_, py in itertools.permutations(params, 2)
+        }
+        means = pd.concat([c['mean'] for c in cells.values() if not c.empty]) if cells else pd.Series(dtype=float)
+        cmin, cmax = (float(means.min()), float(means.max())) if not means.empty else (None, None)
+
         color_added = False
-        mvals = data[metric]
 
         for r, py in enumerate(params, start=1):
             for c, px_ in enumerate(params, start=1):
                 if r == c:
+                    # Diagonale: Runs pro Parameterwert (Cube-Slice), sonst Histogramm der Rohdaten
+                    counts = self._cube_slice(df, metric, [px_], 'count')
+                    if counts is not None and not counts.empty:
+                        fig.add_trace(
+                            go.Bar(
+                                x=counts.index,
+                                y=counts.values,
+                                marker=dict(color='#6366f1'),
+                                hovertemplate=f"{px_}: %{{x}}<br>Count: %{{y}}<extra></extra>",
+                                showlegend=False
+                            ),
+                            row=r, col=c
+                        )
+                        continue
                     col_data = pd.to_numeric(data[px_], errors='coerce').dropna()
                     bins = min(30, max(5, col_data.nunique()))
                     fig.add_trace(
@@ -415,24 +503,29 @@ class ParameterAnalysisService:
                         row=r, col=c
                     )
                 else:
-                    x_vals = pd.to_numeric(data[px_], errors='coerce')
-                    y_vals = pd.to_numeric(data[py], errors='coerce')
+                    cell = cells[(px_, py)]
+                    if cell.empty:
+                        continue
                     hover_tmpl = (
                         f"{px_}=%{{x}}<br>"
                         f"{py}=%{{y}}<br>"
-                        f"{metric}=%{{marker.color:.4f}}<extra></extra>"
+                        f"mean {metric}=%{{marker.color:.4f}}<br>"
+                        f"runs=%{{customdata}}<extra></extra>"
                     )
                     fig.add_trace(
                         go.Scattergl(
-                            x=x_vals,
-                            y=y_vals,
+                            x=cell[px_],
+                            y=cell[py],
+                            customdata=cell['count'],
                             mode='markers',
                             marker=dict(
-                                color=mvals,
+                                color=cell['mean'],
                                 colorscale='Viridis',
+                                cmin=cmin,
+                                cmax=cmax,
                                 showscale=not color_added,
-                                colorbar=dict(title=metric) if not color_added else None,
-                                size=6,
+                                colorbar=dict(title=f"mean {metric}") if not color_added else None,
+                                size=8,
                                 line=dict(width=0),
                                 opacity=0.85
                             ),
@@ -538,7 +631,8 @@ class ParameterAnalysisService:
             }),
             html.P(
                 ("Showing first 8 parameters (truncated). " if truncated else "") +
-                f"Diagonal: distributions, off-diagonals: scatter (colored by {metric}). Both triangles filled.",
+                f"Diagonal: runs per parameter value, off-diagonals: one point per parameter pair cell "
+                f"(colored by mean {metric} over its runs, hover shows the run count). Both triangles filled.",
                 style={'color': '#94a3b8', 'margin': '0 0 14px 0', 'fontSize': '13px', 'fontFamily': 'Inter'}
             )
         ])
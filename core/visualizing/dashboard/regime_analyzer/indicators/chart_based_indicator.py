@@ -89,36 +89,41 @@ class ChartBasedIndicator(BaseIndicator):
         })
         return result.dropna()
     
-    def _calculate_volume_profile(self, data: pd.DataFrame, bins: int = 50) -> pd.DataFrame:
-        """Calculate Volume Profile - volume at price levels."""
-        high = data['high']
-        low = data['low']
-        close = data['close']
-        volume = data['volume']
-        
-        # Create price bins
-        price_min = low.min()
-        price_max = high.max()
-        price_bins = np.linspace(price_min, price_max, bins)
-        
-        # Calculate volume at each price level
-        volume_profile = []
-        for i, row in data.iterrows():
-            # Distribute volume across price range for this candle
-            candle_bins = np.linspace(row['low'], row['high'], max(2, int((row['high'] - row['low']) / (price_max - price_min) * bins)))
-            vol_per_bin = row['volume'] / len(candle_bins) if len(candle_bins) > 0 else 0
-            volume_profile.append(vol_per_bin)
-        
-        # Calculate volume-weighted average price position
-        vwap_position = []
-        for i, row in data.iterrows():
-            typical_price = (row['high'] + row['low'] + row['close']) / 3
-            position = (typical_price - price_min) / (price_max - price_min)
-            vwap_position.append(position)
-        
+    def _calculate_volume_profile(self, data: pd.DataFrame, bins: int = 50, session: Optional[str] = None) -> pd.DataFrame:
+        """Calculate Volume Profile - volume at price levels.
+
+        value = normalized typical price position in the overall range, poc = point of control
+        (center of the highest volume price bin) over the full data or per session (e.g. '1D').
+        """
+        high = data['high'].to_numpy(dtype='float64')
+        low = data['low'].to_numpy(dtype='float64')
+        close = data['close'].to_numpy(dtype='float64')
+        volume = np.nan_to_num(data['volume'].to_numpy(dtype='float64'))
+        timestamps = data.get('timestamp', data.index)
+
+        price_min = np.nanmin(low)
+        price_max = np.nanmax(high)
+        typical_price = (high + low + close) / 3
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap_position = (typical_price - price_min) / (price_max - price_min)
+
+        # volume per price bin via bincount, optionally per session
+        edges = np.linspace(price_min, price_max, bins + 1)
+        centers = (edges[:-1] + edges[1:]) / 2
+        price_bin = np.clip(np.searchsorted(edges, typical_price, side='right') - 1, 0, bins - 1)
+        if session:
+            group = pd.to_datetime(pd.Series(np.asarray(timestamps))).dt.floor(session).to_numpy()
+            _, group_id = np.unique(group, return_inverse=True)
+        else:
+            group_id = np.zeros(len(data), dtype='int64')
+        n_groups = int(group_id.max()) + 1 if len(group_id) else 0
+        profile = np.bincount(group_id * bins + price_bin, weights=volume, minlength=n_groups * bins).reshape(n_groups, bins)
+        poc = centers[profile.argmax(axis=1)][group_id] if n_groups else np.array([])
+
         result = pd.DataFrame({
-            'timestamp': data.get('timestamp', data.index),
-            'value': vwap_position  # Normalized VWAP position
+            'timestamp': timestamps,
+            'value': vwap_position,  # Normalized VWAP position
+            'poc': poc
         })
         return result
     
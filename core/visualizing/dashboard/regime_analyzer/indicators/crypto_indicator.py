@@ -1,10 +1,17 @@
 from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
-import requests
 from datetime import datetime, timedelta
+from tools.help_funcs.external_data_cache import load_fear_greed, load_coingecko_global
 from .base_indicator import BaseIndicator
 
+
+def _last_days_window(days: int):
+    """[today - days, tomorrow) in UTC -> past days come from the cache, the running day at most once per cache TTL"""
+    end = pd.Timestamp.now(tz="UTC").normalize().tz_convert(None) + pd.Timedelta(days=1)
+    return end - pd.Timedelta(days=days + 1), end
+
+
 class CryptoIndicator(BaseIndicator):
     """Crypto-specific indicators for cryptocurrency market analysis.
     
@@ -81,69 +88,60 @@ class CryptoIndicator(BaseIndicator):
     def _calculate_fear_greed(self, data: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """Calculate Crypto Fear & Greed Index.
         
-        Uses Alternative.me API to fetch Fear & Greed Index data.
+        Uses Alternative.me API (through the local external data cache) to fetch Fear & Greed Index data.
         """
         try:
-            # Alternative.me Fear & Greed Index API
-            url = f"https://api.alternative.me/fng/?limit={days}&format=json"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                fng_data = response.json()
-                
-                records = []
-                for item in fng_data['data']:
-                    records.append({
-                        'timestamp': pd.to_datetime(int(item['timestamp']), unit='s'),
-                        'value': float(item['value']),
-                        'classification': item['value_classification']
-                    })
-                
-                result = pd.DataFrame(records)
-                result = result.sort_values('timestamp')
-                
-                # Add additional metrics
-                result['value_normalized'] = result['value'] / 100  # 0-1 scale
-                result['fear_extreme'] = (result['value'] < 25).astype(int)
-                result['greed_extreme'] = (result['value'] > 75).astype(int)
-                
-                return result
-            else:
-                print(f"[CRYPTO] Fear & Greed API error: {response.status_code}")
+            start, end = _last_days_window(days)
+            result = load_fear_greed(start, end)
+            if result.empty:
+                print(f"[CRYPTO] Fear & Greed: no data available")
                 return self._generate_fallback_data(data, 'fear_greed')
+
+            result = result[['timestamp', 'value', 'classification']].sort_values('timestamp').tail(days).reset_index(drop=True)
+            
+            # Add additional metrics
+            result['value_normalized'] = result['value'] / 100  # 0-1 scale
+            result['fear_extreme'] = (result['value'] < 25).astype(int)
+            result['greed_extreme'] = (result['value'] > 75).astype(int)
+            
+            return result
                 
         except Exception as e:
             print(f"[CRYPTO] Fear & Greed calculation error: {e}")
             return self._generate_fallback_data(data, 'fear_greed')
+
+    def _coingecko_global_series(self, column: str, days: int) -> Optional[pd.DataFrame]:
+        """daily series of a coingecko global metric, snapshots are forward filled over the requested days"""
+        start, end = _last_days_window(days)
+        snapshots = load_coingecko_global(start, end)
+        if snapshots.empty or column not in snapshots.columns:
+            return None
+        timestamps = pd.date_range(end=pd.Timestamp.now(), periods=days, freq='D')
+        result = pd.merge_asof(
+            pd.DataFrame({'timestamp': timestamps}),
+            snapshots[['timestamp', column]].sort_values('timestamp'),
+            on='timestamp',
+            direction='backward'
+        ).rename(columns={column: 'value'})
+        result['value'] = result['value'].bfill()
+        return result
     
     def _calculate_btc_dominance(self, data: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """Calculate Bitcoin Dominance.
         
-        Uses CoinGecko API to fetch Bitcoin dominance data.
+        Uses CoinGecko global snapshots from the local cache (one snapshot per day is kept).
         """
         try:
-            # CoinGecko API for Bitcoin dominance
-            url = f"https://api.coingecko.com/api/v3/global"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                global_data = response.json()
-                btc_dominance = global_data['data']['market_cap_percentage']['btc']
-                
-                # Create time series data (simplified - in reality would need historical API)
-                result = pd.DataFrame({
-                    'timestamp': pd.date_range(end=pd.Timestamp.now(), periods=days, freq='D'),
-                    'value': [btc_dominance] * days,  # Simplified - would need historical data
-                })
-                
-                # Add trend analysis
-                result['dominance_normalized'] = result['value'] / 100
-                result['high_dominance'] = (result['value'] > 50).astype(int)
-                
-                return result
-            else:
-                print(f"[CRYPTO] BTC Dominance API error: {response.status_code}")
+            result = self._coingecko_global_series('btc_dominance', days)
+            if result is None:
+                print(f"[CRYPTO] BTC Dominance: no data available")
                 return self._generate_fallback_data(data, 'btc_dominance')
+            
+            # Add trend analysis
+            result['dominance_normalized'] = result['value'] / 100
+            result['high_dominance'] = (result['value'] > 50).astype(int)
+            
+            return result
                 
         except Exception as e:
             print(f"[CRYPTO] BTC Dominance calculation error: {e}")
@@ -152,25 +150,14 @@ class CryptoIndicator(BaseIndicator):
     def _calculate_total_market_cap(self, data: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """Calculate Total Crypto Market Cap."""
         try:
-            # CoinGecko API for total market cap
-            url = f"https://api.coingecko.com/api/v3/global"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                global_data = response.json()
-                total_mcap = global_data['data']['total_market_cap']['usd']
-                
-                result = pd.DataFrame({
-                    'timestamp': pd.date_range(end=pd.Timestamp.now(), periods=days, freq='D'),
-                    'value': [total_mcap] * days,  # Simplified
-                })
-                
-                # Normalize to trillions
-                result['value_trillions'] = result['value'] / 1e12
-                
-                return result
-            else:
+            result = self._coingecko_global_series('total_market_cap', days)
+            if result is None:
                 return self._generate_fallback_data(data, 'total_market_cap')
+            
+            # Normalize to trillions
+            result['value_trillions'] = result['value'] / 1e12
+            
+            return result
                 
         except Exception as e:
             print(f"[CRYPTO] Total Market Cap calculation error: {e}")
@@ -3,6 +3,19 @@ import pandas as pd
 import numpy as np
 from .base_indicator import BaseIndicator
 
+def _rolling_mean_abs_dev(values: np.ndarray, period: int, chunk_size: int = 65536) -> np.ndarray:
+    """Rolling mean absolute deviation over strided windows (chunked to bound memory), NaN for incomplete windows."""
+    out = np.full(len(values), np.nan, dtype='float64')
+    if period <= 0 or len(values) < period:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, period)
+    for start in range(0, len(windows), chunk_size):
+        block = windows[start:start + chunk_size]
+        means = block.mean(axis=1, keepdims=True)
+        out[start + period - 1:start + period - 1 + len(block)] = np.abs(block - means).mean(axis=1)
+    return out
+
+
 class GeneralIndicator(BaseIndicator):
     """General financial indicators that work for both crypto and traditional markets.
     
@@ -220,7 +233,7 @@ class GeneralIndicator(BaseIndicator):
         
         typical_price = (high + low + close) / 3
         sma_tp = typical_price.rolling(window=period).mean()
-        mean_deviation = typical_price.rolling(window=period).apply(lambda x: np.abs(x - x.mean()).mean())
+        mean_deviation = pd.Series(_rolling_mean_abs_dev(typical_price.to_numpy(dtype='float64'), period), index=typical_price.index)
         
         cci = (typical_price - sma_tp) / (0.015 * mean_deviation)
         
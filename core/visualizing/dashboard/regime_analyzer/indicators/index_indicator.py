@@ -1,8 +1,8 @@
 from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
-import requests
 from datetime import datetime, timedelta
+from tools.help_funcs.external_data_cache import load_yfinance_daily
 from .base_indicator import BaseIndicator
 
 class IndexIndicator(BaseIndicator):
@@ -78,11 +78,31 @@ class IndexIndicator(BaseIndicator):
         }
         return defaults.get(self.indicator_type, {})
     
+    def _cached_close_series(self, ticker: str, days: int) -> Optional[pd.DataFrame]:
+        """last `days` daily closes of a yahoo ticker from the local external data cache, None if unavailable"""
+        try:
+            end = pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+            # calendar days -> etwas Puffer für Wochenenden / Feiertage
+            history = load_yfinance_daily(ticker, end - pd.Timedelta(days=int(days * 1.6) + 7), end)
+        except Exception as e:
+            print(f"[INDEX] {ticker} cache error: {e}")
+            return None
+        if history.empty or 'Close' not in history.columns:
+            return None
+        return history[['timestamp', 'Close']].rename(columns={'Close': 'value'}).dropna().tail(days).reset_index(drop=True)
+
     def _calculate_vix(self, data: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """Calculate VIX (Volatility Index) - Fear Index for stocks."""
+        result = self._cached_close_series('^VIX', days)
+        if result is not None:
+            result['vix_percentile'] = result['value'].rolling(window=min(252, len(result))).rank(pct=True)
+            result['vix_fear_level'] = pd.cut(result['value'],
+                                            bins=[0, 12, 20, 30, 100],
+                                            labels=['Low', 'Normal', 'Elevated', 'High'])
+            return result
+
         try:
-            # In real implementation, would use FRED API or Yahoo Finance
-            # For now, generate realistic VIX-like synthetic data
+            # Fallback: realistic VIX-like synthetic data
             timestamps = pd.date_range(end=pd.Timestamp.now(), periods=days, freq='D')
             
             # VIX typically ranges 10-80, with mean around 20
@@ -113,8 +133,15 @@ class IndexIndicator(BaseIndicator):
     
     def _calculate_bond_yield_10y(self, data: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """Calculate 10-Year Treasury Bond Yield."""
+        result = self._cached_close_series('^TNX', days)
+        if result is not None:
+            result['yield_regime'] = pd.cut(result['value'],
+                                          bins=[0, 2, 3, 4, 10],
+                                          labels=['Low', 'Normal', 'Elevated', 'High'])
+            return result
+
         try:
-            # Generate realistic 10Y yield data (typically 1-5%)
+            # Fallback: generate realistic 10Y yield data (typically 1-5%)
             timestamps = pd.date_range(end=pd.Timestamp.now(), periods=days, freq='D')
             
             base_yield = 3.5  # Current approximate 10Y yield
@@ -144,8 +171,15 @@ class IndexIndicator(BaseIndicator):
     
     def _calculate_dollar_index(self, data: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """Calculate US Dollar Index (DXY)."""
+        result = self._cached_close_series('DX-Y.NYB', days)
+        if result is not None:
+            result['dollar_strength'] = pd.cut(result['value'],
+                                             bins=[0, 95, 105, 115, 200],
+                                             labels=['Weak', 'Normal', 'Strong', 'Very Strong'])
+            return result
+
         try:
-            # DXY typically ranges 90-120
+            # Fallback: DXY typically ranges 90-120
             timestamps = pd.date_range(end=pd.Timestamp.now(), periods=days, freq='D')
             
             base_dxy = 105.0
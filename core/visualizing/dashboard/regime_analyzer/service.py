@@ -7,6 +7,57 @@ from plotly.subplots import make_subplots
 import plotly.express as px
 from .indicators import IndicatorManager
 
+
+def forward_returns(values: np.ndarray, periods: int) -> np.ndarray:
+    """(v[i+p] - v[i]) / v[i] as shifted-array math, NaN where the base is 0/NaN or the horizon runs past the end."""
+    if periods <= 0:
+        raise ValueError("periods must be > 0")
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan, dtype='float64')
+    if periods >= len(values):
+        return out
+    cur = values[:-periods]
+    fut = values[periods:]
+    valid = (cur != 0) & ~np.isnan(cur) & ~np.isnan(fut)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[:-periods] = np.where(valid, (fut - cur) / cur, np.nan)
+    return out
+
+
+def _timestamps_ns(values) -> np.ndarray:
+    return pd.to_datetime(values).to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+def _nearest_indexer(left_ts: np.ndarray, right_ts: np.ndarray) -> np.ndarray:
+    """index of the nearest right timestamp for every left timestamp (ties -> backward, like merge_asof 'nearest')."""
+    n_right = len(right_ts)
+    back = np.searchsorted(right_ts, left_ts, side='right') - 1
+    fwd = np.searchsorted(right_ts, left_ts, side='left')
+    has_back = back >= 0
+    has_fwd = fwd < n_right
+    back_diff = np.where(has_back, left_ts - right_ts[np.clip(back, 0, n_right - 1)], np.iinfo('int64').max)
+    fwd_diff = np.where(has_fwd, right_ts[np.clip(fwd, 0, n_right - 1)] - left_ts, np.iinfo('int64').max)
+    return np.where(back_diff <= fwd_diff, back, fwd)
+
+
+def asof_join_nearest(left: pd.DataFrame, indicators: Dict[str, pd.DataFrame], on: str = 'timestamp') -> pd.DataFrame:
+    """joins all indicator value columns onto `left` in one go (nearest timestamp per indicator)."""
+    left = left.sort_values(on, kind='mergesort').reset_index(drop=True)
+    left_ts = _timestamps_ns(left[on])
+    columns = {}
+    for indicator_df in indicators.values():
+        if indicator_df.empty:
+            continue
+        right = indicator_df.sort_values(on, kind='mergesort')
+        idx = _nearest_indexer(left_ts, _timestamps_ns(right[on]))
+        for col in right.columns:
+            if col != on:
+                columns[col] = right[col].to_numpy()[idx]
+    if not columns:
+        return left
+    return pd.concat([left, pd.DataFrame(columns, index=left.index)], axis=1)
+
+
 class RegimeService:
     """Advanced regime analysis service for equity performance vs indicators."""
     
@@ -20,6 +71,9 @@ class RegimeService:
         self.current_run = None
         self.analysis_type = 'crypto'
         self.indicator_manager = None
+        # merged frames per (run_id, analysis_type), invalidated when total_equity.csv changes
+        self._run_cache: Dict[Tuple[str, str], Dict] = {}
+        self._cache_key: Optional[Tuple[str, str]] = None
 
     def set_analysis_type(self, analysis_type: str):
         """Set the analysis type (index or crypto) for specialized handling."""
@@ -41,14 +95,18 @@ class RegimeService:
         print(f"[SERVICE] Loading data for run: {run_id}")
         try:
             self.current_run = run_id
+            run_path = self.results_root / run_id / "general" / "indicators"
+            equity_file = run_path / "total_equity.csv"
+            if self._restore_cached(run_id, equity_file):
+                print(f"[SERVICE] Using cached merged data for {run_id} ({self.analysis_type})")
+                return True
+
             self.indicator_manager = IndicatorManager(self.results_root)
             
-            run_path = self.results_root / run_id / "general" / "indicators"
             if not run_path.exists():
                 print(f"[SERVICE] Run path does not exist!")
                 return False
 
-            equity_file = run_path / "total_equity.csv"
             if equity_file.exists():
                 equity_df = pd.read_csv(equity_file)
                 equity_df['timestamp'] = pd.to_datetime(equity_df['timestamp'], unit='ns')
@@ -74,6 +132,9 @@ class RegimeService:
 
             print(f"[SERVICE] Total indicators loaded: {len(self.indicators)}")
             self.create_merged_data()
+            if self.merged_data is not None:
+                self._cache_key = (run_id, self.analysis_type)
+                self._store_cache(equity_file.stat().st_mtime)
             return True
 
         except Exception as e:
@@ -82,42 +143,51 @@ class RegimeService:
             print(f"[SERVICE] Traceback: {traceback.format_exc()}")
             return False
 
+    def _restore_cached(self, run_id: str, equity_file: Path) -> bool:
+        key = (run_id, self.analysis_type)
+        entry = self._run_cache.get(key)
+        if entry is None or not equity_file.exists() or entry['equity_mtime'] != equity_file.stat().st_mtime:
+            return False
+        self.equity_data = entry['equity_data']
+        self.indicators = entry['indicators']
+        self.merged_data = entry['merged_data']
+        self.indicator_manager = entry['indicator_manager']
+        self._cache_key = key
+        return True
+
+    def _store_cache(self, equity_mtime: Optional[float] = None):
+        if self._cache_key is None:
+            return
+        entry = self._run_cache.setdefault(self._cache_key, {})
+        if equity_mtime is not None:
+            entry['equity_mtime'] = equity_mtime
+        entry.update(
+            equity_data=self.equity_data,
+            indicators=self.indicators,
+            merged_data=self.merged_data,
+            indicator_manager=self.indicator_manager,
+        )
+
     def create_merged_data(self):
         """Merge equity data with indicators and calculate returns."""
         print(f"[SERVICE] Creating merged data...")
+        # explicit re-merges (e.g. other instrument/timeframe) are not the cached run state
+        self._cache_key = None
         if self.equity_data is None or not self.indicators:
             return
 
-        merged = self.equity_data.copy()
-        equity_values = merged['equity'].values
-        
+        merged = self.equity_data.sort_values('timestamp', kind='mergesort').reset_index(drop=True)
+        equity_values = merged['equity'].to_numpy(dtype='float64')
+
         # Current return (standard)
         merged['equity_return'] = merged['equity'].pct_change()
-        
-        # Manual calculation for forward returns
-        forward_return_1 = np.full(len(equity_values), np.nan)
-        for i in range(len(equity_values) - 1):
-            if equity_values[i] != 0 and not np.isnan(equity_values[i]) and not np.isnan(equity_values[i + 1]):
-                forward_return_1[i] = (equity_values[i + 1] - equity_values[i]) / equity_values[i]
-        merged['forward_return_1'] = forward_return_1
-        
-        forward_return_5 = np.full(len(equity_values), np.nan)
-        for i in range(len(equity_values) - 5):
-            if equity_values[i] != 0 and not np.isnan(equity_values[i]) and not np.isnan(equity_values[i + 5]):
-                forward_return_5[i] = (equity_values[i + 5] - equity_values[i]) / equity_values[i]
-        merged['forward_return_5'] = forward_return_5
-        
+        merged['forward_return_1'] = forward_returns(equity_values, 1)
+        merged['forward_return_5'] = forward_returns(equity_values, 5)
         merged['cumulative_return'] = (merged['equity'] / merged['equity'].iloc[0]) - 1
         merged['equity_base'] = merged['equity']
 
-        # Merge indicators
-        for indicator_name, indicator_df in self.indicators.items():
-            merged = pd.merge_asof(
-                merged.sort_values('timestamp'),
-                indicator_df.sort_values('timestamp'),
-                on='timestamp',
-                direction='nearest'
-            )
+        # Merge indicators (one as-of pass for all indicator columns)
+        merged = asof_join_nearest(merged, self.indicators)
 
         self.merged_data = merged.dropna()
         print(f"[SERVICE] Final merged data shape: {self.merged_data.shape}")
@@ -133,25 +203,15 @@ class RegimeService:
             if 'equity_base' in self.merged_data.columns:
                 try:
                     print(f"[SERVICE] Computing {column_name} for {periods} periods...")
-                    self.merged_data = self.merged_data.copy(deep=True)
-                    
-                    equity_values = self.merged_data['equity_base'].to_numpy()
-                    forward_returns = np.full(len(equity_values), np.nan, dtype='float64')
-                    limit = len(equity_values) - periods
-                    if periods <= 0:
-                        raise ValueError("periods must be > 0")
-                    for i in range(limit):
-                        cur = equity_values[i]
-                        fut = equity_values[i + periods]
-                        if cur and not np.isnan(cur) and not np.isnan(fut):
-                            forward_returns[i] = (fut - cur) / cur
-                    
-                    self.merged_data.loc[:, column_name] = forward_returns
-                    valid_count = np.isfinite(forward_returns).sum()
+                    forward = forward_returns(self.merged_data['equity_base'].to_numpy(), periods)
+                    self.merged_data = self.merged_data.assign(**{column_name: forward})
+                    valid_count = np.isfinite(forward).sum()
                     print(f"[SERVICE] forward_return_custom {periods} bars computed ({valid_count} values)")
                 except Exception as e:
                     print(f"[SERVICE] Error calculating {column_name}: {e}")
-                    self.merged_data.loc[:, column_name] = self.merged_data.get('forward_return_1', np.nan)
+                    self.merged_data = self.merged_data.assign(**{column_name: self.merged_data.get('forward_return_1', np.nan)})
+                # keep the horizon for later clicks on the same run
+                self._store_cache()
             else:
                 return 'forward_return_1'
         
@@ -189,14 +249,21 @@ class RegimeService:
             bin_edges = feature_values.quantile(qs).to_numpy()
 
         try:
-            bin_stats = data.groupby('feature_bin').agg({
-                return_type: ['mean', 'std', 'count'],
-                feature: ['min', 'max', 'mean']
-            }).round(4)
-            
-            bin_stats.columns = ['return_mean', 'return_std', 'count', 'feature_min', 'feature_max', 'feature_mean']
+            # win rate as mean of a 0/1 column -> plain numeric reduction, no per-group python lambda
+            data.loc[:, '_win'] = (data[return_type].to_numpy() > 0).astype('float64')
+            bin_stats = data.groupby('feature_bin').agg(
+                return_mean=(return_type, 'mean'),
+                return_std=(return_type, 'std'),
+                count=(return_type, 'count'),
+                feature_min=(feature, 'min'),
+                feature_max=(feature, 'max'),
+                feature_mean=(feature, 'mean'),
+                win_rate=('_win', 'mean'),
+            ).round(4)
+            data = data.drop(columns='_win')
+
             bin_stats['sharpe'] = (bin_stats['return_mean'] / bin_stats['return_std']).fillna(0)
-            bin_stats['win_rate'] = data.groupby('feature_bin')[return_type].apply(lambda x: (x > 0).mean()).round(4)
+            bin_stats = bin_stats[['return_mean', 'return_std', 'count', 'feature_min', 'feature_max', 'feature_mean', 'sharpe', 'win_rate']]
         except Exception as e:
             print(f"[SERVICE] Error in statistics calculation: {e}")
             return {}
@@ -1,10 +1,10 @@
 from pathlib import Path
-import pandas as pd
-import quantstats as qs
 import webbrowser
-import tempfile
 from dash import html, dcc
 import warnings
+from tools.help_funcs.quantstats_reports import (
+    daily_returns_path, load_daily_returns, load_benchmark_returns, report_is_fresh, write_quantstats_report
+)
 try:
     import matplotlib
     matplotlib.use("Agg")  # verhindert GUI Backend -> unterdrückt Thread-Warnungen
@@ -155,51 +155,34 @@ class QuantStatsViewer:
         return None
 
     def _generate_quantstats_report(self, run_id, benchmark_symbol=None):
-        """Generiert QuantStats-Report und öffnet ihn im Browser"""
+        """Generiert QuantStats-Report (bzw. nutzt den vorhandenen) und öffnet ihn im Browser"""
         try:
             # Equity CSV finden
             equity_csv = self._find_equity_csv(run_id)
-            if not equity_csv:
+            run_dir = self._results_dir() / run_id
+            if not equity_csv and not daily_returns_path(run_dir).exists():
                 raise FileNotFoundError(f"No total_equity.csv found for run {run_id}")
 
-            # Equity-Kurve laden
-            equity_df = pd.read_csv(equity_csv, usecols=["timestamp", "value"])
-            equity = pd.Series(
-                equity_df["value"].values, 
-                index=pd.to_datetime(equity_df["timestamp"], unit="ns")
-            )
-            equity = equity[~equity.index.duplicated(keep='first')]
-            
-            # Fix: Resample auf Tagesbasis
-            equity_daily = equity.resample("1D").last().dropna()
-            returns = equity_daily.pct_change(fill_method=None).dropna()
+            benchmark_symbol = benchmark_symbol.strip() if benchmark_symbol else None
+            # Daily returns aus dem Cache, wird beim ersten Zugriff gebaut
+            load_daily_returns(run_dir)
 
-            # Benchmark laden (falls angegeben)
+            # Benchmark nur laden wenn der Report neu gebaut werden muss
             benchmark = None
-            if benchmark_symbol and benchmark_symbol.strip():
+            if benchmark_symbol and not report_is_fresh(run_dir, benchmark_symbol):
                 try:
-                    benchmark = qs.utils.download_returns(benchmark_symbol)
-                    # Benchmark auf gleiche Zeitspanne beschränken
-                    benchmark = benchmark[equity_daily.index.min():equity_daily.index.max()]
+                    benchmark = load_benchmark_returns(benchmark_symbol)
                 except Exception as e:
                     self._log(f"Warning: Could not load benchmark {benchmark_symbol}: {e}")
                     benchmark = None
 
-            # Temporäre HTML-Datei erstellen
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as tmp_file:
-                output_path = tmp_file.name
-
-            # QuantStats Report generieren
-            qs.reports.html(
-                returns, 
-                benchmark=benchmark, 
-                output=output_path,
-                title=f"QuantStats Report - {run_id}"
-            )
+            output_path = write_quantstats_report(run_dir, run_id, benchmark=benchmark, benchmark_symbol=benchmark_symbol)
+            if output_path is None:
+                raise ValueError(f"No returns available for run {run_id}")
 
             # Im Browser öffnen
-            webbrowser.open(f'file://{output_path}')
-            
+            webbrowser.open(output_path.as_uri())
+
             return True, f"QuantStats report generated and opened for {run_id}"
 
         except Exception as e:
@@ -5,6 +5,7 @@ from pathlib import Path
 import pandas as pd
 import yaml
 from typing import List
+from tools.help_funcs.results_ledger import open_ledger
 
 class RunValidator:
     # note: styling changes only affect UI components, logic stays the same
@@ -28,15 +29,21 @@ class RunValidator:
     def validate_and_load(self) -> pd.DataFrame:
         """Lädt und validiert all_backtest_results.csv mit strikter Prüfung"""
         
-        # CSV-Datei muss existieren
+        # CSV-Datei muss existieren - außer ein Sweep läuft noch, dann die fertigen Runs aus dem Ledger
         if not self.csv_path.exists():
-            raise FileNotFoundError(f"CRITICAL: all_backtest_results.csv not found at {self.csv_path}")
-        
-        # CSV laden
-        try:
-            df = pd.read_csv(self.csv_path)
-        except Exception as e:
-            raise RuntimeError(f"CRITICAL: Failed to read {self.csv_path}: {e}")
+            ledger = open_ledger(self.results_dir)
+            if ledger is None:
+                raise FileNotFoundError(f"CRITICAL: all_backtest_results.csv not found at {self.csv_path}")
+            try:
+                df = ledger.to_frame()
+            except Exception as e:
+                raise RuntimeError(f"CRITICAL: Failed to read {ledger.path}: {e}")
+        else:
+            # CSV laden
+            try:
+                df = pd.read_csv(self.csv_path)
+            except Exception as e:
+                raise RuntimeError(f"CRITICAL: Failed to read {self.csv_path}: {e}")
         
         # Darf nicht leer sein
         if df.empty:
@@ -1,17 +1,56 @@
 import requests
 import zipfile
 import io
+import json
+import time
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone, date
 from pathlib import Path
-import shutil
+
+from data.download.crypto_downloads.custom_class.arrow_catalog import build_table, to_unix_nanos, write_table_to_catalog
+from data.download.crypto_downloads.custom_class.book_depth_data import (
+    BOOK_DEPTH_LEVELS, BOOK_DEPTH_WRITE_OPTIONS, BookDepthData, book_depth_columns, level_columns,
+)
+
+STATE_FILE = "bookdepth_state.json"
+# 404 gilt erst als endgültig, wenn der Tag so alt ist (binance lädt die Tagesdateien verzögert hoch)
+NO_FILE_GRACE_DAYS = 3
+
+
+def snapshots_from_raw(df):
+    """
+    raw bookDepth rows (timestamp, percentage, depth, notional) -> one row per snapshot:
+    ts_event + bid/ask depth/notional je Band (kumuliert), fehlende Bänder NaN
+    """
+    ts = to_unix_nanos(df["timestamp"])
+    pct = pd.to_numeric(df["percentage"], errors="coerce").to_numpy()
+    level_index = {round(level, 2): i for i, level in enumerate(BOOK_DEPTH_LEVELS)}
+    level = pd.Series(np.round(np.abs(pct), 2)).map(level_index).to_numpy()
+    valid = ~pd.isna(level)
+    if not valid.all():
+        print(f"⚠️ {int((~valid).sum())} Zeilen mit unbekanntem percentage ignoriert")
+    ts, pct, level = ts[valid], pct[valid], level[valid].astype(int)
+    ts_unique, row = np.unique(ts, return_inverse=True)
+
+    out = {"ts_event": ts_unique}
+    for side, mask in (("bid", pct < 0), ("ask", pct > 0)):
+        for kind in ("depth", "notional"):
+            values = pd.to_numeric(df[kind], errors="coerce").to_numpy(dtype="float64")[valid]
+            grid = np.full((len(ts_unique), len(BOOK_DEPTH_LEVELS)), np.nan)
+            grid[row[mask], level[mask]] = values[mask]
+            out.update(zip(level_columns(f"{side}_{kind}"), grid.T))
+    return pd.DataFrame(out)
 
 
 class BookDepthDownloader:
     BASE_URL = "https://data.binance.vision/data/futures/um/daily/bookDepth"
 
-    def __init__(self, symbol, start_date, end_date, base_data_dir):
+    def __init__(self, symbol, start_date, end_date, base_data_dir, catalog_path=None,
+                 max_workers=8, save_in_catalog=True, save_as_csv=False, resume=True):
         self.symbol = symbol.upper()  # z. B. "ATOMUSDT"
+        self.instrument_id = f"{self.symbol}-PERP.BINANCE"
 
         self.start_date_dt = self._to_date(start_date)
         self.end_date_dt = self._to_date(end_date)
@@ -19,15 +58,18 @@ class BookDepthDownloader:
         self.end_date_str = self.end_date_dt.isoformat()
 
         self.base_data_dir = Path(base_data_dir)
-        self.temp_raw_download_dir = self.base_data_dir / "temp_bookdepth_downloads"
+        self.catalog_path = Path(catalog_path) if catalog_path else self.base_data_dir / "data_catalog_wrangled"
         self.processed_dir = (
             self.base_data_dir
             / f"processed_bookdepth_{self.start_date_str}_to_{self.end_date_str}"
             / "csv"
         )
-
-        self.temp_raw_download_dir.mkdir(parents=True, exist_ok=True)
-        self.processed_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.save_in_catalog = save_in_catalog
+        self.save_as_csv = save_as_csv
+        self.resume = resume
+        self.state_path = self.catalog_path / STATE_FILE
+        self.session = requests.Session()
 
     def _to_date(self, d):
         if isinstance(d, date):
@@ -36,58 +78,134 @@ class BookDepthDownloader:
             return datetime.strptime(d, "%Y-%m-%d").date()
         raise TypeError("start_date/end_date must be str 'YYYY-MM-DD' or datetime.date")
 
-    def run(self):
-        current = self.start_date_dt
-        temp_csvs = []
-
-        while current <= self.end_date_dt:
-            date_str = current.strftime("%Y-%m-%d")
-            url = f"{self.BASE_URL}/{self.symbol}/{self.symbol}-bookDepth-{date_str}.zip"
-            print(f"⬇️ Lade {url} ...")
-
-            r = requests.get(url)
-            if r.status_code != 200:
-                print(f"❌ Keine Datei für {date_str} (Status {r.status_code})")
-                current += timedelta(days=1)
-                continue
-
+    # resume state -----------------------------------------------------------------
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return {}
+        return json.loads(self.state_path.read_text(encoding="utf-8"))
+
+    def _mark_done(self, state, day, no_file=False):
+        """
+        day finished: downloaded days under state[instrument_id],
+        confirmed 404 days separately under state["no_file"][instrument_id] (beide werden beim resume übersprungen)
+        """
+        if no_file:
+            bucket = state.setdefault("no_file", {})
+            bucket[self.instrument_id] = sorted(set(bucket.get(self.instrument_id, [])) | {day.isoformat()})
+        else:
+            state[self.instrument_id] = sorted(set(state.get(self.instrument_id, [])) | {day.isoformat()})
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def _done_days(self, state):
+        return set(state.get(self.instrument_id, [])) | set(state.get("no_file", {}).get(self.instrument_id, []))
+
+    @staticmethod
+    def _no_file_is_final(day):
+        return day <= datetime.now(timezone.utc).date() - timedelta(days=NO_FILE_GRACE_DAYS)
+
+    def days(self):
+        total_days = (self.end_date_dt - self.start_date_dt).days + 1
+        return [self.start_date_dt + timedelta(days=n) for n in range(total_days)]
+
+    # download ----------------------------------------------------------------------
+
+    def fetch_day(self, day, max_retries=3, backoff=1.0):
+        """raw rows of one day, None if binance has no file (retries mit exponentiellem backoff)"""
+        url = f"{self.BASE_URL}/{self.symbol}/{self.symbol}-bookDepth-{day:%Y-%m-%d}.zip"
+        for attempt in range(max_retries):
             try:
-                z = zipfile.ZipFile(io.BytesIO(r.content))
-                for name in z.namelist():
-                    with z.open(name) as csvfile:
-                        df = pd.read_csv(csvfile)
-
-                        # Temporäre Datei speichern
-                        temp_path = (
-                            self.temp_raw_download_dir
-                            / f"{self.symbol}_bookDepth_{date_str}.csv"
-                        )
-                        df.to_csv(temp_path, index=False)
-                        temp_csvs.append(temp_path)
-                        print(f"📂 Gespeichert: {temp_path}")
-            except Exception as e:
-                print(f"⚠️ Fehler beim Entpacken {url}: {e}")
-
-            current += timedelta(days=1)
-
-        if not temp_csvs:
-            print("❌ Keine Daten geladen.")
-            return
-
-        # Alles zusammenfassen
-        dfs = [pd.read_csv(p) for p in temp_csvs]
-        final_df = pd.concat(dfs, ignore_index=True)
-        combined_path = (
-            self.processed_dir
-            / f"{self.symbol}_BOOKDEPTH_{self.start_date_str}_to_{self.end_date_str}.csv"
-        )
-        final_df.to_csv(combined_path, index=False)
+                r = self.session.get(url, timeout=60)
+                if r.status_code == 404:
+                    print(f"❌ Keine Datei für {day:%Y-%m-%d}")
+                    return None
+                r.raise_for_status()
+                break
+            except requests.exceptions.RequestException as e:
+                if attempt == max_retries - 1:
+                    raise
+                wait = backoff * (2 ** attempt)
+                print(f"⚠️ {url} fehlgeschlagen (Versuch {attempt + 1}/{max_retries}), neuer Versuch in {wait:.0f}s: {e}")
+                time.sleep(wait)
+        with zipfile.ZipFile(io.BytesIO(r.content)) as z:
+            frames = [pd.read_csv(z.open(name)) for name in z.namelist() if name.endswith(".csv")]
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def _process_day(self, day):
+        """(day, raw rows for the csv, snapshots written, no_file)"""
+        raw = self.fetch_day(day)
+        if raw is None:
+            return day, None, 0, True
+        if raw.empty:
+            return day, None, 0, False
+        snapshots = snapshots_from_raw(raw)
+        if self.save_in_catalog and len(snapshots):
+            # eine Datei pro Tag -> Intervalle disjunkt, ein erneuter Lauf überschreibt denselben Tag
+            table = build_table(BookDepthData.schema(), self.instrument_id, snapshots["ts_event"].to_numpy(),
+                                book_depth_columns(snapshots))
+            write_table_to_catalog(self.catalog_path, table, BookDepthData, self.instrument_id,
+                                   write_options=BOOK_DEPTH_WRITE_OPTIONS)
+        return day, raw if self.save_as_csv else None, len(snapshots), False
+
+    def _process_day_safe(self, day):
+        """_process_day für pool.map: ein fehlerhafter Tag bricht den Lauf nicht ab (transient, bleibt offen für resume)"""
+        try:
+            return self._process_day(day) + (None,)
+        except Exception as e:
+            return day, None, 0, False, e
 
-        print(f"✅ BookDepth CSV gespeichert: {combined_path}")
-
-        # Temp-Ordner aufräumen
-        shutil.rmtree(self.temp_raw_download_dir, ignore_errors=True)
-        print(f"🧹 Temporäre Downloads gelöscht: {self.temp_raw_download_dir}")
+    def run(self):
+        state = self._load_state() if self.resume else {}
+        done = self._done_days(state)
+        pending = [d for d in self.days() if d.isoformat() not in done]
+        print(f"⬇️ {self.symbol} bookDepth: {len(pending)} offene Tage von {len(self.days())} "
+              f"({self.max_workers} parallel)")
+        if not pending:
+            return 0
+
+        combined_path = None
+        if self.save_as_csv:
+            self.processed_dir.mkdir(parents=True, exist_ok=True)
+            combined_path = (
+                self.processed_dir
+                / f"{self.symbol}_BOOKDEPTH_{self.start_date_str}_to_{self.end_date_str}.csv"
+            )
+        if self.save_in_catalog:
+            self.catalog_path.mkdir(parents=True, exist_ok=True)
+
+        total = 0
+        failed = []
+        # resume: an die vorhandene CSV anhängen statt sie zu überschreiben (nachgeholte Tage landen am Ende)
+        csv_started = bool(self.resume and combined_path is not None and combined_path.exists()
+                           and combined_path.stat().st_size > 0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # map liefert in Tagesreihenfolge -> CSV bleibt sortiert, State wird nur im Hauptthread geschrieben
+            for day, raw, n_snapshots, no_file, error in pool.map(self._process_day_safe, pending):
+                if error is not None:
+                    failed.append(day)
+                    print(f"❌ {day:%Y-%m-%d} fehlgeschlagen: {error}")
+                    continue
+                if no_file:
+                    # bestätigtes 404 -> nicht bei jedem Lauf neu anfragen (außer die Datei kann noch kommen)
+                    if self._no_file_is_final(day):
+                        self._mark_done(state, day, no_file=True)
+                    continue
+                if raw is not None and combined_path is not None:
+                    raw.to_csv(combined_path, mode="a" if csv_started else "w", header=not csv_started, index=False)
+                    csv_started = True
+                total += n_snapshots
+                self._mark_done(state, day)
+                if n_snapshots:
+                    print(f"📂 {day:%Y-%m-%d}: {n_snapshots} Snapshots")
+
+        if failed:
+            print(f"⚠️ {len(failed)} Tage fehlgeschlagen, werden beim nächsten Lauf erneut geladen: "
+                  f"{', '.join(f'{d:%Y-%m-%d}' for d in failed)}")
+        print(f"✅ {total} BookDepth Snapshots gespeichert ({self.catalog_path if self.save_in_catalog else combined_path})")
+        return total
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 import shutil
-from data.download.download_logic_db import download_dbn, transform_dbn_to_parquet
+from data.download.download_logic_db import download_dbn_many, transform_dbn_to_parquet
 
 load_dotenv()
 
@@ -30,30 +30,14 @@ if not api_key:
 
 if __name__ == "__main__":
     try:
-        # Download OHLCV (Bar-Daten) - use instrument_id to get GLBX venue
-        download_dbn(
-            symbol=symbol,
-            start_date=start_date,
-            end_date=end_date,
-            dataset=dataset,
-            schema="ohlcv-1m",
-            api_key=api_key,
-            raw_dir=raw_dir / "bars",
-            stype_out="instrument_id",  # This should give us GLBX venue
-        )
+        # Bars + Definitionen als Batch-Jobs gleichzeitig einreichen, gemeinsam pollen - use instrument_id to get GLBX venue
+        jobs = [
+            dict(symbol=symbol, start_date=start_date, end_date=end_date, dataset=dataset,
+                 schema=schema, raw_dir=raw_dir / sub_dir, stype_out="instrument_id")
+            for schema, sub_dir in (("ohlcv-1m", "bars"), ("definition", "definitions"))
+        ]
+        download_dbn_many(jobs, api_key=api_key)
     
-        # Download Definitionen (Contract-Daten) - use instrument_id
-        download_dbn(
-            symbol=symbol,
-            start_date=start_date,
-            end_date=end_date,
-            dataset=dataset,
-            schema="definition",
-            api_key=api_key,
-            raw_dir=raw_dir / "definitions",
-            stype_out="instrument_id",  # This should give us GLBX venue
-        )
-        
         # Transformiere Bar-Daten - Nautilus fügt data/bar automatisch hinzu
         transform_dbn_to_parquet(
             symbol=symbol,
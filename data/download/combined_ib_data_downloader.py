@@ -2,4 +2,5 @@ import asyncio
 from download_logic_ib import download__ib_historical_data
 
 if __name__ == "__main__":
-    asyncio.run(download__ib_historical_data())
\ No newline at end of file
+    # lädt nur Zeiträume, die noch nicht in ib_coverage.json stehen (Monats-Chunks parallel, IB-Pacing beachtet)
+    asyncio.run(download__ib_historical_data())
@@ -12,12 +12,14 @@ from nautilus_trader.core.nautilus_pyo3 import Bar, BarSpecification, BarType, B
 from nautilus_trader.persistence.wranglers_v2 import BarDataWranglerV2
 from nautilus_trader.test_kit.providers import TestInstrumentProvider
 from nautilus_trader.core.datetime import unix_nanos_to_dt
-from nautilus_trader.persistence.loaders import CSVTickDataLoader
-from nautilus_trader.persistence.wranglers import TradeTickDataWrangler
 from nautilus_trader.persistence.catalog import ParquetDataCatalog
 import glob
 import os
 
+from data.download.crypto_downloads.custom_class.tick_ingest import (
+    DEFAULT_TICK_CHUNKSIZE, TickCatalogSink, clean_tick_frame, ingest_tick_sources,
+)
+
 
 # Parameter hier anpassen
 symbol = "ETHUSDT-PERP"
@@ -29,10 +31,13 @@ interval = "5m"    # nur für Bars relevant
 
 save_as_csv = True    # Bars zusätzlich als OHLCV.csv speichern
 save_in_catalog = False  # Bars in Nautilus Parquet-Katalog schreiben
+TICK_WORKERS = 1  # >1: mehrere Tage parallel nach Arrow/Katalog konvertieren (Speicher ~ Anzahl Tage im Flug)
 
 class CombinedCryptoDataDownloader:
     def __init__(self, symbol, start_date, end_date, base_data_dir, datatype="tick", interval="1h",
-                 csv_output_subdir: str | None = None):  # NEU
+                 csv_output_subdir: str | None = None,  # NEU
+                 save_as_csv: bool | None = None, save_in_catalog: bool | None = None,
+                 tick_workers: int = TICK_WORKERS):
         # Symbol-Handling für Spot und Futures (PERP)
         self.is_perp = symbol.endswith("-PERP")
         self.symbol_for_binance = symbol.replace("-PERP", "")
@@ -43,39 +48,31 @@ class CombinedCryptoDataDownloader:
         self.base_data_dir = base_data_dir
         self.datatype = datatype
         self.interval = interval
-        self.save_as_csv = save_as_csv
-        self.save_in_catalog = save_in_catalog
+        # None -> Modul-Defaults (Skript-Aufruf), Orchestrator übergibt explizit statt die Globals zu setzen
+        self.save_as_csv = globals()["save_as_csv"] if save_as_csv is None else save_as_csv
+        self.save_in_catalog = globals()["save_in_catalog"] if save_in_catalog is None else save_in_catalog
         self.csv_output_subdir = csv_output_subdir  # NEU
+        self.tick_workers = tick_workers
 
     def run(self):
         if self.datatype == "tick":
             print("Mode: tick")
+            # Stream: zip -> Arrow -> Katalog/TICK.csv, kein processed csv und keine tmp csv mehr
             tick_downloader = TickDownloader(
                 symbol=self.symbol_for_binance,
                 start_date=self.start_date,
                 end_date=self.end_date,
                 base_data_dir=self.base_data_dir
             )
-            tick_downloader.run()
-            processed_dir = str(Path(self.base_data_dir) / "cache" / f"processed_tick_data_{self.start_date}_to_{self.end_date}" / "csv")
-            csv_path = find_csv_file(self.symbol_for_binance, processed_dir)
-            catalog_root_path = f"{self.base_data_dir}/data_catalog_wrangled"
-            tick_transformer = TickTransformer(
-                csv_path=csv_path,
-                catalog_root_path=catalog_root_path,
-                symbol=self.symbol_for_binance,
-                is_perp=self.is_perp,
-                save_as_csv=self.save_as_csv,
-                save_in_catalog=self.save_in_catalog,
-                base_data_dir=self.base_data_dir,
-                csv_output_subdir=self.csv_output_subdir,  # NEU
+            sink = make_tick_sink(
+                self.symbol_for_binance, self.is_perp, self.save_as_csv, self.save_in_catalog,
+                self.base_data_dir, f"{self.base_data_dir}/data_catalog_wrangled", self.csv_output_subdir,
             )
-            tick_transformer.run()
-            try:
-                shutil.rmtree(Path(self.base_data_dir) / "cache" / f"processed_tick_data_{self.start_date}_to_{self.end_date}")
-                print(f"[INFO] Tick-Ordner gelöscht: {Path(self.base_data_dir) / 'cache' / f'processed_tick_data_{self.start_date}_to_{self.end_date}'}")
-            except Exception as e:
-                print(f"[WARN] Tick-Ordner konnte nicht gelöscht werden: {e}")
+            print(f"Tick download started: {self.symbol_for_binance} ({len(tick_downloader.days())} days)")
+            rows = ingest_tick_sources(tick_downloader.days(), tick_downloader.read_day, sink,
+                                       max_workers=self.tick_workers)
+            tick_downloader.cleanup()
+            print(f"[INFO] {rows} ticks written")
             print("Tick pipeline completed.")
         elif self.datatype == "bar":
             print("Mode: bar")
@@ -169,7 +166,11 @@ class CombinedCryptoDataDownloader:
         
 
 class TickDownloader:
-    def __init__(self, symbol, start_date, end_date, base_data_dir):
+    """daily trade zips from data.binance.vision, streamed to disk and read chunkweise direkt aus dem zip"""
+
+    columns = ['trade_id', 'price', 'quantity', 'base_quantity', 'timestamp', 'is_buyer_maker']
+
+    def __init__(self, symbol, start_date, end_date, base_data_dir, chunksize=DEFAULT_TICK_CHUNKSIZE):
         self.symbol = symbol
         self.start_date = start_date
         self.end_date = end_date
@@ -179,54 +180,92 @@ class TickDownloader:
         self.temp_dir = self.cache_root / "temp_tick_downloads"
         self.processed_dir = self.cache_root / f"processed_tick_data_{start_date}_to_{end_date}" / "csv"
         self.futures_url = "https://data.binance.vision/data/futures/um/daily/trades"
+        self.chunksize = chunksize
+
+    def days(self):
+        total_days = (self.end_date - self.start_date).days + 1
+        return [self.start_date + dt.timedelta(days=n) for n in range(total_days)]
+
+    def read_day(self, date):
+        """raw chunks (timestamp, trade_id, price, quantity, buyer_maker) of one day, nothing if no file exists"""
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        filename = f"{self.symbol}-trades-{date:%Y-%m-%d}.zip"
+        zip_path = self.temp_dir / filename
+        try:
+            with requests.get(f"{self.futures_url}/{self.symbol}/{filename}", stream=True, timeout=60) as r:
+                if r.status_code != 200:
+                    print(f"[WARN] No tick data for {date:%Y-%m-%d} (HTTP {r.status_code})")
+                    return
+                with open(zip_path, "wb") as f:
+                    for block in r.iter_content(chunk_size=1 << 20):
+                        f.write(block)
+            with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                for name in zip_ref.namelist():
+                    if not name.endswith(".csv"):
+                        continue
+                    with zip_ref.open(name) as fh:
+                        for chunk in pd.read_csv(fh, names=self.columns, chunksize=self.chunksize, low_memory=False):
+                            yield chunk.rename(columns={"is_buyer_maker": "buyer_maker"})[
+                                ["timestamp", "trade_id", "price", "quantity", "buyer_maker"]]
+        finally:
+            zip_path.unlink(missing_ok=True)
+
+    def cleanup(self):
+        try:
+            self.temp_dir.rmdir()
+        except OSError:
+            pass  # andere Symbole laden noch / nicht leer
 
     def run(self):
+        """processed csv (timestamp ms, trade_id, price, quantity, buyer_maker) wie bisher, ohne extractall"""
         self.processed_dir.mkdir(parents=True, exist_ok=True)
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
         output_file = self.processed_dir / f"{self.symbol}_TICKS_{self.start_date:%Y-%m-%d}_to_{self.end_date:%Y-%m-%d}.csv"
         if output_file.exists():
             output_file.unlink()
-        columns = ['trade_id', 'price', 'quantity', 'base_quantity', 'timestamp', 'is_buyer_maker']
-        total_days = (self.end_date - self.start_date).days + 1
-        print(f"Tick download started: {self.symbol} ({total_days} days)")
-        for n in range(total_days):
-            date = self.start_date + dt.timedelta(days=n)
-            filename = f"{self.symbol}-trades-{date:%Y-%m-%d}.zip"
-            url = f"{self.futures_url}/{self.symbol}/{filename}"
-            zip_path = self.temp_dir / filename
-            r = requests.get(url)
-            if r.status_code != 200:
-                continue
-            with open(zip_path, "wb") as f:
-                f.write(r.content)
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(self.temp_dir)
-            for csv_file in self.temp_dir.glob("*.csv"):
-                df = pd.read_csv(csv_file, names=columns, low_memory=False)
-                df['price'] = pd.to_numeric(df['price'], errors='coerce')
-                df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
-                df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce')  # ms since epoch
-                df = df.dropna(subset=['price', 'quantity', 'timestamp'])
-                df = df[(df['price'] > 0) & (df['quantity'] > 0) & (df['timestamp'] > 0)]
-                df['timestamp'] = df['timestamp'].astype('int64')  # sicherstellen int
-                df['buyer_maker'] = df['is_buyer_maker'].astype(str).str.lower() == 'true'
-                chunk = df[['timestamp', 'trade_id', 'price', 'quantity', 'buyer_maker']]
-                mode = 'w' if n == 0 else 'a'
-                header = n == 0
-                chunk.to_csv(output_file, mode=mode, header=header, index=False)
-                csv_file.unlink(missing_ok=True)
-            zip_path.unlink(missing_ok=True)
-        for f in self.temp_dir.glob("*"):
-            f.unlink(missing_ok=True)
-        self.temp_dir.rmdir()
+        print(f"Tick download started: {self.symbol} ({len(self.days())} days)")
+        header = True
+        for date in self.days():
+            for raw in self.read_day(date):
+                clean = clean_tick_frame(raw)
+                chunk = pd.DataFrame({
+                    "timestamp": clean["ts_ns"] // 1_000_000,
+                    "trade_id": clean["trade_id"],
+                    "price": clean["price"],
+                    "quantity": clean["quantity"],
+                    "buyer_maker": clean["buyer_maker"],
+                })
+                chunk.to_csv(output_file, mode='w' if header else 'a', header=header, index=False)
+                header = False
+        self.cleanup()
         print(f"Tick data written: {output_file}")
 
+
+def make_tick_sink(symbol, is_perp, save_as_csv, save_in_catalog, base_data_dir, catalog_root_path,
+                   csv_output_subdir=None):
+    """catalog (bisheriges Test-Instrument) und/oder csv_data/<symbol>/TICK.csv als Ziel"""
+    symbol_label = symbol + ("-PERP" if is_perp else "")
+    instrument = None
+    if save_in_catalog:
+        Path(catalog_root_path).mkdir(parents=True, exist_ok=True)
+        instrument = TestInstrumentProvider.btcusdt_perp_binance()
+        ParquetDataCatalog(path=str(catalog_root_path)).write_data([instrument])
+    csv_out_path = None
+    if save_as_csv:
+        subdir = csv_output_subdir or os.getenv("CSV_OUTPUT_SUBDIR") or "csv_data"  # NEU
+        csv_out_path = Path(base_data_dir) / subdir / symbol_label / "TICK.csv"
+    return TickCatalogSink(instrument=instrument, catalog_path=catalog_root_path if save_in_catalog else None,
+                           csv_out_path=csv_out_path, symbol_label=symbol_label)
+
+
 class TickTransformer:
+    """processed tick csv -> catalog / TICK.csv (chunkweise, vektorisiert)"""
+
     def __init__(self, csv_path, catalog_root_path,
                  symbol=None, is_perp=False,
                  save_as_csv=False, save_in_catalog=True,
                  base_data_dir=None,
-                 csv_output_subdir: str | None = None):  # NEU
+                 csv_output_subdir: str | None = None,  # NEU
+                 chunksize=DEFAULT_TICK_CHUNKSIZE):
         self.csv_path = Path(csv_path)
         self.catalog_root_path = Path(catalog_root_path)
         self.symbol = symbol
@@ -235,69 +274,14 @@ class TickTransformer:
         self.save_in_catalog = save_in_catalog
         self.base_data_dir = Path(base_data_dir) if base_data_dir else self.catalog_root_path
         self.csv_output_subdir = csv_output_subdir  # NEU
+        self.chunksize = chunksize
 
     def run(self):
-        if self.save_in_catalog:
-            self.catalog_root_path.mkdir(parents=True, exist_ok=True)
-            catalog = ParquetDataCatalog(path=self.catalog_root_path)
-            instrument = TestInstrumentProvider.btcusdt_perp_binance()
-            catalog.write_data([instrument])
-            wrangler = TradeTickDataWrangler(instrument=instrument)
-        else:
-            catalog = None
-            wrangler = None
-
-        chunk_iter = pd.read_csv(self.csv_path, chunksize=5_000_000)
-        csv_out_path = None
-        first_chunk = True
-
-        for i, chunk_df in enumerate(chunk_iter):
-            # Parsing timestamp robust: numeric (ms) oder ISO-String aus Altbeständen
-            if self.save_as_csv:
-                if csv_out_path is None:
-                    subdir = self.csv_output_subdir or os.getenv("CSV_OUTPUT_SUBDIR") or "csv_data"  # NEU
-                    sym_dir = self.base_data_dir / subdir / (self.symbol + ("-PERP" if self.is_perp else ""))
-                    sym_dir.mkdir(parents=True, exist_ok=True)
-                    csv_out_path = sym_dir / "TICK.csv"
-
-                ts_raw = chunk_df["timestamp"]
-                if pd.api.types.is_integer_dtype(ts_raw) or pd.api.types.is_float_dtype(ts_raw):
-                    ts = pd.to_datetime(ts_raw.astype('int64'), unit='ms', utc=True)
-                else:
-                    ts = pd.to_datetime(ts_raw, utc=True, errors='coerce', format='ISO8601')
-                    mask_na = ts.isna()
-                    if mask_na.any():
-                        ts_alt = pd.to_datetime(ts_raw[mask_na], utc=True, errors='coerce')
-                        ts[mask_na] = ts_alt
-
-                ts_nano = ts.astype('int64')  # statt deprecated .view("int64")
-
-                rows = pd.DataFrame({
-                    "timestamp_nano": ts_nano,
-                    "timestamp_iso": ts.dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-                    "symbol": self.symbol + ("-PERP" if self.is_perp else ""),
-                    "price": pd.to_numeric(chunk_df["price"], errors="coerce"),
-                    "quantity": pd.to_numeric(chunk_df["quantity"], errors="coerce"),
-                    "buyer_maker": chunk_df["buyer_maker"].astype(str),
-                    "trade_id": chunk_df["trade_id"],
-                }).dropna(subset=["price", "quantity", "timestamp_nano"])
-
-                rows.to_csv(
-                    csv_out_path,
-                    mode="w" if first_chunk else "a",
-                    header=first_chunk,
-                    index=False
-                )
-
-            if self.save_in_catalog:
-                tmp_csv = self.catalog_root_path / f"tmp_tick_chunk_{i}.csv"
-                chunk_df.to_csv(tmp_csv, index=False)
-                data = CSVTickDataLoader.load(file_path=tmp_csv)
-                ticks = wrangler.process(data)
-                catalog.write_data(ticks, skip_disjoint_check=True)
-                tmp_csv.unlink()
-
-            first_chunk = False
+        sink = make_tick_sink(self.symbol, self.is_perp, self.save_as_csv, self.save_in_catalog,
+                              self.base_data_dir, self.catalog_root_path, self.csv_output_subdir)
+        # timestamp numeric (ms) oder ISO-String aus Altbeständen, siehe clean_tick_frame
+        rows = ingest_tick_sources([self.csv_path], lambda path: pd.read_csv(path, chunksize=self.chunksize), sink)
+        print(f"[INFO] {rows} ticks transformed from {self.csv_path.name}")
 
 class BarDownloader:
     def __init__(self, symbol, interval, start_date, end_date, base_data_dir):
@@ -523,73 +507,13 @@ def find_csv_file(symbol, processed_dir):
     return selected
 
 def _fetch_single_symbol_info(symbol: str, is_perp: bool) -> dict:
-    base_url = "https://fapi.binance.com/fapi/v1/exchangeInfo" if is_perp else "https://api.binance.com/api/v3/exchangeInfo"
-    # NOTE: Don't use symbol parameter as it doesn't filter correctly, fetch all and filter manually
-    resp = requests.get(base_url, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    symbols = data.get("symbols") or []
-    
-    # Find the specific symbol
-    for symbol_info in symbols:
-        if symbol_info["symbol"] == symbol:
-            return symbol_info
-    
-    raise ValueError(f"exchangeInfo: Symbol '{symbol}' nicht gefunden (is_perp={is_perp}). Available symbols: {len(symbols)}")
+    # volle exchangeInfo nur einmal pro TTL (instrument_store), nicht pro Symbol
+    from data.download.crypto_downloads.custom_class.instrument_store import get_instrument_store
+    return get_instrument_store().get_info("BINANCE", "perp" if is_perp else "spot", symbol)
 
 def get_instrument(symbol: str, is_perp: bool):
-    from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
-    from nautilus_trader.test_kit.providers import TestInstrumentProvider
-    from nautilus_trader.model.objects import Price, Quantity
-
-    raw_symbol = symbol.replace("-PERP", "") if is_perp else symbol
-    info = _fetch_single_symbol_info(raw_symbol, is_perp)
-    filters = {f["filterType"]: f for f in info["filters"]}
-    tick_size_str = filters["PRICE_FILTER"]["tickSize"]
-    step_size_str = filters["LOT_SIZE"]["stepSize"]
-    use_price_precision = int(info["pricePrecision"])
-    use_size_precision = int(info["quantityPrecision"])
-    
-    # Better fix: Calculate precision from tick size instead of trusting pricePrecision
-    # This handles all pairs, not just BTCUSDT
-    tick_size = Decimal(tick_size_str)
-    calculated_price_precision = abs(tick_size.as_tuple().exponent)
-    
-    if calculated_price_precision != use_price_precision:
-        print(f"Debug: Precision mismatch for {raw_symbol} - API says {use_price_precision}, tick size implies {calculated_price_precision}. Using tick size.")
-        use_price_precision = calculated_price_precision
-        
-    if is_perp:
-        margin_init = Decimal(info["requiredMarginPercent"]) / Decimal(100)
-        margin_maint = Decimal(info["maintMarginPercent"]) / Decimal(100)
-    else:
-        margin_init = Decimal("0")
-        margin_maint = Decimal("0")
-    min_notional = filters.get("MIN_NOTIONAL", {}).get("notional")
-    min_qty = filters["LOT_SIZE"]["minQty"]
-    max_qty = filters["LOT_SIZE"]["maxQty"]
-    template = TestInstrumentProvider.btcusdt_perp_binance() if is_perp else TestInstrumentProvider.btcusdt_binance()
-    inst_id = InstrumentId(Symbol(f"{raw_symbol}-PERP"), Venue("BINANCE")) if is_perp else InstrumentId(Symbol(raw_symbol), Venue("BINANCE"))
-    instrument = template.__class__(
-        instrument_id=inst_id,
-        raw_symbol=Symbol(raw_symbol),
-        base_currency=template.base_currency,
-        quote_currency=template.quote_currency,
-        settlement_currency=template.settlement_currency,
-        is_inverse=template.is_inverse,
-        price_precision=use_price_precision,
-        size_precision=use_size_precision,
-        price_increment=Price.from_str(tick_size_str),
-        size_increment=Quantity.from_str(step_size_str),
-        margin_init=margin_init,
-        margin_maint=margin_maint,
-        maker_fee=template.maker_fee,
-        taker_fee=template.taker_fee,
-        ts_event=template.ts_event,
-        ts_init=template.ts_init,
-    )
-    return instrument
-
+    from data.download.crypto_downloads.custom_class.instrument_store import resolve_instruments
+    return resolve_instruments("BINANCE", [symbol], is_perp)[symbol]
 
 
 if __name__ == "__main__":
@@ -2,12 +2,13 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import csv
 import json
-import time
 import os
 
-from main_download import CryptoDataOrchestrator
+from main_download import CryptoDataOrchestrator, SOURCE_LIMITS
 from new_future_list_download import BinancePerpetualFuturesDiscovery
 from fear_and_greed_download import FearAndGreedDownloader
+from data.download.crypto_downloads.task_graph import TaskGraph
+from data.download.crypto_downloads.custom_class.listing_feed import LISTED, get_listing_feed
 
 # ========================
 # Configuration
@@ -23,10 +24,14 @@ RUN_DISCOVERY = True
 DISCOVERY_WINDOW_START = "2024-01-01"
 DISCOVERY_WINDOW_END = "2025-10-07"
 DISCOVERY_ONLY_USDT = True
+# nur Symbole, deren Listing-Event dieser Konsument noch nicht verarbeitet hat (listing feed Cursor)
+ONLY_NEW_LISTINGS = False
+LISTING_CONSUMER = "binance_iteration"
 
 RANGE_DAYS = 28
 MAX_SYMBOLS = None
-SLEEP_SECONDS = 1
+TASK_RETRIES = 1
+RESUME = True  # abgebrochene Iteration setzt bei den offenen Tasks fort (iteration_state.json)
 
 RUN_LUNAR = False
 RUN_VENUE = True
@@ -41,11 +46,9 @@ BINANCE_INTERVAL = "15m"
 SAVE_AS_CSV = True
 SAVE_IN_CATALOG = True
 DOWNLOAD_IF_MISSING = True
+STATE_FILE = BASE_DATA_DIR / "iteration_state.json"
 # ========================
 
-_fng_done = False
-_fng_result = None
-
 def _sep(title: str) -> str:
     line = "-" * 22
     return f"\n{line} {title.upper()} {line}"
@@ -61,10 +64,8 @@ def run_discovery_if_needed():
     )
     d.run()
 
-def run_fng_once():
-    global _fng_done, _fng_result
-    if _fng_done or not RUN_FNG:
-        return
+def download_fng():
+    """Fear & Greed einmal für das ganze Fenster (eigene Task, nicht pro Symbol)"""
     print(_sep(f"FEAR & GREED WINDOW {DISCOVERY_WINDOW_START} -> {DISCOVERY_WINDOW_END}"))
     try:
         dl = FearAndGreedDownloader(
@@ -79,12 +80,12 @@ def run_fng_once():
             remove_processed=True,
             csv_output_subdir=CSV_OUTPUT_SUBDIR,  # NEU
         )
-        _fng_result = dl.run()
-        print(f"[OK] Fear & Greed geladen: records={_fng_result.get('records')}")
+        result = dl.run()
+        print(f"[OK] Fear & Greed geladen: records={result.get('records')}")
+        return result
     except Exception as e:
-        _fng_result = {"error": str(e)}
         print(f"[ERROR] Fear & Greed Download: {e}")
-    _fng_done = True
+        return {"error": str(e)}
 
 def parse_onboard(ts: str):
     for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
@@ -102,11 +103,19 @@ def load_futures(csv_path: Path):
 
 def iterate_symbols():
     run_discovery_if_needed()
-    run_fng_once()  # NEU: vor Symbolen
     rows = load_futures(FUTURES_CSV)
-    summaries = []
+    feed, listing_cursor = None, None
+    if ONLY_NEW_LISTINGS:
+        feed = get_listing_feed("BINANCE", "perp")
+        new_events, listing_cursor = feed.consume(LISTING_CONSUMER, kinds=(LISTED,))
+        new_symbols = {e["symbol"] for e in new_events}
+        rows = [r for r in rows if r["symbol"] in new_symbols]
+        print(f"[INFO] {len(rows)} neue Listings seit dem letzten Lauf ({LISTING_CONSUMER}).")
     total = len(rows) if MAX_SYMBOLS is None else min(MAX_SYMBOLS, len(rows))
     print(f"[INFO] Starte Iteration über {total} Symbole (von {len(rows)} gelistet).")
+
+    # NEU: alle Symbol/Stage-Tasks in einem Graph, Quellen parallel, pro Quelle begrenzt (SOURCE_LIMITS)
+    entries = []
     for idx, row in enumerate(rows, 1):
         if MAX_SYMBOLS and idx > MAX_SYMBOLS:
             break
@@ -118,7 +127,6 @@ def iterate_symbols():
             continue
         start_date = onboard_dt.date()
         end_date = start_date + timedelta(days=RANGE_DAYS - 1)
-        print(_sep(f"SYMBOL {idx}/{total}: {symbol}  RANGE {start_date} -> {end_date}"))
         orch = CryptoDataOrchestrator(
             symbol=symbol,
             start=start_date.isoformat(),
@@ -137,40 +145,53 @@ def iterate_symbols():
             fng_instrument_id=FNG_INSTRUMENT_ID,
             csv_output_subdir=CSV_OUTPUT_SUBDIR,  # NEU
         )
-        # NEU: Statt orch.run() modulare Ausführung mit sichtbaren Sektionen
-        results = {}
-        if RUN_LUNAR:
-            print(_sep("LUNAR START"))
-            results["lunar"] = orch.run_lunar_metrics()
-            print(_sep("LUNAR DONE"))
-        if RUN_VENUE:
-            print(_sep("VENUE METRICS START"))
-            results["venue_metrics"] = orch.run_venue_metrics()
-            print(_sep("VENUE METRICS DONE"))
-        if RUN_BINANCE:
-            print(_sep(f"BINANCE {BINANCE_DATATYPE.upper()} START"))
-            results["binance_data"] = orch.run_binance_data()
-            print(_sep(f"BINANCE {BINANCE_DATATYPE.upper()} DONE"))
-        summary = {
-            "input": {
-                "symbol_input": orch.symbol,
-                "normalized_base": orch.base_symbol,
-                "normalized_perp": orch.perp_symbol,
-                "start": orch.start,
-                "end": orch.end,
-            },
-            "results": results,
-        }
-        # NEU: Fear & Greed global anhängen
-        if _fng_result and "fear_greed_global" not in summary:
-            summary["fear_greed_global"] = _fng_result
-        summaries.append(summary)
-        out_json = BASE_DATA_DIR / "iteration_results.json"
+        entries.append(orch)
+
+    out_json = BASE_DATA_DIR / "iteration_results.json"
+
+    def build_summaries():
+        task_results = graph.results()
+        summaries = []
+        for orch, keys in task_keys:
+            results = {name: task_results[key] for name, key in keys.items() if key in task_results}
+            if not results:
+                continue
+            summary = {
+                "input": {
+                    "symbol_input": orch.symbol,
+                    "normalized_base": orch.base_symbol,
+                    "normalized_perp": orch.perp_symbol,
+                    "start": orch.start,
+                    "end": orch.end,
+                },
+                "results": results,
+            }
+            # NEU: Fear & Greed global anhängen
+            if "fear_greed" in task_results:
+                summary["fear_greed_global"] = task_results["fear_greed"]
+            summaries.append(summary)
+        return summaries
+
+    def on_task_done(key, outcome):
+        print(_sep(f"{key} {outcome.status} ({outcome.seconds:.0f}s)"))
         with open(out_json, "w", encoding="utf-8") as jf:
-            json.dump(summaries, jf, indent=2)
-        print(f"[OK] {symbol} abgeschlossen. Zwischenergebnis gespeichert.")
-        if idx < total:
-            time.sleep(SLEEP_SECONDS)
+            json.dump(build_summaries(), jf, indent=2, default=str)
+
+    graph = TaskGraph(source_limits=SOURCE_LIMITS, state_path=STATE_FILE, resume=RESUME, on_task_done=on_task_done)
+    if RUN_FNG:
+        graph.add("fear_greed", download_fng, source="fear_greed", retries=TASK_RETRIES)
+    task_keys = [(orch, orch.add_to_graph(graph, retries=TASK_RETRIES)) for orch in entries]
+    graph.run()
+
+    summaries = build_summaries()
+    with open(out_json, "w", encoding="utf-8") as jf:
+        json.dump(summaries, jf, indent=2, default=str)
+    failed = [k for k, o in graph.outcomes.items() if o.status != "done"]
+    if failed:
+        print(f"[WARN] {len(failed)} Tasks nicht erledigt (Neustart setzt dort fort): {failed}")
+    if feed is not None:
+        # offene Tasks holt RESUME nach, die Listings selbst gelten als verarbeitet
+        feed.commit(LISTING_CONSUMER, listing_cursor)
     print("\n[INFO] Iteration fertig.")
     return summaries
 
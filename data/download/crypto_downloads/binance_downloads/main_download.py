@@ -1,13 +1,13 @@
 import json
 import os
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Any, Callable, Dict, List, Tuple
 
 from lunar_metrics_download import LunarMetricsDownloader
 from venue_metrics_download import VenueMetricsDownloader
 from binance_data_download import CombinedCryptoDataDownloader
-import binance_data_download as bdd
 from fear_and_greed_download import FearAndGreedDownloader
+from data.download.crypto_downloads.task_graph import TaskGraph
 
 # ========================
 # Configuration
@@ -31,6 +31,9 @@ SAVE_AS_CSV = False
 SAVE_IN_CATALOG = True
 DOWNLOAD_IF_MISSING = True
 CSV_OUTPUT_SUBDIR = None
+
+# max. gleichzeitige Tasks pro Datenquelle (Stages verschiedener Quellen laufen parallel)
+SOURCE_LIMITS = {"lunar": 1, "venue_metrics": 1, "binance_data": 1, "fear_greed": 1}
 # ========================
 
 class CryptoDataOrchestrator:
@@ -125,8 +128,6 @@ class CryptoDataOrchestrator:
     def run_binance_data(self) -> Dict[str, Any]:
         # ...existing code...
         try:
-            bdd.save_as_csv = self.save_as_csv
-            bdd.save_in_catalog = self.save_in_catalog
             CombinedCryptoDataDownloader(
                 symbol=self.perp_symbol,
                 start_date=self.start,
@@ -135,6 +136,8 @@ class CryptoDataOrchestrator:
                 datatype=self.binance_datatype,
                 interval=self.binance_interval,
                 csv_output_subdir=self.csv_output_subdir,  # NEU
+                save_as_csv=self.save_as_csv,
+                save_in_catalog=self.save_in_catalog,
             ).run()
             # Entfernt: erneutes Speichern OHLCV.csv (BarTransformer erledigt das jetzt im Zielsubdir)
             return {
@@ -161,16 +164,34 @@ class CryptoDataOrchestrator:
         except Exception as e:
             return {"error": str(e)}
 
-    def run(self) -> Dict[str, Any]:
-        results: Dict[str, Any] = {}
+    def stages(self) -> List[Tuple[str, Callable[[], Dict[str, Any]]]]:
+        """enabled stages as (name, callable); name is also the data source for the task graph"""
+        stages = []
         if self.run_lunar:
-            results["lunar"] = self.run_lunar_metrics()
+            stages.append(("lunar", self.run_lunar_metrics))
         if self.run_venue:
-            results["venue_metrics"] = self.run_venue_metrics()
+            stages.append(("venue_metrics", self.run_venue_metrics))
         if self.run_binance:
-            results["binance_data"] = self.run_binance_data()
+            stages.append(("binance_data", self.run_binance_data))
         if self.run_fng:                      # NEU
-            results["fear_greed"] = self.run_fear_greed()
+            stages.append(("fear_greed", self.run_fear_greed))
+        return stages
+
+    def add_to_graph(self, graph: TaskGraph, retries: int = 1) -> Dict[str, str]:
+        """adds one task per stage (key "<perp_symbol>:<stage>"), returns stage -> task key"""
+        keys = {}
+        for name, fn in self.stages():
+            keys[name] = f"{self.perp_symbol}:{name}"
+            graph.add(keys[name], fn, source=name, retries=retries)
+        return keys
+
+    def run(self, source_limits: Dict[str, int] | None = None, state_path: Path | None = None) -> Dict[str, Any]:
+        # Stages hängen nicht voneinander ab -> laufen parallel, Dauer ~ langsamste Quelle statt Summe
+        graph = TaskGraph(source_limits=source_limits or SOURCE_LIMITS, state_path=state_path)
+        keys = self.add_to_graph(graph)
+        graph.run()
+        task_results = graph.results()
+        results: Dict[str, Any] = {name: task_results[key] for name, key in keys.items()}
         return {
             "input": {
                 "symbol_input": self.symbol,
@@ -1,14 +1,18 @@
 """
 Discovery-Skript für neu gelistete Binance Perpetual Futures in einem gegebenen Zeitfenster (inklusive).
+Die Instrumentenliste läuft über den listing feed (Diff + append-only Event Log), die CSV wird nur bei Änderung neu geschrieben.
 """
 from __future__ import annotations
 # ...existing imports...
 import csv
 import requests
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
 
+from data.download.crypto_downloads.custom_class.instrument_store import InstrumentMetadataStore
+from data.download.crypto_downloads.custom_class.listing_feed import ListingFeed, get_listing_feed
+
 # ...existing constants...
 DEFAULT_OUTPUT_SUBDIR = "project_future_scraper"
 DEFAULT_OUTPUT_FILENAME = "new_binance_perpetual_futures.csv"
@@ -33,6 +37,12 @@ class BinancePerpetualFuturesDiscovery:
         self.output_subdir = output_subdir
         self.output_filename = output_filename
         self.exchange_info_url = exchange_info_url
+        if exchange_info_url == DEFAULT_EXCHANGE_INFO_URL:
+            self.feed = get_listing_feed("BINANCE", "perp")
+        else:
+            # eigener store, damit eine andere URL nicht die geteilten Snapshots überschreibt
+            store = InstrumentMetadataStore(fetchers={"BINANCE": self._fetch_symbols})
+            self.feed = ListingFeed("BINANCE", "perp", store=store, root=store.root / "custom_url")
 
     @staticmethod
     def _parse_date(s: str):
@@ -43,25 +53,18 @@ class BinancePerpetualFuturesDiscovery:
         resp.raise_for_status()
         return resp.json()
 
+    def _fetch_symbols(self, market) -> Dict[str, Dict]:
+        return {info["symbol"]: info for info in self._fetch_exchange_info().get("symbols", [])}
+
     def discover(self) -> List[Dict[str, str]]:
-        data = self._fetch_exchange_info()
-        new_futures: List[Dict[str, str]] = []
-        for symbol_info in data.get("symbols", []):
-            if symbol_info.get("contractType") != "PERPETUAL":
-                continue
-            onboard_ms = symbol_info.get("onboardDate")
-            if onboard_ms is None:
-                continue
-            listing_dt = datetime.fromtimestamp(onboard_ms / 1000, tz=timezone.utc)
-            listing_day = listing_dt.date()
-            if self.start_dt <= listing_day <= self.end_dt:
-                sym = symbol_info["symbol"]
-                if self.only_usdt and not sym.endswith("USDT"):
-                    continue
-                new_futures.append({
-                    "symbol": sym,
-                    "onboardDate": listing_dt.strftime("%Y-%m-%d %H:%M:%S"),
-                })
+        events = self.feed.poll()
+        listed = [e["symbol"] for e in events if e["event"] == "listed" and not e["initial"]]
+        if listed:
+            print(f"[INFO] Neu gelistet seit dem letzten Lauf: {', '.join(listed)}")
+        new_futures: List[Dict[str, str]] = [
+            {"symbol": row["symbol"], "onboardDate": row["onboard"]}
+            for row in self.feed.listings(start=self.start_dt, end=self.end_dt, only_usdt=self.only_usdt)
+        ]
         print("[INFO] Letzte 10 (gefiltert im Fenster):")
         for fut in new_futures[-10:]:
             print(fut)
@@ -71,6 +74,11 @@ class BinancePerpetualFuturesDiscovery:
         target_dir = data_root / self.output_subdir
         target_dir.mkdir(parents=True, exist_ok=True)
         target_path = target_dir / self.output_filename
+        if target_path.exists():
+            with open(target_path, "r", newline="", encoding="utf-8") as f:
+                if list(csv.DictReader(f)) == rows:
+                    print(f"[SKIP] {target_path.name} unverändert ({len(rows)} Einträge)")
+                    return target_path
         with open(target_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=["symbol", "onboardDate"])
             writer.writeheader()
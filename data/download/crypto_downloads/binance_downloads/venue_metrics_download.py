@@ -5,9 +5,19 @@ import pandas as pd
 import os  # NEU
 from binance_historical_data import BinanceDataDumper
 from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
-from nautilus_trader.core.datetime import dt_to_unix_nanos, unix_nanos_to_iso8601
-from nautilus_trader.persistence.catalog import ParquetDataCatalog
 from data.download.crypto_downloads.custom_class.metrics_data import MetricsData
+from data.download.crypto_downloads.custom_class.arrow_catalog import (
+    build_table, to_unix_nanos, unix_nanos_to_iso8601_array, write_table_to_catalog,
+)
+
+METRIC_COLUMNS = [
+    "sum_open_interest",
+    "sum_open_interest_value",
+    "count_toptrader_long_short_ratio",
+    "sum_toptrader_long_short_ratio",
+    "count_long_short_ratio",
+    "sum_taker_long_short_vol_ratio",
+]
 
 
 class VenueMetricsDownloader:
@@ -98,15 +108,7 @@ class VenueMetricsDownloader:
 
     def _load_raw(self, path: Path) -> pd.DataFrame:
         df = pd.read_csv(path)
-        required = {
-            "create_time",
-            "sum_open_interest",
-            "sum_open_interest_value",
-            "count_toptrader_long_short_ratio",
-            "sum_toptrader_long_short_ratio",
-            "count_long_short_ratio",
-            "sum_taker_long_short_vol_ratio",
-        }
+        required = {"create_time", *METRIC_COLUMNS}
         missing = required.difference(df.columns)
         if missing:
             raise ValueError(f"Missing columns: {missing}")
@@ -117,51 +119,31 @@ class VenueMetricsDownloader:
         df = self._load_raw(raw_file)
 
         instrument_id = InstrumentId(Symbol(self.symbol), Venue("BINANCE"))
-        records = []
-        csv_rows = []
-
-        for _, row in df.iterrows():
-            ts_event = dt_to_unix_nanos(pd.to_datetime(row["create_time"], utc=True))
-            md = MetricsData(
-                instrument_id=instrument_id,
-                ts_event=ts_event,
-                ts_init=ts_event,
-                sum_open_interest=row["sum_open_interest"],
-                sum_open_interest_value=row["sum_open_interest_value"],
-                count_toptrader_long_short_ratio=row["count_toptrader_long_short_ratio"],
-                sum_toptrader_long_short_ratio=row["sum_toptrader_long_short_ratio"],
-                count_long_short_ratio=row["count_long_short_ratio"],
-                sum_taker_long_short_vol_ratio=row["sum_taker_long_short_vol_ratio"],
-            )
-            records.append(md)
-            if self.save_as_csv:
-                csv_rows.append({
-                    "timestamp_nano": ts_event,
-                    "timestamp_iso": unix_nanos_to_iso8601(ts_event),
-                    "symbol": self.symbol,
-                    "sum_open_interest": row["sum_open_interest"],
-                    "sum_open_interest_value": row["sum_open_interest_value"],
-                    "count_toptrader_long_short_ratio": row["count_toptrader_long_short_ratio"],
-                    "sum_toptrader_long_short_ratio": row["sum_toptrader_long_short_ratio"],
-                    "count_long_short_ratio": row["count_long_short_ratio"],
-                    "sum_taker_long_short_vol_ratio": row["sum_taker_long_short_vol_ratio"],
-                })
-
-        if self.save_in_catalog:
+        # spaltenweise: Timestamps einmal parsen, Tabelle direkt im MetricsData-Schema
+        ts_event = to_unix_nanos(df["create_time"])
+        values = {col: df[col].to_numpy(dtype="float64") for col in METRIC_COLUMNS}
+
+        if self.save_in_catalog and len(df):
             self.catalog_path.mkdir(parents=True, exist_ok=True)
-            catalog = ParquetDataCatalog(str(self.catalog_path))
-            catalog.write_data(records)
+            table = build_table(MetricsData.schema(), instrument_id.value, ts_event, values)
+            write_table_to_catalog(self.catalog_path, table, MetricsData, instrument_id.value)
 
         if self.save_as_csv:
             subdir = self.csv_output_subdir or os.getenv("CSV_OUTPUT_SUBDIR") or "csv_data"  # NEU
             out_dir = self.base_data_dir / subdir / self.symbol
             out_dir.mkdir(parents=True, exist_ok=True)
             out_path = out_dir / "METRICS.csv"
-            pd.DataFrame(csv_rows).to_csv(out_path, index=False)
+            csv_df = pd.DataFrame({
+                "timestamp_nano": ts_event,
+                "timestamp_iso": unix_nanos_to_iso8601_array(ts_event),
+                "symbol": self.symbol,
+                **values,
+            })
+            csv_df.to_csv(out_path, index=False)
 
         result = {
             "raw_file": str(raw_file),
-            "records": len(records),
+            "records": len(df),
             "catalog_written": self.save_in_catalog,
             "csv_written": self.save_as_csv,
         }
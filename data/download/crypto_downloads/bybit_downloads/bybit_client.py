@@ -0,0 +1,349 @@
+"""
+Shared Bybit V5 HTTP client
+
+- token buckets per endpoint plus a rolling window for the IP limit (statt fester Sleeps vor jedem Request)
+- pooled keep-alive connections (requests.Session)
+- concurrent fetches of time windows, each window paged by cursor
+- response cache by request key for closed time windows (memory LRU, optional disk), offene Fenster immer live
+
+base_url is configurable, so the downloaders can be run against a local stand-in server.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BYBIT_API_BASE = "https://api.bybit.com/v5/market"
+
+# Bybit: 600 requests / 5s per IP over all endpoints -> (max requests, window seconds), rolling
+IP_RATE_LIMIT = (600, 5.0)
+# (requests per second, burst) per endpoint, unter dem IP-Limit damit parallele Endpunkte nicht blockieren
+ENDPOINT_RATE_LIMITS = {
+    "kline": (50.0, 50),
+    "instruments-info": (10.0, 10),
+    "open-interest": (20.0, 20),
+    "account-ratio": (20.0, 20),
+    "funding/history": (20.0, 20),
+    "recent-trade": (20.0, 20),
+}
+DEFAULT_ENDPOINT_RATE_LIMIT = (10.0, 10)
+
+# in-memory responses (LRU), ältere fallen raus und kommen ggf. vom disk cache
+CACHE_MAX_ENTRIES = 2048
+
+# retCodes bei denen ein Retry Sinn macht (rate limit / server busy)
+RETRYABLE_RET_CODES = {10000, 10002, 10006, 10016}
+
+
+class TokenBucket:
+    """thread-safe token bucket: `rate` tokens per second, at most `capacity` stored"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """blocks until `tokens` are available, returns the time waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def drain(self) -> None:
+        """after a rate-limit answer: empty the bucket so the next requests wait a full refill"""
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+
+class SlidingWindowLimiter:
+    """thread-safe rolling window: at most `max_requests` within any `window` seconds"""
+
+    def __init__(self, max_requests: int, window: float):
+        self.max_requests = int(max_requests)
+        self.window = float(window)
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """blocks until a request fits into the window, returns the time waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.window:
+                    self._sent.popleft()
+                if len(self._sent) < self.max_requests:
+                    self._sent.append(now)
+                    return waited
+                wait = self.window - (now - self._sent[0])
+            time.sleep(wait)
+            waited += wait
+
+
+class BybitClient:
+    def __init__(
+        self,
+        base_url: str = BYBIT_API_BASE,
+        max_workers: int = 8,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30,
+        cache_dir: Optional[Path] = None,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        ip_rate_limit: Tuple[int, float] = IP_RATE_LIMIT,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.rate_limits = dict(ENDPOINT_RATE_LIMITS, **(rate_limits or {}))
+        self.ip_limiter = SlidingWindowLimiter(*ip_rate_limit)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self.cache_max_entries = cache_max_entries
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_workers, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "cache_hits": 0, "retries": 0}
+
+    # helpers ---------------------------------------------------------------
+
+    def _endpoint(self, endpoint: str) -> str:
+        """endpoint name ("kline", "/kline") or full url -> key relative to the market base"""
+        if endpoint.startswith("http"):
+            endpoint = endpoint.split("/v5/market/", 1)[-1] if "/v5/market/" in endpoint else endpoint.rsplit("/", 1)[-1]
+        return endpoint.strip("/")
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        with self._buckets_lock:
+            if endpoint not in self._buckets:
+                self._buckets[endpoint] = TokenBucket(*self.rate_limits.get(endpoint, DEFAULT_ENDPOINT_RATE_LIMIT))
+            return self._buckets[endpoint]
+
+    @staticmethod
+    def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"endpoint": endpoint, "params": {k: str(v) for k, v in params.items()}}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _is_closed_window(params: Dict[str, Any]) -> bool:
+        """requests whose time window ended in the past return immutable data -> cacheable"""
+        end = params.get("end", params.get("endTime"))
+        try:
+            return end is not None and int(end) < (time.time() - 60) * 1000
+        except (TypeError, ValueError):
+            return False
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{key}.json"
+            if path.exists():
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self._remember(key, data)
+                return data
+        return None
+
+    def _remember(self, key: str, data: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._cache[key] = data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def _cache_put(self, key: str, data: Dict[str, Any]) -> None:
+        self._remember(key, data)
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(self.cache_dir / f"{key}.json")
+
+    # requests --------------------------------------------------------------
+
+    def get(self, endpoint: str, params: Dict[str, Any], use_cache: bool = True,
+            max_retries: Optional[int] = None) -> Dict[str, Any]:
+        """one GET with rate limiting, retries on network errors / 429 / 5xx / rate-limit retCodes"""
+        max_retries = max_retries or self.max_retries
+        endpoint = self._endpoint(endpoint)
+        params = dict(params)
+        key = self.request_key(endpoint, params)
+        use_cache = use_cache and self._is_closed_window(params)
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached
+
+        url = f"{self.base_url}/{endpoint}"
+        bucket = self._bucket(endpoint)
+        for attempt in range(max_retries):
+            bucket.acquire()
+            self.ip_limiter.acquire()
+            self.stats["requests"] += 1
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    bucket.drain()
+                    raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                data = response.json()
+                ret_code = data.get("retCode")
+                if ret_code in RETRYABLE_RET_CODES:
+                    bucket.drain()
+                    raise requests.exceptions.RetryError(f"Bybit API busy: {data.get('retMsg')}")
+                if ret_code != 0:
+                    raise ValueError(f"Bybit API error: {data.get('retMsg', 'Unknown error')}")
+                if use_cache:
+                    self._cache_put(key, data)
+                return data
+            except requests.exceptions.RequestException as e:
+                if attempt == max_retries - 1:
+                    raise
+                self.stats["retries"] += 1
+                print(f"[WARN] Request failed (attempt {attempt + 1}/{max_retries}): {e}")
+                time.sleep(self.backoff * (2 ** attempt))
+        raise RuntimeError("Should never reach here")
+
+    def paginate(self, endpoint: str, params: Dict[str, Any], max_pages: Optional[int] = None,
+                 use_cache: bool = True) -> List[Any]:
+        """all result.list entries of a request, following nextPageCursor"""
+        params = dict(params)
+        records: List[Any] = []
+        page = 0
+        while True:
+            page += 1
+            data = self.get(endpoint, params, use_cache=use_cache)
+            result = data.get("result", {})
+            batch = result.get("list", [])
+            if not batch:
+                break
+            records.extend(batch)
+            cursor = result.get("nextPageCursor")
+            if not cursor or (max_pages is not None and page >= max_pages):
+                break
+            params["cursor"] = cursor
+        return records
+
+    def fetch_windows(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        start_ms: int,
+        end_ms: int,
+        window_ms: int,
+        start_key: str = "start",
+        end_key: str = "end",
+        paginate: bool = True,
+        retry_rounds: int = 1,
+    ) -> Tuple[List[Any], List[Tuple[int, int]]]:
+        """
+        splits [start_ms, end_ms] into windows of `window_ms` and fetches them concurrently
+        (window size so that one window fits into one page, e.g. limit * interval)
+        a failing window does not drop the others: failed windows are fetched again up to `retry_rounds` times,
+        returns (records of the successful windows in window order, still failed (start_ms, end_ms) windows)
+        """
+        windows = []
+        current = int(start_ms)
+        while current <= end_ms:
+            window_end = min(current + int(window_ms) - 1, int(end_ms))
+            windows.append((current, window_end))
+            current = window_end + 1
+
+        def _fetch(window):
+            window_params = dict(params, **{start_key: window[0], end_key: window[1]})
+            try:
+                if paginate:
+                    return self.paginate(endpoint, window_params), None
+                return self.get(endpoint, window_params).get("result", {}).get("list", []), None
+            except Exception as e:
+                return None, e
+
+        records: Dict[Tuple[int, int], List[Any]] = {}
+        pending = windows
+        for round_ in range(retry_rounds + 1):
+            if not pending:
+                break
+            if round_:
+                print(f"[INFO] Retrying {len(pending)} failed windows ({round_}/{retry_rounds})")
+            if len(pending) <= 1 or self.max_workers <= 1:
+                outcomes = [_fetch(w) for w in pending]
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    outcomes = list(pool.map(_fetch, pending))
+            failed = []
+            for window, (chunk, error) in zip(pending, outcomes):
+                if error is None:
+                    records[window] = chunk
+                else:
+                    failed.append(window)
+                    last_error = error
+            if failed and round_ == retry_rounds:
+                print(f"[WARN] {len(failed)} of {len(windows)} windows failed: {last_error}")
+            pending = failed
+        return [record for window in windows for record in records.get(window, [])], pending
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_client: Optional[BybitClient] = None
+_default_client_lock = threading.Lock()
+
+
+def report_failed_windows(label: str, failed: List[Tuple[int, int]]) -> None:
+    """prints the time ranges that are missing from a download (UTC)"""
+    if not failed:
+        return
+    from datetime import datetime, timezone
+
+    def _fmt(ms):
+        return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+    ranges = ", ".join(f"{_fmt(start)} - {_fmt(end)}" for start, end in failed)
+    print(f"[WARN] {label}: {len(failed)} windows missing, rerun to fill: {ranges}")
+
+
+def get_bybit_client() -> BybitClient:
+    """process wide client, so all downloaders share one rate budget and connection pool"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = BybitClient()
+        return _default_client
+
+
+def set_bybit_client(client: Optional[BybitClient]) -> None:
+    """swap the shared client (e.g. one pointing at a local stand-in server)"""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
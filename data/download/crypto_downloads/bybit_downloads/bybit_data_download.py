@@ -26,12 +26,15 @@ from nautilus_trader.core.nautilus_pyo3 import (
 from nautilus_trader.persistence.wranglers_v2 import BarDataWranglerV2
 from nautilus_trader.test_kit.providers import TestInstrumentProvider
 from nautilus_trader.core.datetime import unix_nanos_to_dt
-from nautilus_trader.persistence.loaders import CSVTickDataLoader
-from nautilus_trader.persistence.wranglers import TradeTickDataWrangler
 from nautilus_trader.persistence.catalog import ParquetDataCatalog
 import glob
 import os
 
+from data.download.crypto_downloads.bybit_downloads.bybit_client import get_bybit_client, report_failed_windows
+from data.download.crypto_downloads.custom_class.tick_ingest import (
+    DEFAULT_TICK_CHUNKSIZE, TickCatalogSink, ingest_tick_sources,
+)
+
 
 # ============================================================================
 # CONFIGURATION PARAMETERS
@@ -95,6 +98,17 @@ def format_symbol_for_nautilus_bybit(symbol: str) -> str:
     return symbol
 
 
+# Dauer eines Bybit-Intervalls in ms (Monat konservativ mit 28 Tagen -> nie mehr als limit Bars pro Fenster)
+BYBIT_INTERVAL_MS = {
+    **{code: int(code) * 60_000 for code in ["1", "3", "5", "15", "30", "60", "120", "240", "360", "720"]},
+    "D": 86_400_000,
+    "W": 7 * 86_400_000,
+    "M": 28 * 86_400_000,
+}
+
+BYBIT_KLINE_LIMIT = 1000
+
+
 def convert_interval_to_bybit(interval: str) -> str:
     interval_lower = interval.lower().strip()
     if interval_lower not in BYBIT_INTERVAL_MAP:
@@ -118,28 +132,8 @@ def make_bybit_api_request(
     max_retries: int = 3,
     delay: float = BYBIT_RATE_LIMIT_DELAY
 ) -> dict:
-    time.sleep(delay)
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get("retCode") != 0:
-                error_msg = data.get("retMsg", "Unknown error")
-                raise ValueError(f"Bybit API error: {error_msg}")
-                
-            return data
-            
-        except (requests.exceptions.RequestException, ValueError) as e:
-            if attempt == max_retries - 1:
-                raise
-            print(f"[WARN] Request failed (attempt {attempt + 1}/{max_retries}): {e}")
-            time.sleep(delay * (2 ** attempt))
-    
-    raise RuntimeError("Should never reach here")
+    # fester Sleep pro Request ersetzt durch die Token-Buckets des geteilten Clients (delay wird ignoriert)
+    return get_bybit_client().get(url, params, max_retries=max_retries)
 
 
 def find_csv_file(symbol: str, processed_dir: str) -> str:
@@ -164,6 +158,8 @@ class CombinedCryptoDataDownloader:
         datatype="tick",
         interval="1h",
         csv_output_subdir: str | None = None,
+        save_as_csv: bool | None = None,
+        save_in_catalog: bool | None = None,
     ):
         self.is_linear = symbol.endswith("-LINEAR")
         self.symbol_for_bybit = normalize_symbol_for_bybit(symbol)
@@ -175,8 +171,9 @@ class CombinedCryptoDataDownloader:
         self.base_data_dir = base_data_dir
         self.datatype = datatype
         self.interval = interval
-        self.save_as_csv = save_as_csv
-        self.save_in_catalog = save_in_catalog
+        # None -> Modul-Defaults (Skript-Aufruf), Orchestrator übergibt explizit statt die Globals zu setzen
+        self.save_as_csv = globals()["save_as_csv"] if save_as_csv is None else save_as_csv
+        self.save_in_catalog = globals()["save_in_catalog"] if save_in_catalog is None else save_in_catalog
         self.csv_output_subdir = csv_output_subdir
 
     def run(self):
@@ -399,6 +396,7 @@ class TickTransformer:
         save_in_catalog=True,
         base_data_dir=None,
         csv_output_subdir: str | None = None,
+        chunksize=DEFAULT_TICK_CHUNKSIZE,
     ):
         self.csv_path = Path(csv_path)
         self.catalog_root_path = Path(catalog_root_path)
@@ -408,68 +406,28 @@ class TickTransformer:
         self.save_in_catalog = save_in_catalog
         self.base_data_dir = Path(base_data_dir) if base_data_dir else self.catalog_root_path
         self.csv_output_subdir = csv_output_subdir
+        self.chunksize = chunksize
 
     def run(self):
+        symbol_label = self.symbol + ("-LINEAR" if self.is_linear else "")
+        instrument = None
         if self.save_in_catalog:
             self.catalog_root_path.mkdir(parents=True, exist_ok=True)
-            catalog = ParquetDataCatalog(path=self.catalog_root_path)
             instrument = TestInstrumentProvider.btcusdt_perp_binance()
-            catalog.write_data([instrument])
-            wrangler = TradeTickDataWrangler(instrument=instrument)
-        else:
-            catalog = None
-            wrangler = None
-
-        chunk_iter = pd.read_csv(self.csv_path, chunksize=5_000_000)
+            ParquetDataCatalog(path=str(self.catalog_root_path)).write_data([instrument])
         csv_out_path = None
-        first_chunk = True
-
-        for i, chunk_df in enumerate(chunk_iter):
-            if self.save_as_csv:
-                if csv_out_path is None:
-                    subdir = self.csv_output_subdir or os.getenv("CSV_OUTPUT_SUBDIR") or "csv_data"
-                    sym_dir = self.base_data_dir / subdir / (self.symbol + ("-LINEAR" if self.is_linear else ""))
-                    sym_dir.mkdir(parents=True, exist_ok=True)
-                    csv_out_path = sym_dir / "TICK.csv"
-
-                ts_raw = chunk_df["timestamp"]
-                if pd.api.types.is_integer_dtype(ts_raw) or pd.api.types.is_float_dtype(ts_raw):
-                    ts = pd.to_datetime(ts_raw.astype('int64'), unit='ms', utc=True)
-                else:
-                    ts = pd.to_datetime(ts_raw, utc=True, errors='coerce', format='ISO8601')
-                    mask_na = ts.isna()
-                    if mask_na.any():
-                        ts_alt = pd.to_datetime(ts_raw[mask_na], utc=True, errors='coerce')
-                        ts[mask_na] = ts_alt
-
-                ts_nano = ts.astype('int64')
-
-                rows = pd.DataFrame({
-                    "timestamp_nano": ts_nano,
-                    "timestamp_iso": ts.dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-                    "symbol": self.symbol + ("-LINEAR" if self.is_linear else ""),
-                    "price": pd.to_numeric(chunk_df["price"], errors="coerce"),
-                    "quantity": pd.to_numeric(chunk_df["quantity"], errors="coerce"),
-                    "buyer_maker": chunk_df["buyer_maker"].astype(str),
-                    "trade_id": chunk_df["trade_id"],
-                }).dropna(subset=["price", "quantity", "timestamp_nano"])
-
-                rows.to_csv(
-                    csv_out_path,
-                    mode="w" if first_chunk else "a",
-                    header=first_chunk,
-                    index=False
-                )
-
-            if self.save_in_catalog:
-                tmp_csv = self.catalog_root_path / f"tmp_tick_chunk_{i}.csv"
-                chunk_df.to_csv(tmp_csv, index=False)
-                data = CSVTickDataLoader.load(file_path=tmp_csv)
-                ticks = wrangler.process(data)
-                catalog.write_data(ticks, skip_disjoint_check=True)
-                tmp_csv.unlink()
-
-            first_chunk = False
+        if self.save_as_csv:
+            subdir = self.csv_output_subdir or os.getenv("CSV_OUTPUT_SUBDIR") or "csv_data"
+            csv_out_path = self.base_data_dir / subdir / symbol_label / "TICK.csv"
+        sink = TickCatalogSink(
+            instrument=instrument,
+            catalog_path=self.catalog_root_path if self.save_in_catalog else None,
+            csv_out_path=csv_out_path,
+            symbol_label=symbol_label,
+        )
+        # chunkweise direkt nach Arrow -> Katalog, keine tmp csv / CSVTickDataLoader mehr
+        rows = ingest_tick_sources([self.csv_path], lambda path: pd.read_csv(path, chunksize=self.chunksize), sink)
+        print(f"[INFO] {rows} ticks transformed from {self.csv_path.name}")
 
 
 # ============================================================================
@@ -498,58 +456,21 @@ class BarDownloader:
         start_ms = int(pd.Timestamp(self.start_date).tz_localize("UTC").timestamp() * 1000)
         end_ms = int((pd.Timestamp(self.end_date) + pd.Timedelta(days=1)).tz_localize("UTC").timestamp() * 1000) - 1
         
-        # Bybit API limit: chunk into large windows for efficiency
-        chunk_days = 1800  # ~5 years per chunk (increased from 180)
-        chunk_ms = chunk_days * 24 * 60 * 60 * 1000
-        
-        all_bars = []
-        current_start = start_ms
-        chunk_num = 0
-        
-        while current_start < end_ms:
-            chunk_num += 1
-            current_end = min(current_start + chunk_ms, end_ms)
-            
-            print(f"[INFO] Downloading chunk {chunk_num}: {pd.Timestamp(current_start, unit='ms')} to {pd.Timestamp(current_end, unit='ms')}")
-            
-            params = {
-                "category": "linear",
-                "symbol": self.symbol,
-                "interval": self.bybit_interval,
-                "start": current_start,
-                "end": current_end,
-                "limit": 1000,
-            }
-            
-            cursor = None
-            page = 0
-            
-            while True:
-                page += 1
-                if cursor:
-                    params["cursor"] = cursor
-                
-                try:
-                    data = make_bybit_api_request(BYBIT_ENDPOINTS["kline"], params)
-                except Exception as e:
-                    print(f"[ERROR] API request failed: {e}")
-                    break
-                
-                result = data.get("result", {})
-                bars = result.get("list", [])
-                
-                if not bars:
-                    print(f"[INFO] No more data (chunk {chunk_num}, page {page})")
-                    break
-                
-                all_bars.extend(bars)
-                print(f"[INFO] Downloaded {len(bars)} bars (chunk {chunk_num}, page {page}, total: {len(all_bars)})")
-                
-                cursor = result.get("nextPageCursor")
-                if not cursor:
-                    break
-            
-            current_start = current_end + 1
+        # kline liefert max. 1000 Bars pro Request und hat keinen Cursor: Fenster von genau 1000 Bars,
+        # parallel über den geteilten Client (Token-Bucket statt fester Sleeps)
+        window_ms = BYBIT_KLINE_LIMIT * BYBIT_INTERVAL_MS[self.bybit_interval]
+        params = {
+            "category": "linear",
+            "symbol": self.symbol,
+            "interval": self.bybit_interval,
+            "limit": BYBIT_KLINE_LIMIT,
+        }
+        # fehlgeschlagene Fenster fallen nicht mit den erfolgreichen weg, sondern werden gemeldet
+        all_bars, failed = get_bybit_client().fetch_windows(
+            BYBIT_ENDPOINTS["kline"], params, start_ms, end_ms, window_ms, paginate=False,
+        )
+        report_failed_windows(f"{self.symbol} {self.interval} bars", failed)
+        print(f"[INFO] Downloaded {len(all_bars)} bars")
         
         if not all_bars:
             print("[WARN] No bars downloaded")
@@ -600,6 +521,7 @@ class BarTransformer:
         save_in_catalog=True,
         base_data_dir=None,
         csv_output_subdir: str | None = None,
+        chunksize=DEFAULT_TICK_CHUNKSIZE,
     ):
         self.csv_path = Path(csv_path)
         self.catalog_root_path = Path(catalog_root_path)
@@ -712,84 +634,14 @@ class BarTransformer:
 # ============================================================================
 
 def _fetch_single_symbol_info_bybit(symbol: str, is_linear: bool) -> dict:
-    params = {
-        "category": "linear" if is_linear else "spot",
-        "symbol": symbol,
-    }
-    
-    try:
-        data = make_bybit_api_request(BYBIT_ENDPOINTS["instruments"], params)
-    except Exception as e:
-        raise ValueError(f"Failed to fetch instrument info for {symbol}: {e}")
-    
-    result = data.get("result", {})
-    instruments = result.get("list", [])
-    
-    if not instruments:
-        raise ValueError(f"Bybit instruments-info: Symbol '{symbol}' nicht gefunden (is_linear={is_linear})")
-    
-    return instruments[0]
+    # komplette instruments-info Liste einmal pro TTL (instrument_store), nicht pro Symbol
+    from data.download.crypto_downloads.custom_class.instrument_store import get_instrument_store
+    return get_instrument_store().get_info("BYBIT", "linear" if is_linear else "spot", normalize_symbol_for_bybit(symbol))
 
 
 def get_instrument(symbol: str, is_linear: bool):
-    from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
-    from nautilus_trader.test_kit.providers import TestInstrumentProvider
-    from nautilus_trader.model.objects import Price, Quantity
-
-    info = _fetch_single_symbol_info_bybit(symbol, is_linear)
-    
-    price_filter = info.get("priceFilter", {})
-    lot_size_filter = info.get("lotSizeFilter", {})
-    
-    tick_size_str = price_filter.get("tickSize", "0.01")
-    min_order_qty_str = lot_size_filter.get("minOrderQty", "0.001")
-    
-    base_precision_str = lot_size_filter.get("basePrecision", "8")
-    quote_precision_str = lot_size_filter.get("quotePrecision", "8")
-    
-    tick_size = Decimal(tick_size_str)
-    calculated_price_precision = abs(tick_size.as_tuple().exponent)
-    
-    step_size = Decimal(min_order_qty_str)
-    calculated_size_precision = abs(step_size.as_tuple().exponent)
-    
-    use_price_precision = calculated_price_precision
-    use_size_precision = calculated_size_precision
-    
-    if is_linear:
-        margin_init = Decimal("0.01")
-        margin_maint = Decimal("0.005")
-    else:
-        margin_init = Decimal("0")
-        margin_maint = Decimal("0")
-    
-    template = TestInstrumentProvider.btcusdt_perp_binance() if is_linear else TestInstrumentProvider.btcusdt_binance()
-    
-    if is_linear:
-        inst_id = InstrumentId(Symbol(f"{symbol}-LINEAR"), Venue("BYBIT"))
-    else:
-        inst_id = InstrumentId(Symbol(symbol), Venue("BYBIT"))
-    
-    instrument = template.__class__(
-        instrument_id=inst_id,
-        raw_symbol=Symbol(symbol),
-        base_currency=template.base_currency,
-        quote_currency=template.quote_currency,
-        settlement_currency=template.settlement_currency,
-        is_inverse=template.is_inverse,
-        price_precision=use_price_precision,
-        size_precision=use_size_precision,
-        price_increment=Price.from_str(tick_size_str),
-        size_increment=Quantity.from_str(min_order_qty_str),
-        margin_init=margin_init,
-        margin_maint=margin_maint,
-        maker_fee=template.maker_fee,
-        taker_fee=template.taker_fee,
-        ts_event=template.ts_event,
-        ts_init=template.ts_init,
-    )
-    
-    return instrument
+    from data.download.crypto_downloads.custom_class.instrument_store import resolve_instruments
+    return resolve_instruments("BYBIT", [symbol], is_linear)[symbol]
 
 
 # ============================================================================
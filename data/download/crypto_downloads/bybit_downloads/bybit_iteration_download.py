@@ -2,16 +2,17 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import csv
 import json
-import time
 import os
 import sys
 
 # Add binance_downloads to path for third-party downloaders
 sys.path.insert(0, str(Path(__file__).parent.parent / "binance_downloads"))
 
-from bybit_main_download import BybitDataOrchestrator
+from bybit_main_download import BybitDataOrchestrator, SOURCE_LIMITS
 from bybit_new_future_list_download import BybitLinearPerpetualFuturesDiscovery
 from fear_and_greed_download import FearAndGreedDownloader
+from data.download.crypto_downloads.task_graph import TaskGraph
+from data.download.crypto_downloads.custom_class.listing_feed import LISTED, get_listing_feed
 
 
 # ============================================================================
@@ -30,11 +31,15 @@ RUN_DISCOVERY = True
 DISCOVERY_WINDOW_START = "2025-01-01"
 DISCOVERY_WINDOW_END = "2025-10-18"
 DISCOVERY_ONLY_USDT = True
+# Only symbols whose listing event this consumer has not processed yet (listing feed cursor)
+ONLY_NEW_LISTINGS = False
+LISTING_CONSUMER = "bybit_iteration"
 
 # Iteration settings
 RANGE_DAYS = 28  # How many days to download after listing date
 MAX_SYMBOLS = None  # Limit number of symbols (None = all)
-SLEEP_SECONDS = 2  # Delay between symbols (rate limiting)
+TASK_RETRIES = 1  # Retries per symbol/stage task
+RESUME = True  # Resume an aborted iteration with its unfinished tasks (bybit_iteration_state.json)
 
 # Downloader toggles
 RUN_LUNAR = False
@@ -50,14 +55,7 @@ BYBIT_INTERVAL = "15m"
 SAVE_AS_CSV = True
 SAVE_IN_CATALOG = True
 DOWNLOAD_IF_MISSING = True
-
-
-# ============================================================================
-# GLOBAL STATE
-# ============================================================================
-
-_fng_done = False
-_fng_result = None
+STATE_FILE = BASE_DATA_DIR / "bybit_iteration_state.json"
 
 
 # ============================================================================
@@ -92,12 +90,7 @@ def run_discovery_if_needed():
     print(_separator("DISCOVERY DONE"))
 
 
-def run_fng_once():
-    global _fng_done, _fng_result
-    
-    if _fng_done or not RUN_FNG:
-        return
-    
+def download_fng() -> dict:
     print(_separator(f"FEAR & GREED {DISCOVERY_WINDOW_START} -> {DISCOVERY_WINDOW_END}"))
     
     try:
@@ -113,14 +106,12 @@ def run_fng_once():
             remove_processed=True,
             csv_output_subdir=CSV_OUTPUT_SUBDIR,
         )
-        _fng_result = downloader.run()
-        print(f"[SUCCESS] Fear & Greed: {_fng_result.get('records', 0)} records")
+        result = downloader.run()
+        print(f"[SUCCESS] Fear & Greed: {result.get('records', 0)} records")
+        return result
     except Exception as e:
-        _fng_result = {"error": str(e)}
         print(f"[ERROR] Fear & Greed download failed: {e}")
-    
-    _fng_done = True
-    print(_separator("FEAR & GREED DONE"))
+        return {"error": str(e)}
 
 
 def parse_launch_time(ts: str) -> datetime:
@@ -151,17 +142,20 @@ def iterate_symbols():
     # Step 2: Load futures list
     print(f"\n[INFO] Loading futures list from: {FUTURES_CSV}")
     rows = load_futures_list(FUTURES_CSV)
+    feed, listing_cursor = None, None
+    if ONLY_NEW_LISTINGS:
+        feed = get_listing_feed("BYBIT", "linear")
+        new_events, listing_cursor = feed.consume(LISTING_CONSUMER, kinds=(LISTED,))
+        new_symbols = {e["symbol"] for e in new_events}
+        rows = [r for r in rows if r["symbol"] in new_symbols]
+        print(f"[INFO] {len(rows)} new listings since last run ({LISTING_CONSUMER})")
     
-    # Step 3: Fear & Greed (once for all symbols)
-    run_fng_once()
-    
-    # Step 4: Iterate symbols
-    summaries = []
     total = len(rows) if MAX_SYMBOLS is None else min(MAX_SYMBOLS, len(rows))
-    
-    print(f"\n[INFO] Starting iteration over {total} symbols (of {len(rows)} listed)")
+    print(f"\n[INFO] Building task graph for {total} symbols (of {len(rows)} listed)")
     print("="*80)
     
+    # Step 3: One orchestrator per symbol
+    orchestrators = []
     for idx, row in enumerate(rows, 1):
         if MAX_SYMBOLS and idx > MAX_SYMBOLS:
             break
@@ -179,11 +173,6 @@ def iterate_symbols():
         start_date = launch_dt.date()
         end_date = start_date + timedelta(days=RANGE_DAYS - 1)
         
-        print(_separator(f"SYMBOL {idx}/{total}: {symbol}"))
-        print(f"[INFO] Launch: {launch_dt}")
-        print(f"[INFO] Range: {start_date} to {end_date} ({RANGE_DAYS} days)")
-        
-        # Create orchestrator
         orchestrator = BybitDataOrchestrator(
             symbol=symbol,  # Will be normalized to -LINEAR format
             start=start_date.isoformat(),
@@ -198,63 +187,65 @@ def iterate_symbols():
             save_as_csv=SAVE_AS_CSV,
             save_in_catalog=SAVE_IN_CATALOG,
             download_if_missing=DOWNLOAD_IF_MISSING,
-            run_fng=False,  # Already done once globally
+            run_fng=False,  # Done once globally as its own task
             fng_instrument_id=FNG_INSTRUMENT_ID,
             csv_output_subdir=CSV_OUTPUT_SUBDIR,
         )
-        
-        # Run downloaders with visible sections
-        results = {}
-        
-        if RUN_LUNAR:
-            print(_separator("LUNAR START"))
-            results["lunar"] = orchestrator.run_lunar_metrics()
-            print(_separator("LUNAR DONE"))
-        
-        if RUN_VENUE:
-            print(_separator("VENUE METRICS START"))
-            results["venue_metrics"] = orchestrator.run_venue_metrics()
-            print(_separator("VENUE METRICS DONE"))
-        
-        if RUN_BYBIT:
-            print(_separator(f"BYBIT {BYBIT_DATATYPE.upper()} START"))
-            results["bybit_data"] = orchestrator.run_bybit_data()
-            print(_separator(f"BYBIT {BYBIT_DATATYPE.upper()} DONE"))
-        
-        # Create summary
-        summary = {
-            "input": {
-                "symbol_input": orchestrator.symbol,
-                "normalized_base": orchestrator.base_symbol,
-                "normalized_linear": orchestrator.linear_symbol,
-                "launch_time": row["launchTime"],
-                "start": orchestrator.start,
-                "end": orchestrator.end,
-            },
-            "results": results,
-        }
-        
-        # Add global Fear & Greed result
-        if _fng_result and "fear_greed_global" not in summary:
-            summary["fear_greed_global"] = _fng_result
-        
-        summaries.append(summary)
-        
-        # Save progress after each symbol
-        output_json = BASE_DATA_DIR / "bybit_iteration_results.json"
+        orchestrators.append((orchestrator, row["launchTime"]))
+    
+    output_json = BASE_DATA_DIR / "bybit_iteration_results.json"
+    
+    def build_summaries() -> list:
+        task_results = graph.results()
+        summaries = []
+        for orchestrator, launch_time, keys in task_keys:
+            results = {name: task_results[key] for name, key in keys.items() if key in task_results}
+            if not results:
+                continue
+            summary = {
+                "input": {
+                    "symbol_input": orchestrator.symbol,
+                    "normalized_base": orchestrator.base_symbol,
+                    "normalized_linear": orchestrator.linear_symbol,
+                    "launch_time": launch_time,
+                    "start": orchestrator.start,
+                    "end": orchestrator.end,
+                },
+                "results": results,
+            }
+            # Add global Fear & Greed result
+            if "fear_greed" in task_results:
+                summary["fear_greed_global"] = task_results["fear_greed"]
+            summaries.append(summary)
+        return summaries
+    
+    def on_task_done(key, outcome):
+        print(_separator(f"{key} {outcome.status} ({outcome.seconds:.0f}s)"))
+        # Save progress after each task
         with open(output_json, "w", encoding="utf-8") as f:
-            json.dump(summaries, f, indent=2)
-        
-        print(f"\n[SUCCESS] {symbol} completed")
-        print(f"[INFO] Progress saved to: {output_json}")
-        
-        # Rate limiting
-        if idx < total:
-            print(f"[INFO] Sleeping {SLEEP_SECONDS}s before next symbol...")
-            time.sleep(SLEEP_SECONDS)
+            json.dump(build_summaries(), f, indent=2, default=str)
+    
+    # Step 4: Run all symbol/stage tasks; sources run in parallel, bounded per source
+    graph = TaskGraph(source_limits=SOURCE_LIMITS, state_path=STATE_FILE, resume=RESUME, on_task_done=on_task_done)
+    if RUN_FNG:
+        graph.add("fear_greed", download_fng, source="fear_greed", retries=TASK_RETRIES)
+    task_keys = [(o, launch_time, o.add_to_graph(graph, retries=TASK_RETRIES)) for o, launch_time in orchestrators]
+    graph.run()
+    
+    summaries = build_summaries()
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(summaries, f, indent=2, default=str)
+    
+    failed = [k for k, o in graph.outcomes.items() if o.status != "done"]
+    if failed:
+        print(f"[WARN] {len(failed)} tasks not completed (rerun resumes them): {failed}")
+    if feed is not None:
+        # Unfinished tasks are resumed via RESUME, the listings themselves count as consumed
+        feed.commit(LISTING_CONSUMER, listing_cursor)
     
     print("\n" + "="*80)
     print(f"[INFO] Iteration complete: {len(summaries)} symbols processed")
+    print(f"[INFO] Results saved to: {output_json}")
     print("="*80)
     
     return summaries
@@ -16,11 +16,11 @@ Key differences from Binance version:
 import json
 import os
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Any, Callable, Dict, List, Tuple
 
 from bybit_venue_metrics_download import BybitVenueMetricsDownloader
 from bybit_data_download import CombinedCryptoDataDownloader
-import bybit_data_download as bdd
+from data.download.crypto_downloads.task_graph import TaskGraph
 
 # Import third-party downloaders from binance_downloads (exchange-agnostic)
 import sys
@@ -60,6 +60,9 @@ SAVE_IN_CATALOG = True
 DOWNLOAD_IF_MISSING = True
 CSV_OUTPUT_SUBDIR = None  # Optional: specify subdirectory for CSV output
 
+# Max concurrent tasks per data source (stages of different sources run in parallel)
+SOURCE_LIMITS = {"lunar": 1, "venue_metrics": 1, "bybit_data": 1, "fear_greed": 1}
+
 
 # ============================================================================
 # ORCHESTRATOR CLASS
@@ -221,10 +224,6 @@ class BybitDataOrchestrator:
         print("="*60)
         
         try:
-            # Set module-level flags (same pattern as Binance version)
-            bdd.save_as_csv = self.save_as_csv
-            bdd.save_in_catalog = self.save_in_catalog
-            
             CombinedCryptoDataDownloader(
                 symbol=self.linear_symbol,
                 start_date=self.start,
@@ -233,6 +232,8 @@ class BybitDataOrchestrator:
                 datatype=self.bybit_datatype,
                 interval=self.bybit_interval,
                 csv_output_subdir=self.csv_output_subdir,
+                save_as_csv=self.save_as_csv,
+                save_in_catalog=self.save_in_catalog,
             ).run()
             
             return {
@@ -272,10 +273,43 @@ class BybitDataOrchestrator:
             print(f"[ERROR] Fear & Greed download failed: {e}")
             return {"error": str(e)}
 
-    def run(self) -> Dict[str, Any]:
+    def stages(self) -> List[Tuple[str, Callable[[], Dict[str, Any]]]]:
+        """
+        Enabled stages as (name, callable).
+        
+        The name doubles as the data source of the task in the task graph.
+        """
+        stages = []
+        if self.run_lunar:
+            stages.append(("lunar", self.run_lunar_metrics))
+        if self.run_venue:
+            stages.append(("venue_metrics", self.run_venue_metrics))
+        if self.run_bybit:
+            stages.append(("bybit_data", self.run_bybit_data))
+        if self.run_fng:
+            stages.append(("fear_greed", self.run_fear_greed))
+        return stages
+
+    def add_to_graph(self, graph: TaskGraph, retries: int = 1) -> Dict[str, str]:
+        """
+        Add one task per enabled stage (key "<linear_symbol>:<stage>").
+        
+        Returns:
+            Dict mapping stage name to task key
+        """
+        keys = {}
+        for name, fn in self.stages():
+            keys[name] = f"{self.linear_symbol}:{name}"
+            graph.add(keys[name], fn, source=name, retries=retries)
+        return keys
+
+    def run(self, source_limits: Dict[str, int] | None = None, state_path: Path | None = None) -> Dict[str, Any]:
         """
         Execute all enabled downloaders.
         
+        Stages don't depend on each other and run concurrently in a task graph,
+        bounded per data source by source_limits.
+        
         Returns:
             Dict with input parameters and results from each downloader
         """
@@ -287,19 +321,11 @@ class BybitDataOrchestrator:
         print(f"Enabled: Lunar={self.run_lunar}, Venue={self.run_venue}, "
               f"Bybit={self.run_bybit}, FnG={self.run_fng}")
         
-        results: Dict[str, Any] = {}
-        
-        if self.run_lunar:
-            results["lunar"] = self.run_lunar_metrics()
-        
-        if self.run_venue:
-            results["venue_metrics"] = self.run_venue_metrics()
-        
-        if self.run_bybit:
-            results["bybit_data"] = self.run_bybit_data()
-        
-        if self.run_fng:
-            results["fear_greed"] = self.run_fear_greed()
+        graph = TaskGraph(source_limits=source_limits or SOURCE_LIMITS, state_path=state_path)
+        keys = self.add_to_graph(graph)
+        graph.run()
+        task_results = graph.results()
+        results: Dict[str, Any] = {name: task_results[key] for name, key in keys.items()}
         
         print("\n" + "="*80)
         print("BYBIT DATA ORCHESTRATOR - COMPLETE")
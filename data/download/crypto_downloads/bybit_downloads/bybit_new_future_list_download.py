@@ -1,10 +1,11 @@
 import csv
-import requests
-import time
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
 
+from data.download.crypto_downloads.bybit_downloads.bybit_client import get_bybit_client
+from data.download.crypto_downloads.custom_class.listing_feed import LISTED, get_listing_feed
+
 
 # ============================================================================
 # BYBIT API CONFIGURATION
@@ -28,29 +29,8 @@ def make_bybit_api_request(
     max_retries: int = 3,
     delay: float = BYBIT_RATE_LIMIT_DELAY
 ) -> Dict[str, Any]:
-    time.sleep(delay)
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Bybit V5 API uses retCode (not retMsg)
-            if data.get("retCode") != 0:
-                error_msg = data.get("retMsg", "Unknown error")
-                raise ValueError(f"Bybit API error: {error_msg}")
-                
-            return data
-            
-        except (requests.exceptions.RequestException, ValueError) as e:
-            if attempt == max_retries - 1:
-                raise
-            print(f"[WARN] Request failed (attempt {attempt + 1}/{max_retries}): {e}")
-            time.sleep(delay * (2 ** attempt))  # Exponential backoff
-    
-    raise RuntimeError("Should never reach here")
+    # fester Sleep pro Request ersetzt durch die Token-Buckets des geteilten Clients (delay wird ignoriert)
+    return get_bybit_client().get(url, params, max_retries=max_retries)
 
 
 # ============================================================================
@@ -75,6 +55,8 @@ class BybitLinearPerpetualFuturesDiscovery:
         self.only_usdt = only_usdt
         self.output_subdir = output_subdir
         self.output_filename = output_filename
+        # instruments-info diff + append-only listing/delisting log (shared with the live trader)
+        self.feed = get_listing_feed("BYBIT", "linear")
         
         # Convert dates to timestamps
         self.start_ts = int(datetime.combine(self.start_dt, datetime.min.time()).timestamp() * 1000)
@@ -87,82 +69,27 @@ class BybitLinearPerpetualFuturesDiscovery:
     def _parse_date(s: str):
         return datetime.strptime(s, "%Y-%m-%d").date()
 
-    def _fetch_all_instruments(self) -> List[Dict[str, Any]]:
-        print("[INFO] Fetching instruments from Bybit...")
-        
-        params = {
-            "category": "linear",
-            "limit": 1000,  # Max per request
-        }
-        
-        all_instruments = []
-        cursor = None
-        page = 0
+    def discover(self) -> List[Dict[str, str]]:
+        print("[INFO] Polling Bybit listing feed...")
+        try:
+            events = self.feed.poll()
+        except Exception as e:
+            # kein Abbruch: der bisher bekannte Stand aus dem Event Log wird weiterverwendet
+            print(f"[ERROR] Failed to fetch instruments: {e}")
+            events = []
         
-        while True:
-            page += 1
-            if cursor:
-                params["cursor"] = cursor
-            
-            try:
-                data = make_bybit_api_request(BYBIT_INSTRUMENTS_URL, params)
-            except Exception as e:
-                print(f"[ERROR] Failed to fetch instruments: {e}")
-                break
-            
-            result = data.get("result", {})
-            instruments = result.get("list", [])
-            
-            if not instruments:
-                break
-            
-            all_instruments.extend(instruments)
-            print(f"[INFO] Page {page}: {len(instruments)} instruments (total: {len(all_instruments)})")
-            
-            cursor = result.get("nextPageCursor")
-            if not cursor:
-                break
+        listed = [e["symbol"] for e in events if e["event"] == LISTED and not e["initial"]]
+        if listed:
+            print(f"[INFO] Newly listed since last poll: {', '.join(listed)}")
         
-        print(f"[INFO] Total instruments fetched: {len(all_instruments)}")
-        return all_instruments
-
-    def discover(self) -> List[Dict[str, str]]:
-        instruments = self._fetch_all_instruments()
         new_futures: List[Dict[str, str]] = []
-        
-        for inst in instruments:
-            # Check if it's a perpetual contract
-            contract_type = inst.get("contractType", "")
-            if contract_type != "LinearPerpetual":
-                continue
-            
-            # Get launch time
-            launch_time_str = inst.get("launchTime")
-            if not launch_time_str:
-                continue
-            
-            try:
-                # Bybit launchTime is milliseconds timestamp as string
-                launch_ms = int(launch_time_str)
-            except (ValueError, TypeError):
-                continue
-            
+        for row in self.feed.listings(only_usdt=self.only_usdt):
             # Check if within date range
-            if not (self.start_ts <= launch_ms <= self.end_ts):
+            if not (self.start_ts <= row["onboard_ms"] <= self.end_ts):
                 continue
-            
-            symbol = inst.get("symbol", "")
-            
-            # Filter USDT only if requested
-            if self.only_usdt and not symbol.endswith("USDT"):
-                continue
-            
-            # Format launch time
-            launch_dt = datetime.fromtimestamp(launch_ms / 1000, tz=timezone.utc)
-            
             new_futures.append({
-                "symbol": symbol,
-                "launchTime": launch_dt.strftime("%Y-%m-%d %H:%M:%S"),
+                "symbol": row["symbol"],
+                "launchTime": row["onboard"],
             })
         
         # Sort by launch time
@@ -180,6 +107,13 @@ class BybitLinearPerpetualFuturesDiscovery:
         target_dir.mkdir(parents=True, exist_ok=True)
         target_path = target_dir / self.output_filename
         
+        # Only rewrite the CSV if the listings in the window changed
+        if target_path.exists():
+            with open(target_path, "r", newline="", encoding="utf-8") as f:
+                if list(csv.DictReader(f)) == rows:
+                    print(f"\n[SKIP] {target_path.name} unchanged ({len(rows)} entries)")
+                    return target_path
+        
         with open(target_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=["symbol", "launchTime"])
             writer.writeheader()
@@ -1,15 +1,16 @@
 from pathlib import Path
 from datetime import datetime, date, timedelta
+import numpy as np
 import pandas as pd
 import os
-import time
-import requests
 from typing import List, Dict, Any
 
 from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
-from nautilus_trader.core.datetime import dt_to_unix_nanos, unix_nanos_to_iso8601
-from nautilus_trader.persistence.catalog import ParquetDataCatalog
 from data.download.crypto_downloads.custom_class.bybit_metrics_data import BybitMetricsData
+from data.download.crypto_downloads.custom_class.arrow_catalog import (
+    build_table, to_unix_nanos, unix_nanos_to_iso8601_array, write_table_to_catalog,
+)
+from data.download.crypto_downloads.bybit_downloads.bybit_client import get_bybit_client, report_failed_windows
 
 
 # ============================================================================
@@ -35,6 +36,17 @@ BYBIT_INTERVALS = {
     "1d": "1d",
 }
 
+BYBIT_INTERVAL_MS = {
+    "5min": 5 * 60_000,
+    "15min": 15 * 60_000,
+    "30min": 30 * 60_000,
+    "1h": 3_600_000,
+    "4h": 4 * 3_600_000,
+    "1d": 86_400_000,
+}
+# funding kann stündlich sein -> Fenster für 200 Einträge à 1h
+FUNDING_WINDOW_MS = 200 * 3_600_000
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -46,29 +58,8 @@ def make_bybit_api_request(
     max_retries: int = 3,
     delay: float = BYBIT_RATE_LIMIT_DELAY
 ) -> Dict[str, Any]:
-    time.sleep(delay)
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Bybit V5 API uses retCode (not retMsg)
-            if data.get("retCode") != 0:
-                error_msg = data.get("retMsg", "Unknown error")
-                raise ValueError(f"Bybit API error: {error_msg}")
-                
-            return data
-            
-        except (requests.exceptions.RequestException, ValueError) as e:
-            if attempt == max_retries - 1:
-                raise
-            print(f"[WARN] Request failed (attempt {attempt + 1}/{max_retries}): {e}")
-            time.sleep(delay * (2 ** attempt))  # Exponential backoff
-    
-    raise RuntimeError("Should never reach here")
+    # fester Sleep pro Request ersetzt durch die Token-Buckets des geteilten Clients (delay wird ignoriert)
+    return get_bybit_client().get(url, params, max_retries=max_retries)
 
 
 # ============================================================================
@@ -126,36 +117,16 @@ class BybitVenueMetricsDownloader:
             "category": "linear",
             "symbol": self.base_symbol,
             "intervalTime": self.interval,
-            "startTime": start_ms,
-            "endTime": end_ms,
             "limit": 200,  # Max per request
         }
         
-        all_records = []
-        cursor = None
-        
-        while True:
-            if cursor:
-                params["cursor"] = cursor
-            
-            try:
-                data = make_bybit_api_request(BYBIT_ENDPOINTS["open_interest"], params)
-            except Exception as e:
-                print(f"[ERROR] Failed to download open interest: {e}")
-                break
-            
-            result = data.get("result", {})
-            records = result.get("list", [])
-            
-            if not records:
-                break
-            
-            all_records.extend(records)
-            print(f"[INFO] Downloaded {len(records)} open interest records (total: {len(all_records)})")
-            
-            cursor = result.get("nextPageCursor")
-            if not cursor:
-                break
+        # Zeitfenster à 200 Intervalle parallel, innerhalb eines Fensters per Cursor
+        all_records, failed = get_bybit_client().fetch_windows(
+            BYBIT_ENDPOINTS["open_interest"], params, start_ms, end_ms,
+            200 * BYBIT_INTERVAL_MS[self.interval], start_key="startTime", end_key="endTime",
+        )
+        report_failed_windows(f"{self.base_symbol} open interest", failed)
+        print(f"[INFO] Downloaded {len(all_records)} open interest records")
         
         if not all_records:
             return pd.DataFrame(columns=["timestamp", "openInterest", "openInterestValue"])
@@ -187,27 +158,19 @@ class BybitVenueMetricsDownloader:
             "category": "linear",
             "symbol": self.base_symbol,
             "period": self.interval,
-            "startTime": start_ms,  # Add start time
-            "endTime": end_ms,      # Add end time
             "limit": 500,  # Max per request
         }
         
-        all_records = []
+        # bisher ein einziger Request (max. 500 Einträge) -> jetzt Fenster à 500 Perioden
+        all_records, failed = get_bybit_client().fetch_windows(
+            BYBIT_ENDPOINTS["account_ratio"], params, start_ms, end_ms,
+            500 * BYBIT_INTERVAL_MS[self.interval], start_key="startTime", end_key="endTime",
+        )
+        report_failed_windows(f"{self.base_symbol} account ratio", failed)
         
-        try:
-            data = make_bybit_api_request(BYBIT_ENDPOINTS["account_ratio"], params)
-        except Exception as e:
-            print(f"[ERROR] Failed to download account ratio: {e}")
-            return pd.DataFrame(columns=["timestamp", "longAccount", "shortAccount", "longShortRatio"])
-        
-        result = data.get("result", {})
-        records = result.get("list", [])
-        
-        if not records:
+        if not all_records:
             return pd.DataFrame(columns=["timestamp", "longAccount", "shortAccount", "longShortRatio"])
-        
-        all_records.extend(records)
-        print(f"[INFO] Downloaded {len(records)} account ratio records")
+        print(f"[INFO] Downloaded {len(all_records)} account ratio records")
         
         # Bybit format: [{"symbol": "BTCUSDT", "buyRatio": "0.52", "sellRatio": "0.48", "timestamp": "1704067200000"}]
         df = pd.DataFrame(all_records)
@@ -252,27 +215,18 @@ class BybitVenueMetricsDownloader:
         params = {
             "category": "linear",
             "symbol": self.base_symbol,
-            "startTime": start_ms,
-            "endTime": end_ms,
             "limit": 200,  # Max per request
         }
         
-        all_records = []
-        
-        try:
-            data = make_bybit_api_request(BYBIT_ENDPOINTS["funding_history"], params)
-        except Exception as e:
-            print(f"[ERROR] Failed to download funding history: {e}")
-            return pd.DataFrame(columns=["timestamp", "fundingRate"])
-        
-        result = data.get("result", {})
-        records = result.get("list", [])
+        all_records, failed = get_bybit_client().fetch_windows(
+            BYBIT_ENDPOINTS["funding_history"], params, start_ms, end_ms, FUNDING_WINDOW_MS,
+            start_key="startTime", end_key="endTime", paginate=False,
+        )
+        report_failed_windows(f"{self.base_symbol} funding history", failed)
         
-        if not records:
+        if not all_records:
             return pd.DataFrame(columns=["timestamp", "fundingRate"])
-        
-        all_records.extend(records)
-        print(f"[INFO] Downloaded {len(records)} funding rate records")
+        print(f"[INFO] Downloaded {len(all_records)} funding rate records")
         
         # Bybit format: [{"symbol": "BTCUSDT", "fundingRate": "0.0001", "fundingRateTimestamp": "1704067200000"}]
         df = pd.DataFrame(all_records)
@@ -353,41 +307,23 @@ class BybitVenueMetricsDownloader:
         
         print(f"[INFO] Total merged records: {len(merged_df)}")
         
-        # Create NautilusTrader BybitMetricsData objects
+        # Spaltenweise statt BybitMetricsData pro Zeile: ms -> ns einmal als int64 Array
         instrument_id = InstrumentId(Symbol(self.symbol), Venue("BYBIT"))
-        records = []
-        csv_rows = []
-        
-        for _, row in merged_df.iterrows():
-            ts_event = int(row["timestamp"]) * 1_000_000  # ms to ns
-            
-            # Create BybitMetricsData with available Bybit metrics
-            md = BybitMetricsData(
-                instrument_id=instrument_id,
-                ts_event=ts_event,
-                ts_init=ts_event,
-                open_interest=float(row.get("openInterest", 0)),
-                funding_rate=float(row.get("fundingRate", 0)),
-                long_short_ratio=float(row.get("longShortRatio", 0)),
+        ts_event = to_unix_nanos(merged_df["timestamp"], unit="ms")
+        values = {
+            target: (
+                pd.to_numeric(merged_df[source], errors="coerce").to_numpy(dtype="float64")
+                if source in merged_df.columns else np.zeros(len(merged_df))
             )
-            records.append(md)
-            
-            if self.save_as_csv:
-                csv_rows.append({
-                    "timestamp_nano": ts_event,
-                    "timestamp_iso": unix_nanos_to_iso8601(ts_event),
-                    "symbol": self.symbol,
-                    "open_interest": row.get("openInterest", 0),
-                    "funding_rate": row.get("fundingRate", 0),
-                    "long_short_ratio": row.get("longShortRatio", 0),
-                })
+            for source, target in (("openInterest", "open_interest"), ("fundingRate", "funding_rate"), ("longShortRatio", "long_short_ratio"))
+        }
         
         # Save to catalog
         if self.save_in_catalog:
             self.catalog_path.mkdir(parents=True, exist_ok=True)
-            catalog = ParquetDataCatalog(str(self.catalog_path))
-            catalog.write_data(records)
-            print(f"[INFO] Saved {len(records)} metrics to catalog")
+            table = build_table(BybitMetricsData.schema(), instrument_id.value, ts_event, values)
+            write_table_to_catalog(self.catalog_path, table, BybitMetricsData, instrument_id.value)
+            print(f"[INFO] Saved {table.num_rows} metrics to catalog")
         
         # Save to CSV
         if self.save_as_csv:
@@ -395,12 +331,18 @@ class BybitVenueMetricsDownloader:
             out_dir = self.base_data_dir / subdir / self.symbol
             out_dir.mkdir(parents=True, exist_ok=True)
             out_path = out_dir / "METRICS.csv"
-            pd.DataFrame(csv_rows).to_csv(out_path, index=False)
+            csv_df = pd.DataFrame({
+                "timestamp_nano": ts_event,
+                "timestamp_iso": unix_nanos_to_iso8601_array(ts_event),
+                "symbol": self.symbol,
+                **values,
+            })
+            csv_df.to_csv(out_path, index=False)
             print(f"[INFO] Saved CSV to {out_path}")
         
         return {
             "symbol": self.symbol,
-            "records": len(records),
+            "records": len(merged_df),
             "catalog_written": self.save_in_catalog,
             "csv_written": self.save_as_csv,
             "date_range": f"{self.start_date} to {self.end_date}",
@@ -0,0 +1,205 @@
+# arrow_catalog.py
+# columnar write path for the custom data classes and trade ticks: DataFrame -> Arrow table -> catalog parquet,
+# ohne Data-Objekte pro Zeile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+# private catalog internals (geprüft mit nautilus_trader 1.221.0), tests/test_arrow_catalog.py fails if they change
+from nautilus_trader.persistence.catalog.parquet import _are_intervals_disjoint, _timestamps_to_filename
+
+
+def to_unix_nanos(values, unit: str | None = None) -> np.ndarray:
+    """int64 ns array from datetime strings (parsed once, utc) or epoch numbers in `unit` (e.g. "ms")"""
+    s = pd.Series(values)
+    if unit is not None:
+        return (pd.to_numeric(s).astype("int64") * pd.Timedelta(1, unit=unit).value).to_numpy(dtype="int64")
+    parsed = pd.to_datetime(s, utc=True).dt.tz_localize(None)
+    return parsed.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+def unix_nanos_to_iso8601_array(ts_ns: np.ndarray) -> pd.Series:
+    """vectorized unix_nanos_to_iso8601 (same format: ...T..:..:..123456789Z)"""
+    s = pd.Series(ts_ns, dtype="int64")
+    seconds = pd.to_datetime(s, utc=True).dt.strftime("%Y-%m-%dT%H:%M:%S.")
+    return seconds + (s % 1_000_000_000).astype(str).str.zfill(9) + "Z"
+
+
+def coerce_column(values, type_: pa.DataType) -> pa.Array:
+    """column -> arrow array of the schema field type (numbers coerced, bool from bool or "true"/"false" strings)"""
+    s = pd.Series(values).reset_index(drop=True)
+    if pa.types.is_floating(type_):
+        return pa.array(pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64"), type=type_)
+    if pa.types.is_integer(type_):
+        return pa.array(pd.to_numeric(s, errors="coerce").astype("Int64"), type=type_)
+    if pa.types.is_boolean(type_):
+        if s.dtype != bool:
+            s = s.astype(str).str.lower() == "true"
+        return pa.array(s.to_numpy(dtype=bool), type=type_)
+    if pa.types.is_string(type_):
+        return pa.array(s.astype(str), type=type_)
+    return pa.array(s, type=type_)
+
+
+def build_table(schema: pa.Schema, instrument_id: str, ts_event: np.ndarray, columns: dict) -> pa.Table:
+    """arrow table in the schema of a custom data class, sorted by ts_init (= ts_event) like write_data expects"""
+    order = np.argsort(ts_event, kind="stable")
+    ts = np.asarray(ts_event, dtype="int64")[order]
+    arrays = {
+        "instrument_id": pa.array(np.full(len(ts), instrument_id, dtype=object), type=pa.string()),
+        "ts_event": pa.array(ts, type=pa.int64()),
+        "ts_init": pa.array(ts, type=pa.int64()),
+    }
+    for name, values in columns.items():
+        arrays[name] = coerce_column(pd.Series(values).to_numpy()[order], schema.field(name).type)
+    return pa.Table.from_pydict({field.name: arrays[field.name] for field in schema}, schema=schema)
+
+
+def _mul_i64_to_i128(mantissa: np.ndarray, factor: int):
+    """(lo, hi) uint64 words of mantissa * factor as two's complement i128, factor < 2**63"""
+    negative = mantissa < 0
+    a = np.abs(mantissa).astype(np.uint64)
+    b = np.uint64(factor)
+    mask = np.uint64(0xFFFFFFFF)
+    shift = np.uint64(32)
+    a0, a1 = a & mask, a >> shift
+    b0, b1 = b & mask, b >> shift
+    p00, p01, p10, p11 = a0 * b0, a0 * b1, a1 * b0, a1 * b1
+    mid = (p00 >> shift) + (p01 & mask) + (p10 & mask)
+    lo = (p00 & mask) | (mid << shift)
+    hi = p11 + (p01 >> shift) + (p10 >> shift) + (mid >> shift)
+    # negative Werte: Zweierkomplement über beide Wörter
+    neg_lo = ~lo + np.uint64(1)
+    neg_hi = ~hi + (neg_lo == 0).astype(np.uint64)
+    return np.where(negative, neg_lo, lo), np.where(negative, neg_hi, hi)
+
+
+def fixed_point_array(values, precision: int) -> pa.FixedSizeBinaryArray:
+    """
+    Price/Quantity raw values as the catalog stores them (fixed_size_binary, little endian)
+    rounding like the Rust side: value * 10^precision half away from zero, then scaled to FIXED_PRECISION
+    """
+    from nautilus_trader.model.objects import FIXED_PRECISION, FIXED_PRECISION_BYTES
+
+    scaled = np.asarray(values, dtype="float64") * 10.0 ** precision
+    whole = np.trunc(scaled)
+    mantissa = np.where(np.abs(scaled - whole) >= 0.5, whole + np.sign(scaled), whole).astype(np.int64)
+    factor = 10 ** (FIXED_PRECISION - precision)
+    if FIXED_PRECISION_BYTES == 8:
+        buffer = (mantissa * np.int64(factor)).astype("<i8").tobytes()
+    else:
+        lo, hi = _mul_i64_to_i128(mantissa, factor)
+        buffer = np.column_stack([lo, hi]).astype("<u8").tobytes()
+    return pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(FIXED_PRECISION_BYTES), len(mantissa), [None, pa.py_buffer(buffer)]
+    )
+
+
+def build_trade_tick_table(instrument, ts_event: np.ndarray, price, size, buyer_maker, trade_id) -> pa.Table:
+    """TradeTick table in the catalog schema (sorted by ts_event), buyer_maker True -> SELLER aggressor"""
+    order = np.argsort(np.asarray(ts_event, dtype="int64"), kind="stable")
+    ts = np.asarray(ts_event, dtype="int64")[order].astype(np.uint64)
+    width = fixed_point_array([0.0], 0).type
+    schema = pa.schema(
+        [
+            pa.field("price", width, nullable=False),
+            pa.field("size", width, nullable=False),
+            pa.field("aggressor_side", pa.uint8(), nullable=False),
+            pa.field("trade_id", pa.string(), nullable=False),
+            pa.field("ts_event", pa.uint64(), nullable=False),
+            pa.field("ts_init", pa.uint64(), nullable=False),
+        ],
+        metadata={
+            "instrument_id": str(instrument.id),
+            "price_precision": str(instrument.price_precision),
+            "size_precision": str(instrument.size_precision),
+        },
+    )
+    # AggressorSide: BUYER = 1, SELLER = 2
+    side = np.where(np.asarray(buyer_maker, dtype=bool)[order], 2, 1).astype(np.uint8)
+    return pa.Table.from_arrays(
+        [
+            fixed_point_array(np.asarray(price, dtype="float64")[order], instrument.price_precision),
+            fixed_point_array(np.asarray(size, dtype="float64")[order], instrument.size_precision),
+            pa.array(side, type=pa.uint8()),
+            pa.array(pd.Series(trade_id).astype(str).to_numpy()[order], type=pa.string()),
+            pa.array(ts, type=pa.uint64()),
+            pa.array(ts, type=pa.uint64()),
+        ],
+        schema=schema,
+    )
+
+
+def write_table_to_catalog(catalog_path, table: pa.Table, data_cls: type, identifier: str,
+                           skip_disjoint_check: bool = False, write_options: dict | None = None) -> Path:
+    """
+    writes a prepared table into the same place/file naming as ParquetDataCatalog.write_data
+    write_options: extra pq.write_table arguments (compression, column_encoding, ...)
+    """
+    catalog = ParquetDataCatalog(str(catalog_path))
+    directory = catalog._make_path(data_cls=data_cls, identifier=identifier)
+    catalog.fs.mkdirs(directory, exist_ok=True)
+    ts_init = table.column("ts_init")
+    parquet_file = f"{directory}/{_timestamps_to_filename(ts_init[0].as_py(), ts_init[-1].as_py())}"
+    pq.write_table(table, where=parquet_file, filesystem=catalog.fs, row_group_size=catalog.max_rows_per_group,
+                   **(write_options or {}))
+    if not skip_disjoint_check:
+        assert _are_intervals_disjoint(catalog._get_directory_intervals(directory)), "Intervals are not disjoint after writing a new file"
+    return Path(parquet_file)
+
+
+# bulk loader ------------------------------------------------------------------------
+
+def iter_source_chunks(source, chunksize: int, columns=None):
+    """DataFrame chunks of a csv or parquet file (parquet: record batches, only the needed columns)"""
+    source = Path(source)
+    if source.suffix == ".parquet":
+        parquet = pq.ParquetFile(source)
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=columns)
+
+
+def bulk_load_to_catalog(source, data_cls: type, catalog_path, instrument_id: str, ts_column: str,
+                         ts_unit: str | None = None, column_map: dict | None = None,
+                         chunksize: int = 1_000_000) -> int:
+    """
+    csv/parquet -> catalog for any registered custom Data class, columnweise in chunks, ohne Data-Objekte pro Zeile
+    column_map: schema field -> source column (default: same name), ts_column parsed as datetime or epoch in ts_unit
+    rows with the last timestamp of a chunk go to the next chunk so the written files stay disjoint (sorted source)
+    """
+    from nautilus_trader.serialization.arrow.serializer import get_schema
+
+    schema = get_schema(data_cls)
+    fields = [f.name for f in schema if f.name not in ("instrument_id", "ts_event", "ts_init")]
+    mapping = {name: (column_map or {}).get(name, name) for name in fields}
+    needed = list(dict.fromkeys([ts_column, *mapping.values()]))
+    Path(catalog_path).mkdir(parents=True, exist_ok=True)
+
+    def _write(df, ts_event):
+        table = build_table(schema, instrument_id, ts_event, {name: df[src] for name, src in mapping.items()})
+        write_table_to_catalog(catalog_path, table, data_cls, instrument_id)
+        return len(df)
+
+    written = 0
+    carry, carry_ts = None, None
+    for chunk in iter_source_chunks(source, chunksize, columns=needed):
+        chunk = chunk.dropna(subset=[ts_column]).reset_index(drop=True)
+        ts = to_unix_nanos(chunk[ts_column], unit=ts_unit)
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+            ts = np.concatenate([carry_ts, ts])
+        if chunk.empty:
+            continue
+        last = ts == ts.max()
+        carry, carry_ts = chunk[last], ts[last]
+        if (~last).any():
+            written += _write(chunk[~last], ts[~last])
+    if carry is not None and len(carry):
+        written += _write(carry, carry_ts)
+    print(f"[INFO] {data_cls.__name__}: {written} Zeilen aus {Path(source).name} -> {catalog_path}")
+    return written
@@ -0,0 +1,205 @@
+# book_depth_data.py
+# binance bookDepth snapshots: kumulierte depth/notional je ±% Band um den Mid, ein Objekt pro Snapshot
+# im Katalog werden die Bänder delta-kodiert gespeichert (Zuwachs je Band statt kumuliert), from_catalog summiert zurück
+import msgspec
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from nautilus_trader.core import Data
+from nautilus_trader.model import InstrumentId
+from nautilus_trader.serialization.base import register_serializable_type
+from nautilus_trader.serialization.arrow.serializer import register_arrow
+from nautilus_trader.core.datetime import unix_nanos_to_iso8601
+
+# Bänder in % vom Mid (bid = negative percentage in den Binance Dateien), Index i -> Spalten *_{i}
+BOOK_DEPTH_LEVELS = (0.2, 1.0, 2.0, 3.0, 4.0, 5.0)
+BOOK_DEPTH_SERIES = ("bid_depth", "bid_notional", "ask_depth", "ask_notional")
+
+
+def level_columns(series: str) -> list:
+    return [f"{series}_{i}" for i in range(len(BOOK_DEPTH_LEVELS))]
+
+
+def encode_levels(cumulative: np.ndarray) -> np.ndarray:
+    """
+    cumulative values per band (rows x levels) -> increment per band
+    fehlende Bänder: Delta gegen den letzten vorhandenen kumulierten Wert, das Band selbst bleibt NaN (= missing mask)
+    """
+    cumulative = np.atleast_2d(np.asarray(cumulative, dtype="float64"))
+    missing = np.isnan(cumulative)
+    filled = pd.DataFrame(cumulative).ffill(axis=1).fillna(0.0).to_numpy()
+    increments = np.diff(filled, axis=1, prepend=0.0)
+    increments[missing] = np.nan
+    return increments
+
+
+def decode_levels(increments: np.ndarray) -> np.ndarray:
+    """increments -> cumulative, NaN only in the bands that were missing (nicht in den weiteren Bändern)"""
+    increments = np.atleast_2d(np.asarray(increments, dtype="float64"))
+    cumulative = np.nancumsum(increments, axis=1)
+    cumulative[np.isnan(increments)] = np.nan
+    return cumulative
+
+
+class BookDepthData(Data):
+    def __init__(
+        self,
+        instrument_id: InstrumentId,
+        ts_event: int,
+        ts_init: int,
+        bid_depth,
+        bid_notional,
+        ask_depth,
+        ask_notional,
+    ):
+        # je Seite ein Wert pro Band aus BOOK_DEPTH_LEVELS, kumuliert (wie in der Binance Datei)
+        self.instrument_id = instrument_id
+        self._ts_event = ts_event
+        self._ts_init = ts_init
+        self.bid_depth = tuple(bid_depth)
+        self.bid_notional = tuple(bid_notional)
+        self.ask_depth = tuple(ask_depth)
+        self.ask_notional = tuple(ask_notional)
+
+    def __repr__(self):
+        return (
+            f"BookDepthData(ts={unix_nanos_to_iso8601(self._ts_event)}, "
+            f"instrument_id={self.instrument_id}, "
+            f"bid_depth={self.bid_depth}, "
+            f"ask_depth={self.ask_depth})"
+        )
+
+    @property
+    def ts_event(self) -> int:
+        return self._ts_event
+
+    @property
+    def ts_init(self) -> int:
+        return self._ts_init
+
+    def imbalance(self, level: int = len(BOOK_DEPTH_LEVELS) - 1) -> float:
+        """(bid - ask) / (bid + ask) depth within band `level`"""
+        bid, ask = self.bid_depth[level], self.ask_depth[level]
+        total = bid + ask
+        return (bid - ask) / total if total else 0.0
+
+    def to_dict(self):
+        return {
+            "instrument_id": self.instrument_id.value,
+            "ts_event": self._ts_event,
+            "ts_init": self._ts_init,
+            "bid_depth": list(self.bid_depth),
+            "bid_notional": list(self.bid_notional),
+            "ask_depth": list(self.ask_depth),
+            "ask_notional": list(self.ask_notional),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return BookDepthData(
+            InstrumentId.from_str(data["instrument_id"]),
+            data["ts_event"],
+            data["ts_init"],
+            data["bid_depth"],
+            data["bid_notional"],
+            data["ask_depth"],
+            data["ask_notional"],
+        )
+
+    def to_bytes(self):
+        return msgspec.msgpack.encode(self.to_dict())
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        return cls.from_dict(msgspec.msgpack.decode(data))
+
+    def to_catalog(self):
+        row = {
+            "instrument_id": self.instrument_id.value,
+            "ts_event": self._ts_event,
+            "ts_init": self._ts_init,
+        }
+        for series in BOOK_DEPTH_SERIES:
+            row.update(zip(level_columns(series), encode_levels(getattr(self, series))[0]))
+        return pa.RecordBatch.from_pylist([row], schema=BookDepthData.schema())
+
+    @classmethod
+    def from_catalog(cls, table: pa.Table):
+        decoded = {s: decode_levels(np.column_stack([table.column(c).to_numpy() for c in level_columns(s)]))
+                   for s in BOOK_DEPTH_SERIES}
+        instrument_ids = table.column("instrument_id").to_pylist()
+        ts_event = table.column("ts_event").to_pylist()
+        ts_init = table.column("ts_init").to_pylist()
+        ids = {s: InstrumentId.from_str(s) for s in set(instrument_ids)}
+        return [
+            BookDepthData(ids[instrument_ids[i]], ts_event[i], ts_init[i],
+                          *(decoded[s][i].tolist() for s in BOOK_DEPTH_SERIES))
+            for i in range(table.num_rows)
+        ]
+
+    @classmethod
+    def schema(cls):
+        fields = {
+            "instrument_id": pa.string(),
+            "ts_event": pa.int64(),
+            "ts_init": pa.int64(),
+        }
+        for series in BOOK_DEPTH_SERIES:
+            fields.update({c: pa.float64() for c in level_columns(series)})
+        return pa.schema(fields)
+
+
+# parquet Optionen für die Katalog-Dateien: Zeitstempel delta-kodiert, floats byte-stream-split + zstd
+BOOK_DEPTH_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "use_dictionary": ["instrument_id"],
+    "column_encoding": {
+        "ts_event": "DELTA_BINARY_PACKED",
+        "ts_init": "DELTA_BINARY_PACKED",
+        **{c: "BYTE_STREAM_SPLIT" for s in BOOK_DEPTH_SERIES for c in level_columns(s)},
+    },
+}
+
+
+def book_depth_columns(snapshots: pd.DataFrame) -> dict:
+    """pivoted snapshots (columns <series>_<i>, kumuliert) -> delta-kodierte Spalten für build_table"""
+    columns = {}
+    for series in BOOK_DEPTH_SERIES:
+        names = level_columns(series)
+        columns.update(zip(names, encode_levels(snapshots[names].to_numpy()).T))
+    return columns
+
+
+def load_book_depth_frame(catalog_path, instrument_id: str, start=None, end=None) -> pd.DataFrame:
+    """
+    snapshots of [start, end] straight from the catalog parquet files (filter pushdown on ts_event),
+    columns ts_event + <series>_<i> kumuliert, ohne BookDepthData Objekte
+    """
+    from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+    catalog = ParquetDataCatalog(str(catalog_path))
+    directory = catalog._make_path(data_cls=BookDepthData, identifier=instrument_id)
+    if not catalog.fs.exists(directory):
+        return pd.DataFrame(columns=["ts_event", *[c for s in BOOK_DEPTH_SERIES for c in level_columns(s)]])
+
+    def _ns(value):
+        ts = pd.Timestamp(value)
+        return (ts.tz_localize("UTC") if ts.tzinfo is None else ts).value
+
+    flt = None
+    if start is not None:
+        flt = ds.field("ts_event") >= _ns(start)
+    if end is not None:
+        upper = ds.field("ts_event") <= _ns(end)
+        flt = upper if flt is None else flt & upper
+    table = ds.dataset(directory, format="parquet", filesystem=catalog.fs).to_table(filter=flt)
+    df = table.drop(["instrument_id", "ts_init"]).to_pandas().sort_values("ts_event", kind="stable")
+    for series in BOOK_DEPTH_SERIES:
+        names = level_columns(series)
+        df[names] = decode_levels(df[names].to_numpy())
+    return df.reset_index(drop=True)
+
+
+register_serializable_type(BookDepthData, BookDepthData.to_dict, BookDepthData.from_dict)
+register_arrow(BookDepthData, BookDepthData.schema(), BookDepthData.to_catalog, BookDepthData.from_catalog)
@@ -0,0 +1,257 @@
+# instrument_store.py
+# exchange instrument metadata: full instrument list pro Börse/Markt einmal laden, mit TTL als json speichern,
+# beliebig viele Symbole daraus auflösen (statt exchangeInfo / instruments-info pro Symbol)
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import requests
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parents[3] / "DATA_STORAGE" / "instrument_metadata"
+DEFAULT_TTL_SECONDS = 6 * 3600
+# fehlende Symbole lösen höchstens so oft einen Refresh aus (neu gelistete Symbole)
+MIN_REFRESH_INTERVAL_SECONDS = 60
+
+BINANCE_EXCHANGE_INFO_URLS = {
+    "perp": "https://fapi.binance.com/fapi/v1/exchangeInfo",
+    "spot": "https://api.binance.com/api/v3/exchangeInfo",
+}
+
+
+def _get_json(url, params=None, max_retries=3, delay=0.5):
+    for attempt in range(max_retries):
+        try:
+            resp = requests.get(url, params=params, timeout=30)
+            resp.raise_for_status()
+            return resp.json()
+        except requests.exceptions.RequestException as e:
+            if attempt == max_retries - 1:
+                raise
+            print(f"[WARN] Instrument list request failed (attempt {attempt + 1}/{max_retries}): {e}")
+            time.sleep(delay * (2 ** attempt))
+
+
+def fetch_binance_instruments(market):
+    """all symbols of binance futures ("perp") or spot ("spot") exchangeInfo, one request"""
+    data = _get_json(BINANCE_EXCHANGE_INFO_URLS[market])
+    return {info["symbol"]: info for info in data.get("symbols") or []}
+
+
+def fetch_bybit_instruments(market):
+    """all instruments of a bybit category ("linear" / "spot"), cursor pagination with limit 1000"""
+    from data.download.crypto_downloads.bybit_downloads.bybit_client import get_bybit_client
+    records = get_bybit_client().paginate("instruments-info", {"category": market, "limit": 1000})
+    return {info["symbol"]: info for info in records}
+
+
+FETCHERS = {
+    "BINANCE": fetch_binance_instruments,
+    "BYBIT": fetch_bybit_instruments,
+}
+
+
+class InstrumentMetadataStore:
+    """
+    persisted instrument lists per exchange/market (DATA_STORAGE/instrument_metadata/<exchange>_<market>.json)
+    - a snapshot older than `ttl` is refreshed with one full list request, shared by all symbols and processes
+    - symbols that vanish from the list are kept under "delisted" (last known info) for historical backtests
+    - an unknown symbol triggers at most one refresh per MIN_REFRESH_INTERVAL_SECONDS
+    """
+
+    def __init__(self, root=None, ttl=DEFAULT_TTL_SECONDS, fetchers=None):
+        self.root = Path(root or DEFAULT_STORE_DIR)
+        self.ttl = ttl
+        self.fetchers = dict(FETCHERS, **(fetchers or {}))
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def _path(self, exchange, market):
+        return self.root / f"{exchange.lower()}_{market}.json"
+
+    def _load(self, exchange, market):
+        key = (exchange, market)
+        path = self._path(exchange, market)
+        snapshot = self._snapshots.get(key)
+        # anderer Prozess kann die Datei inzwischen erneuert haben
+        if path.exists() and (snapshot is None or path.stat().st_mtime_ns != snapshot.get("_mtime_ns")):
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+            snapshot["_mtime_ns"] = path.stat().st_mtime_ns
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def _save(self, exchange, market, snapshot):
+        path = self._path(exchange, market)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({k: v for k, v in snapshot.items() if not k.startswith("_")}), encoding="utf-8")
+        os.replace(tmp, path)
+        snapshot["_mtime_ns"] = path.stat().st_mtime_ns
+        self._snapshots[(exchange, market)] = snapshot
+
+    def _refresh(self, exchange, market, previous):
+        print(f"[INFO] Refreshing {exchange} {market} instrument list...")
+        current = self.fetchers[exchange](market)
+        now = time.time()
+        delisted = dict((previous or {}).get("delisted", {}))
+        for symbol, info in (previous or {}).get("symbols", {}).items():
+            if symbol not in current:
+                delisted[symbol] = {"info": info, "delisted_at": now}
+        for symbol in current:
+            delisted.pop(symbol, None)
+        snapshot = {"fetched_at": now, "symbols": current, "delisted": delisted}
+        self._save(exchange, market, snapshot)
+        print(f"[INFO] {exchange} {market}: {len(current)} instruments, {len(delisted)} delisted kept")
+        return snapshot
+
+    def snapshot(self, exchange, market, force_refresh=False):
+        exchange = exchange.upper()
+        with self._lock:
+            snapshot = self._load(exchange, market)
+            if force_refresh or snapshot is None or time.time() - snapshot["fetched_at"] > self.ttl:
+                snapshot = self._refresh(exchange, market, snapshot)
+            return snapshot
+
+    def get_infos(self, exchange, market, symbols):
+        """raw exchange info per symbol (delisted snapshots included), ValueError listing every unknown symbol"""
+        symbols = list(dict.fromkeys(symbols))
+        snapshot = self.snapshot(exchange, market)
+
+        def _lookup(snap):
+            found, missing = {}, []
+            for symbol in symbols:
+                if symbol in snap["symbols"]:
+                    found[symbol] = snap["symbols"][symbol]
+                elif symbol in snap["delisted"]:
+                    found[symbol] = snap["delisted"][symbol]["info"]
+                else:
+                    missing.append(symbol)
+            return found, missing
+
+        found, missing = _lookup(snapshot)
+        if missing and time.time() - snapshot["fetched_at"] > MIN_REFRESH_INTERVAL_SECONDS:
+            found, missing = _lookup(self.snapshot(exchange, market, force_refresh=True))
+        if missing:
+            raise ValueError(f"{exchange.upper()} {market}: Symbole nicht gefunden: {missing}")
+        return found
+
+    def get_info(self, exchange, market, symbol):
+        return self.get_infos(exchange, market, [symbol])[symbol]
+
+    def resolve(self, exchange, symbols, is_perp=True):
+        """
+        nautilus instruments for many symbols at once (one list request at most)
+        binance: symbols with or without -PERP, bybit: with or without -LINEAR; keys are the given symbols
+        """
+        exchange = exchange.upper()
+        if exchange == "BINANCE":
+            market = "perp" if is_perp else "spot"
+            raw = {s: s.replace("-PERP", "") if is_perp else s for s in symbols}
+            build = binance_instrument_from_info
+        elif exchange == "BYBIT":
+            market = "linear" if is_perp else "spot"
+            raw = {s: s.replace("-LINEAR", "") for s in symbols}
+            build = bybit_instrument_from_info
+        else:
+            raise ValueError(f"Unsupported exchange: {exchange}")
+        infos = self.get_infos(exchange, market, raw.values())
+        return {s: build(infos[r], is_perp) for s, r in raw.items()}
+
+
+_default_store = None
+
+
+def get_instrument_store():
+    """process wide store (in-memory snapshots on top of the json files)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = InstrumentMetadataStore()
+    return _default_store
+
+
+def resolve_instruments(exchange, symbols, is_perp=True):
+    return get_instrument_store().resolve(exchange, symbols, is_perp)
+
+
+# info -> nautilus instrument ------------------------------------------------------
+
+def _from_template(template, raw_symbol, inst_id, price_precision, size_precision, tick_size_str, step_size_str,
+                   margin_init, margin_maint):
+    from nautilus_trader.model.identifiers import Symbol
+    from nautilus_trader.model.objects import Price, Quantity
+
+    return template.__class__(
+        instrument_id=inst_id,
+        raw_symbol=Symbol(raw_symbol),
+        base_currency=template.base_currency,
+        quote_currency=template.quote_currency,
+        settlement_currency=template.settlement_currency,
+        is_inverse=template.is_inverse,
+        price_precision=price_precision,
+        size_precision=size_precision,
+        price_increment=Price.from_str(tick_size_str),
+        size_increment=Quantity.from_str(step_size_str),
+        margin_init=margin_init,
+        margin_maint=margin_maint,
+        maker_fee=template.maker_fee,
+        taker_fee=template.taker_fee,
+        ts_event=template.ts_event,
+        ts_init=template.ts_init,
+    )
+
+
+def binance_instrument_from_info(info, is_perp):
+    from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
+    from nautilus_trader.test_kit.providers import TestInstrumentProvider
+
+    raw_symbol = info["symbol"]
+    filters = {f["filterType"]: f for f in info["filters"]}
+    tick_size_str = filters["PRICE_FILTER"]["tickSize"]
+    step_size_str = filters["LOT_SIZE"]["stepSize"]
+    use_price_precision = int(info["pricePrecision"]) if "pricePrecision" in info else None
+    use_size_precision = int(info["quantityPrecision"]) if "quantityPrecision" in info else abs(
+        Decimal(step_size_str).normalize().as_tuple().exponent
+    )
+
+    # Precision aus der tick size statt pricePrecision (stimmt nicht für alle Paare)
+    calculated_price_precision = abs(Decimal(tick_size_str).as_tuple().exponent)
+    if use_price_precision is not None and calculated_price_precision != use_price_precision:
+        print(f"Debug: Precision mismatch for {raw_symbol} - API says {use_price_precision}, tick size implies {calculated_price_precision}. Using tick size.")
+    use_price_precision = calculated_price_precision
+
+    if is_perp:
+        margin_init = Decimal(info["requiredMarginPercent"]) / Decimal(100)
+        margin_maint = Decimal(info["maintMarginPercent"]) / Decimal(100)
+    else:
+        margin_init = Decimal("0")
+        margin_maint = Decimal("0")
+    template = TestInstrumentProvider.btcusdt_perp_binance() if is_perp else TestInstrumentProvider.btcusdt_binance()
+    inst_id = InstrumentId(Symbol(f"{raw_symbol}-PERP"), Venue("BINANCE")) if is_perp else InstrumentId(Symbol(raw_symbol), Venue("BINANCE"))
+    return _from_template(template, raw_symbol, inst_id, use_price_precision, use_size_precision,
+                          tick_size_str, step_size_str, margin_init, margin_maint)
+
+
+def bybit_instrument_from_info(info, is_linear):
+    from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
+    from nautilus_trader.test_kit.providers import TestInstrumentProvider
+
+    raw_symbol = info["symbol"]
+    price_filter = info.get("priceFilter", {})
+    lot_size_filter = info.get("lotSizeFilter", {})
+    tick_size_str = price_filter.get("tickSize", "0.01")
+    min_order_qty_str = lot_size_filter.get("minOrderQty", "0.001")
+    use_price_precision = abs(Decimal(tick_size_str).as_tuple().exponent)
+    use_size_precision = abs(Decimal(min_order_qty_str).as_tuple().exponent)
+
+    if is_linear:
+        margin_init = Decimal("0.01")
+        margin_maint = Decimal("0.005")
+    else:
+        margin_init = Decimal("0")
+        margin_maint = Decimal("0")
+    template = TestInstrumentProvider.btcusdt_perp_binance() if is_linear else TestInstrumentProvider.btcusdt_binance()
+    inst_id = InstrumentId(Symbol(f"{raw_symbol}-LINEAR"), Venue("BYBIT")) if is_linear else InstrumentId(Symbol(raw_symbol), Venue("BYBIT"))
+    return _from_template(template, raw_symbol, inst_id, use_price_precision, use_size_precision,
+                          tick_size_str, min_order_qty_str, margin_init, margin_maint)
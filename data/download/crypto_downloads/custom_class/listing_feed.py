@@ -0,0 +1,331 @@
+# listing_feed.py
+# incremental listing discovery: diff der Instrumentenliste (instrument_store snapshot) gegen den bekannten Stand,
+# append-only event log (listed / delisted + onboard timestamp) pro Börse/Markt, Abonnenten bekommen nur Änderungen
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+    import msvcrt
+
+from data.download.crypto_downloads.custom_class.instrument_store import get_instrument_store
+
+DEFAULT_FEED_DIR = Path(__file__).resolve().parents[3] / "DATA_STORAGE" / "listing_feed"
+DEFAULT_POLL_INTERVAL_SECONDS = 300
+
+LISTED = "listed"
+DELISTED = "delisted"
+
+# message bus topic für Listing Events im Live Trader: f"{LISTING_TOPIC}.{exchange}"
+LISTING_TOPIC = "events.listing"
+
+ONBOARD_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# perpetual contracts und "aktiv" Status je Börse (PENDING_TRADING / PreLaunch = angekündigt, zählt als gelistet)
+PERPETUAL_CONTRACT_TYPES = {"BINANCE": "PERPETUAL", "BYBIT": "LinearPerpetual"}
+ACTIVE_STATUS = {"BINANCE": {"TRADING", "PENDING_TRADING"}, "BYBIT": {"Trading", "PreLaunch"}}
+ONBOARD_FIELDS = {"BINANCE": "onboardDate", "BYBIT": "launchTime"}
+
+
+def feed_log_path(exchange, market, root=None):
+    """event log file of one exchange/market (backtests list it as run cache input)"""
+    return Path(root or DEFAULT_FEED_DIR) / f"{exchange.lower()}_{market}_events.jsonl"
+
+
+def onboard_ms_from_info(exchange, info):
+    """listing time in ms (binance onboardDate, bybit launchTime), None if missing/0"""
+    try:
+        value = int(info.get(ONBOARD_FIELDS[exchange]) or 0)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def format_onboard(onboard_ms):
+    """ms -> "YYYY-mm-dd HH:MM:SS" (utc, gleiches Format wie die bisherigen CSVs)"""
+    if onboard_ms is None:
+        return None
+    return datetime.fromtimestamp(onboard_ms / 1000, tz=timezone.utc).strftime(ONBOARD_FORMAT)
+
+
+@contextmanager
+def file_lock(path):
+    """exclusive inter-process lock on `path` (fcntl / msvcrt), blockiert bis frei"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ListingFeed:
+    """
+    change feed of one exchange/market (DATA_STORAGE/listing_feed/<exchange>_<market>_events.jsonl)
+    - poll(): one instrument list request (shared instrument_store), diff, neue Events anhängen + an Abonnenten
+    - erster poll ohne Log: alle aktuellen (und im store als delisted bekannten) Symbole als initial Events
+    - consume()/commit(): Cursor pro Konsument (persistiert), damit Skripte nur neue Events verarbeiten
+    """
+
+    def __init__(self, exchange, market, store=None, root=None, perpetual_only=True):
+        self.exchange = exchange.upper()
+        self.market = market
+        self.store = store or get_instrument_store()
+        self.root = Path(root or DEFAULT_FEED_DIR)
+        self.perpetual_only = perpetual_only
+        self.log_path = feed_log_path(self.exchange, market, self.root)
+        self.cursor_path = self.root / f"{self.exchange.lower()}_{market}_cursors.json"
+        # sync -> diff -> append muss über Prozesse hinweg atomar sein (sonst doppelte seq / doppelte Events)
+        self.lock_path = self.root / f"{self.exchange.lower()}_{market}.lock"
+        self._state = {}          # symbol -> letzter Event des Symbols
+        self._last_seq = 0
+        self._offset = 0          # gelesene Bytes des Logs (andere Prozesse können anhängen)
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # event log ------------------------------------------------------------------------
+
+    def _sync(self):
+        """apply events appended since the last read (auch von anderen Prozessen)"""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # halb geschriebene Zeile, beim nächsten Mal
+                self._offset += len(line)
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    def _apply(self, event):
+        self._last_seq = max(self._last_seq, event["seq"])
+        self._state[event["symbol"]] = event
+
+    def _append(self, events):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "ab") as f:
+            f.write(b"".join(json.dumps(e).encode("utf-8") + b"\n" for e in events))
+        self._sync()
+
+    def _event(self, kind, symbol, onboard_ms, now, initial, status=None):
+        self._last_seq += 1
+        return {
+            "seq": self._last_seq,
+            "event": kind,
+            "exchange": self.exchange,
+            "market": self.market,
+            "symbol": symbol,
+            "onboard_ms": onboard_ms,
+            "onboard": format_onboard(onboard_ms),
+            "status": status,
+            "detected_at": now,
+            "initial": initial,
+        }
+
+    # diff -------------------------------------------------------------------------------
+
+    def _tracked(self, infos):
+        if not self.perpetual_only:
+            return infos
+        contract_type = PERPETUAL_CONTRACT_TYPES[self.exchange]
+        return {s: info for s, info in infos.items() if info.get("contractType") == contract_type}
+
+    def diff(self, snapshot):
+        """events that turn the known state into `snapshot` (store format: symbols + delisted)"""
+        current = self._tracked(snapshot.get("symbols", {}))
+        active_status = ACTIVE_STATUS[self.exchange]
+        now = time.time()
+        initial = not self._state
+        seq = self._last_seq
+        events = []
+        try:
+            for symbol, info in current.items():
+                known = self._state.get(symbol)
+                onboard_ms = onboard_ms_from_info(self.exchange, info)
+                status = info.get("status")
+                active = status is None or status in active_status
+                if known is None or (active and known["event"] == DELISTED):
+                    events.append(self._event(LISTED, symbol, onboard_ms, now, initial, status))
+                    known = events[-1]
+                if not active and known["event"] == LISTED:
+                    events.append(self._event(DELISTED, symbol, onboard_ms, now, initial, status))
+            gone = {s: state for s, state in self._state.items() if s not in current and state["event"] == LISTED}
+            if initial:
+                # vom store schon als delisted gemerkte Symbole, damit historische Listings im Feed bleiben
+                gone_infos = self._tracked({s: d["info"] for s, d in snapshot.get("delisted", {}).items()})
+                for symbol, info in gone_infos.items():
+                    if symbol not in current:
+                        onboard_ms = onboard_ms_from_info(self.exchange, info)
+                        events.append(self._event(LISTED, symbol, onboard_ms, now, True, info.get("status")))
+                        events.append(self._event(DELISTED, symbol, onboard_ms, now, True, "removed"))
+            for symbol, state in gone.items():
+                events.append(self._event(DELISTED, symbol, state["onboard_ms"], now, False, "removed"))
+        finally:
+            # diff allein ändert den Stand nicht, _append/_sync übernimmt die Events
+            self._last_seq = seq
+        return events
+
+    def poll(self, force_refresh=True):
+        """refresh the instrument list, append + publish the changes, returns the new events"""
+        snapshot = self.store.snapshot(self.exchange, self.market, force_refresh=force_refresh)
+        with self._lock, file_lock(self.lock_path):
+            self._sync()
+            events = self.diff(snapshot)
+            if events:
+                self._append(events)
+        listed = sum(e["event"] == LISTED for e in events)
+        if events:
+            print(f"[INFO] {self.exchange} {self.market}: {listed} listed, {len(events) - listed} delisted "
+                  f"(seq {events[0]['seq']}..{events[-1]['seq']})")
+        self._publish(events)
+        return events
+
+    # subscriber -------------------------------------------------------------------------
+
+    def subscribe(self, callback, kinds=None, include_initial=False):
+        """callback(event) for every new event of poll() in this process"""
+        kinds = set(kinds) if kinds else None
+        self._subscribers.append((callback, kinds, include_initial))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [s for s in self._subscribers if s[0] is not callback]
+
+    def _publish(self, events):
+        for event in events:
+            for callback, kinds, include_initial in list(self._subscribers):
+                if (kinds is not None and event["event"] not in kinds) or (event["initial"] and not include_initial):
+                    continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"[WARN] Listing subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def start(self, interval=DEFAULT_POLL_INTERVAL_SECONDS):
+        """background polling thread (daemon), Fehler werden geloggt und beim nächsten Intervall erneut versucht"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"[WARN] Listing poll {self.exchange} {self.market} failed: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=_loop, name=f"listing-feed-{self.exchange.lower()}", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    # lesen ------------------------------------------------------------------------------
+
+    def events(self, since_seq=0, kinds=None):
+        """all logged events with seq > since_seq"""
+        with self._lock:
+            self._sync()
+        if not self.log_path.exists():
+            return []
+        with open(self.log_path, "rb") as f:
+            rows = [json.loads(line) for line in f if line.strip() and line.endswith(b"\n")]
+        return [e for e in rows if e["seq"] > since_seq and (kinds is None or e["event"] in kinds)]
+
+    def listings(self, start=None, end=None, only_usdt=False, include_delisted=True):
+        """
+        known symbols with onboard date in [start, end] (dates inklusive, "YYYY-mm-dd" oder date),
+        sortiert nach onboard; include_delisted=False -> nur aktuell gelistete
+        """
+        with self._lock:
+            self._sync()
+            state = dict(self._state)
+        start = str(start) if start is not None else None
+        end = str(end) if end is not None else None
+        rows = []
+        for symbol, event in state.items():
+            onboard = event["onboard"]
+            if onboard is None:
+                continue
+            if (start is not None and onboard[:10] < start) or (end is not None and onboard[:10] > end):
+                continue
+            if only_usdt and not symbol.endswith("USDT"):
+                continue
+            if not include_delisted and event["event"] == DELISTED:
+                continue
+            rows.append({"symbol": symbol, "onboard": onboard, "onboard_ms": event["onboard_ms"],
+                         "listed": event["event"] == LISTED})
+        rows.sort(key=lambda r: (r["onboard_ms"], r["symbol"]))
+        return rows
+
+    def onboard_dates(self, only_usdt=False):
+        """symbol -> onboard datetime (naive utc), ohne Netzwerkzugriff"""
+        return {r["symbol"]: datetime.strptime(r["onboard"], ONBOARD_FORMAT)
+                for r in self.listings(only_usdt=only_usdt)}
+
+    # consumer cursor --------------------------------------------------------------------
+
+    def _load_cursors(self):
+        if not self.cursor_path.exists():
+            return {}
+        return json.loads(self.cursor_path.read_text(encoding="utf-8"))
+
+    def consume(self, consumer, kinds=None):
+        """(events since the consumer's cursor, seq to commit afterwards)"""
+        since = self._load_cursors().get(consumer, 0)
+        events = self.events(since_seq=since, kinds=kinds)
+        return events, events[-1]["seq"] if events else since
+
+    def commit(self, consumer, seq):
+        with self._lock, file_lock(self.lock_path):
+            cursors = self._load_cursors()
+            cursors[consumer] = max(seq, cursors.get(consumer, 0))
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.cursor_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(cursors, indent=2), encoding="utf-8")
+            os.replace(tmp, self.cursor_path)
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_listing_feed(exchange, market):
+    """process wide feed per exchange/market (gleiche Abonnenten für Downloader, Strategie und Live Trader)"""
+    key = (exchange.upper(), market)
+    with _feeds_lock:
+        if key not in _feeds:
+            _feeds[key] = ListingFeed(*key)
+        return _feeds[key]
+
+
+def load_onboard_dates(exchange="BINANCE", market="perp", only_usdt=False):
+    """onboard dates from the feed log, {} if there is no log yet"""
+    return get_listing_feed(exchange, market).onboard_dates(only_usdt=only_usdt)
@@ -0,0 +1,138 @@
+# tick_ingest.py
+# streaming tick path: raw trade chunks (daily zip / processed csv) -> vectorized cleanup -> TradeTick Arrow tables
+# direkt in den Katalog (+ optional TICK.csv), ohne temporäre CSVs und ohne TradeTick Objekte pro Zeile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from nautilus_trader.model.data import TradeTick
+
+from data.download.crypto_downloads.custom_class.arrow_catalog import build_trade_tick_table, write_table_to_catalog
+
+DEFAULT_TICK_CHUNKSIZE = 2_000_000
+
+
+def clean_tick_frame(chunk_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    raw chunk (timestamp, trade_id, price, quantity, buyer_maker) -> ts_ns/trade_id/price/quantity/buyer_maker
+    timestamp numeric (ms) oder ISO-String aus Altbeständen, ungültige Zeilen (Header, NaN, <= 0) fallen raus
+    """
+    ts_raw = chunk_df["timestamp"]
+    ts_num = pd.to_numeric(ts_raw, errors="coerce")
+    if ts_num.notna().any():
+        # ganzzahlig rechnen, ms * 1e6 liegt über der float64 Genauigkeit
+        ts_ns = ts_num.round().astype("Int64") * 1_000_000
+    else:
+        parsed = pd.to_datetime(ts_raw, utc=True, errors="coerce", format="ISO8601")
+        ts_ns = pd.Series(parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view("int64"),
+                          index=chunk_df.index, dtype="Int64").mask(parsed.isna())
+    buyer_maker = chunk_df["buyer_maker"]
+    if buyer_maker.dtype != bool:
+        buyer_maker = buyer_maker.astype(str).str.lower() == "true"
+    out = pd.DataFrame({
+        "ts_ns": ts_ns,
+        "trade_id": chunk_df["trade_id"],
+        "price": pd.to_numeric(chunk_df["price"], errors="coerce"),
+        "quantity": pd.to_numeric(chunk_df["quantity"], errors="coerce"),
+        "buyer_maker": buyer_maker,
+    }).dropna(subset=["ts_ns", "price", "quantity", "trade_id"])
+    out = out[(out["price"] > 0) & (out["quantity"] > 0) & (out["ts_ns"] > 0)]
+    out["ts_ns"] = out["ts_ns"].astype("int64")
+    return out.reset_index(drop=True)
+
+
+def tick_csv_rows(clean: pd.DataFrame, symbol_label: str) -> pd.DataFrame:
+    """TICK.csv rows (same columns/format as before)"""
+    ts = pd.to_datetime(clean["ts_ns"], unit="ns", utc=True)
+    return pd.DataFrame({
+        "timestamp_nano": clean["ts_ns"],
+        "timestamp_iso": ts.dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "symbol": symbol_label,
+        "price": clean["price"],
+        "quantity": clean["quantity"],
+        "buyer_maker": clean["buyer_maker"].astype(str),
+        "trade_id": clean["trade_id"],
+    })
+
+
+class TickCatalogSink:
+    """
+    target of the streaming path: one catalog parquet per cleaned chunk and/or appended TICK.csv rows
+    write_catalog is thread-safe (eigene Datei pro Chunk), append_csv muss in Reihenfolge aufgerufen werden
+    """
+
+    def __init__(self, instrument=None, catalog_path=None, csv_out_path=None, symbol_label=None):
+        self.instrument = instrument
+        self.catalog_path = Path(catalog_path) if catalog_path is not None and instrument is not None else None
+        self.csv_out_path = Path(csv_out_path) if csv_out_path is not None else None
+        self.symbol_label = symbol_label
+        self._csv_started = False
+        self.rows = 0
+
+    def write_catalog(self, clean: pd.DataFrame) -> None:
+        if self.catalog_path is None or clean.empty:
+            return
+        table = build_trade_tick_table(
+            self.instrument,
+            ts_event=clean["ts_ns"].to_numpy(),
+            price=clean["price"].to_numpy(),
+            size=clean["quantity"].to_numpy(),
+            buyer_maker=clean["buyer_maker"].to_numpy(),
+            trade_id=clean["trade_id"],
+        )
+        # Chunk-Grenzen können sich um dieselbe ms überlappen -> wie bisher ohne disjoint check
+        write_table_to_catalog(self.catalog_path, table, TradeTick, str(self.instrument.id), skip_disjoint_check=True)
+
+    def append_csv(self, clean: pd.DataFrame) -> None:
+        if self.csv_out_path is None:
+            return
+        self.csv_out_path.parent.mkdir(parents=True, exist_ok=True)
+        tick_csv_rows(clean, self.symbol_label).to_csv(
+            self.csv_out_path,
+            mode="a" if self._csv_started else "w",
+            header=not self._csv_started,
+            index=False,
+        )
+        self._csv_started = True
+
+    def write(self, clean: pd.DataFrame) -> None:
+        self.write_catalog(clean)
+        self.append_csv(clean)
+        self.rows += len(clean)
+
+
+def ingest_tick_sources(sources, read_chunks, sink: TickCatalogSink, max_workers: int = 1) -> int:
+    """
+    streams every source (e.g. a day) through read_chunks(source) -> raw chunk frames -> sink
+    max_workers > 1: sources are converted/written to the catalog concurrently, at most max_workers in flight,
+    TICK.csv is still appended in source order; memory bound = chunksize (sequential) bzw. max_workers Quellen
+    """
+    sources = list(sources)
+    if max_workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            for raw in read_chunks(source):
+                sink.write(clean_tick_frame(raw))
+        return sink.rows
+
+    def _convert(source):
+        # (rows, frame für TICK.csv oder None) pro Chunk
+        converted = []
+        for raw in read_chunks(source):
+            clean = clean_tick_frame(raw)
+            sink.write_catalog(clean)
+            converted.append((len(clean), clean if sink.csv_out_path is not None else None))
+        return converted
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        remaining = iter(sources)
+        in_flight = deque(pool.submit(_convert, s) for _, s in zip(range(max_workers), remaining))
+        while in_flight:
+            for rows, clean in in_flight.popleft().result():
+                if clean is not None:
+                    sink.append_csv(clean)
+                sink.rows += rows
+            nxt = next(remaining, None)
+            if nxt is not None:
+                in_flight.append(pool.submit(_convert, nxt))
+    return sink.rows
@@ -8,6 +8,9 @@ FILTERED_ROOT = BASE_DATA_DIR / "csv_data_all_filtered"
 
 INPUT_FILENAME = "matched_data.csv"
 OUTPUT_FILENAME = "matched_data_filtered.csv"
+# zeitlich sortiert als parquet (timestamp als echter Zeitstempel) -> Eingabe für den k-way merge in merge.py
+OUTPUT_PARQUET = "matched_data_filtered.parquet"
+WRITE_CSV = True
 
 # columns to remove
 DROP_COLS = {
@@ -43,8 +46,8 @@ def _build_timestamp(df: pd.DataFrame) -> pd.Series:
         ts = pd.to_datetime(pd.to_numeric(df["timestamp_nano"], errors="coerce"), utc=True, unit="ns")
     else:
         raise ValueError("Weder timestamp_iso noch timestamp_nano vorhanden.")
-    ts = ts.dropna()
-    return ts.dt.strftime("%Y-%m-%d %H:%M:%S")
+    # auf Sekunden wie das bisherige "%Y-%m-%d %H:%M:%S" Format, ohne Zeitzone
+    return ts.dt.tz_localize(None).dt.floor("s")
 
 def process_directory(sym_dir: Path, dest_root: Path):  # geändert: Zielroot
     in_file = sym_dir / INPUT_FILENAME
@@ -54,13 +57,6 @@ def process_directory(sym_dir: Path, dest_root: Path):  # geändert: Zielroot
     if df is None or df.empty:
         return
 
-    # create new timestamp column
-    try:
-        new_timestamp = _build_timestamp(df)
-    except Exception as e:
-        print(f"[SKIP] {sym_dir.name}: Timestamp-Erstellung fehlgeschlagen: {e}")
-        return
-
     # Sortierung anhand vorhandener Zeit (nutze timestamp_iso falls möglich sonst timestamp_nano)
     sort_key = None
     if "timestamp_nano" in df.columns:
@@ -75,9 +71,17 @@ def process_directory(sym_dir: Path, dest_root: Path):  # geändert: Zielroot
             df[key] = pd.to_datetime(df[key], utc=True, errors="coerce")
         df = df.sort_values(key).reset_index(drop=True)
 
+    # create new timestamp column (nach dem Sortieren, sonst passt die Zuordnung nach reset_index nicht)
+    try:
+        new_timestamp = _build_timestamp(df)
+    except Exception as e:
+        print(f"[SKIP] {sym_dir.name}: Timestamp-Erstellung fehlgeschlagen: {e}")
+        return
+
     # ts_since_listing (beginnend bei 1)
     df["ts_since_listing"] = range(1, len(df) + 1)
     df["timestamp"] = new_timestamp
+    df = df.dropna(subset=["timestamp"]).reset_index(drop=True)
 
     # Spalten entfernen
     cols_to_drop = [c for c in DROP_COLS if c in df.columns]
@@ -92,8 +96,10 @@ def process_directory(sym_dir: Path, dest_root: Path):  # geändert: Zielroot
 
     out_dir = dest_root / sym_dir.name
     out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / OUTPUT_FILENAME
-    df.to_csv(out_path, index=False)
+    out_path = out_dir / OUTPUT_PARQUET
+    df.to_parquet(out_path, index=False)
+    if WRITE_CSV:
+        df.assign(timestamp=df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")).to_csv(out_dir / OUTPUT_FILENAME, index=False)
     print(f"[OK] {sym_dir.name}: {len(df)} Zeilen -> {out_path}")
 
 def run():
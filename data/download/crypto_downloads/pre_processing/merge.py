@@ -1,5 +1,10 @@
 from pathlib import Path
+import shutil
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 BASE_DATA_DIR = Path(__file__).resolve().parents[3] / "DATA_STORAGE"/ "csv_data_catalog"
 
@@ -7,81 +12,266 @@ BASE_DATA_DIR = Path(__file__).resolve().parents[3] / "DATA_STORAGE"/ "csv_data_
 SOURCE_ROOT = BASE_DATA_DIR / "csv_data_all_filtered"    # bei Bedarf ändern auf "csv_data_all_filtered"
 OUTPUT_DIR = BASE_DATA_DIR / "csv_data_all_merged"
 OUTPUT_FILENAME = "all_matched_data.csv"
+# partitioniertes parquet dataset (hive: month=YYYY-MM/symbol=XYZ) für Abfragen nach Zeitraum und Symbol
+DATASET_DIR = OUTPUT_DIR / "all_matched_data"
 
 MATCHED_NAME = "matched_data_filtered.csv"
+MATCHED_PARQUET = "matched_data_filtered.parquet"   # sortiert, von filter.py geschrieben
 
-SORT_BY_TIMESTAMP = False        # True => final nach timestamp_nano sortieren (kostet RAM)
-FILL_VALUE = 0                   # Wert für fehlende Spalten
+SORT_BY_TIMESTAMP = False        # True => k-way merge nach timestamp (chunkweise, lädt nie alles in den RAM)
+FILL_VALUE = 0                   # Wert für NaN in numerischen Spalten (fehlende Spalten bleiben null)
+WRITE_CSV = True                 # zusätzlich all_matched_data.csv (wie bisher) schreiben
+MERGE_BATCH_ROWS = 50_000        # Zeilen pro Symbol im Puffer -> RAM ~ Anzahl Symbole * MERGE_BATCH_ROWS
+PARTITION_FREQ = "month"         # "month" | "day" | "year"
 
-def discover_files():
+# Filter, werden beim Lesen der Symbol-Dateien gepusht (row groups außerhalb werden gar nicht gelesen)
+START_DATE = None                # z. B. "2024-01-01"
+END_DATE = None                  # inklusive, z. B. "2024-12-31 23:59:59"
+SYMBOLS = None                   # z. B. ["BTCUSDT", "ETHUSDT"] (Ordnernamen), None = alle
+MIN_TS_SINCE_LISTING = None      # z. B. 288 -> erste Tage nach dem Listing verwerfen
+
+TS_COL = "timestamp"
+PARTITION_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+
+def _ts_scalar(value):
+    return pa.scalar(pd.Timestamp(value).tz_localize(None).as_unit("ns"), type=pa.timestamp("ns"))
+
+
+def build_filter(start=None, end=None, min_ts_since_listing=None):
+    """pyarrow expression for the row filters (None = no filter)"""
+    conditions = []
+    if start is not None:
+        conditions.append(ds.field(TS_COL) >= _ts_scalar(start))
+    if end is not None:
+        conditions.append(ds.field(TS_COL) <= _ts_scalar(end))
+    if min_ts_since_listing is not None:
+        conditions.append(ds.field("ts_since_listing") >= min_ts_since_listing)
+    flt = None
+    for cond in conditions:
+        flt = cond if flt is None else flt & cond
+    return flt
+
+
+def _csv_to_parquet(csv_path: Path, parquet_path: Path, chunksize: int = 500_000):
+    """alte filter.py Ausgabe (nur CSV) chunkweise nach parquet, timestamp als Zeitstempel, Zahlen als float64"""
+    writer = None
+    tmp = parquet_path.with_suffix(".tmp")
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            chunk[TS_COL] = pd.to_datetime(chunk[TS_COL], errors="coerce")
+            for col in chunk.columns:
+                if col == TS_COL or col == "instrument_id":
+                    continue
+                if col == "ts_since_listing":
+                    chunk[col] = chunk[col].astype("int64")
+                else:
+                    chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(tmp, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        tmp.replace(parquet_path)
+
+
+def discover_files(symbols=SYMBOLS):
+    """(symbol, parquet) per symbol folder; symbols with only the CSV (ältere filter.py Läufe) are converted once"""
+    wanted = set(symbols) if symbols else None
     for sub in sorted(SOURCE_ROOT.iterdir()):
-        if not sub.is_dir():
+        if not sub.is_dir() or (wanted is not None and sub.name not in wanted):
             continue
-        file = sub / MATCHED_NAME
-        if file.exists():
-            yield sub.name, file
+        parquet_file = sub / MATCHED_PARQUET
+        csv_file = sub / MATCHED_NAME
+        if not parquet_file.exists() and csv_file.exists():
+            print(f"[INFO] {sub.name}: {MATCHED_NAME} -> {MATCHED_PARQUET}")
+            _csv_to_parquet(csv_file, parquet_file)
+        if parquet_file.exists():
+            yield sub.name, parquet_file
 
-def union_columns(file_infos):
-    cols = set()
-    for _, f in file_infos:
-        try:
-            head = pd.read_csv(f, nrows=1)
-            cols.update(head.columns.tolist())
-        except Exception:
-            continue
-    return list(cols)
 
-def stream_merge(file_infos, all_columns, out_path):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    header_written = False
-    total_rows = 0
-    meta = []
+def union_schema(file_infos):
+    """union of all columns (Reihenfolge: erste Datei, dann neue Spalten), bei Typkonflikten float64"""
+    fields = {}
     for inst, f in file_infos:
         try:
-            df = pd.read_csv(f)
+            schema = pq.read_schema(f)
         except Exception as e:
-            print(f"[SKIP] {inst}: read error {e}")
+            print(f"[SKIP] {inst}: schema error {e}")
             continue
-        if df.empty:
-            print(f"[SKIP] {inst}: empty")
+        for field in schema:
+            if field.name not in fields:
+                fields[field.name] = field.type
+            elif fields[field.name] != field.type and field.name != TS_COL:
+                fields[field.name] = pa.float64()
+    if TS_COL not in fields:
+        raise RuntimeError(f"Spalte {TS_COL} fehlt in allen Dateien.")
+    fields[TS_COL] = pa.timestamp("ns")
+    return pa.schema(list(fields.items()))
+
+
+def _read_batches(inst, path, schema, row_filter, batch_rows):
+    """
+    filtered chunks of one symbol, aligned to the union schema:
+    Spalten die dem Symbol fehlen -> typisierte nulls, NaN in vorhandenen numerischen Spalten -> FILL_VALUE
+    """
+    source = ds.dataset(path, format="parquet")
+    columns = [name for name in schema.names if name in source.schema.names]
+    fill_columns = [name for name in columns if name != TS_COL and
+                    (pa.types.is_integer(schema.field(name).type) or pa.types.is_floating(schema.field(name).type))]
+    for batch in source.to_batches(columns=columns, filter=row_filter, batch_size=batch_rows):
+        if batch.num_rows == 0:
             continue
-        # Reindex auf vollständiges Schema
-        df = df.reindex(columns=all_columns)
-        df = df.fillna(FILL_VALUE)
-        rows = len(df)
-        mode = "w" if not header_written else "a"
-        df.to_csv(out_path, mode=mode, header=not header_written, index=False)
-        header_written = True
-        total_rows += rows
-        meta.append((inst, rows))
-        print(f"[OK] {inst}: {rows} rows appended")
-    return meta, total_rows
-
-def optional_sort(out_path):
-    df = pd.read_csv(out_path)
-    if "timestamp_nano" in df.columns:
-        df = df.sort_values("timestamp_nano")
-    elif "timestamp" in df.columns:
-        df = df.sort_values("timestamp")
-    df.to_csv(out_path, index=False)
-    print("[INFO] Final file sorted.")
+        table = pa.Table.from_batches([batch])
+        for field in schema:
+            if field.name not in table.column_names:
+                table = table.append_column(field, pa.nulls(table.num_rows, type=field.type))
+        df = table.select(schema.names).to_pandas()
+        df[TS_COL] = pd.to_datetime(df[TS_COL]).astype("datetime64[ns]")
+        if fill_columns:
+            df[fill_columns] = df[fill_columns].fillna(FILL_VALUE)
+        df["symbol"] = inst
+        yield df
+
+
+def concat_chunks(sources):
+    """symbol nach symbol (SORT_BY_TIMESTAMP = False)"""
+    for inst, batches in sources:
+        for df in batches:
+            yield df
+
+
+def kway_merge(sources):
+    """
+    k-way merge of per-symbol time-sorted chunk streams, ohne alles zu laden:
+    pro Runde werden alle gepufferten Zeilen <= dem kleinsten letzten timestamp der noch offenen Quellen ausgegeben
+    (die können von keiner späteren Zeile mehr unterboten werden), bei gleichem timestamp in Quellreihenfolge
+    """
+    streams = [iter(batches) for _, batches in sources]
+    buffers = [None] * len(streams)
+    exhausted = [False] * len(streams)
+    while True:
+        for i, stream in enumerate(streams):
+            while not exhausted[i] and (buffers[i] is None or buffers[i].empty):
+                nxt = next(stream, None)
+                if nxt is None:
+                    exhausted[i] = True
+                else:
+                    buffers[i] = nxt
+        live = [i for i in range(len(streams)) if buffers[i] is not None and not buffers[i].empty]
+        if not live:
+            return
+        open_lasts = [buffers[i][TS_COL].iat[-1] for i in live if not exhausted[i]]
+        bound = min(open_lasts) if open_lasts else None
+
+        parts = []
+        for i in live:
+            buf = buffers[i]
+            if bound is None:
+                take = len(buf)
+            else:
+                take = int(np.searchsorted(buf[TS_COL].to_numpy(), np.datetime64(bound, "ns"), side="right"))
+            if take:
+                parts.append(buf.iloc[:take])
+                buffers[i] = buf.iloc[take:]
+        out = pd.concat(parts, ignore_index=True).sort_values(TS_COL, kind="stable").reset_index(drop=True)
+        yield out
+
+
+def _partition_column(ts: pd.Series) -> pd.Series:
+    return ts.dt.strftime(PARTITION_FORMATS[PARTITION_FREQ])
+
+
+def stream_merge(file_infos, schema, out_path, dataset_dir, row_filter=None):
+    """merged chunks -> partitioned dataset (+ optional CSV), returns ({symbol: rows}, total)"""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if dataset_dir.exists():
+        shutil.rmtree(dataset_dir)
+    if out_path.exists():
+        out_path.unlink()
+    sources = [(inst, _read_batches(inst, f, schema, row_filter, MERGE_BATCH_ROWS)) for inst, f in file_infos]
+    chunks = kway_merge(sources) if SORT_BY_TIMESTAMP else concat_chunks(sources)
+
+    partition_name = PARTITION_FREQ
+    out_schema = schema.append(pa.field(partition_name, pa.string())).append(pa.field("symbol", pa.string()))
+    meta = {}
+    header_written = False
+
+    def _batches():
+        nonlocal header_written
+        for df in chunks:
+            for inst, rows in df["symbol"].value_counts(sort=False).items():
+                meta[inst] = meta.get(inst, 0) + int(rows)
+            if WRITE_CSV:
+                csv_df = df.drop(columns="symbol").assign(**{TS_COL: df[TS_COL].dt.strftime("%Y-%m-%d %H:%M:%S")})
+                csv_df.to_csv(out_path, mode="a" if header_written else "w", header=not header_written, index=False)
+                header_written = True
+            df[partition_name] = _partition_column(df[TS_COL])
+            yield from pa.Table.from_pandas(df, schema=out_schema, preserve_index=False).to_batches()
+
+    ds.write_dataset(
+        _batches(),
+        dataset_dir,
+        schema=out_schema,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(partition_name, pa.string()), ("symbol", pa.string())]),
+                                     flavor="hive"),
+        max_partitions=100_000,
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    for inst, rows in meta.items():
+        print(f"[OK] {inst}: {rows} rows merged")
+    return meta, sum(meta.values())
+
+
+def load_merged(start=None, end=None, symbols=None, columns=None, row_filter=None,
+                dataset_dir: Path | None = None) -> pd.DataFrame:
+    """
+    query of the partitioned dataset: symbols/months prune directories, timestamp/row_filter are pushed
+    down to the row groups; columns=None -> alle
+    """
+    dataset = ds.dataset(dataset_dir or DATASET_DIR, format="parquet", partitioning="hive")
+    names = dataset.schema.names
+    partition_name = next((p for p in PARTITION_FORMATS if p in names), None)
+    conditions = [build_filter(start, end), row_filter]
+    if symbols:
+        conditions.append(ds.field("symbol").isin(list(symbols)))
+    if partition_name is not None:
+        fmt = PARTITION_FORMATS[partition_name]
+        if start is not None:
+            conditions.append(ds.field(partition_name) >= pd.Timestamp(start).strftime(fmt))
+        if end is not None:
+            conditions.append(ds.field(partition_name) <= pd.Timestamp(end).strftime(fmt))
+    flt = None
+    for cond in conditions:
+        if cond is not None:
+            flt = cond if flt is None else flt & cond
+    df = dataset.to_table(columns=columns, filter=flt).to_pandas()
+    if TS_COL in df.columns:
+        df = df.sort_values(TS_COL, kind="stable").reset_index(drop=True)
+    return df
+
 
 def run():
     if not SOURCE_ROOT.exists():
         raise FileNotFoundError(f"Source root not found: {SOURCE_ROOT}")
     files = list(discover_files())
     if not files:
-        raise RuntimeError("No matched_data.csv files found.")
-    all_cols = union_columns(files)
+        raise RuntimeError(f"No {MATCHED_PARQUET}/{MATCHED_NAME} files found.")
+    schema = union_schema(files)
     out_path = OUTPUT_DIR / OUTPUT_FILENAME
-    meta, total = stream_merge(files, all_cols, out_path)
-    if SORT_BY_TIMESTAMP:
-        optional_sort(out_path)
+    row_filter = build_filter(START_DATE, END_DATE, MIN_TS_SINCE_LISTING)
+    meta, total = stream_merge(files, schema, out_path, DATASET_DIR, row_filter)
     print("\nSummary:")
-    for inst, rows in meta:
+    for inst, rows in meta.items():
         print(f"  {inst}: {rows}")
     print(f"TOTAL rows: {total}")
-    print(f"OUTPUT: {out_path}")
+    print(f"DATASET: {DATASET_DIR}")
+    if WRITE_CSV:
+        print(f"OUTPUT: {out_path}")
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,306 @@
+"""
+Trend Feature Pipeline
+----------------------
+Replaces step_1.py .. step_5.py: all five stages in memory, for any number of symbols.
+
+Input:  csv_data/<SYMBOL>/OHLCV.csv, csv_data/<SYMBOL>/METRICS.csv, csv_data/FNG-INDEX.BINANCE/FNG.csv
+Output: csv_data/processed/<SYMBOL>/OHLCV_features.parquet (+ OHLCV_processed_5.csv if save_as_csv)
+
+Stages:
+1. technical indicators (pandas_ta, same columns as step_1)
+2. NaN -> fill_value
+3. merge METRICS / FNG on int64 timestamps (to the second), forward fill, rest -> fill_value
+4. forward-return targets per horizon (y_return_*, y_classification_*)
+5. trim warm-up / incomplete-target rows
+
+Stage 1 and the final feature set are cached as parquet under processed/<SYMBOL>/feature_cache,
+keyed by the stage parameters and the input files (size + mtime), so changing e.g. horizons reuses the indicators.
+Symbols run in parallel processes.
+"""
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+BASE_DATA_DIR = Path(__file__).resolve().parents[3] / "DATA_STORAGE" / "csv_data"
+FNG_SYMBOL = "FNG-INDEX.BINANCE"
+
+METRICS_COLUMNS = [
+    "sum_open_interest",
+    "sum_open_interest_value",
+    "count_toptrader_long_short_ratio",
+    "sum_toptrader_long_short_ratio",
+    "count_long_short_ratio",
+    "sum_taker_long_short_vol_ratio",
+]
+FNG_COLUMNS = ["fear_greed"]
+
+
+@dataclass(frozen=True)
+class IndicatorParams:
+    ema_lengths: tuple = (9, 21, 50)  # slope / close ratio on the middle one, distances between neighbours
+    rsi_lengths: tuple = (7, 14)
+    roc_length: int = 10
+    atr_length: int = 14
+    bb_length: int = 20
+    bb_std: float = 2.0
+    window: int = 20  # rolling volatility, volume / price z-score
+    return_periods: tuple = (1, 3, 5, 15)
+
+
+@dataclass(frozen=True)
+class FeatureParams:
+    indicators: IndicatorParams = field(default_factory=IndicatorParams)
+    # 5-Minuten Kerzen: 2=10m, 4=20m, 6=30m, 9=45m, 12=60m
+    horizons: tuple = (("10m", 2), ("20m", 4), ("30m", 6), ("45m", 9), ("60m", 12))
+    first_rows: int = 200
+    last_rows: int = 50
+    fill_value: float = 0.0
+    merge_metrics: bool = True
+    merge_fng: bool = True
+
+
+def _params_key(*parts) -> str:
+    payload = json.dumps([asdict(p) if hasattr(p, "__dataclass_fields__") else p for p in parts],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _fingerprint(path: Path):
+    """input file identity for the cache key (missing file -> None)"""
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [str(path), stat.st_size, stat.st_mtime_ns]
+
+
+def timestamp_key(values) -> np.ndarray:
+    """int64 ns floored to the second, utc (ersetzt das String-Cleaning per .apply aus step_3)"""
+    ts = pd.to_datetime(pd.Series(values), utc=True, format="ISO8601")
+    ns = ts.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view("int64")
+    return ns - ns % 1_000_000_000
+
+
+# stages ---------------------------------------------------------------------------
+
+def add_indicators(df: pd.DataFrame, p: IndicatorParams = IndicatorParams()) -> pd.DataFrame:
+    """STEP 1: trend, momentum, volatility, volume and price-structure indicators"""
+    out = df[["timestamp_iso", "open", "high", "low", "close", "volume"]].copy()
+    close, high, low, volume = out["close"], out["high"], out["low"], out["volume"]
+    cols = {}
+
+    for length in p.ema_lengths:
+        cols[f"ema_{length}"] = ta.ema(close, length=length)
+    mid = p.ema_lengths[len(p.ema_lengths) // 2]
+    cols[f"ema_{mid}_slope"] = cols[f"ema_{mid}"].diff()
+    cols[f"close_ema{mid}_ratio"] = close / cols[f"ema_{mid}"]
+    for a, b in zip(p.ema_lengths, p.ema_lengths[1:]):
+        cols[f"ema_{a}_{b}_distance"] = cols[f"ema_{a}"] - cols[f"ema_{b}"]
+
+    for length in p.rsi_lengths:
+        cols[f"rsi_{length}"] = ta.rsi(close, length=length)
+
+    macd = ta.macd(close)
+    cols["macd"] = macd["MACD_12_26_9"]
+    cols["macd_signal"] = macd["MACDs_12_26_9"]
+    cols["macd_histogram"] = macd["MACDh_12_26_9"]
+
+    stoch = ta.stoch(high, low, close)
+    cols["stoch_k"] = stoch["STOCHk_14_3_3"]
+    cols["stoch_d"] = stoch["STOCHd_14_3_3"]
+
+    cols[f"roc_{p.roc_length}"] = ta.roc(close, length=p.roc_length)
+    cols["atr"] = ta.atr(high, low, close, length=p.atr_length)
+
+    bbands = ta.bbands(close, length=p.bb_length, std=p.bb_std)
+    if bbands is not None and len(bbands.columns) >= 5:
+        # Reihenfolge: Lower, Middle, Upper, Bandwidth, %B
+        cols["bb_lower"] = bbands.iloc[:, 0]
+        cols["bb_middle"] = bbands.iloc[:, 1]
+        cols["bb_upper"] = bbands.iloc[:, 2]
+        cols["bb_percent_b"] = bbands.iloc[:, 4]
+    else:
+        print("Warning: Bollinger Bands calculation failed, using manual calculation.")
+        sma = close.rolling(window=p.bb_length).mean()
+        std = close.rolling(window=p.bb_length).std()
+        cols["bb_upper"] = sma + p.bb_std * std
+        cols["bb_middle"] = sma
+        cols["bb_lower"] = sma - p.bb_std * std
+        cols["bb_percent_b"] = (close - cols["bb_lower"]) / (cols["bb_upper"] - cols["bb_lower"])
+
+    w = p.window
+    cols["returns"] = close.pct_change()
+    cols[f"rolling_volatility_{w}"] = cols["returns"].rolling(window=w).std()
+    cols["hl_range"] = high - low
+    cols["hl_normalized_range"] = cols["hl_range"] / close
+
+    cols["volume_delta"] = volume.diff()
+    cols["volume_zscore"] = (volume - volume.rolling(window=w).mean()) / volume.rolling(window=w).std()
+    cols["obv"] = ta.obv(close, volume)
+    cols["volume_volatility_ratio"] = volume / cols[f"rolling_volatility_{w}"]
+
+    total_range = (high - low).replace(0, float("nan"))
+    body_top = np.maximum(out["open"], close)
+    body_bottom = np.minimum(out["open"], close)
+    cols["candle_body"] = (close - out["open"]).abs()
+    cols["candle_total_range"] = high - low
+    cols["candle_body_ratio"] = cols["candle_body"] / total_range
+    cols["upper_wick"] = high - body_top
+    cols["lower_wick"] = body_bottom - low
+    cols["upper_wick_ratio"] = cols["upper_wick"] / total_range
+    cols["lower_wick_ratio"] = cols["lower_wick"] / total_range
+
+    cols[f"price_zscore_{w}"] = (close - close.rolling(window=w).mean()) / close.rolling(window=w).std()
+    cols["hl2"] = (high + low) / 2
+    cols["hlc3"] = (high + low + close) / 3
+    for periods in p.return_periods:
+        cols[f"return_{periods}"] = close.pct_change(periods=periods)
+
+    return pd.concat([out, pd.DataFrame(cols, index=out.index)], axis=1)
+
+
+def fill_missing(df: pd.DataFrame, fill_value: float = 0.0) -> pd.DataFrame:
+    """STEP 2: NaN -> fill_value"""
+    nan_counts = df.isna().sum()
+    total = int(nan_counts.sum())
+    if total:
+        print(f"NaN filled with {fill_value}: {total} ({total / df.size * 100:.2f}%), "
+              f"{int((nan_counts > 0).sum())} columns")
+    return df.fillna(fill_value)
+
+
+def merge_external(df: pd.DataFrame, externals: dict, fill_value: float = 0.0, report_dir: Path | None = None) -> pd.DataFrame:
+    """
+    STEP 3: externals = {name: (frame with timestamp_iso, columns)} joined on the second (int64), forward filled
+    bars without an exact match are listed in report_dir/missing_timestamps_<name>.csv
+    """
+    key = timestamp_key(df["timestamp_iso"])
+    out = df.copy()
+    for name, (ext, columns) in externals.items():
+        ext_key = timestamp_key(ext["timestamp_iso"])
+        right = pd.DataFrame(ext[columns].to_numpy(), index=ext_key, columns=columns)
+        right = right[~right.index.duplicated(keep="last")]
+        merged = right.reindex(key)
+        missing = merged.isna().all(axis=1).to_numpy()
+        print(f"{name.upper()} - Timestamps NOT found: {int(missing.sum())} ({missing.mean() * 100:.2f}%)")
+        if report_dir is not None:
+            report = df.loc[missing, ["timestamp_iso"]].copy()
+            report["reason"] = f"Not found in {name.upper()} - will be forward filled"
+            report.to_csv(Path(report_dir) / f"missing_timestamps_{name}.csv", index=False)
+        out[columns] = merged.ffill().fillna(fill_value).to_numpy()
+    return out
+
+
+def add_targets(df: pd.DataFrame, horizons) -> pd.DataFrame:
+    """STEP 4: y_return_<name> (forward return) and y_classification_<name> (1=up, 0=down)"""
+    close = df["close"]
+    cols = {}
+    for name, periods in horizons:
+        ret = close.shift(-periods) / close - 1
+        cols[f"y_return_{name}"] = ret
+        cols[f"y_classification_{name}"] = (ret > 0).astype(int)
+    return pd.concat([df, pd.DataFrame(cols, index=df.index)], axis=1)
+
+
+def trim(df: pd.DataFrame, first_rows: int, last_rows: int) -> pd.DataFrame:
+    """STEP 5: drop indicator warm-up and rows without complete targets"""
+    end = len(df) - last_rows if last_rows else len(df)
+    return df.iloc[first_rows:end].reset_index(drop=True)
+
+
+# pipeline -------------------------------------------------------------------------
+
+def _read_fng(base_dir: Path) -> pd.DataFrame | None:
+    path = base_dir / FNG_SYMBOL / "FNG.csv"
+    if not path.exists():
+        return None
+    fng = pd.read_csv(path)
+    if "timestamp_iso" not in fng.columns:
+        fng = fng.rename(columns={[c for c in fng.columns if "timestamp" in c.lower()][0]: "timestamp_iso"})
+    return fng
+
+
+def build_symbol_features(symbol: str, params: FeatureParams = FeatureParams(), base_dir: Path = BASE_DATA_DIR,
+                          use_cache: bool = True, save_as_csv: bool = False) -> Path:
+    """all five stages for one symbol, returns the feature parquet"""
+    base_dir = Path(base_dir)
+    ohlcv_path = base_dir / symbol / "OHLCV.csv"
+    metrics_path = base_dir / symbol / "METRICS.csv"
+    fng_path = base_dir / FNG_SYMBOL / "FNG.csv"
+    out_dir = base_dir / "processed" / symbol
+    cache_dir = out_dir / "feature_cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    inputs = [_fingerprint(ohlcv_path)]
+    if params.merge_metrics:
+        inputs.append(_fingerprint(metrics_path))
+    if params.merge_fng:
+        inputs.append(_fingerprint(fng_path))
+    final_path = cache_dir / f"features_{_params_key(params, inputs)}.parquet"
+    output_path = out_dir / "OHLCV_features.parquet"
+
+    if use_cache and final_path.exists():
+        print(f"[{symbol}] Features aus Cache: {final_path.name}")
+        df = pd.read_parquet(final_path)
+    else:
+        indicators_path = cache_dir / f"indicators_{_params_key(params.indicators, inputs[:1])}.parquet"
+        if use_cache and indicators_path.exists():
+            df = pd.read_parquet(indicators_path)
+        else:
+            df = add_indicators(pd.read_csv(ohlcv_path), params.indicators)
+            df.to_parquet(indicators_path, index=False)
+
+        df = fill_missing(df, params.fill_value)
+        externals = {}
+        if params.merge_metrics and metrics_path.exists():
+            externals["metrics"] = (pd.read_csv(metrics_path), METRICS_COLUMNS)
+        if params.merge_fng:
+            fng = _read_fng(base_dir)
+            if fng is not None:
+                externals["fng"] = (fng, FNG_COLUMNS)
+        df = merge_external(df, externals, params.fill_value, report_dir=out_dir)
+        df = add_targets(df, params.horizons)
+        df = trim(df, params.first_rows, params.last_rows)
+        df.to_parquet(final_path, index=False)
+
+    df.to_parquet(output_path, index=False)
+    if save_as_csv:
+        df.to_csv(out_dir / "OHLCV_processed_5.csv", index=False)
+    print(f"[{symbol}] {len(df)} rows x {len(df.columns)} columns -> {output_path}")
+    return output_path
+
+
+def _build_symbol_task(args):
+    symbol, params, base_dir, use_cache, save_as_csv = args
+    try:
+        return symbol, build_symbol_features(symbol, params, base_dir, use_cache, save_as_csv)
+    except Exception as e:
+        print(f"[{symbol}] Fehler: {e}")
+        return symbol, {"error": str(e)}
+
+
+def build_features(symbols, params: FeatureParams = FeatureParams(), base_dir: Path = BASE_DATA_DIR,
+                   max_workers: int = 4, use_cache: bool = True, save_as_csv: bool = False) -> dict:
+    """features for many symbols in parallel processes: {symbol: parquet path or {"error": ...}}"""
+    tasks = [(s, params, Path(base_dir), use_cache, save_as_csv) for s in symbols]
+    if max_workers <= 1 or len(tasks) <= 1:
+        return dict(map(_build_symbol_task, tasks))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(_build_symbol_task, tasks))
+
+
+def available_symbols(base_dir: Path = BASE_DATA_DIR) -> list:
+    """every csv_data/<SYMBOL> with an OHLCV.csv"""
+    return sorted(p.parent.name for p in Path(base_dir).glob("*/OHLCV.csv"))
+
+
+if __name__ == "__main__":
+    SYMBOLS = ["ETHUSDT-PERP"]  # oder available_symbols()
+    results = build_features(SYMBOLS, FeatureParams(), max_workers=4, save_as_csv=True)
+    failed = {s: r for s, r in results.items() if isinstance(r, dict)}
+    print(f"{len(results) - len(failed)} Symbole fertig, {len(failed)} fehlgeschlagen {list(failed)}")
@@ -0,0 +1,199 @@
+# task_graph.py
+# dependency-aware executor for download stages: tasks per symbol/stage, bounded concurrency per data source,
+# retries and a json state file so an aborted refresh resumes with the unfinished tasks only
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Stages einer Quelle teilen sich cache/temp Ordner pro Datumsbereich -> standardmäßig eine Task pro Quelle gleichzeitig,
+# verschiedene Quellen laufen parallel
+DEFAULT_SOURCE_LIMIT = 1
+
+
+@dataclass
+class Task:
+    key: str
+    fn: Callable[[], Any]
+    source: str = "default"
+    deps: Tuple[str, ...] = ()
+    retries: int = 1
+
+
+@dataclass
+class TaskOutcome:
+    status: str  # done | failed | skipped
+    result: Any = None
+    attempts: int = 0
+    error: Optional[str] = None
+    seconds: float = 0.0
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+def _is_error(result: Any) -> bool:
+    # die Downloader fangen ihre Exceptions selbst und geben {"error": ...} zurück
+    return isinstance(result, dict) and "error" in result
+
+
+class TaskGraph:
+    def __init__(
+        self,
+        source_limits: Optional[Dict[str, int]] = None,
+        state_path: Optional[Path] = None,
+        resume: bool = True,
+        clear_state_on_success: bool = True,
+        retry_backoff: float = 5.0,
+        on_task_done: Optional[Callable[[str, TaskOutcome], None]] = None,
+    ):
+        self.source_limits = dict(source_limits or {})
+        self.state_path = Path(state_path) if state_path else None
+        self.resume = resume
+        # State nur solange etwas offen ist, sonst würde der nächste Refresh alles als erledigt überspringen
+        self.clear_state_on_success = clear_state_on_success
+        self.retry_backoff = retry_backoff
+        self.on_task_done = on_task_done
+        self.tasks: Dict[str, Task] = {}
+        self.outcomes: Dict[str, TaskOutcome] = {}
+        self._state_lock = threading.Lock()
+
+    def add(self, key: str, fn: Callable[[], Any], source: str = "default", deps=(), retries: int = 1) -> Task:
+        if key in self.tasks:
+            raise ValueError(f"Task '{key}' existiert bereits")
+        task = Task(key=key, fn=fn, source=source, deps=tuple(deps), retries=retries)
+        self.tasks[key] = task
+        return task
+
+    # state -----------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.resume or self.state_path is None or not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        if self.state_path is None:
+            return
+        with self._state_lock:
+            state = {
+                key: {"status": o.status, "result": o.result, "attempts": o.attempts, "error": o.error,
+                      "seconds": round(o.seconds, 3)}
+                for key, o in self.outcomes.items()
+            }
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=2, default=str), encoding="utf-8")
+            os.replace(tmp, self.state_path)
+
+    # execution -------------------------------------------------------------
+
+    def _validate(self) -> None:
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task '{task.key}' hängt von unbekannter Task '{dep}' ab")
+        # Zyklen: topologische Sortierung muss alle Tasks erreichen
+        indegree = {k: len(t.deps) for k, t in self.tasks.items()}
+        children: Dict[str, list] = {k: [] for k in self.tasks}
+        for task in self.tasks.values():
+            for dep in task.deps:
+                children[dep].append(task.key)
+        queue = [k for k, d in indegree.items() if d == 0]
+        seen = 0
+        while queue:
+            key = queue.pop()
+            seen += 1
+            for child in children[key]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        if seen != len(self.tasks):
+            raise ValueError("Task graph enthält einen Zyklus")
+
+    def _run_task(self, task: Task) -> TaskOutcome:
+        started = time.time()
+        error = None
+        for attempt in range(1, task.retries + 2):
+            try:
+                result = task.fn()
+                if not _is_error(result):
+                    return TaskOutcome("done", result, attempt, seconds=time.time() - started)
+                error = str(result["error"])
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+            if attempt <= task.retries:
+                print(f"[WARN] {task.key} fehlgeschlagen (Versuch {attempt}/{task.retries + 1}): {error}")
+                time.sleep(self.retry_backoff * attempt)
+        return TaskOutcome("failed", result, task.retries + 1, error=error, seconds=time.time() - started)
+
+    def _finish(self, key: str, outcome: TaskOutcome) -> None:
+        self.outcomes[key] = outcome
+        self._save_state()
+        if self.on_task_done is not None:
+            self.on_task_done(key, outcome)
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, TaskOutcome]:
+        """runs every task once its deps are done; tasks with a failed/skipped dep are skipped"""
+        self._validate()
+        previous = self._load_state()
+        for key, entry in previous.items():
+            if key in self.tasks and entry.get("status") == "done":
+                self.outcomes[key] = TaskOutcome("done", entry.get("result"), entry.get("attempts", 0),
+                                                 meta={"resumed": True})
+                print(f"[INFO] {key}: bereits erledigt (resume)")
+
+        pending = {k: t for k, t in self.tasks.items() if k not in self.outcomes}
+        running: Dict[Any, Task] = {}
+        busy: Dict[str, int] = {}
+        if max_workers is None:
+            sources = {t.source for t in pending.values()}
+            max_workers = max(1, sum(self.source_limits.get(s, DEFAULT_SOURCE_LIMIT) for s in sources))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                progressed = False
+                for key, task in list(pending.items()):
+                    dep_status = [self.outcomes[d].status if d in self.outcomes else None for d in task.deps]
+                    if any(s in ("failed", "skipped") for s in dep_status):
+                        del pending[key]
+                        self._finish(key, TaskOutcome("skipped", error="dependency failed"))
+                        progressed = True
+                        continue
+                    if any(s is None for s in dep_status):
+                        continue
+                    if busy.get(task.source, 0) >= self.source_limits.get(task.source, DEFAULT_SOURCE_LIMIT):
+                        continue
+                    del pending[key]
+                    busy[task.source] = busy.get(task.source, 0) + 1
+                    running[pool.submit(self._run_task, task)] = task
+                    progressed = True
+                if not running:
+                    if pending and not progressed:
+                        raise RuntimeError(f"Task graph blockiert: {sorted(pending)}")
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    busy[task.source] -= 1
+                    self._finish(task.key, future.result())
+
+        if (self.clear_state_on_success and self.state_path is not None and self.state_path.exists()
+                and all(o.status == "done" for o in self.outcomes.values())):
+            self.state_path.unlink()
+        return dict(self.outcomes)
+
+    def results(self) -> Dict[str, Any]:
+        """result per task (error dict for failed / skipped tasks, like the stage methods return)"""
+        out = {}
+        for key, outcome in self.outcomes.items():
+            if outcome.status == "done":
+                out[key] = outcome.result
+            else:
+                out[key] = {"error": outcome.error or outcome.status}
+        return out
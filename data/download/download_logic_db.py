@@ -3,44 +3,145 @@ from nautilus_trader.adapters.databento.loaders import DatabentoDataLoader
 from nautilus_trader.persistence.catalog.parquet import ParquetDataCatalog
 from nautilus_trader.model.identifiers import InstrumentId, Venue
 from nautilus_trader.model.instruments import FuturesContract
+import os
 import shutil
 import time
-import databento as db
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 
-def download_dbn(symbol, start_date, end_date, dataset, schema, api_key, raw_dir, stype_out="instrument_id"):
-    raw_dir = Path(raw_dir)
-    raw_dir.mkdir(parents=True, exist_ok=True)
-    
-    client = db.Historical(api_key)
+class DatabentoJobManager:
+    """
+    submits many Databento batch jobs at once, polls them together (one list_jobs call per round, backoff while
+    nothing finishes) and downloads each job in a thread pool as soon as it is done
+    client only needs .batch.submit_job / .batch.list_jobs / .batch.download -> a local fake batch API can be passed in
+    """
+
+    def __init__(self, api_key=None, client=None, poll_interval=1.0, max_poll_interval=30.0, backoff=1.5,
+                 timeout=None, max_download_workers=4):
+        if client is None:
+            import databento as db  # nur für den echten Client nötig
+            client = db.Historical(api_key)
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_download_workers = max_download_workers
+        self.jobs = {}  # job_id -> {"label", "raw_dir"}
+        self.failed = {}
+
+    def submit(self, symbol, start_date, end_date, dataset, schema, raw_dir, stype_out="instrument_id"):
+        raw_dir = Path(raw_dir)
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        job = self.client.batch.submit_job(
+            dataset=dataset,
+            start=start_date,
+            end=end_date,
+            symbols=symbol,
+            schema=schema,
+            split_duration="month",
+            stype_in="raw_symbol",
+            stype_out=stype_out,
+        )
+        label = f"{symbol} {schema}"
+        self.jobs[job["id"]] = {"label": label, "raw_dir": raw_dir}
+        print(f"[INFO] Job submitted: {label} -> {job['id']}")
+        return job["id"]
+
+    def _download(self, job_id):
+        job = self.jobs[job_id]
+        files = self.client.batch.download(job_id=job_id, output_dir=job["raw_dir"])
+        print(f"[INFO] {job['label']}: {len(files)} Dateien heruntergeladen")
+        return files
+
+    def run(self, on_downloaded=None):
+        """waits for all submitted jobs, returns {job_id: files}; on_downloaded(job_id, files) is called per finished download"""
+        pending = set(self.jobs)
+        results = {}
+        self.failed = {}
+        interval = self.poll_interval
+        started = time.monotonic()
+
+        def _collect(future, job_id):
+            try:
+                results[job_id] = future.result()
+                if on_downloaded is not None:
+                    on_downloaded(job_id, results[job_id])
+            except Exception as e:
+                self.failed[job_id] = str(e)
+                print(f"[ERROR] Download {self.jobs[job_id]['label']} ({job_id}) fehlgeschlagen: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_download_workers) as pool:
+            downloads = {}
+            while pending:
+                states = {j["id"]: j.get("state", "done") for j in self.client.batch.list_jobs("done,expired")}
+                finished = [job_id for job_id in pending if job_id in states]
+                for job_id in finished:
+                    pending.discard(job_id)
+                    if states[job_id] == "expired":
+                        self.failed[job_id] = "expired"
+                        print(f"[WARNING] Job {self.jobs[job_id]['label']} ({job_id}) expired")
+                        continue
+                    downloads[pool.submit(self._download, job_id)] = job_id
+
+                # fertige Downloads schon während des Pollens weiterreichen
+                for future in [f for f in downloads if f.done()]:
+                    _collect(future, downloads.pop(future))
+
+                if not pending:
+                    break
+                if self.timeout is not None and time.monotonic() - started > self.timeout:
+                    for job_id in pending:
+                        self.failed[job_id] = "timeout"
+                    print(f"[WARNING] Timeout: {len(pending)} Jobs nicht fertig")
+                    break
+                # backoff solange nichts fertig wird, sonst wieder schnell pollen
+                interval = self.poll_interval if finished else min(interval * self.backoff, self.max_poll_interval)
+                time.sleep(interval)
+
+            for future in as_completed(list(downloads)):
+                _collect(future, downloads[future])
+        return results
+
+
+def download_dbn(symbol, start_date, end_date, dataset, schema, api_key, raw_dir, stype_out="instrument_id", client=None):
     print(f"[INFO] Download {schema} für {symbol}")
-    
-    job = client.batch.submit_job(
-        dataset=dataset,
-        start=start_date,
-        end=end_date,
-        symbols=symbol,
-        schema=schema,
-        split_duration="month",
-        stype_in="raw_symbol",
-        stype_out=stype_out,
-    )
-    
-    print(f"[INFO] Job ID: {job['id']}")
-    
-    while True:
-        done_jobs = [j["id"] for j in client.batch.list_jobs("done")]
-        if job["id"] in done_jobs:
-            break
-        time.sleep(1.0)
-    
-    files = client.batch.download(job_id=job["id"], output_dir=raw_dir)
-    print(f"[INFO] {len(files)} Dateien heruntergeladen")
+    manager = DatabentoJobManager(api_key=api_key, client=client)
+    job_id = manager.submit(symbol, start_date, end_date, dataset, schema, raw_dir, stype_out=stype_out)
+    files = manager.run().get(job_id, [])
     print(files)
     return files
 
 
-def transform_dbn_to_parquet(symbol, raw_dir, catalog_root_path, venue="GLBX", delete_raw_dir=True, flat_structure=False):
+def download_dbn_many(requests, api_key, client=None, **manager_kwargs):
+    """
+    requests: list of dicts with symbol, start_date, end_date, dataset, schema, raw_dir (optional stype_out)
+    all jobs are submitted up front and polled together, returns {job_id: files}
+    """
+    manager = DatabentoJobManager(api_key=api_key, client=client, **manager_kwargs)
+    for req in requests:
+        manager.submit(**req)
+    return manager.run()
+
+
+def _transform_dbn_file(data_file, catalog_path):
+    """process pool worker: decodes one DBN file and writes it into the catalog (month splits -> disjoint files)"""
+    try:
+        loader = DatabentoDataLoader()
+        data = loader.from_dbn_file(
+            path=str(data_file),
+            instrument_id=None,
+            as_legacy_cython=True,
+            use_exchange_as_venue=False,
+        )
+        if data:
+            ParquetDataCatalog(path=catalog_path).write_data(data)
+        return Path(data_file).name, len(data) if data else 0, None
+    except Exception as e:
+        return Path(data_file).name, 0, str(e)
+
+
+def transform_dbn_to_parquet(symbol, raw_dir, catalog_root_path, venue="GLBX", delete_raw_dir=True, flat_structure=False, max_workers=None):
     raw_dir = Path(raw_dir)
     
     if flat_structure:
@@ -55,29 +156,23 @@ def transform_dbn_to_parquet(symbol, raw_dir, catalog_root_path, venue="GLBX", d
         print("[WARNING] Keine DBN-Dateien gefunden")
         return
     
-    loader = DatabentoDataLoader()
-    catalog = ParquetDataCatalog(path=organized_path)
-    
     print(f"[INFO] Transformiere {len(files)} DBN-Dateien...")
     print(f"[INFO] Speichere in: {organized_path}")
     print(f"[INFO] Target venue: {venue}")
-    
-    for data_file in files:
-        try:
-            data = loader.from_dbn_file(
-                path=str(data_file),
-                instrument_id=None,
-                as_legacy_cython=True,
-                use_exchange_as_venue=False,
-            )
-            
-            if data:
-                catalog.write_data(data)
-                print(f"  ✓ {data_file.name}: {len(data)} Objekte")
-                
-        except Exception as e:
-            print(f"  ✗ {data_file.name}: {e}")
-            continue
+
+    workers = max_workers or min(len(files), os.cpu_count() or 1)
+    if workers <= 1:
+        outcomes = [_transform_dbn_file(str(f), str(organized_path)) for f in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_transform_dbn_file, str(f), str(organized_path)) for f in files]
+            outcomes = [future.result() for future in as_completed(futures)]
+
+    for name, count, error in outcomes:
+        if error:
+            print(f"  ✗ {name}: {error}")
+        elif count:
+            print(f"  ✓ {name}: {count} Objekte")
     
     if delete_raw_dir and raw_dir.exists():
         shutil.rmtree(raw_dir)
@@ -1,23 +1,261 @@
 # JUHUU RAPHAEL GOAT
 import asyncio
 import datetime
-from nautilus_trader.adapters.interactive_brokers.common import IBContract
-from nautilus_trader.adapters.interactive_brokers.historical.client import HistoricInteractiveBrokersClient
+import json
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 from nautilus_trader.persistence.catalog import ParquetDataCatalog
 
-async def download__ib_historical_data():
-    client = HistoricInteractiveBrokersClient(
-        host="127.0.0.1",
-        port=4002,
-        client_id=1,
-        log_level="INFO"
-    )
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parents[1] / "DATA_STORAGE" / "data_catalog_wrangled"
+COVERAGE_FILE = "ib_coverage.json"
+
+
+class IBPacingLimiter:
+    """
+    IB historical data pacing: max `max_requests` per `window` seconds and at least `min_spacing` seconds between
+    requests (the gateway answers pacing violations with errors instead of queueing)
+    """
+
+    def __init__(self, max_requests=60, window=600.0, min_spacing=0.5):
+        self.max_requests = max_requests
+        self.window = window
+        self.min_spacing = min_spacing
+        self._sent = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.window:
+                    self._sent.popleft()
+                wait = 0.0
+                if len(self._sent) >= self.max_requests:
+                    wait = self.window - (now - self._sent[0])
+                if self._sent:
+                    wait = max(wait, self.min_spacing - (now - self._sent[-1]))
+                if wait <= 0:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(wait)
+
+
+# coverage index -----------------------------------------------------------------
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(start, end, covered):
+    """parts of [start, end) not covered by the (merged) intervals"""
+    missing = []
+    cursor = start
+    for cov_start, cov_end in _merge_intervals(covered):
+        if cov_end <= cursor or cov_start >= end:
+            continue
+        if cov_start > cursor:
+            missing.append((cursor, min(cov_start, end)))
+        cursor = max(cursor, cov_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class CoverageIndex:
+    """persisted covered time ranges per contract/bar spec (json next to the catalog)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._data = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+
+    def covered(self, key):
+        return [(datetime.datetime.fromisoformat(s), datetime.datetime.fromisoformat(e)) for s, e in self._data.get(key, [])]
+
+    def add(self, key, start, end):
+        intervals = _merge_intervals(self.covered(key) + [(start, end)])
+        self._data[key] = [[s.isoformat(), e.isoformat()] for s, e in intervals]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def month_chunks(start, end):
+    """[start, end) split at month boundaries (16:30, wie bisher)"""
+    chunks = []
+    current = start
+    while current < end:
+        if current.month == 12:
+            next_month = current.replace(year=current.year + 1, month=1, day=1, hour=16, minute=30)
+        else:
+            next_month = current.replace(month=current.month + 1, day=1, hour=16, minute=30)
+        chunk_end = min(next_month, end)
+        chunks.append((current, chunk_end))
+        current = chunk_end
+    return chunks
+
+
+def dedup_bars(bars, start_ns, end_ns):
+    """sorted unique bars (per bar type and ts_event) with start_ns <= ts_event < end_ns, vectorized over the chunk results"""
+    if not bars:
+        return []
+    ts = np.fromiter((b.ts_event for b in bars), dtype=np.int64, count=len(bars))
+    keys = pd.DataFrame({"bar_type": [str(b.bar_type) for b in bars], "ts": ts})
+    keep = (ts >= start_ns) & (ts < end_ns) & ~keys.duplicated(keep="first").to_numpy()
+    idx = np.flatnonzero(keep)
+    idx = idx[np.argsort(ts[idx], kind="stable")]
+    return [bars[i] for i in idx]
+
+
+def write_outside_existing(catalog, bars):
+    """
+    writes bars without touching existing catalog files: bars inside existing file intervals (ts_init) are dropped,
+    the rest is written per gap between existing files so the catalog intervals stay disjoint
+    """
+    from nautilus_trader.model.data import Bar
+    written = 0
+    by_type = {}
+    for bar in bars:
+        by_type.setdefault(str(bar.bar_type), []).append(bar)
+    for bar_type, group in by_type.items():
+        ts = np.fromiter((b.ts_init for b in group), dtype=np.int64, count=len(group))
+        try:
+            intervals = sorted(catalog.get_intervals(Bar, bar_type))
+        except Exception:
+            intervals = []
+        if intervals:
+            starts = np.array([iv[0] for iv in intervals], dtype=np.int64)
+            ends = np.array([iv[1] for iv in intervals], dtype=np.int64)
+            pos = np.searchsorted(starts, ts, side="right") - 1
+            inside = (pos >= 0) & (ts <= ends[np.clip(pos, 0, None)])
+        else:
+            pos = np.zeros(len(group), dtype=np.int64)
+            inside = np.zeros(len(group), dtype=bool)
+        for segment in np.unique(pos[~inside]):
+            idx = np.flatnonzero((pos == segment) & ~inside)
+            catalog.write_data([group[i] for i in idx])
+            written += len(idx)
+    return written
+
+
+def _to_ns(dt, tz_name):
+    return pd.Timestamp(dt).tz_localize(tz_name).value
+
+
+def _now_local(tz_name):
+    """current wall time in tz_name (naive, wie start/end der Downloads)"""
+    return pd.Timestamp.now(tz=tz_name).tz_localize(None).to_pydatetime()
+
+
+async def download_contract_bars(client, contract, catalog, coverage, start_date, end_date, bar_spec, tz_name,
+                                 limiter, max_concurrent=6, block_months=12, use_rth=False):
+    """
+    downloads only the ranges of [start_date, end_date) missing in the coverage index
+    month chunks run concurrently (pacing limiter), every block of `block_months` is deduped and written
+    coverage: only chunks that returned bars, or returned nothing while a later chunk of the gap had bars
+    (confirmed empty, z. B. vor dem Listing), capped at now; failed chunks stay missing for the next run
+    """
+    key = f"{contract.symbol}.{contract.exchange}-{bar_spec}"
+    gaps = missing_ranges(start_date, end_date, coverage.covered(key))
+    if not gaps:
+        print(f"[{key}] bereits vollständig im Katalog.")
+        return 0
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _request(chunk_start, chunk_end):
+        async with semaphore:
+            await limiter.acquire()
+            return await client.request_bars(
+                bar_specifications=[bar_spec],
+                start_date_time=chunk_start,
+                end_date_time=chunk_end,
+                tz_name=tz_name,
+                contracts=[contract],
+                use_rth=use_rth,
+            )
+
+    written = 0
+    for gap_start, gap_end in gaps:
+        print(f"[{key}] Lücke {gap_start} -> {gap_end}")
+        chunks = month_chunks(gap_start, gap_end)
+        unconfirmed = []  # leere Chunks, abgedeckt erst wenn ein späterer Chunk Bars liefert
+        for i in range(0, len(chunks), block_months):
+            block = chunks[i:i + block_months]
+            block_start, block_end = block[0][0], block[-1][1]
+            results = await asyncio.gather(*(_request(s, e) for s, e in block), return_exceptions=True)
+            bars, filled = [], []
+            for (chunk_start, chunk_end), chunk in zip(block, results):
+                if isinstance(chunk, BaseException) or chunk is None:
+                    print(f"[WARN] [{key}] Chunk {chunk_start:%Y-%m-%d} -> {chunk_end:%Y-%m-%d} fehlgeschlagen: {chunk!r}")
+                    unconfirmed = []  # über einen Fehler hinweg nichts als leer bestätigen
+                    continue
+                in_chunk = dedup_bars(list(chunk), _to_ns(chunk_start, tz_name), _to_ns(chunk_end, tz_name))
+                if in_chunk:
+                    bars += in_chunk
+                    filled += unconfirmed + [(chunk_start, chunk_end)]
+                    unconfirmed = []
+                else:
+                    unconfirmed.append((chunk_start, chunk_end))
+            bars = dedup_bars(bars, _to_ns(block_start, tz_name), _to_ns(block_end, tz_name))
+            stored = write_outside_existing(catalog, bars) if bars else 0
+            if stored:
+                written += stored
+                print(f"[{key}] {stored} Bars gespeichert {block_start:%Y-%m} bis {block_end:%Y-%m}.")
+            else:
+                print(f"[{key}] Keine Bars {block_start:%Y-%m} bis {block_end:%Y-%m}.")
+            # erst nach dem Schreiben als abgedeckt markieren -> Abbruch lädt den Block erneut
+            now = _now_local(tz_name)
+            for chunk_start, chunk_end in filled:
+                if chunk_start < now:
+                    coverage.add(key, chunk_start, min(chunk_end, now))
+        if unconfirmed:
+            print(f"[{key}] {len(unconfirmed)} leere Chunks am Ende der Lücke nicht als abgedeckt markiert.")
+    return written
+
+
+async def download__ib_historical_data(
+    contracts=None,
+    start_date=datetime.datetime(2010, 1, 1, 9, 30),
+    end_date=datetime.datetime(2025, 9, 1, 16, 30),
+    bar_spec="15-MINUTE-LAST",
+    tz_name="America/New_York",
+    catalog_path=DEFAULT_CATALOG_PATH,
+    client=None,
+    host="127.0.0.1",
+    port=4002,
+    client_id=1,
+    max_concurrent=6,
+    limiter=None,
+):
+    if client is None:
+        from nautilus_trader.adapters.interactive_brokers.historical.client import HistoricInteractiveBrokersClient
+        client = HistoricInteractiveBrokersClient(
+            host=host,
+            port=port,
+            client_id=client_id,
+            log_level="INFO"
+        )
     await client.connect()
     await asyncio.sleep(2)
 
-    contracts = [IBContract(secType="STK", symbol="SPY", exchange="ARCA", primaryExchange="ARCA")]
+    if contracts is None:
+        from nautilus_trader.adapters.interactive_brokers.common import IBContract
+        contracts = [IBContract(secType="STK", symbol="SPY", exchange="ARCA", primaryExchange="ARCA")]
     instruments = await client.request_instruments(contracts=contracts)
-    catalog = ParquetDataCatalog("C:/Users/Ferdi/Desktop/projectx/AlgorithmicTrader/data/DATA_STORAGE/data_catalog_wrangled")
+    catalog = ParquetDataCatalog(str(catalog_path))
     try:
         existing_instruments = catalog.read_instruments()
     except Exception:
@@ -25,42 +263,14 @@ async def download__ib_historical_data():
     if not existing_instruments:
         catalog.write_data(instruments)
 
-    start_date = datetime.datetime(2010, 1, 1, 9, 30)
-    end_date = datetime.datetime(2025, 9, 1, 16, 30)
-    bar_spec = "15-MINUTE-LAST"
-    tz_name = "America/New_York"
-    current = start_date
-    last_bar_ts = None
-
-    while current < end_date:
-        month_start = current
-        if current.month == 12:
-            next_month = current.replace(year=current.year+1, month=1, day=1, hour=16, minute=30)
-        else:
-            next_month = current.replace(month=current.month+1, day=1, hour=16, minute=30)
-        month_end = min(next_month, end_date)
-
-        bars = await client.request_bars(
-            bar_specifications=[bar_spec],
-            start_date_time=month_start,
-            end_date_time=month_end,
-            tz_name=tz_name,
-            contracts=contracts,
-            use_rth=False,
+    coverage = CoverageIndex(Path(catalog_path) / COVERAGE_FILE)
+    limiter = limiter or IBPacingLimiter()
+    total = 0
+    for contract in contracts:
+        total += await download_contract_bars(
+            client, contract, catalog, coverage, start_date, end_date, bar_spec, tz_name,
+            limiter=limiter, max_concurrent=max_concurrent,
         )
 
-        # Filter: Nur Bars mit ts_event > last_bar_ts
-        if bars:
-            if last_bar_ts is not None:
-                bars = [bar for bar in bars if bar.ts_event > last_bar_ts]
-            if bars:
-                last_bar_ts = bars[-1].ts_event
-                catalog.write_data(bars)
-                print(f"{len(bars)} Bars gespeichert bis {month_end}.")
-            else:
-                print(f"Keine neuen Bars im Monat {month_start.strftime('%Y-%m')}.")
-        else:
-            print(f"Keine Bars im Monat {month_start.strftime('%Y-%m')}.")
-        current = month_end
-
-    print("Download und Speicherung abgeschlossen.")
\ No newline at end of file
+    print(f"Download und Speicherung abgeschlossen ({total} neue Bars).")
+    return total
@@ -1,10 +1,7 @@
 import os
-import time
-import requests
 import pandas as pd
-import threading
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
 from nautilus_trader.adapters.bybit import BYBIT, BybitDataClientConfig, BybitExecClientConfig
@@ -16,6 +13,7 @@ from nautilus_trader.model.identifiers import InstrumentId, TraderId
 from nautilus_trader.portfolio.config import PortfolioConfig
 from nautilus_trader.trading.config import ImportableStrategyConfig
 from strategies.coin_listing_short_strategy import CoinListingShortStrategy, CoinListingShortConfig
+from data.download.crypto_downloads.custom_class.listing_feed import DELISTED, LISTED, LISTING_TOPIC, get_listing_feed
 
 load_dotenv()
 
@@ -32,123 +30,52 @@ class AutoDiscoveryLiveTrader:
         if not api_key or not api_secret:
             raise ValueError("BYBIT_TESTNET_API_KEY and BYBIT_TESTNET_API_SECRET required")
         
-        self.known_symbols = self._initialize_known_symbols()
+        # listing feed: diff der instruments-info Liste + append-only Event Log, hier nur Änderungen abonnieren
+        self.feed = get_listing_feed("BYBIT", "linear")
+        self.feed.subscribe(self._on_listing_event, kinds=(LISTED, DELISTED))
+        self.strategy = None
+        self.loop = None
+        self.new_listings = []
+        self._initialize_feed()
         print(f"Auto-Discovery Live | Interval: {check_interval}s | Max: {max_coins} | Days: {days_back}")
     
-    def _initialize_known_symbols(self):
-        current_perpetuals = self._get_bybit_perpetuals()
-        
-        if not self.csv_path.exists() and current_perpetuals:
-            self._create_initial_csv(current_perpetuals)
-        
-        if current_perpetuals:
-            return {p['symbol'] for p in current_perpetuals}
-        return set()
-    
-    def _create_initial_csv(self, perpetuals):
-        df = pd.DataFrame(perpetuals)
-        df = df.rename(columns={'launchTime': 'onboardDate'})
-        
-        df['onboardDate'] = df['onboardDate'].apply(
-            lambda x: datetime.fromtimestamp(int(x) / 1000) 
-            if int(x) > 0 else datetime.now()
-        )
-        
-        cutoff_date = datetime.now() - timedelta(days=self.days_back)
-        df = df[df['onboardDate'] >= cutoff_date]
-        
-        df['onboardDate'] = df['onboardDate'].dt.strftime("%Y-%m-%d %H:%M:%S")
-        df = df.sort_values('onboardDate', ascending=False)
-        df.to_csv(self.csv_path, index=False)
-        print(f"Created initial CSV with {len(df)} instruments from last {self.days_back} days")
-    
-    def _get_bybit_perpetuals(self):
+    def _initialize_feed(self):
         try:
-            resp = requests.get(
-                "https://api.bybit.com/v5/market/instruments-info",
-                params={"category": "linear", "status": "Trading", "limit": 1000},
-                timeout=10
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if data['retCode'] != 0:
-                return []
-            
-            perpetuals = []
-            for inst in data['result']['list']:
-                if inst['symbol'].endswith('USDT') and inst['contractType'] == 'LinearPerpetual':
-                    perpetuals.append({
-                        'symbol': inst['symbol'],
-                        'launchTime': inst.get('launchTime', '0'),
-                        'status': inst.get('status', 'Trading')
-                    })
-            return perpetuals
-        except Exception:
-            return []
+            self.feed.poll()
+        except Exception as e:
+            print(f"Listing feed init failed: {e}")
+        if not self.csv_path.exists():
+            self._export_csv()
     
-    def _detect_new_listings(self):
-        current_perpetuals = self._get_bybit_perpetuals()
-        if not current_perpetuals:
-            return []
-        
-        current_symbols = {p['symbol'] for p in current_perpetuals}
-        new_symbols = current_symbols - self.known_symbols
-        
-        if not new_symbols:
-            return []
-        
-        new_listings = []
-        for perp in current_perpetuals:
-            if perp['symbol'] in new_symbols:
-                launch_ts = int(perp['launchTime'])
-                onboard_date = datetime.fromtimestamp(launch_ts / 1000) if launch_ts > 0 else datetime.now()
-                new_listings.append({
-                    'symbol': perp['symbol'],
-                    'onboardDate': onboard_date.strftime("%Y-%m-%d %H:%M:%S"),
-                    'status': perp['status']
-                })
-        
-        if new_listings:
-            self._update_csv(new_listings)
-            self.known_symbols.update(new_symbols)
-            print(f"NEW: {', '.join([listing['symbol'] for listing in new_listings])}")
-        
-        return new_listings
+    def _recent_listings(self, days):
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+        rows = self.feed.listings(start=cutoff, only_usdt=True, include_delisted=False)
+        return sorted(rows, key=lambda r: r["onboard_ms"], reverse=True)
     
-    def _update_csv(self, new_listings):
-        new_df = pd.DataFrame(new_listings)
-        
-        if self.csv_path.exists():
-            existing_df = pd.read_csv(self.csv_path)
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
+    def _export_csv(self):
+        # CSV für die Strategien (bybit_live_linear_perpetual_futures.csv), nur bei Änderungen neu geschrieben
+        rows = [{"symbol": r["symbol"], "onboardDate": r["onboard"], "status": "Trading"} for r in self._recent_listings(50)]
+        pd.DataFrame(rows, columns=["symbol", "onboardDate", "status"]).to_csv(self.csv_path, index=False)
+        print(f"Listing CSV updated with {len(rows)} instruments from last 50 days")
+    
+    def _on_listing_event(self, event):
+        if not event["symbol"].endswith("USDT"):
+            return
+        if event["event"] == LISTED:
+            self.new_listings.append(event)
+            print(f"NEW: {event['symbol']} (onboard {event['onboard']})")
         else:
-            combined_df = new_df
-        
-        combined_df['onboardDate'] = pd.to_datetime(combined_df['onboardDate'])
-        
-        cutoff_date = datetime.now() - timedelta(days=50)
-        combined_df = combined_df[combined_df['onboardDate'] >= cutoff_date]
-        
-        combined_df = combined_df.sort_values('onboardDate', ascending=False)
-        combined_df['onboardDate'] = combined_df['onboardDate'].dt.strftime("%Y-%m-%d %H:%M:%S")
-        combined_df.to_csv(self.csv_path, index=False)
+            print(f"DELISTED: {event['symbol']}")
+        self._export_csv()
+        # feed läuft im eigenen Thread -> Event über den Message Bus im Event Loop des Nodes zustellen
+        if self.strategy is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(
+                self.strategy.msgbus.publish, f"{LISTING_TOPIC}.{self.feed.exchange}", event, False,
+            )
     
     def _load_recent_listings(self):
-        if not self.csv_path.exists():
-            return []
-        
-        df = pd.read_csv(self.csv_path)
-        
-        df['onboardDate'] = pd.to_datetime(df['onboardDate'])
-        
-        cutoff_date = datetime.now() - timedelta(days=self.days_back)
-        recent_df = df[df['onboardDate'] >= cutoff_date]
-        
-        recent_df = recent_df.sort_values('onboardDate', ascending=False).head(self.max_coins)
-        
         instruments = []
-        for _, row in recent_df.iterrows():
+        for row in self._recent_listings(self.days_back)[:self.max_coins]:
             symbol = row['symbol']
             instruments.append({
                 "instrument_id": f"{symbol}-LINEAR.BYBIT",
@@ -253,28 +180,21 @@ class AutoDiscoveryLiveTrader:
         strategy = CoinListingShortStrategy(config=config)
         
         node.trader.add_strategy(strategy)
+        self.strategy = strategy
         node.add_data_client_factory(BYBIT, BybitLiveDataClientFactory)
         node.add_exec_client_factory(BYBIT, BybitLiveExecClientFactory)
         node.build()
+        self.loop = node.get_event_loop()
         
         return node
     
-    def _monitor_loop(self):
-        while True:
-            try:
-                self._detect_new_listings()
-                time.sleep(self.check_interval)
-            except Exception as e:
-                print(f"Monitor error: {e}")
-                time.sleep(60)
-    
     def run(self):
         instruments = self._load_recent_listings()
         
         if not instruments:
             instruments = [{"instrument_id": "ETHUSDT-LINEAR.BYBIT", "bar_types": ["ETHUSDT-LINEAR.BYBIT-15-MINUTE-LAST-EXTERNAL"], "trade_size_usdt": "50"}]
         
-        threading.Thread(target=self._monitor_loop, daemon=True).start()
+        self.feed.start(self.check_interval)
         
         node = self._create_node(instruments)
         
@@ -283,6 +203,7 @@ class AutoDiscoveryLiveTrader:
         except KeyboardInterrupt:
             pass
         finally:
+            self.feed.stop()
             node.dispose()
 
 if __name__ == "__main__":
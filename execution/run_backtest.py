@@ -6,6 +6,8 @@ from nautilus_trader.model.identifiers import InstrumentId, Symbol, Venue
 from nautilus_trader.backtest.config import BacktestDataConfig, BacktestVenueConfig, BacktestEngineConfig, BacktestRunConfig
 from nautilus_trader.trading.config import ImportableStrategyConfig
 from tools.help_funcs.help_funcs_execution import (_clear_directory, run_backtest, extract_metrics, load_qs, add_trade_metrics, build_data_configs)
+from tools.help_funcs.results_ledger import ResultsLedger
+from tools.help_funcs.run_cache import RunCache, code_fingerprint, data_fingerprint, run_cache_key, strategy_input_files
 from tools.help_funcs.yaml_loader import load_and_split_params, set_nested_parameter
 import shutil
 import yaml
@@ -14,112 +16,155 @@ from glob import glob
 import os
 import webbrowser
 from core.visualizing.dashboard.main import launch_dashbaord
-
-#STRAT PARAMETER
-
-yaml_name = "short_tha_bich.yaml"
-
-yaml_path = str(Path(__file__).resolve().parents[1] / "config" / yaml_name)
-params, param_grid, keys, values, static_params, all_instrument_ids, all_bar_types, data_sources_normalized = load_and_split_params(yaml_path)
-
-strategy_path = params["strategy_path"]
-config_path = params["config_path"]
-start_date = params["start_date"]
-end_date = params["end_date"]
-venue = params["venue"]
-visualize = params.get("visualize", True)
-load_qs_flag = params.get("load_qs", False)  # renamed to avoid clash with function
-bench_qs = params.get("qs_bench")
-
-catalog_path = str(Path(__file__).resolve().parents[1] / "data" / "DATA_STORAGE" / "data_catalog_wrangled")
-
-# Datenquellen aus YAML bauen (fallback auf Standard-Bar wenn nicht angegeben)
-data_configs = build_data_configs(
-    data_sources_normalized=data_sources_normalized,
-    all_instrument_ids=all_instrument_ids,
-    all_bar_types=all_bar_types,
-    catalog_path=catalog_path,
-)
-
-from nautilus_trader.backtest.config import ImportableFillModelConfig
-
-venue_config = BacktestVenueConfig(
-    name=str(venue),
-    oms_type=params.get("oms_type", "NETTING"),
-    account_type=params.get("account_type", "MARGIN"),
-    base_currency=params.get("base_currency", "USDT"),
-    starting_balances=[params.get("starting_account_balance", "100000 USDT")],
-    bar_adaptive_high_low_ordering=True,
-)
-
-results_dir = Path(__file__).resolve().parents[1] / "data" / "DATA_STORAGE" / "results"
-results_dir.mkdir(parents=True, exist_ok=True)
-_clear_directory(results_dir)
-
-run_configs = []
-run_ids = []
-run_params_list = []
-run_dirs = []
-
-for i, combination in enumerate(itertools.product(*values)):
-    run_id = f"run{i}"
-    run_dir = results_dir / run_id
-    run_dir.mkdir(parents=True, exist_ok=True)
-
-    run_params = dict(zip(keys, combination))
-    config_params = copy.deepcopy(static_params)
-    
-    for param_key, param_value in run_params.items():
-        if "." in param_key:
-            set_nested_parameter(config_params, param_key, param_value)
-        else:
-            config_params[param_key] = param_value
-    
-    config_params["run_id"] = run_id
-
-    strategy_config = ImportableStrategyConfig(
-        strategy_path=strategy_path,
-        config_path=config_path,
-        config=config_params,
+from core.visualizing.dashboard.slide_menu import RunValidator
+from core.visualizing.dashboard.param_analysis.service import ParameterAnalysisService
+from core.visualizing.dashboard.param_analysis.cube import CUBE_DIR_NAME
+
+def main():
+    #STRAT PARAMETER
+
+    yaml_name = "short_tha_bich.yaml"
+
+    yaml_path = str(Path(__file__).resolve().parents[1] / "config" / yaml_name)
+    params, param_grid, keys, values, static_params, all_instrument_ids, all_bar_types, data_sources_normalized = load_and_split_params(yaml_path)
+
+    strategy_path = params["strategy_path"]
+    config_path = params["config_path"]
+    start_date = params["start_date"]
+    end_date = params["end_date"]
+    venue = params["venue"]
+    visualize = params.get("visualize", True)
+    load_qs_flag = params.get("load_qs", False)  # renamed to avoid clash with function
+    reuse_cached_runs = params.get("reuse_cached_runs", True)
+    bench_qs = params.get("qs_bench")
+
+    catalog_path = str(Path(__file__).resolve().parents[1] / "data" / "DATA_STORAGE" / "data_catalog_wrangled")
+
+    # Datenquellen aus YAML bauen (fallback auf Standard-Bar wenn nicht angegeben)
+    data_configs = build_data_configs(
+        data_sources_normalized=data_sources_normalized,
+        all_instrument_ids=all_instrument_ids,
+        all_bar_types=all_bar_types,
+        catalog_path=catalog_path,
     )
-    engine_config = BacktestEngineConfig(strategies=[strategy_config])
-    run_config = BacktestRunConfig(
-        data=data_configs,
-        venues=[venue_config],
-        engine=engine_config,
-        start=start_date,
-        end=end_date,
+
+    from nautilus_trader.backtest.config import ImportableFillModelConfig
+
+    venue_config = BacktestVenueConfig(
+        name=str(venue),
+        oms_type=params.get("oms_type", "NETTING"),
+        account_type=params.get("account_type", "MARGIN"),
+        base_currency=params.get("base_currency", "USDT"),
+        starting_balances=[params.get("starting_account_balance", "100000 USDT")],
+        bar_adaptive_high_low_ordering=True,
     )
 
-    run_config_dict = copy.deepcopy(params)
-    run_config_dict.update(run_params)
-    run_config_dict.update(static_params)
-    run_config_dict["run_id"] = run_id
-    with open(run_dir / "run_config.yaml", "w", encoding="utf-8") as f:
-        yaml.dump(run_config_dict, f, allow_unicode=True, sort_keys=False)
-
-    run_configs.append(run_config)
-    run_ids.append(run_id)
-    run_params_list.append(run_params)
-    run_dirs.append(run_dir)
-
-results = run_backtest(run_configs)
-
-all_metrics = []
-for result, run_id, run_params, run_dir in zip(results, run_ids, run_params_list, run_dirs):
-    metrics = extract_metrics(result, run_params, run_id)
-    pd.DataFrame([metrics]).to_csv(run_dir / "performance_metrics.csv", index=False)
-    all_metrics.append(metrics)
-
-df_all = pd.DataFrame(all_metrics)
-file_path = results_dir / "all_backtest_results.csv"
-df_all.to_csv(file_path, index=False)
-add_trade_metrics(run_ids, results_dir, file_path, all_instrument_ids)
-print("Finished Backtest runs. Results saved to:", results_dir)
-
-if load_qs_flag:
-    load_qs(run_dirs, run_ids, benchmark_symbol=bench_qs, open_browser=True)
-
-if visualize:
-    dash = launch_dashbaord()
-    dash.run(debug=True, host="127.0.0.1", port=8050, use_reloader=False)
+    results_dir = Path(__file__).resolve().parents[1] / "data" / "DATA_STORAGE" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    # results/ ist nur die Ansicht des aktuellen Sweeps, fertige Runs liegen content-addressed im run_cache
+    _clear_directory(results_dir)
+    run_cache = RunCache()
+    data_fp = data_fingerprint(catalog_path, list(all_instrument_ids) + list(all_bar_types), data_configs,
+                               input_files=strategy_input_files(strategy_path))
+    code_fp = code_fingerprint(strategy_path)
+    # append-only ledger: params jetzt, Metriken schreibt jede Strategie in on_stop (Dashboard sieht Teil-Sweeps)
+    ledger = ResultsLedger(results_dir)
+
+    run_configs = []
+    run_ids = []
+    run_params_list = []
+    run_dirs = []
+    cache_keys = []
+    cached_metrics = {}
+
+    for i, combination in enumerate(itertools.product(*values)):
+        run_id = f"run{i}"
+        run_dir = results_dir / run_id
+
+        run_params = dict(zip(keys, combination))
+        config_params = copy.deepcopy(static_params)
+
+        for param_key, param_value in run_params.items():
+            if "." in param_key:
+                set_nested_parameter(config_params, param_key, param_value)
+            else:
+                config_params[param_key] = param_value
+
+        config_params["run_id"] = run_id
+
+        run_config_dict = copy.deepcopy(params)
+        run_config_dict.update(run_params)
+        run_config_dict.update(static_params)
+        run_config_dict["run_id"] = run_id
+
+        strategy_params = {k: v for k, v in config_params.items() if k != "run_id"}
+        cache_key = run_cache_key({**run_config_dict, "config_params": strategy_params, "catalog_path": catalog_path}, data_fp, code_fp)
+        if reuse_cached_runs and run_cache.has(cache_key):
+            cached_metrics[run_id] = run_cache.restore(cache_key, run_dir, run_id)
+            print(f"[RunCache] {run_id} unchanged -> reusing cached result {cache_key}")
+        else:
+            run_dir.mkdir(parents=True, exist_ok=True)
+            strategy_config = ImportableStrategyConfig(
+                strategy_path=strategy_path,
+                config_path=config_path,
+                config=config_params,
+            )
+            engine_config = BacktestEngineConfig(strategies=[strategy_config])
+            run_config = BacktestRunConfig(
+                data=data_configs,
+                venues=[venue_config],
+                engine=engine_config,
+                start=start_date,
+                end=end_date,
+            )
+            run_configs.append(run_config)
+
+        with open(run_dir / "run_config.yaml", "w", encoding="utf-8") as f:
+            yaml.dump(run_config_dict, f, allow_unicode=True, sort_keys=False)
+
+        ledger.register_run(run_id, run_params)
+        if run_id in cached_metrics:
+            ledger.record_metrics(run_id, cached_metrics[run_id], kind="result")
+
+        run_ids.append(run_id)
+        run_params_list.append(run_params)
+        run_dirs.append(run_dir)
+        cache_keys.append(cache_key)
+
+    print(f"[RunCache] {len(cached_metrics)} of {len(run_ids)} runs reused, {len(run_configs)} to run")
+    results = iter(run_backtest(run_configs) if run_configs else [])
+
+    for run_id, run_params, run_dir, cache_key in zip(run_ids, run_params_list, run_dirs, cache_keys):
+        if run_id in cached_metrics:
+            continue
+        metrics = extract_metrics(next(results), run_params, run_id, ledger=ledger)
+        pd.DataFrame([metrics]).to_csv(run_dir / "performance_metrics.csv", index=False)
+        try:
+            run_cache.store(cache_key, run_dir, metrics)
+        except Exception as e:
+            print(f"[RunCache] could not store {run_id}: {e}")
+
+    add_trade_metrics(run_ids, results_dir, all_instrument_ids, ledger)
+    # all_backtest_results.csv ist nur ein Export des Ledgers, kein eigener Schreibpfad
+    ledger.export_csv(results_dir / "all_backtest_results.csv")
+    print("Finished Backtest runs. Results saved to:", results_dir)
+
+    # Parameter-Cube einmal nach dem Sweep bauen, der Param-Analyzer slict dann nur noch
+    try:
+        runs_df = RunValidator(results_dir).validate_and_load()
+        ParameterAnalysisService(cube_dir=results_dir / CUBE_DIR_NAME).refresh_cube(runs_df)
+    except Exception as e:
+        print(f"[ParamCube] not built: {e}")
+
+    # Reports nur wenn gewünscht, sonst baut das Dashboard daily returns + Report lazy beim ersten Öffnen
+    if load_qs_flag:
+        load_qs(run_dirs, run_ids, benchmark_symbol=bench_qs, open_browser=True)
+
+    if visualize:
+        dash = launch_dashbaord()
+        dash.run(debug=True, host="127.0.0.1", port=8050, use_reloader=False)
+
+
+# guard: quantstats reports are generated in a process pool (spawn re-imports this module)
+if __name__ == "__main__":
+    main()
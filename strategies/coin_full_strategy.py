@@ -1,4 +1,5 @@
-from datetime import datetime, time, timezone, timedelta
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
 from typing import Any, Dict, Optional, List
 from nautilus_trader.trading import Strategy
 from nautilus_trader.trading.config import StrategyConfig
@@ -14,7 +15,17 @@ from nautilus_trader.indicators.volatility import AverageTrueRange
 from tools.help_funcs.base_strategy import BaseStrategy
 from tools.order_management.order_types import OrderTypes
 from tools.order_management.risk_manager import RiskManager
+from tools.help_funcs.rolling_window import RollingSum
+from tools.help_funcs.session_calendar import SessionCalendar
 from data.download.crypto_downloads.custom_class.metrics_data import MetricsData
+from data.download.crypto_downloads.custom_class.listing_feed import (
+    LISTED, LISTING_TOPIC, ONBOARD_FORMAT, feed_log_path, load_onboard_dates as load_feed_onboard_dates,
+)
+
+ONBOARD_DATES_CSV = Path(__file__).parent.parent / "data" / "DATA_STORAGE" / "project_future_scraper" / "new_binance_perpetual_futures.csv"
+# Dateien außerhalb des Katalogs, die das Ergebnis beeinflussen -> Teil des run_cache keys
+# (der listing feed ist ein wachsendes Event Log, jede neue Zeile invalidiert gecachte Runs)
+RUN_CACHE_INPUTS = [ONBOARD_DATES_CSV, feed_log_path("BINANCE", "perp")]
 
 
 class CoinFullConfig(StrategyConfig):
@@ -195,6 +206,7 @@ class CoinFullStrategy(BaseStrategy,Strategy):
         self.risk_manager.set_strategy(self)  # Set strategy reference for risk manager
         self.order_types = OrderTypes(self) 
         self.onboard_dates = self.load_onboard_dates()
+        self.listing_deadlines_ns = self.build_listing_deadlines_ns(self.onboard_dates)
         self.add_instrument_context()
     
     def add_instrument_context(self):
@@ -315,6 +327,10 @@ class CoinFullStrategy(BaseStrategy,Strategy):
             current_instrument["rth_start_minute"] = 30
             current_instrument["rth_end_hour"] = 21
             current_instrument["rth_end_minute"] = 0
+            current_instrument["session_calendar"] = SessionCalendar(
+                rth_start=(current_instrument["rth_start_hour"], current_instrument["rth_start_minute"]),
+                rth_end=(current_instrument["rth_end_hour"], current_instrument["rth_end_minute"]),
+            )
             
             # toptrader metrics (for exit method only)
             current_instrument["sum_toptrader_long_short_ratio"] = 0.0
@@ -326,8 +342,9 @@ class CoinFullStrategy(BaseStrategy,Strategy):
             current_instrument["min_price"] = coin_filters.get("min_price", 0.1)
             current_instrument["min_24h_volume"] = coin_filters.get("min_24h_volume", 5000000)
             current_instrument["min_sum_open_interest_value"] = coin_filters.get("min_sum_open_interest_value", 500000)
-            current_instrument["volume_history"] = []
-            current_instrument["price_history"] = []
+            # 24 hours worth of 15-minute bars (24h * 4 bars/hour = 96 bars)
+            current_instrument["volume_window"] = RollingSum(96)
+            current_instrument["dollar_volume_window"] = RollingSum(96)
             current_instrument["rolling_24h_volume"] = 0.0
             current_instrument["rolling_24h_dollar_volume"] = 0.0
             current_instrument["latest_open_interest_value"] = 0.0
@@ -368,6 +385,8 @@ class CoinFullStrategy(BaseStrategy,Strategy):
     def on_start(self): 
         super().on_start()
         self._subscribe_to_metrics_data()
+        # Live Trader publiziert neue Listings auf dem Message Bus, im Backtest kommt nichts an
+        self.msgbus.subscribe(topic=f"{LISTING_TOPIC}.*", handler=self.on_listing_event)
         
     def _subscribe_to_metrics_data(self):
         try:
@@ -380,38 +399,19 @@ class CoinFullStrategy(BaseStrategy,Strategy):
     def is_rth_time(self, bar: Bar, current_instrument: Dict[str, Any]) -> bool:
         if not current_instrument["only_trade_rth"]:
             return True
-            
-        bar_time = datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=timezone.utc).time()
-        rth_start = time(current_instrument["rth_start_hour"], current_instrument["rth_start_minute"])
-        rth_end = time(current_instrument["rth_end_hour"], current_instrument["rth_end_minute"])
-        
-        return rth_start <= bar_time <= rth_end
+        return current_instrument["session_calendar"].is_rth(bar.ts_event)
 
     def update_rolling_24h_volume(self, bar: Bar, current_instrument: Dict[str, Any]) -> None:
-        current_volume = float(bar.volume) if hasattr(bar, 'volume') else 0.0
-        current_price = float(bar.close)
-        
-        if "volume_history" not in current_instrument:
-            current_instrument["volume_history"] = []
-        if "price_history" not in current_instrument:
-            current_instrument["price_history"] = []
-            
-        volume_history = current_instrument["volume_history"]
-        price_history = current_instrument["price_history"]
-        
-        volume_history.append(current_volume)
-        price_history.append(current_price)
-        
-        # Keep only 24 hours worth of 15-minute bars (24h * 4 bars/hour = 96 bars)
-        max_bars = 96
-        if len(volume_history) > max_bars:
-            volume_history.pop(0)
-            price_history.pop(0)
-        
-        # Calculate rolling 24h volume and dollar volume
-        current_instrument["rolling_24h_volume"] = sum(volume_history)
-        dollar_volumes = [vol * price for vol, price in zip(volume_history, price_history)]
-        current_instrument["rolling_24h_dollar_volume"] = sum(dollar_volumes)
+        current_volume = bar.volume.as_double()
+        current_price = bar.close.as_double()
+
+        if "volume_window" not in current_instrument:
+            current_instrument["volume_window"] = RollingSum(96)
+            current_instrument["dollar_volume_window"] = RollingSum(96)
+
+        # Calculate rolling 24h volume and dollar volume (O(1) per bar)
+        current_instrument["rolling_24h_volume"] = current_instrument["volume_window"].update(current_volume)
+        current_instrument["rolling_24h_dollar_volume"] = current_instrument["dollar_volume_window"].update(current_volume * current_price)
 
     def difference_topt_longshortratio(self, current_instrument: Dict[str, Any]) -> Optional[float]:
         if not self.config.use_topt_ratio_as_exit.get("enabled", False):
@@ -524,10 +524,9 @@ class CoinFullStrategy(BaseStrategy,Strategy):
 
     def load_onboard_dates(self):
         import csv
-        from pathlib import Path
         
         onboard_dates = {}
-        csv_path = Path(__file__).parent.parent / "data" / "DATA_STORAGE" / "project_future_scraper" / "new_binance_perpetual_futures.csv"
+        csv_path = ONBOARD_DATES_CSV
         
         try:
             with open(csv_path, 'r') as file:
@@ -539,9 +538,33 @@ class CoinFullStrategy(BaseStrategy,Strategy):
                     onboard_dates[symbol] = onboard_date
         except Exception as e:
             self.log.error(f"Failed to load onboard dates: {e}")
+
+        # listing feed (append-only event log) ergänzt die CSV, u.a. um Listings außerhalb des Discovery-Fensters
+        try:
+            for symbol, onboard_date in load_feed_onboard_dates("BINANCE", "perp").items():
+                onboard_dates.setdefault(symbol, onboard_date)
+        except Exception as e:
+            self.log.warning(f"Listing feed not available: {e}")
             
         return onboard_dates
 
+    def on_listing_event(self, event: dict):
+        """listing feed event (message bus): new listing -> onboard date + deadline, ohne die Listen neu einzulesen"""
+        if event.get("event") != LISTED or not event.get("onboard"):
+            return
+        onboard_date = datetime.strptime(event["onboard"], ONBOARD_FORMAT)
+        self.onboard_dates[event["symbol"]] = onboard_date
+        self.listing_deadlines_ns.update(self.build_listing_deadlines_ns({event["symbol"]: onboard_date}))
+
+    @staticmethod
+    def build_listing_deadlines_ns(onboard_dates: Dict[str, datetime]) -> Dict[str, int]:
+        """onboard date + 13.5 days as utc nanoseconds, so per-bar checks are a plain int compare"""
+        deadlines = {}
+        for symbol, onboard_date in onboard_dates.items():
+            deadline = (onboard_date + timedelta(days=13.5)).replace(tzinfo=timezone.utc)
+            deadlines[symbol] = int(deadline.timestamp()) * 1_000_000_000
+        return deadlines
+
     def check_time_based_exit(self, bar: Bar, current_instrument: Dict[str, Any], position) -> bool:
         if not self.config.hold_profit_for_remaining_days:
             return False
@@ -549,15 +572,11 @@ class CoinFullStrategy(BaseStrategy,Strategy):
         instrument_id_str = str(bar.bar_type.instrument_id)
         base_symbol = instrument_id_str.split('-')[0]
         
-        if base_symbol not in self.onboard_dates:
+        deadline_ns = self.listing_deadlines_ns.get(base_symbol)
+        if deadline_ns is None:
             return False
-            
-        onboard_date = self.onboard_dates[base_symbol]
-        deadline = onboard_date + timedelta(days=13.5)
-        
-        current_time = datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=timezone.utc).replace(tzinfo=None)
         
-        if current_time >= deadline:
+        if bar.ts_event >= deadline_ns:
             entry_price = position.avg_px_open
             current_price = float(bar.close)
             
@@ -577,16 +596,12 @@ class CoinFullStrategy(BaseStrategy,Strategy):
         instrument_id_str = str(bar.bar_type.instrument_id)
         base_symbol = instrument_id_str.split('-')[0]
         
-        if base_symbol not in self.onboard_dates:
+        deadline_ns = self.listing_deadlines_ns.get(base_symbol)
+        if deadline_ns is None:
             return True
-            
-        onboard_date = self.onboard_dates[base_symbol]
-        deadline = onboard_date + timedelta(days=13.5)
-        
-        current_time = datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=timezone.utc).replace(tzinfo=None)
         
         # Block all new trades after deadline
-        return current_time < deadline
+        return bar.ts_event < deadline_ns
 
     def on_bar(self, bar: Bar) -> None:
         instrument_id = bar.bar_type.instrument_id
@@ -17,9 +17,11 @@ from nautilus_trader.indicators.volatility import AverageTrueRange
 from tools.help_funcs.base_strategy import BaseStrategy
 from tools.order_management.order_types import OrderTypes
 from tools.order_management.risk_manager import RiskManager
+from tools.help_funcs.rolling_window import RollingSum, RollingMoments, RollingExtremes
 from nautilus_trader.model.data import DataType
 from data.download.crypto_downloads.custom_class.bybit_metrics_data import BybitMetricsData
 from data.download.crypto_downloads.custom_class.fear_and_greed_data import FearAndGreedData
+from data.download.crypto_downloads.custom_class.listing_feed import LISTED, LISTING_TOPIC, ONBOARD_FORMAT
 
 
 class CoinListingShortConfig(StrategyConfig):
@@ -207,8 +209,8 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             current_instrument["min_price"] = coin_filters.get("min_price", 0.1)
             current_instrument["min_24h_volume"] = coin_filters.get("min_24h_volume", 5000000)
             current_instrument["min_sum_open_interest_value"] = coin_filters.get("min_sum_open_interest_value", 500000)
-            current_instrument["volume_history"] = []
-            current_instrument["price_history"] = []
+            current_instrument["volume_window"] = RollingSum(96)
+            current_instrument["dollar_volume_window"] = RollingSum(96)
             current_instrument["rolling_24h_volume"] = 0.0
             current_instrument["rolling_24h_dollar_volume"] = 0.0
             current_instrument["latest_open_interest_value"] = 0.0
@@ -259,7 +261,7 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             current_instrument["oi_allow_entry_difference"] = filter_config["oi_allow_entry_difference"]
             
             # Historical tracking for five day scaling filters (uses ENTRY scaled values) - OI only
-            current_instrument["oi_scaled_history"] = []
+            current_instrument["oi_scaled_history"] = RollingExtremes(max(1, int(current_instrument["amount_change_scaled_values"])))
 
             # Exit L3 metrics configuration - OI only
             exit_config = self.config.exit_l3_metrics_in_profit
@@ -276,10 +278,10 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             current_instrument["entry_history_position"] = None
             
             # Separate history arrays for exit logic (independent from five_day_scaling_filters) - OI only
-            current_instrument["exit_oi_scaled_history"] = []
+            current_instrument["exit_oi_scaled_history"] = RollingExtremes(max(1, int(current_instrument["exit_amount_change_scaled_values"])))
             
             # NEW: L3 window that starts fresh after each trade entry - OI only
-            current_instrument["l3_oi_window"] = []
+            current_instrument["l3_oi_window"] = RollingExtremes(max(1, int(current_instrument["exit_amount_change_scaled_values"])))
             current_instrument["l3_window_active"] = False
 
             # EMA Exit system
@@ -333,7 +335,6 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         "btc_instrument_id": None,
         
         # Rolling z-score calculation components
-        "price_history": [],
         "current_zscore": 0.0,
         "current_zscore_1": 0.0,
         "current_zscore_2": 0.0,
@@ -345,6 +346,7 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         "rolling_std": 0.0,
         "current_risk_multiplier": 1.0
         }
+        self.btc_context["zscore_moments"] = self._build_zscore_moments(self.btc_context)
     
     def setup_sol_tracking(self):
         if not self.config.sol_performance_risk_scaling.get("enabled", False):
@@ -369,7 +371,6 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         "sol_instrument_id": None,
         
         # Rolling z-score calculation components
-        "price_history": [],
         "current_zscore": 0.0,
         "current_zscore_1": 0.0,
         "current_zscore_2": 0.0,
@@ -380,11 +381,14 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         "rolling_mean": 0.0,
         "rolling_std": 0.0,
         "current_risk_multiplier": 1.0
-        }            
+        }
+        self.sol_context["zscore_moments"] = self._build_zscore_moments(self.sol_context)
     
     def on_start(self): 
         super().on_start()
         self._subscribe_to_metrics_data()
+        # Live Trader publiziert neue Listings auf dem Message Bus (Handler läuft im Strategy Event Loop)
+        self.msgbus.subscribe(topic=f"{LISTING_TOPIC}.*", handler=self.on_listing_event)
         #self._subscribe_to_fear_and_greed_data()
         
         # Request historical bars for all instruments to initialize indicators
@@ -455,28 +459,15 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             self.log.error(f"Failed to subscribe to BybitMetricsData: {e}", LogColor.RED)
         
     def update_rolling_24h_volume(self, bar: Bar, current_instrument: Dict[str, Any]) -> None:
-        current_volume = float(bar.volume) if hasattr(bar, 'volume') else 0.0
-        current_price = float(bar.close)
-        
-        if "volume_history" not in current_instrument:
-            current_instrument["volume_history"] = []
-        if "price_history" not in current_instrument:
-            current_instrument["price_history"] = []
-            
-        volume_history = current_instrument["volume_history"]
-        price_history = current_instrument["price_history"]
-        
-        volume_history.append(current_volume)
-        price_history.append(current_price)
-        
-        max_bars = 96
-        if len(volume_history) > max_bars:
-            volume_history.pop(0)
-            price_history.pop(0)
-        
-        current_instrument["rolling_24h_volume"] = sum(volume_history)
-        dollar_volumes = [vol * price for vol, price in zip(volume_history, price_history)]
-        current_instrument["rolling_24h_dollar_volume"] = sum(dollar_volumes)
+        current_volume = bar.volume.as_double()
+        current_price = bar.close.as_double()
+
+        if "volume_window" not in current_instrument:
+            current_instrument["volume_window"] = RollingSum(96)
+            current_instrument["dollar_volume_window"] = RollingSum(96)
+
+        current_instrument["rolling_24h_volume"] = current_instrument["volume_window"].update(current_volume)
+        current_instrument["rolling_24h_dollar_volume"] = current_instrument["dollar_volume_window"].update(current_volume * current_price)
     
     def on_data(self, data) -> None:
         if isinstance(data, BybitMetricsData):
@@ -517,9 +508,9 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         oi_threshold = current_instrument.get("oi_trade_threshold", [0.8, 0.95])
         oi_difference = current_instrument.get("oi_allow_entry_difference", [0.2, 0.5])
         
-        oi_history = current_instrument.get("oi_scaled_history", [])
+        oi_history = current_instrument["oi_scaled_history"]
         
-        if len(oi_history) == 0:
+        if oi_history.count == 0:
             return False
         
         # Use ENTRY scaled values for entry logic
@@ -530,20 +521,12 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         
         if oi_threshold_val >= 0:
             # Positive threshold: look for downward movement from peaks
-            oi_past_condition = any(val >= oi_threshold_val for val in oi_history)
-            if oi_past_condition:
-                max_oi = max(oi_history)
-                oi_condition = current_oi <= (max_oi - oi_difference_val)
-            else:
-                oi_condition = False
+            max_oi = oi_history.max
+            oi_condition = max_oi >= oi_threshold_val and current_oi <= (max_oi - oi_difference_val)
         else:
             # Negative threshold: look for upward movement from lows
-            oi_past_condition = any(val <= oi_threshold_val for val in oi_history)
-            if oi_past_condition:
-                min_oi = min(oi_history)
-                oi_condition = current_oi >= (min_oi + oi_difference_val)
-            else:
-                oi_condition = False
+            min_oi = oi_history.min
+            oi_condition = min_oi <= oi_threshold_val and current_oi >= (min_oi + oi_difference_val)
         
         return oi_condition
     
@@ -588,31 +571,23 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         # Use L3 window for exit analysis if only_check_thresholds_after_entry is enabled
         if current_instrument.get("only_check_thresholds_after_entry", False):
             # Use the fresh L3 window that started after trade entry
-            oi_recent = current_instrument.get("l3_oi_window", [])
+            oi_recent = current_instrument["l3_oi_window"]
         else:
-            # Use the regular exit history
-            lookback_window = current_instrument.get("exit_amount_change_scaled_values", 200)
-            oi_history = current_instrument.get("exit_oi_scaled_history", [])
-            
-            if len(oi_history) > lookback_window:
-                oi_recent = oi_history[-lookback_window:]
-            else:
-                oi_recent = oi_history
+            # Use the regular exit history (already capped to the lookback window)
+            oi_recent = current_instrument["exit_oi_scaled_history"]
         
         # Calculate OI exit signal
         oi_exit_signal = False
-        if exit_oi_threshold != 0.0 and exit_oi_allow_diff > 0.0 and len(oi_recent) > 0:
+        if exit_oi_threshold != 0.0 and exit_oi_allow_diff > 0.0 and oi_recent.count > 0:
             if exit_oi_threshold >= 0:
                 # Positive threshold: check if we reached the extreme high, then snapped back down
-                oi_reached_extreme = any(val >= exit_oi_threshold for val in oi_recent)
-                if oi_reached_extreme:
-                    max_oi = max(oi_recent)
+                max_oi = oi_recent.max
+                if max_oi >= exit_oi_threshold:
                     oi_exit_signal = current_oi <= (max_oi - exit_oi_allow_diff)
             else:
                 # Negative threshold: check if we reached the extreme low, then snapped back up
-                oi_reached_extreme = any(val <= exit_oi_threshold for val in oi_recent)
-                if oi_reached_extreme:
-                    min_oi = min(oi_recent)
+                min_oi = oi_recent.min
+                if min_oi <= exit_oi_threshold:
                     required_oi_rebound = min_oi + exit_oi_allow_diff
                     oi_exit_signal = current_oi >= required_oi_rebound
         
@@ -658,6 +633,13 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             
         return onboard_dates
     
+    def on_listing_event(self, event: dict):
+        """listing feed event (message bus): new listing -> onboard date per base symbol (XYZUSDT, wie in check_time_based_exit)"""
+        if event.get("event") != LISTED or not event.get("onboard"):
+            return
+        self.onboard_dates[event["symbol"]] = datetime.strptime(event["onboard"], ONBOARD_FORMAT)
+        self.log.info(f"Listing {event['symbol']}: onboard {event['onboard']}", color=LogColor.CYAN)
+
     def check_time_based_exit(self, bar: Bar, current_instrument: Dict[str, Any], position, time_after_listing_close) -> bool:
 
         # Handle both single value and array for optimization
@@ -838,33 +820,19 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         if not current_instrument.get("five_day_filters_enabled", True):
             return
         
-        lookback_window = current_instrument.get("amount_change_scaled_values", 100)
-        
         # Use ENTRY scaled values for five day filters (entry logic) - OI only
         oi_scaled = current_instrument.get("latest_open_interest_value_scaled_entry", 0.0)
         
-        current_instrument["oi_scaled_history"].append(oi_scaled)
-            
-        if len(current_instrument["oi_scaled_history"]) > lookback_window:
-            current_instrument["oi_scaled_history"].pop(0)
+        current_instrument["oi_scaled_history"].update(oi_scaled)
 
     def update_exit_history(self, current_instrument: Dict[str, Any]) -> None:
         if not current_instrument.get("exit_l3_enabled", False):
             return
         
-        lookback_window = current_instrument.get("exit_amount_change_scaled_values", 200)
-        
         # Use EXIT scaled values for exit logic
         oi_scaled = current_instrument.get("latest_open_interest_value_scaled_exit", 0.0)
         
-        if "exit_oi_scaled_history" not in current_instrument:
-            current_instrument["exit_oi_scaled_history"] = []
-        
-        current_instrument["exit_oi_scaled_history"].append(oi_scaled)
-    
-            
-        if len(current_instrument["exit_oi_scaled_history"]) > lookback_window:
-            current_instrument["exit_oi_scaled_history"].pop(0)
+        current_instrument["exit_oi_scaled_history"].update(oi_scaled)
 
     def update_l3_window(self, current_instrument: Dict[str, Any]) -> None:
         """Update the L3 window with fresh data after trade entry"""
@@ -873,14 +841,8 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             
         current_oi = current_instrument.get("latest_open_interest_value_scaled_exit", 0.0)
         
-        # Add to L3 window
-        current_instrument["l3_oi_window"].append(current_oi)
-        
-        # Limit L3 window size to lookback window
-        lookback_window = current_instrument.get("exit_amount_change_scaled_values", 200)
-            
-        if len(current_instrument["l3_oi_window"]) > lookback_window:
-            current_instrument["l3_oi_window"].pop(0)
+        # Add to L3 window (capped to the exit lookback window)
+        current_instrument["l3_oi_window"].update(current_oi)
 
     def is_btc_instrument(self, instrument_id) -> bool:
         return "BTCUSDT" in str(instrument_id)
@@ -899,13 +861,10 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             self.btc_context["btc_instrument_id"] = bar.bar_type.instrument_id
 
         current_price = float(bar.close)
-        self.btc_context["price_history"].append(current_price)
-        
-        window_size = self.btc_context["rolling_zscore"]
-        if len(self.btc_context["price_history"]) > window_size:
-            self.btc_context["price_history"].pop(0)
-        
-        self.update_btc_risk_metrics()
+        # leak-safe: stats come from previous closes, the current close is added afterwards
+        self.update_btc_risk_metrics(current_price)
+        for moments in self.btc_context["zscore_moments"].values():
+            moments.update(current_price)
     
     def process_sol_bar(self, bar: Bar) -> None:
         if not self.config.sol_performance_risk_scaling.get("enabled", False):
@@ -918,175 +877,96 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             self.sol_context["sol_instrument_id"] = bar.bar_type.instrument_id
 
         current_price = float(bar.close)
-        self.sol_context["price_history"].append(current_price)
-        
-        window_size = self.sol_context["rolling_zscore"]
-        if len(self.sol_context["price_history"]) > window_size:
-            self.sol_context["price_history"].pop(0)
-        
-        self.update_sol_risk_metrics()
+        self.update_sol_risk_metrics(current_price)
+        for moments in self.sol_context["zscore_moments"].values():
+            moments.update(current_price)
+
+    @staticmethod
+    def _build_zscore_moments(context: Dict[str, Any]) -> Dict[str, RollingMoments]:
+        # stats use the previous (rolling_zscore - 1) closes, additional windows are capped to that
+        main_window = max(1, int(context["rolling_zscore"]) - 1)
+        moments = {"rolling_zscore": RollingMoments(main_window)}
+        for i in range(1, 6):
+            key = f"rolling_zscore_{i}"
+            win = context.get(key)
+            if win is None:
+                continue
+            win = int(win)
+            moments[key] = RollingMoments(min(win, main_window) if win > 0 else main_window)
+        return moments
         
     # Helper: leak-safe rolling z-score with clamping
-    def _compute_rolling_zscore(self, prices: List[float], window: int, min_z: float, max_z: float) -> float:
-        if len(prices) < 2:
+    def _compute_rolling_zscore(self, moments: RollingMoments, current_price: float, min_z: float, max_z: float) -> float:
+        if moments.n < 2:
             return 0.0
-        stats_data = prices[:-1]
-        if len(stats_data) < 2:
-            return 0.0
-        if len(stats_data) > window:
-            rolling_data = stats_data[-window:]
-        else:
-            rolling_data = stats_data
-
-        mean = sum(rolling_data) / len(rolling_data)
-        if len(rolling_data) > 1:
-            variance = sum((x - mean) ** 2 for x in rolling_data) / (len(rolling_data) - 1)
-            std = variance ** 0.5
-        else:
-            std = 0.0
-
-        current_price = prices[-1]
-        z = (current_price - mean) / std if std > 0 else 0.0
+        std = moments.std
+        z = (current_price - moments.mean) / std if std > 0 else 0.0
         # Clamp
         return max(min_z, min(max_z, z))
 
-    def update_btc_risk_metrics(self) -> None:
-        if not hasattr(self, 'btc_context') or len(self.btc_context["price_history"]) < 2:
-            if hasattr(self, 'btc_context'):
-                self.btc_context["current_risk_multiplier"] = 1.0
-            return
-
-        price_history = self.btc_context["price_history"]
-        window_size = self.btc_context["rolling_zscore"]
+    def _update_risk_context(self, context: Dict[str, Any], current_price: float) -> Optional[float]:
+        """updates rolling mean/std and all window z-scores, returns clamped main z-score or None"""
+        moments = context["zscore_moments"]
+        main = moments["rolling_zscore"]
 
-        if len(price_history) >= 2:
-            stats_data = price_history[:-1]
-            
-            if len(stats_data) > window_size:
-                rolling_data = stats_data[-window_size:]
-            else:
-                rolling_data = stats_data
+        if main.count == 0 or main.invalid_count > 0:
+            return None
 
-            if any(x is None or x != x for x in rolling_data):
-                self.btc_context["current_risk_multiplier"] = 1.0
-                return
-                
-            self.btc_context["rolling_mean"] = sum(rolling_data) / len(rolling_data)
+        context["rolling_mean"] = main.mean
+        min_std_threshold = abs(main.mean) * 0.001
+        context["rolling_std"] = max(main.std, min_std_threshold) if main.n > 1 else min_std_threshold
 
-            if len(rolling_data) > 1:
-                variance = sum((x - self.btc_context["rolling_mean"]) ** 2 for x in rolling_data) / (len(rolling_data) - 1)
-                raw_std = variance ** 0.5
-                min_std_threshold = abs(self.btc_context["rolling_mean"]) * 0.001
-                self.btc_context["rolling_std"] = max(raw_std, min_std_threshold)
-            else:
-                self.btc_context["rolling_std"] = abs(self.btc_context["rolling_mean"]) * 0.001
-            
-            # Calculate main z-score (clamped)
-            current_price = price_history[-1]
-            if current_price is None or current_price != current_price:
-                self.btc_context["current_risk_multiplier"] = 1.0
-                return
-
-            if self.btc_context["rolling_std"] > 0:
-                raw_z = (current_price - self.btc_context["rolling_mean"]) / self.btc_context["rolling_std"]
-            else:
-                raw_z = 0.0
-
-            # Clamp z-score to configured bounds
-            zscore_main = max(self.btc_context["min_zscore"], 
-                              min(self.btc_context["max_zscore"], raw_z))
-            self.btc_context["current_zscore"] = zscore_main
-
-            # Compute additional window z-scores and store them
-            min_z = self.btc_context["min_zscore"]
-            max_z = self.btc_context["max_zscore"]
-            current_zscores = {"rolling_zscore": zscore_main}
-
-            for i in range(1, 6):
-                key = f"rolling_zscore_{i}"
-                win = self.btc_context.get(key)
-                if win is None:
-                    continue
-                z_i = self._compute_rolling_zscore(price_history, int(win), min_z, max_z)
-                self.btc_context[f"current_zscore_{i}"] = z_i
-                current_zscores[key] = z_i
+        # Calculate main z-score (clamped)
+        if current_price is None or current_price != current_price:
+            return None
 
-            self.btc_context["current_zscores"] = current_zscores
-            
-            # Risk multiplier still derived from main window
-            risk_multiplier = self._zscore_to_risk_multiplier_btc(zscore_main)
-            self.btc_context["current_risk_multiplier"] = risk_multiplier
+        if context["rolling_std"] > 0:
+            raw_z = (current_price - context["rolling_mean"]) / context["rolling_std"]
         else:
-            self.btc_context["current_risk_multiplier"] = 1.0
-
-    def update_sol_risk_metrics(self) -> None:
-        if not hasattr(self, 'sol_context') or len(self.sol_context["price_history"]) < 2:
-            if hasattr(self, 'sol_context'):
-                self.sol_context["current_risk_multiplier"] = 1.0
-            return
+            raw_z = 0.0
+
+        # Clamp z-score to configured bounds
+        min_z = context["min_zscore"]
+        max_z = context["max_zscore"]
+        zscore_main = max(min_z, min(max_z, raw_z))
+        context["current_zscore"] = zscore_main
+
+        # Compute additional window z-scores and store them
+        current_zscores = {"rolling_zscore": zscore_main}
+        for i in range(1, 6):
+            key = f"rolling_zscore_{i}"
+            if key not in moments:
+                continue
+            z_i = self._compute_rolling_zscore(moments[key], current_price, min_z, max_z)
+            context[f"current_zscore_{i}"] = z_i
+            current_zscores[key] = z_i
 
-        price_history = self.sol_context["price_history"]
-        window_size = self.sol_context["rolling_zscore"]
+        context["current_zscores"] = current_zscores
+        return zscore_main
 
-        if len(price_history) >= 2:
-            stats_data = price_history[:-1]
-            
-            if len(stats_data) > window_size:
-                rolling_data = stats_data[-window_size:]
-            else:
-                rolling_data = stats_data
+    def update_btc_risk_metrics(self, current_price: float) -> None:
+        if not hasattr(self, 'btc_context'):
+            return
 
-            if any(x is None or x != x for x in rolling_data):
-                self.sol_context["current_risk_multiplier"] = 1.0
-                return
-                
-            self.sol_context["rolling_mean"] = sum(rolling_data) / len(rolling_data)
+        zscore_main = self._update_risk_context(self.btc_context, current_price)
+        if zscore_main is None:
+            self.btc_context["current_risk_multiplier"] = 1.0
+            return
 
-            if len(rolling_data) > 1:
-                variance = sum((x - self.sol_context["rolling_mean"]) ** 2 for x in rolling_data) / (len(rolling_data) - 1)
-                raw_std = variance ** 0.5
-                min_std_threshold = abs(self.sol_context["rolling_mean"]) * 0.001
-                self.sol_context["rolling_std"] = max(raw_std, min_std_threshold)
-            else:
-                self.sol_context["rolling_std"] = abs(self.sol_context["rolling_mean"]) * 0.001
-            
-            # Calculate main z-score (clamped)
-            current_price = price_history[-1]
-            if current_price is None or current_price != current_price:
-                self.sol_context["current_risk_multiplier"] = 1.0
-                return
-
-            if self.sol_context["rolling_std"] > 0:
-                raw_z = (current_price - self.sol_context["rolling_mean"]) / self.sol_context["rolling_std"]
-            else:
-                raw_z = 0.0
-
-            # Clamp z-score to configured bounds
-            zscore_main = max(self.sol_context["min_zscore"], 
-                              min(self.sol_context["max_zscore"], raw_z))
-            self.sol_context["current_zscore"] = zscore_main
-
-            # Compute additional window z-scores and store them
-            min_z = self.sol_context["min_zscore"]
-            max_z = self.sol_context["max_zscore"]
-            current_zscores = {"rolling_zscore": zscore_main}
-
-            for i in range(1, 6):
-                key = f"rolling_zscore_{i}"
-                win = self.sol_context.get(key)
-                if win is None:
-                    continue
-                z_i = self._compute_rolling_zscore(price_history, int(win), min_z, max_z)
-                self.sol_context[f"current_zscore_{i}"] = z_i
-                current_zscores[key] = z_i
+        # Risk multiplier still derived from main window
+        self.btc_context["current_risk_multiplier"] = self._zscore_to_risk_multiplier_btc(zscore_main)
 
-            self.sol_context["current_zscores"] = current_zscores
+    def update_sol_risk_metrics(self, current_price: float) -> None:
+        if not hasattr(self, 'sol_context'):
+            return
 
-            # Risk multiplier still derived from main window
-            risk_multiplier = self._zscore_to_risk_multiplier_sol(zscore_main)
-            self.sol_context["current_risk_multiplier"] = risk_multiplier
-        else:
+        zscore_main = self._update_risk_context(self.sol_context, current_price)
+        if zscore_main is None:
             self.sol_context["current_risk_multiplier"] = 1.0
+            return
+
+        # Risk multiplier still derived from main window
+        self.sol_context["current_risk_multiplier"] = self._zscore_to_risk_multiplier_sol(zscore_main)
 
     def _zscore_to_risk_multiplier_btc(self, zscore: float) -> float:
         min_risk = self.btc_context["risk_multiplier_max_z_threshold"]  # 0.2 (low risk when BTC bullish)
@@ -1419,7 +1299,7 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
             
             # ACTIVATE L3 WINDOW: Start fresh tracking for this trade
             current_instrument["l3_window_active"] = True
-            current_instrument["l3_oi_window"] = []
+            current_instrument["l3_oi_window"].reset()
             
             self.log.info("Executing short trade - L3 window activated for exit tracking")
             self.log.info(f"ORDER INIT: {bar.ts_event})", LogColor.CYAN)
@@ -1528,7 +1408,7 @@ class CoinListingShortStrategy(BaseStrategy, Strategy):
         
         # DEACTIVATE L3 WINDOW: Stop tracking for this trade
         current_instrument["l3_window_active"] = False
-        current_instrument["l3_oi_window"] = []
+        current_instrument["l3_oi_window"].reset()
         
         # Reset EMA exit tracking
         if self.config.use_close_ema.get("enabled", False):
@@ -1,4 +1,5 @@
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
 from typing import Any, Dict, Optional, List, Union
 from nautilus_trader.trading import Strategy
 from nautilus_trader.trading.config import StrategyConfig
@@ -14,9 +15,13 @@ from nautilus_trader.indicators.averages import ExponentialMovingAverage
 from tools.help_funcs.base_strategy import BaseStrategy
 from tools.order_management.order_types import OrderTypes
 from tools.order_management.risk_manager import RiskManager
+from tools.help_funcs.rolling_window import RollingSum
 from nautilus_trader.model.data import DataType
 from data.download.crypto_downloads.custom_class.metrics_data import MetricsData
 
+ONBOARD_DATES_CSV = Path(__file__).parent.parent / "data" / "DATA_STORAGE" / "project_future_scraper" / "new_binance_perpetual_futures.csv"
+RUN_CACHE_INPUTS = [ONBOARD_DATES_CSV]
+
 class GammaShortConfig(StrategyConfig):
     instruments: List[dict]  
     max_leverage: float
@@ -179,8 +184,8 @@ class GammaShortStrategy(BaseStrategy, Strategy):
             current_instrument["min_price"] = coin_filters.get("min_price", 0.1)
             current_instrument["min_24h_volume"] = coin_filters.get("min_24h_volume", 5000000)
             current_instrument["min_sum_open_interest_value"] = coin_filters.get("min_sum_open_interest_value", 500000)
-            current_instrument["volume_history"] = []
-            current_instrument["price_history"] = []
+            current_instrument["volume_window"] = RollingSum(96)
+            current_instrument["dollar_volume_window"] = RollingSum(96)
             current_instrument["rolling_24h_volume"] = 0.0
             current_instrument["rolling_24h_dollar_volume"] = 0.0
             current_instrument["latest_open_interest_value"] = 0.0
@@ -342,28 +347,15 @@ class GammaShortStrategy(BaseStrategy, Strategy):
             self.log.error(f"Failed to subscribe to MetricsData: {e}", LogColor.RED)
         
     def update_rolling_24h_volume(self, bar: Bar, current_instrument: Dict[str, Any]) -> None:
-        current_volume = float(bar.volume) if hasattr(bar, 'volume') else 0.0
-        current_price = float(bar.close)
-        
-        if "volume_history" not in current_instrument:
-            current_instrument["volume_history"] = []
-        if "price_history" not in current_instrument:
-            current_instrument["price_history"] = []
-            
-        volume_history = current_instrument["volume_history"]
-        price_history = current_instrument["price_history"]
-        
-        volume_history.append(current_volume)
-        price_history.append(current_price)
-        
-        max_bars = 96
-        if len(volume_history) > max_bars:
-            volume_history.pop(0)
-            price_history.pop(0)
-        
-        current_instrument["rolling_24h_volume"] = sum(volume_history)
-        dollar_volumes = [vol * price for vol, price in zip(volume_history, price_history)]
-        current_instrument["rolling_24h_dollar_volume"] = sum(dollar_volumes)
+        current_volume = bar.volume.as_double()
+        current_price = bar.close.as_double()
+
+        if "volume_window" not in current_instrument:
+            current_instrument["volume_window"] = RollingSum(96)
+            current_instrument["dollar_volume_window"] = RollingSum(96)
+
+        current_instrument["rolling_24h_volume"] = current_instrument["volume_window"].update(current_volume)
+        current_instrument["rolling_24h_dollar_volume"] = current_instrument["dollar_volume_window"].update(current_volume * current_price)
     
     def on_data(self, data) -> None:
         if isinstance(data, MetricsData):
@@ -567,10 +559,9 @@ class GammaShortStrategy(BaseStrategy, Strategy):
     
     def load_onboard_dates(self):
         import csv
-        from pathlib import Path
         
         onboard_dates = {}
-        csv_path = Path(__file__).parent.parent / "data" / "DATA_STORAGE" / "project_future_scraper" / "new_binance_perpetual_futures.csv"
+        csv_path = ONBOARD_DATES_CSV
         
         try:
             with open(csv_path, 'r') as file:
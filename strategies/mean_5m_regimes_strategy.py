@@ -1,7 +1,6 @@
 from decimal import Decimal
 from typing import Any, Dict, Optional, List
 from collections import deque
-import datetime
 
 from nautilus_trader.trading import Strategy
 from nautilus_trader.trading.config import StrategyConfig
@@ -17,6 +16,7 @@ from tools.indicators.kalman_filter_2D_own_ZScore import KalmanFilterRegressionW
 from tools.indicators.VWAP_ZScore_HTF import VWAPZScoreHTFAnchored
 from tools.structure.elastic_reversion_zscore_entry import ElasticReversionZScoreEntry
 from tools.help_funcs.adaptive_parameter_manager_new import AdaptiveParameterManager
+from tools.help_funcs.session_calendar import SessionCalendar
 
 
 class Mean5mregimesStrategyConfig(StrategyConfig):
@@ -173,6 +173,10 @@ class Mean5mregimesStrategy(BaseStrategy, Strategy):
             current_instrument["rth_start_minute"] = 40
             current_instrument["rth_end_hour"] = 21
             current_instrument["rth_end_minute"] = 50
+            current_instrument["session_calendar"] = SessionCalendar(
+                rth_start=(current_instrument["rth_start_hour"], current_instrument["rth_start_minute"]),
+                rth_end=(current_instrument["rth_end_hour"], current_instrument["rth_end_minute"]),
+            )
             
             # Tracking variables pro Instrument
             current_instrument["prev_close"] = None
@@ -225,12 +229,7 @@ class Mean5mregimesStrategy(BaseStrategy, Strategy):
     def is_rth_time(self, bar: Bar, current_instrument: Dict[str, Any]) -> bool:
         if not current_instrument["only_trade_rth"]:
             return True
-            
-        bar_time = datetime.datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=datetime.timezone.utc).time()
-        rth_start = datetime.time(current_instrument["rth_start_hour"], current_instrument["rth_start_minute"])
-        rth_end = datetime.time(current_instrument["rth_end_hour"], current_instrument["rth_end_minute"])
-        
-        return rth_start <= bar_time <= rth_end
+        return current_instrument["session_calendar"].is_rth(bar.ts_event)
 
     def on_bar(self, bar: Bar) -> None:
         # Multi-Instrument Routing: Route bar zu entsprechendem Instrument
@@ -498,7 +497,7 @@ class Mean5mregimesStrategy(BaseStrategy, Strategy):
         if not current_instrument["allow_daily_stacking_reset"]:
             return
             
-        current_day = bar.ts_event.date()
+        current_day = SessionCalendar.day_index(bar.ts_event)
         
         if current_instrument["current_trading_day"] != current_day:
             current_instrument["current_trading_day"] = current_day
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from tools.structure import batch_scanner
+from tools.structure.batch_scanner import fvg_events, ttt_breakout_events
+from tools.structure.fvg import FVG_Analyser
+from tools.structure.TTTbreakout import TTTBreakout_Analyser
+
+N_SERIES = 30
+N_BARS = 3000
+
+
+def _random_bars(seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, N_BARS))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 0.3, N_BARS)
+    high = np.maximum(open_, close) + rng.exponential(0.5, N_BARS)
+    low = np.minimum(open_, close) - rng.exponential(0.5, N_BARS)
+    return open_, high, low, close
+
+
+def _bar(o, h, l, c):
+    return SimpleNamespace(open=o, high=h, low=l, close=c)
+
+
+@pytest.mark.parametrize("seed", range(N_SERIES))
+def test_fvg_matches_streaming_analyser(seed):
+    open_, high, low, close = _random_bars(seed)
+    batch = fvg_events(high, low)
+    analyser = FVG_Analyser(min_size=0.0, lookback=3)
+    for i in range(N_BARS):
+        analyser.update_bars(_bar(open_[i], high[i], low[i], close[i]))
+        bull, (bull_low, bull_high) = analyser.is_bullish_fvg()
+        bear, (bear_high, bear_low) = analyser.is_bearish_fvg()
+        assert bull == batch["bullish"][i]
+        assert bear == batch["bearish"][i]
+        if bull:
+            assert (batch["gap_low"][i], batch["gap_high"][i]) == (bull_low, bull_high)
+        if bear:
+            assert (batch["gap_low"][i], batch["gap_high"][i]) == (bear_low, bear_high)
+
+
+@pytest.mark.parametrize("seed", range(N_SERIES))
+def test_ttt_matches_streaming_analyser(seed):
+    open_, high, low, close = _random_bars(seed)
+    batch = ttt_breakout_events(open_, high, low, close, lookback=10, atr_mult=1.0, max_counter=8)
+    analyser = TTTBreakout_Analyser(lookback=10, atr_mult=1.0, max_counter=8)
+    streamed = np.zeros(N_BARS, dtype=np.int8)
+    for i in range(N_BARS):
+        analyser.update_bars(_bar(open_[i], high[i], low[i], close[i]))
+        hit, direction = analyser.is_tttbreakout()
+        if hit:
+            streamed[i] = 1 if direction == "long" else -1
+    assert int((streamed != batch).sum()) == 0
+
+
+def test_prescreen_requires_zscore_for_every_bar_type(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(batch_scanner, "load_bar_arrays", lambda *a, **k: loaded.append(a) or {})
+    with pytest.raises(KeyError):
+        batch_scanner.prescreen_catalog("catalog", ["A-1-MINUTE", "B-1-MINUTE"],
+                                        scanners={"vscbr": {"zscore": {"A-1-MINUTE": np.zeros(3)}}})
+    assert loaded == []
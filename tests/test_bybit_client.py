@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from data.download.crypto_downloads.bybit_downloads.bybit_client import BybitClient, SlidingWindowLimiter
+
+CLOSED_END = 1_600_000_000_000  # 2020, geschlossenes Fenster -> cachebar
+
+
+class StandInBybit(BaseHTTPRequestHandler):
+    """local stand-in for /v5/market: echoes the query, answers 429 while `fail_first` > 0"""
+
+    fail_first = 0
+    fail_starts = set()  # Fenster mit diesem start antworten immer 500
+    hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits += 1
+            fail = cls.fail_first > 0
+            cls.fail_first -= 1
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if fail or query.get("start") in cls.fail_starts:
+            self.send_response(429 if fail else 500)
+            self.end_headers()
+            return
+        body = json.dumps({"retCode": 0, "retMsg": "OK", "result": {"list": [query]}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    StandInBybit.fail_first = 0
+    StandInBybit.fail_starts = set()
+    StandInBybit.hits = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInBybit)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v5/market"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sliding_window_never_exceeds_the_ip_limit():
+    limiter = SlidingWindowLimiter(5, 0.3)
+    sent = []
+    for _ in range(12):
+        limiter.acquire()
+        sent.append(time.monotonic())
+    for i in range(5, len(sent)):
+        assert sent[i] - sent[i - 5] >= 0.3 - 1e-3
+
+
+def test_memory_cache_is_capped_lru(stand_in):
+    client = BybitClient(base_url=stand_in, cache_max_entries=3)
+    for i in range(5):
+        client.get("kline", {"symbol": f"S{i}", "end": CLOSED_END})
+    assert len(client._cache) == 3
+
+    # S2 zuletzt benutzt -> bleibt, S3 fällt beim nächsten Eintrag raus
+    client.get("kline", {"symbol": "S2", "end": CLOSED_END})
+    client.get("kline", {"symbol": "S5", "end": CLOSED_END})
+    assert client.stats["cache_hits"] == 1
+    assert client.request_key("kline", {"symbol": "S2", "end": CLOSED_END}) in client._cache
+    assert client.request_key("kline", {"symbol": "S3", "end": CLOSED_END}) not in client._cache
+
+
+def test_retry_after_429_and_open_windows_are_not_cached(stand_in):
+    StandInBybit.fail_first = 1
+    client = BybitClient(base_url=stand_in, backoff=0.01)
+    data = client.get("kline", {"symbol": "BTCUSDT", "end": int(time.time() * 1000)})
+    assert data["result"]["list"][0]["symbol"] == "BTCUSDT"
+    assert client.stats["retries"] == 1
+    assert len(client._cache) == 0
+    assert StandInBybit.hits == 2
+
+
+def test_failed_window_keeps_the_others_and_is_reported(stand_in):
+    StandInBybit.fail_starts = {"200"}
+    client = BybitClient(base_url=stand_in, max_retries=1, backoff=0.01)
+    records, failed = client.fetch_windows("kline", {"symbol": "BTCUSDT"}, 0, 399, 100, paginate=False, retry_rounds=1)
+
+    assert [r["start"] for r in records] == ["0", "100", "300"]
+    assert failed == [(200, 299)]
+    # erster Versuch + eine Wiederholungsrunde für das kaputte Fenster
+    assert StandInBybit.hits == 5
@@ -0,0 +1,107 @@
+from nautilus_trader.model.data import Bar, BarType
+from nautilus_trader.model.objects import Price, Quantity
+from nautilus_trader.persistence.catalog.parquet import ParquetDataCatalog
+
+from data.download import download_logic_db
+from data.download.download_logic_db import DatabentoJobManager, transform_dbn_to_parquet
+
+BAR_TYPE = "ESH4.GLBX-1-MINUTE-LAST-EXTERNAL"
+MINUTE_NS = 60_000_000_000
+START_NS = 1_704_153_600_000_000_000  # 2024-01-02
+
+
+class FakeBatch:
+    """local stand-in for the Databento batch API: jobs finish after `polls_until_done` list_jobs calls"""
+
+    def __init__(self, expired=(), broken=(), polls_until_done=2):
+        self.expired = set(expired)
+        self.broken = set(broken)
+        self.polls_until_done = polls_until_done
+        self.submitted = []
+        self.polls = 0
+        self.downloaded = []
+
+    def submit_job(self, dataset, start, end, symbols, schema, split_duration, stype_in, stype_out):
+        job_id = f"GLBX-{len(self.submitted)}"
+        self.submitted.append({"id": job_id, "symbols": symbols, "schema": schema})
+        return {"id": job_id}
+
+    def list_jobs(self, states):
+        self.polls += 1
+        if self.polls < self.polls_until_done:
+            return []
+        return [{"id": j["id"], "state": "expired" if j["symbols"] in self.expired else "done"} for j in self.submitted]
+
+    def download(self, job_id, output_dir):
+        job = next(j for j in self.submitted if j["id"] == job_id)
+        if job["symbols"] in self.broken:
+            raise ConnectionError("download interrupted")
+        path = output_dir / f"glbx-mdp3-{job['symbols']}.ohlcv-1m.dbn.zst"
+        path.write_bytes(b"3")  # Anzahl Bars, der Fake-Loader liest nur diese Zahl
+        self.downloaded.append(job_id)
+        return [path]
+
+
+class FakeClient:
+    def __init__(self, batch):
+        self.batch = batch
+
+
+class FakeLoader:
+    """stand-in for DatabentoDataLoader: n one-minute bars per file"""
+
+    def from_dbn_file(self, path, instrument_id, as_legacy_cython, use_exchange_as_venue):
+        bar_type = BarType.from_str(BAR_TYPE)
+        n = int(open(path, "rb").read())
+        return [
+            Bar(bar_type, Price.from_str("4800.00"), Price.from_str("4801.00"), Price.from_str("4799.00"),
+                Price.from_str("4800.50"), Quantity.from_int(10), START_NS + i * MINUTE_NS, START_NS + i * MINUTE_NS)
+            for i in range(n)
+        ]
+
+
+def _manager(batch):
+    return DatabentoJobManager(client=FakeClient(batch), poll_interval=0.0, max_poll_interval=0.0)
+
+
+def test_submit_poll_download_transform(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_logic_db, "DatabentoDataLoader", FakeLoader)
+    batch = FakeBatch(polls_until_done=3)
+    manager = _manager(batch)
+    raw_dir = tmp_path / "raw"
+    job_id = manager.submit("ESH4", "2024-01-01", "2024-02-01", "GLBX.MDP3", "ohlcv-1m", raw_dir)
+
+    seen = []
+    results = manager.run(on_downloaded=lambda jid, files: seen.append(jid))
+    assert batch.polls == 3
+    assert seen == [job_id]
+    assert manager.failed == {}
+
+    catalog_root = tmp_path / "catalog"
+    transform_dbn_to_parquet("ESH4", raw_dir, catalog_root, flat_structure=True, max_workers=1)
+    bars = ParquetDataCatalog(str(catalog_root)).bars([BAR_TYPE])
+    assert len(results[job_id]) == 1
+    assert [b.ts_event for b in bars] == [START_NS + i * MINUTE_NS for i in range(3)]
+    assert not raw_dir.exists()
+
+
+def test_expired_and_failed_downloads_are_reported(tmp_path):
+    batch = FakeBatch(expired={"NQH4"}, broken={"CLH4"})
+    manager = _manager(batch)
+    ids = {sym: manager.submit(sym, "2024-01-01", "2024-02-01", "GLBX.MDP3", "ohlcv-1m", tmp_path / sym)
+           for sym in ("ESH4", "NQH4", "CLH4")}
+
+    results = manager.run()
+    assert set(results) == {ids["ESH4"]}
+    assert manager.failed[ids["NQH4"]] == "expired"
+    assert "interrupted" in manager.failed[ids["CLH4"]]
+    assert ids["NQH4"] not in batch.downloaded
+
+
+def test_unfinished_jobs_time_out(tmp_path):
+    batch = FakeBatch(polls_until_done=10 ** 6)
+    manager = DatabentoJobManager(client=FakeClient(batch), poll_interval=0.0, max_poll_interval=0.0, timeout=0.0)
+    job_id = manager.submit("ESH4", "2024-01-01", "2024-02-01", "GLBX.MDP3", "ohlcv-1m", tmp_path / "raw")
+
+    assert manager.run() == {}
+    assert manager.failed == {job_id: "timeout"}
@@ -0,0 +1,88 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+
+from data.download import download_logic_ib
+from data.download.download_logic_ib import CoverageIndex, download_contract_bars
+
+TZ = "America/New_York"
+BAR_TYPE = "SPY.ARCA-1-DAY-LAST-EXTERNAL"
+KEY = "SPY.ARCA-1-DAY-LAST"
+
+
+class MockGateway:
+    """local stand-in for the historic IB client: one bar per chunk, per-month failures / empty months"""
+
+    def __init__(self, failing=(), empty=()):
+        self.failing = set(failing)
+        self.empty = set(empty)
+        self.calls = []
+
+    async def request_bars(self, bar_specifications, start_date_time, end_date_time, tz_name, contracts, use_rth):
+        self.calls.append((start_date_time, end_date_time))
+        month = start_date_time.strftime("%Y-%m")
+        if month in self.failing:
+            raise ConnectionError("pacing violation")
+        if month in self.empty:
+            return []
+        ts = pd.Timestamp(start_date_time).tz_localize(tz_name).value
+        return [SimpleNamespace(bar_type=BAR_TYPE, ts_event=ts, ts_init=ts)]
+
+
+class MemoryCatalog:
+    def __init__(self):
+        self.bars = []
+
+    def get_intervals(self, cls, bar_type):
+        return []
+
+    def write_data(self, bars):
+        self.bars += bars
+
+
+class NoPacing:
+    async def acquire(self):
+        return None
+
+
+def _run(gateway, coverage, start, end):
+    contract = SimpleNamespace(symbol="SPY", exchange="ARCA")
+    return asyncio.run(download_contract_bars(
+        gateway, contract, MemoryCatalog(), coverage, start, end, "1-DAY-LAST", TZ, limiter=NoPacing(),
+    ))
+
+
+def test_failed_chunk_is_not_marked_covered(tmp_path):
+    coverage = CoverageIndex(tmp_path / "cov.json")
+    start, end = datetime.datetime(2024, 1, 2, 9, 30), datetime.datetime(2024, 4, 1, 16, 30)
+    _run(MockGateway(failing={"2024-02"}), coverage, start, end)
+
+    missing = download_logic_ib.missing_ranges(start, end, coverage.covered(KEY))
+    assert missing == [(datetime.datetime(2024, 2, 1, 16, 30), datetime.datetime(2024, 3, 1, 16, 30))]
+
+    retry = MockGateway()
+    _run(retry, coverage, start, end)
+    assert retry.calls == missing
+
+
+def test_empty_chunks_need_later_bars_to_count_as_covered(tmp_path):
+    coverage = CoverageIndex(tmp_path / "cov.json")
+    start, end = datetime.datetime(2024, 1, 2, 9, 30), datetime.datetime(2024, 5, 1, 16, 30)
+    # Jan leer vor den ersten Bars (bestätigt), Apr leer am Ende (unbestätigt)
+    _run(MockGateway(empty={"2024-01", "2024-04"}), coverage, start, end)
+
+    assert download_logic_ib.missing_ranges(start, end, coverage.covered(KEY)) == [
+        (datetime.datetime(2024, 4, 1, 16, 30), end)
+    ]
+
+
+def test_coverage_never_extends_past_now(tmp_path, monkeypatch):
+    now = datetime.datetime(2024, 3, 15, 12, 0)
+    monkeypatch.setattr(download_logic_ib, "_now_local", lambda tz_name: now)
+    coverage = CoverageIndex(tmp_path / "cov.json")
+    start, end = datetime.datetime(2024, 1, 2, 9, 30), datetime.datetime(2024, 6, 1, 16, 30)
+    _run(MockGateway(), coverage, start, end)
+
+    assert coverage.covered(KEY) == [(start, now)]
@@ -0,0 +1,107 @@
+import pandas as pd
+
+from tools.help_funcs import external_data_cache
+from tools.help_funcs.external_data_cache import ExternalDataCache, YFINANCE_COLUMNS
+
+
+def _daily(start, end):
+    days = pd.date_range(start, end, freq="D", inclusive="left")
+    return pd.DataFrame({"timestamp": days, "Close": range(len(days))})
+
+
+class StandIn:
+    """local stand-in fetcher: records calls, returns daily rows or raises / returns nothing"""
+
+    def __init__(self, mode="ok"):
+        self.mode = mode
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        if self.mode == "empty":
+            return pd.DataFrame()
+        if self.mode == "fail":
+            raise ConnectionError("stand-in down")
+        return _daily(start, end)
+
+
+def test_empty_fetch_is_not_cached_as_covered(tmp_path):
+    cache = ExternalDataCache(root=tmp_path, offline=False)
+    empty, working = StandIn("empty"), StandIn()
+
+    assert cache.get("src", "SYM", "2024-01-01", "2024-01-11", empty).empty
+    result = cache.get("src", "SYM", "2024-01-01", "2024-01-11", working)
+
+    assert len(working.calls) == 1
+    assert len(result) == 10
+
+
+def test_partial_edge_failure_only_covers_the_fetched_edge(tmp_path):
+    cache = ExternalDataCache(root=tmp_path, offline=False)
+    cache.get("src", "SYM", "2024-01-10", "2024-01-20", StandIn())
+
+    # linke Kante fällt aus, rechte Kante liefert
+    calls = []
+
+    def mixed(start, end):
+        calls.append((start, end))
+        if start < pd.Timestamp("2024-01-10"):
+            raise ConnectionError("left edge down")
+        return _daily(start, end)
+
+    result = cache.get("src", "SYM", "2024-01-05", "2024-01-25", mixed)
+    assert len(calls) == 2
+    assert result["timestamp"].min() == pd.Timestamp("2024-01-10")
+    assert result["timestamp"].max() == pd.Timestamp("2024-01-24")
+
+    # nur die fehlgeschlagene Kante wird erneut geladen
+    retry = StandIn()
+    result = cache.get("src", "SYM", "2024-01-05", "2024-01-25", retry)
+    assert retry.calls == [(pd.Timestamp("2024-01-05"), pd.Timestamp("2024-01-10"))]
+    assert len(result) == 20
+
+
+def test_running_day_is_never_covered_but_refetched_only_after_ttl(tmp_path, monkeypatch):
+    cache = ExternalDataCache(root=tmp_path, offline=False)
+    today = pd.Timestamp.now(tz="UTC").normalize().tz_convert(None)
+    start, end = today - pd.Timedelta(days=3), today + pd.Timedelta(days=1)
+
+    first = StandIn()
+    assert len(cache.get("src", "SYM", start, end, first)) == 4
+    within_ttl = StandIn()
+    assert len(cache.get("src", "SYM", start, end, within_ttl)) == 4
+    assert within_ttl.calls == []
+
+    later = cache._now() + external_data_cache.RUNNING_DAY_TTL
+    monkeypatch.setattr(ExternalDataCache, "_now", staticmethod(lambda: later))
+    expired = StandIn()
+    cache.get("src", "SYM", start, end, expired)
+    assert expired.calls == [(today, end)]
+
+
+def test_coingecko_snapshot_is_stamped_with_the_utc_day(monkeypatch):
+    import requests
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"data": {"market_cap_percentage": {"btc": 52.0}, "total_market_cap": {"usd": 2.0e12}}}
+
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: Response())
+    frame = external_data_cache.coingecko_global_fetcher(None, None)
+    assert frame["timestamp"].iloc[0] == pd.Timestamp.now(tz="UTC").normalize().tz_convert(None)
+
+
+def test_offline_without_cache_keeps_ohlcv_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_data_cache, "_default_cache", ExternalDataCache(root=tmp_path, offline=True))
+    frame = external_data_cache.load_yfinance_daily("^VIX", "2024-01-01", "2024-02-01")
+    assert frame.empty
+    assert set(YFINANCE_COLUMNS) <= set(frame.columns)
+
+    from tools.indicators.VIX import VIX
+
+    vix = VIX(start="2024-01-01", end="2024-02-01")
+    assert vix.get_latest_value() is None
+    assert vix.is_market_in_fear() is False
@@ -0,0 +1,55 @@
+import os
+
+from tools.help_funcs.run_cache import CACHE_META_FILE, RunCache, data_fingerprint
+
+
+def _run_dir(tmp_path, name, size=100):
+    run_dir = tmp_path / "results" / name
+    run_dir.mkdir(parents=True)
+    (run_dir / "equity.csv").write_bytes(b"x" * size)
+    return run_dir
+
+
+def _age(cache, key, seconds_ago):
+    meta = cache.entry_dir(key) / CACHE_META_FILE
+    stamp = meta.stat().st_mtime - seconds_ago
+    os.utime(meta, (stamp, stamp))
+
+
+def test_store_evicts_least_recently_used_entries(tmp_path):
+    cache = RunCache(tmp_path / "cache", max_entries=2)
+    cache.store("a", _run_dir(tmp_path, "run0"), {"Sharpe": 1.0})
+    cache.store("b", _run_dir(tmp_path, "run1"), {"Sharpe": 2.0})
+    _age(cache, "a", 20)
+    _age(cache, "b", 10)
+
+    # Treffer auf a -> b ist jetzt der älteste Zugriff
+    cache.restore("a", tmp_path / "results" / "run2", "run2")
+    cache.store("c", _run_dir(tmp_path, "run3"), {"Sharpe": 3.0})
+
+    assert cache.has("a") and cache.has("c")
+    assert not cache.has("b")
+
+
+def test_size_bound_keeps_the_entry_just_stored(tmp_path):
+    cache = RunCache(tmp_path / "cache", max_bytes=150)
+    cache.store("a", _run_dir(tmp_path, "run0"), {})
+    _age(cache, "a", 10)
+    cache.store("b", _run_dir(tmp_path, "run1", size=200), {})
+
+    assert not cache.has("a")
+    assert cache.has("b")
+
+
+def test_declared_input_files_change_the_data_fingerprint(tmp_path):
+    catalog = tmp_path / "catalog"
+    catalog.mkdir()
+    feed = tmp_path / "listing_events.jsonl"
+    feed.write_text('{"seq": 1}\n', encoding="utf-8")
+
+    before = data_fingerprint(catalog, ["BTCUSDT"], input_files=[feed])
+    assert before != data_fingerprint(catalog, ["BTCUSDT"])
+
+    with open(feed, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2}\n')
+    assert data_fingerprint(catalog, ["BTCUSDT"], input_files=[feed]) != before
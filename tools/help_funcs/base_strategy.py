@@ -7,7 +7,21 @@ from core.visualizing.backtest_visualizer_prototype import BacktestDataCollector
 from typing import Any, Dict, Optional
 from nautilus_trader.model.identifiers import InstrumentId
 from nautilus_trader.model.currencies import USDT
-from  tools.help_funcs.help_funcs_strategy import extract_interval_from_bar_type
+from nautilus_trader.analysis import (
+    PortfolioAnalyzer, MaxWinner, AvgWinner, MinWinner, MinLoser, AvgLoser, MaxLoser, Expectancy, WinRate,
+    ReturnsVolatility, ReturnsAverage, ReturnsAverageLoss, ReturnsAverageWin, SharpeRatio, SortinoRatio,
+    ProfitFactor, RiskReturnRatio, LongRatio,
+)
+from tools.help_funcs.results_ledger import DrawdownTracker, metrics_from_stats, open_ledger
+
+
+def _default_statistics():
+    # gleiche Statistiken wie das Nautilus Portfolio registriert
+    return [
+        MaxWinner(), AvgWinner(), MinWinner(), MinLoser(), AvgLoser(), MaxLoser(), Expectancy(), WinRate(),
+        ReturnsVolatility(), ReturnsAverage(), ReturnsAverageLoss(), ReturnsAverageWin(), SharpeRatio(),
+        SortinoRatio(), ProfitFactor(), RiskReturnRatio(), LongRatio(),
+    ]
 
 
 class BaseStrategy(Strategy):
@@ -26,6 +40,8 @@ class BaseStrategy(Strategy):
         self.general_collector.initialise_logging_indicator("total_unrealized_pnl", 2)
         self.general_collector.initialise_logging_indicator("total_realized_pnl", 3)
         self.general_collector.initialise_logging_indicator("total_equity", 4)
+        # max drawdown läuft mit, statt total_equity.csv nach dem Sweep neu zu lesen
+        self.drawdown_tracker = DrawdownTracker()
 
     def _base_initialize_instrument_contexts(self):
         """builds instrument_dict from yaml config with bar types, collectors, and decimal conversions"""
@@ -213,6 +229,7 @@ class BaseStrategy(Strategy):
         self.general_collector.add_indicator(timestamp=ts, name="total_unrealized_pnl", value=total_unrealized)
         self.general_collector.add_indicator(timestamp=ts, name="total_realized_pnl", value=total_realized)
         self.general_collector.add_indicator(timestamp=ts, name="total_equity", value=total_equity)
+        self.drawdown_tracker.update(total_equity)
 
     def base_update_standard_indicators(self, timestamp, instrument_ctx, inst_id):
         collector = instrument_ctx["collector"]
@@ -250,14 +267,8 @@ class BaseStrategy(Strategy):
             # timeframe ist z. B. "1m" oder "5m"
 
             bar_types = current_instrument["bar_types"]
-            # Robust Ermittlung des letzten Timestamps über alle vorhandenen Bar-Listen
-            bars_dict = getattr(current_instrument["collector"], "bars", {}) or {}
-            last_timestamp = None
-            for bar_list in bars_dict.values():
-                if bar_list:
-                    ts = bar_list[-1].get("timestamp")
-                    if ts is not None and (last_timestamp is None or ts > last_timestamp):
-                        last_timestamp = ts
+            # Letzter Timestamp über alle Timeframes (bleibt auch nach Flushes erhalten)
+            last_timestamp = current_instrument["collector"].last_bar_timestamp()
             if last_timestamp is not None:
                 # Fallback falls keine Bars gesammelt wurden
                 
@@ -273,4 +284,37 @@ class BaseStrategy(Strategy):
         ts_now = self.clock.timestamp_ns()
         self._update_general_metrics(ts_now)
         general_msg = self.general_collector.save_data()
-        self.log.info(f"GENERAL: {general_msg}", color=LogColor.GREEN)
\ No newline at end of file
+        self.log.info(f"GENERAL: {general_msg}", color=LogColor.GREEN)
+        self._record_run_summary()
+
+    def _run_stats(self):
+        """pnl/returns stats like the BacktestResult, computed from the strategy's own cache + accounts"""
+        analyzer = PortfolioAnalyzer()
+        for statistic in _default_statistics():
+            analyzer.register_statistic(statistic)
+        stats_pnls, stats_returns = {}, {}
+        for venue in {inst_id.venue for inst_id in self.instrument_dict}:
+            account = self.portfolio.account(venue)
+            if account is None:
+                continue
+            # calculate_statistics setzt den Analyzer pro Venue zurück -> Stats direkt danach abgreifen
+            analyzer.calculate_statistics(account, self.cache.positions(venue=venue))
+            for currency in analyzer.currencies:
+                stats_pnls[currency.code] = analyzer.get_performance_stats_pnls(currency)
+            stats_returns.update(analyzer.get_performance_stats_returns())
+        return stats_pnls, stats_returns
+
+    def _record_run_summary(self) -> None:
+        """appends the run summary (stats, totals, streamed max drawdown) to the sweep's results ledger"""
+        ledger = open_ledger(self.general_collector.run_dir.parent)
+        if ledger is None:
+            return  # kein Sweep (z. B. live) -> nichts anlegen
+        try:
+            metrics = metrics_from_stats(*self._run_stats())
+        except Exception as e:
+            self.log.warning(f"Run stats for ledger failed: {e}")
+            metrics = {}
+        metrics["total_orders"] = len(self.cache.orders())
+        metrics["total_positions"] = len(self.cache.positions())
+        metrics["Max Drawdown"] = self.drawdown_tracker.value
+        ledger.record_metrics(self.run_id, metrics)
\ No newline at end of file
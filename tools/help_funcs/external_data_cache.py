@@ -0,0 +1,240 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+# offline mode: nie ins Netz, nur lokaler Cache (air-gapped backtest hosts)
+OFFLINE_ENV = "ALGOTRADER_OFFLINE"
+CACHE_DIR_ENV = "ALGOTRADER_EXTERNAL_CACHE"
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "DATA_STORAGE" / "external_cache"
+
+# base urls are overridable so the fetchers can be pointed at a local stand-in http service
+FNG_API_URL = os.environ.get("ALGOTRADER_FNG_URL", "https://api.alternative.me/fng/")
+COINGECKO_API_URL = os.environ.get("ALGOTRADER_COINGECKO_URL", "https://api.coingecko.com/api/v3")
+
+# laufender (unvollständiger) UTC-Tag wird nie als abgedeckt markiert -> höchstens alle RUNNING_DAY_TTL neu laden
+RUNNING_DAY_TTL = pd.Timedelta(minutes=30)
+
+Fetcher = Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame]
+
+
+def is_offline() -> bool:
+    return os.environ.get(OFFLINE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _to_ts(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_convert(None) if ts.tzinfo is not None else ts
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+class ExternalDataCache:
+    """
+    local parquet cache for external time series (yfinance, alternative.me, coingecko ...)
+    keyed by source/symbol, remembers the covered date range and only downloads the missing edges (top-up)
+    """
+
+    def __init__(self, root: Optional[Path] = None, offline: Optional[bool] = None,
+                 running_day_ttl: pd.Timedelta = RUNNING_DAY_TTL):
+        self.root = Path(root or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        self.offline = is_offline() if offline is None else offline
+        self.running_day_ttl = pd.Timedelta(running_day_ttl)
+
+    def _paths(self, source: str, symbol: str) -> Tuple[Path, Path]:
+        base = self.root / _safe_name(source)
+        name = _safe_name(symbol)
+        return base / f"{name}.parquet", base / f"{name}.json"
+
+    def _read(self, source: str, symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[Tuple[pd.Timestamp, pd.Timestamp]], Optional[pd.Timestamp]]:
+        """cached rows, covered range, last fetch of the running day"""
+        data_path, meta_path = self._paths(source, symbol)
+        if not data_path.exists() or not meta_path.exists():
+            return None, None, None
+        df = pd.read_parquet(data_path)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        running = meta.get("running_fetched_at")
+        return df, (pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])), (pd.Timestamp(running) if running else None)
+
+    def _write(self, source: str, symbol: str, df: pd.DataFrame, coverage: Tuple[pd.Timestamp, pd.Timestamp],
+               running_fetched_at: Optional[pd.Timestamp] = None) -> None:
+        data_path, meta_path = self._paths(source, symbol)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = data_path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, data_path)
+        meta = {"start": coverage[0].isoformat(), "end": coverage[1].isoformat(), "rows": len(df)}
+        if running_fetched_at is not None:
+            meta["running_fetched_at"] = running_fetched_at.isoformat()
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    @staticmethod
+    def _missing_ranges(start: pd.Timestamp, end: pd.Timestamp, coverage) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        if coverage is None:
+            return [(start, end)]
+        cov_start, cov_end = coverage
+        missing = []
+        if start < cov_start:
+            missing.append((start, cov_start))
+        if end > cov_end:
+            missing.append((cov_end, end))
+        return missing
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        if df is None or df.empty:
+            return pd.DataFrame(columns=["timestamp"])
+        if "timestamp" not in df.columns:
+            df = df.reset_index().rename(columns={df.index.name or "index": "timestamp"})
+        df = df.copy()
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True).dt.tz_convert(None)
+        return df
+
+    @staticmethod
+    def _last_complete_day() -> pd.Timestamp:
+        """coverage never goes past today 00:00 UTC, the running day's candle is still incomplete"""
+        return pd.Timestamp.now(tz="UTC").normalize().tz_convert(None)
+
+    @staticmethod
+    def _now() -> pd.Timestamp:
+        return pd.Timestamp.now(tz="UTC").tz_convert(None)
+
+    def get(self, source: str, symbol: str, start, end, fetcher: Fetcher, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        returns rows with start <= timestamp < end, downloading only what the cache does not cover yet
+        coverage only grows over edges whose download returned rows (empty result / error = miss, retried next time)
+        the running UTC day is never covered, it is fetched again at most once per running_day_ttl
+        columns: columns of the empty frame returned when nothing is available
+        """
+        start, end = _to_ts(start), _to_ts(end)
+        empty = pd.DataFrame(columns=list(dict.fromkeys(["timestamp", *(columns or [])])))
+        cached, coverage, running_fetched_at = self._read(source, symbol)
+        missing = self._missing_ranges(start, end, coverage)
+        cap = self._last_complete_day()
+
+        # nur der laufende Tag fehlt und wurde vor kurzem geladen -> aus dem Cache bedienen
+        if (missing and missing[-1][0] >= cap and running_fetched_at is not None
+                and running_fetched_at >= cap and self._now() - running_fetched_at < self.running_day_ttl):
+            missing = missing[:-1]
+
+        if missing and self.offline:
+            print(f"[CACHE] offline: {source}/{symbol} not cached for {missing[0][0].date()} - {missing[-1][1].date()}, using cache only")
+            missing = []
+
+        if missing:
+            frames = [cached] if cached is not None else []
+            new_coverage = coverage
+            fetched_rows = False
+            for miss_start, miss_end in missing:
+                try:
+                    fetched = self._normalize(fetcher(miss_start, miss_end))
+                except Exception as e:
+                    print(f"[CACHE] download failed for {source}/{symbol}: {e}")
+                    continue
+                no_rows = fetched.empty or not ((fetched["timestamp"] >= miss_start) & (fetched["timestamp"] < miss_end)).any()
+                if no_rows:
+                    print(f"[CACHE] {source}/{symbol}: no rows for {miss_start.date()} - {miss_end.date()}, not cached as covered")
+                    continue
+                frames.append(fetched)
+                fetched_rows = True
+                print(f"[CACHE] downloaded {source}/{symbol} {miss_start.date()} - {miss_end.date()}")
+                if miss_end > cap:
+                    running_fetched_at = self._now()
+                # nur zusammenhängende Abdeckung: linke Kante -> start, rechte Kante -> end (max. bis cap)
+                covered_end = min(miss_end, cap)
+                if new_coverage is None:
+                    new_coverage = (miss_start, covered_end) if covered_end > miss_start else None
+                elif miss_end <= new_coverage[0]:
+                    new_coverage = (miss_start, new_coverage[1])
+                elif covered_end > new_coverage[1]:
+                    new_coverage = (new_coverage[0], covered_end)
+            if fetched_rows:
+                frames = [f for f in frames if f is not None and not f.empty]
+                merged = pd.concat(frames, ignore_index=True) if frames else empty
+                if not merged.empty:
+                    merged = merged.drop_duplicates("timestamp", keep="last").sort_values("timestamp").reset_index(drop=True)
+                if new_coverage is None:
+                    # nur Zeilen des laufenden Tages -> Daten behalten, aber nichts als abgedeckt markieren
+                    new_coverage = (cap, cap)
+                self._write(source, symbol, merged, new_coverage, running_fetched_at)
+                cached = merged
+
+        if cached is None or cached.empty:
+            return empty
+        mask = (cached["timestamp"] >= start) & (cached["timestamp"] < end)
+        return cached.loc[mask].reset_index(drop=True)
+
+
+_default_cache: Optional[ExternalDataCache] = None
+
+
+def get_external_cache() -> ExternalDataCache:
+    """shared cache instance (root/offline from environment)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExternalDataCache()
+    return _default_cache
+
+
+def yfinance_fetcher(ticker: str) -> Fetcher:
+    def _fetch(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        import yfinance as yf
+        df = yf.download(ticker, start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d"), progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df.index.name = "timestamp"
+        return df.reset_index()
+    return _fetch
+
+
+YFINANCE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def load_yfinance_daily(ticker: str, start, end, cache: Optional[ExternalDataCache] = None) -> pd.DataFrame:
+    """daily OHLCV from yfinance through the local cache (empty frame keeps the OHLCV columns)"""
+    return (cache or get_external_cache()).get("yfinance", ticker, start, end, yfinance_fetcher(ticker),
+                                               columns=YFINANCE_COLUMNS)
+
+
+def fear_greed_fetcher(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    import requests
+    # api kennt nur "letzte N tage" -> limit bis zum gewünschten start
+    limit = max(1, (pd.Timestamp.now(tz="UTC").tz_convert(None).normalize() - start.normalize()).days + 1)
+    response = requests.get(FNG_API_URL, params={"limit": limit, "format": "json"}, timeout=10)
+    response.raise_for_status()
+    records = [
+        {
+            "timestamp": pd.to_datetime(int(item["timestamp"]), unit="s"),
+            "value": float(item["value"]),
+            "classification": item["value_classification"],
+        }
+        for item in response.json()["data"]
+    ]
+    return pd.DataFrame(records)
+
+
+def load_fear_greed(start, end, cache: Optional[ExternalDataCache] = None) -> pd.DataFrame:
+    return (cache or get_external_cache()).get("alternative_me", "fng", start, end, fear_greed_fetcher)
+
+
+def coingecko_global_fetcher(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    import requests
+    # nur ein aktueller snapshot -> wird als UTC-tageswert abgelegt, die historie wächst mit jedem tag im cache
+    response = requests.get(f"{COINGECKO_API_URL}/global", timeout=10)
+    response.raise_for_status()
+    data = response.json()["data"]
+    return pd.DataFrame([{
+        "timestamp": pd.Timestamp.now(tz="UTC").normalize().tz_convert(None),
+        "btc_dominance": float(data["market_cap_percentage"]["btc"]),
+        "total_market_cap": float(data["total_market_cap"]["usd"]),
+    }])
+
+
+def load_coingecko_global(start, end, cache: Optional[ExternalDataCache] = None) -> pd.DataFrame:
+    return (cache or get_external_cache()).get("coingecko", "global", start, end, coingecko_global_fetcher)
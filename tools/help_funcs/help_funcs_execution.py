@@ -17,10 +17,45 @@ from typing import Any, Dict, List
 
 from nautilus_trader.backtest.node import BacktestNode
 from nautilus_trader.backtest.config import BacktestDataConfig
+from nautilus_trader.persistence.catalog.types import CatalogDataResult
 from core.visualizing.dashboard1 import TradingDashboard
+from tools.help_funcs.results_ledger import ResultsLedger, metrics_from_stats
+from tools.help_funcs.trade_metrics import GLOBAL_TRADE_METRIC_KEYS, compute_trade_metrics, concat_trade_arrays, trade_arrays_from_frame
+from tools.help_funcs.quantstats_reports import daily_returns_from_equity_csv, cache_daily_returns, generate_reports_parallel
+
+class SharedDataBacktestNode(BacktestNode):
+    """
+    BacktestNode that reads every data config from the catalog once per sweep
+    all runs share the same data configs -> the decoded objects are handed to each engine instead of re-querying parquet
+    """
+
+    def __init__(self, configs):
+        super().__init__(configs)
+        self._data_cache: Dict[tuple, CatalogDataResult] = {}
+
+    def load_data_config(self, config: BacktestDataConfig, start=None, end=None) -> CatalogDataResult:
+        key = (config.id, str(start), str(end))
+        cached = self._data_cache.get(key)
+        if cached is None:
+            cached = super().load_data_config(config, start, end)
+            self._data_cache[key] = cached
+        else:
+            print(f"[SharedData] {len(cached.data):,} {getattr(cached.data_cls, '__name__', cached.data_cls)} events reused from memory")
+        # eigene Liste pro Engine, die Objekte selbst sind immutable
+        return CatalogDataResult(
+            data_cls=cached.data_cls,
+            data=list(cached.data),
+            instruments=cached.instruments,
+            client_id=cached.client_id,
+        )
+
+    def dispose(self):
+        self._data_cache.clear()
+        super().dispose()
+
 
 def run_backtest(run_config):
-    node = BacktestNode(run_config)
+    node = SharedDataBacktestNode(run_config)
     result = node.run()
     return result
 
@@ -51,7 +86,8 @@ def visualize_existing_run(data_path, TradingDashboard=None):
     print("starting dashboard for existing run...")
     visualizer.visualize(visualize_after_backtest=True)
 
-def extract_metrics(result, run_params, run_id):
+def extract_metrics(result, run_params, run_id, ledger=None):
+    """final metrics of a run from its BacktestResult, drawdown comes from the ledger entry written in on_stop"""
     metrics = {}
     result_obj = result[0] if isinstance(result, list) and len(result) > 0 else result
 
@@ -65,77 +101,20 @@ def extract_metrics(result, run_params, run_id):
     metrics["total_orders"] = getattr(result_obj, "total_orders", None)
     metrics["total_positions"] = getattr(result_obj, "total_positions", None)
 
-    def _zero_if_null(x):
-        # Covers: None, float NaN, numpy NaN, string "nan"/"NaN"
-        if x is None:
-            return 0
-        try:
-            if pd.isna(x):
-                return 0
-        except Exception:
-            pass
-        if isinstance(x, str) and x.strip().lower() == "nan":
-            return 0
-        return x
-
-    if hasattr(result_obj, "stats_pnls"):
-        for currency in ["USD", "USDT"]:
-            if currency in result_obj.stats_pnls:
-                for k, v in result_obj.stats_pnls[currency].items():
-                    metrics[f"USDT_{k}"] = _zero_if_null(v)
-                break
-
-    if hasattr(result_obj, "stats_returns"):
-        for k, v in result_obj.stats_returns.items():
-            metrics[k] = _zero_if_null(v)
-
-    max_dd = calculate_max_drawdown(run_id)
-    metrics["Max Drawdown"] = max_dd
+    metrics.update(metrics_from_stats(
+        getattr(result_obj, "stats_pnls", None),
+        getattr(result_obj, "stats_returns", None),
+    ))
 
-    return metrics
+    streamed = ledger.get(run_id) if ledger is not None else {}
+    if "Max Drawdown" in streamed:
+        metrics["Max Drawdown"] = streamed["Max Drawdown"]
+    else:
+        print(f"[WARN] {run_id}: no streamed Max Drawdown in the ledger (strategy without BaseStrategy.on_stop)")
 
-def calculate_max_drawdown(run_id):
-    """calculates max drawdown (0..1) from total_equity.csv for the given run_id"""
-    try:
-        root_dir = Path(__file__).resolve().parents[2]  # .../AlgorithmicTrader
-        equity_csv = (
-            root_dir
-            / "data"
-            / "DATA_STORAGE"
-            / "results"
-            / str(run_id)
-            / "general"
-            / "indicators"
-            / "total_equity.csv"
-        )
-        if not equity_csv.exists():
-            return 0.0
-        df = pd.read_csv(equity_csv, usecols=["timestamp", "value"])
-        if df.empty or "value" not in df.columns:
-            return 0.0
-        # Bereinigung
-        df = df.dropna(subset=["value"])
-        if df.empty:
-            return 0.0
-        # Nach Zeit sortieren (falls nötig)
-        if "timestamp" in df.columns:
-            df = df.sort_values("timestamp")
-        equity = pd.to_numeric(df["value"], errors="coerce").dropna()
-        if equity.empty:
-            return 0.0
-        # Laufendes Hoch
-        running_peak = equity.cummax()
-        # Vermeide Division durch 0 (FutureWarning Fix: statt fillna(method="ffill") -> ffill())
-        running_peak = running_peak.replace(0, pd.NA).ffill()
-        if running_peak.isna().all():
-            return 0.0
-        drawdowns = (running_peak - equity) / running_peak
-        max_dd = drawdowns.max()
-        if pd.isna(max_dd) or max_dd < 0:
-            return 0.0
-        return float(round(max_dd, 6))
-    except Exception:
-        return 0.0
+    if ledger is not None:
+        ledger.record_metrics(run_id, metrics, kind="result")
+    return metrics
 
 def run_backtest_and_visualize(run_config, data_path=None, TradingDashboard=None):
     # Backtest ausführenp
@@ -221,20 +200,14 @@ def show_quantstats_report_from_equity_csv(
     benchmark_symbol=None,
     output_path=None
 ):
-    # Equity-Kurve laden, Duplikate entfernen, Zeitstempel als Index
-    equity_df = pd.read_csv(equity_csv, usecols=["timestamp", "value"])
-    equity = pd.Series(equity_df["value"].values, index=pd.to_datetime(equity_df["timestamp"], unit="ns"))
-    equity = equity[~equity.index.duplicated(keep='first')]
-    # Fix: Resample auf Tagesbasis, damit QuantStats mit Yahoo-Finance-Benchmark funktioniert
-    equity_daily = equity.resample("1D").last().dropna()
-    returns = equity_daily.pct_change(fill_method=None).dropna()
+    returns = daily_returns_from_equity_csv(equity_csv)
 
     # Benchmark von Yahoo Finance laden und Duplikate entfernen
     benchmark = None
     if benchmark_symbol:
         benchmark = qs.utils.download_returns(benchmark_symbol)
         # Benchmark ebenfalls auf die gleichen Tage beschränken
-        benchmark = benchmark[equity_daily.index.min():equity_daily.index.max()]
+        benchmark = benchmark[returns.index.min():returns.index.max()]
 
     # Suppress noisy zero-variance KDE warning from quantstats/seaborn
 
@@ -254,106 +227,34 @@ def _clear_directory(path: Path):
                 pass
 
 
-def load_qs(run_dirs, run_ids, benchmark_symbol=None, open_browser=False):
-    """generates quantstats reports for all runs using existing total_equity.csv files"""
+def load_qs(run_dirs, run_ids, benchmark_symbol=None, open_browser=False, max_workers=None, generate_reports=True):
+    """caches daily returns for all runs and generates quantstats reports in a process pool"""
+    counts = cache_daily_returns(run_dirs)
+    print(f"[QuantStats] Daily returns cached: {counts['cached']} runs ({counts['missing']} without equity)")
+    if not generate_reports:
+        # reports are then built lazily from the dashboard
+        return {}
     print("Generating QuantStats reports...")
-    def _open_html(path_obj):
-        if not open_browser:
-            return
-        try:
-            import webbrowser
-            webbrowser.open_new_tab(path_obj.as_uri())
-        except Exception as e:
-            print(f"[QuantStats] Auto-open failed: {e}")
-    for run_dir, run_id in zip(run_dirs, run_ids):
-        try:
-            equity_csv = run_dir / "general" / "indicators" / "total_equity.csv"
-            if not equity_csv.exists():
-                print(f"[QuantStats] total_equity.csv missing for {run_id} -> skipped")
-                continue
-            out_file = run_dir / "quantstats_report.html"
-            show_quantstats_report_from_equity_csv(
-                equity_csv,
-                benchmark_symbol=benchmark_symbol,
-                output_path=out_file
-            )
-            print(f"[QuantStats] Report written: {out_file}")
-            _open_html(out_file)
-        except Exception as e:
-            print(f"[QuantStats] Failed for {run_id}: {e}")
+    written = generate_reports_parallel(run_dirs, run_ids, benchmark_symbol=benchmark_symbol, max_workers=max_workers)
+    if open_browser:
+        for out_file in written.values():
+            try:
+                webbrowser.open_new_tab(out_file.as_uri())
+            except Exception as e:
+                print(f"[QuantStats] Auto-open failed: {e}")
+    return written
+
+def _read_trades(trades_csv: Path):
+    """trades.csv -> (frame, kernel arrays) or (None, None) if missing/empty"""
+    if not trades_csv.exists():
+        return None, None
+    df_tr = pd.read_csv(trades_csv)
+    if df_tr.empty:
+        return None, None
+    return df_tr, trade_arrays_from_frame(df_tr)
 
 def compute_missing_trade_metrics(run_ids, results_dir: Path, instrument_ids):
     """creates trade_metrics.csv from trades.csv for each run/instrument if missing"""
-    import pandas as _pd
-    import re
-
-    def _parse_number(val):
-        if val is None:
-            return 0.0
-        if isinstance(val, (int, float)):
-            return float(val)
-        s = str(val)
-        m = re.search(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?', s)
-        return float(m.group(0)) if m else 0.0
-
-    def _max_streak(mask_iterable):
-        mx = cur = 0
-        for v in mask_iterable:
-            if v:
-                cur += 1
-                mx = cur if cur > mx else mx
-            else:
-                cur = 0
-        return mx
-
-    def _compute_metrics(df_tr: _pd.DataFrame) -> dict:
-        if df_tr.empty:
-            return {}
-        for col in ["realized_pnl", "fee", "tradesize"]:
-            if col in df_tr.columns:
-                df_tr[col] = df_tr[col].apply(_parse_number)
-            else:
-                df_tr[col] = 0.0
-        if "action" in df_tr.columns:
-            act = df_tr["action"].astype(str).str.upper()
-            is_long = act.eq("BUY")
-            is_short = act.eq("SHORT")
-        else:
-            is_long = df_tr["tradesize"] > 0
-            is_short = df_tr["tradesize"] < 0
-        sort_col = "closed_timestamp" if "closed_timestamp" in df_tr.columns else "timestamp"
-        if sort_col in df_tr.columns:
-            df_tr = df_tr.sort_values(sort_col)
-        realized = df_tr["realized_pnl"].astype(float)
-        fees = df_tr["fee"].astype(float)
-        wins = realized > 0
-        losses = realized < 0
-        n_trades = len(df_tr)
-        n_long = int(is_long.sum())
-        n_short = int(is_short.sum())
-        long_realized = realized[is_long]
-        short_realized = realized[is_short]
-        long_wins = (long_realized > 0).sum()
-        short_wins = (short_realized > 0).sum()
-        return {
-            "final_realized_pnl": float(realized.sum()),
-            "winrate": float(wins.sum() / n_trades) if n_trades else 0.0,
-            "winrate_long": float(long_wins / n_long) if n_long else 0.0,
-            "winrate_short": float(short_wins / n_short) if n_short else 0.0,
-            "pnl_long": float(long_realized.sum()),
-            "pnl_short": float(short_realized.sum()),
-            "n_trades": int(n_trades),
-            "n_long_trades": int(n_long),
-            "n_short_trades": int(n_short),
-            "avg_win": float(realized[wins].mean() if wins.any() else 0.0),
-            "avg_loss": float(realized[losses].mean() if losses.any() else 0.0),
-            "max_win": float(realized.max() if not realized.empty else 0.0),
-            "max_loss": float(realized.min() if not realized.empty else 0.0),
-            "max_consecutive_wins": int(_max_streak(wins)),
-            "max_consecutive_losses": int(_max_streak(losses)),
-            "commissions": float(fees.sum()),
-        }
-
     for run_id in run_ids:
         run_path = results_dir / run_id
         if not run_path.exists():
@@ -364,316 +265,78 @@ def compute_missing_trade_metrics(run_ids, results_dir: Path, instrument_ids):
             metrics_csv = inst_dir / "trade_metrics.csv"
             if metrics_csv.exists():
                 continue
-            if not trades_csv.exists():
-                continue
             try:
-                df_tr = _pd.read_csv(trades_csv)
-                if df_tr.empty:
+                _, arrays = _read_trades(trades_csv)
+                if arrays is None:
                     continue
-                metrics = _compute_metrics(df_tr)
-                if metrics:
-                    inst_dir.mkdir(parents=True, exist_ok=True)
-                    _pd.DataFrame([metrics]).to_csv(metrics_csv, index=False)
-                    print(f"[compute_missing_trade_metrics] Created {metrics_csv}")
+                pd.DataFrame([compute_trade_metrics(**arrays)]).to_csv(metrics_csv, index=False)
+                print(f"[compute_missing_trade_metrics] Created {metrics_csv}")
             except Exception as e:
                 print(f"[compute_missing_trade_metrics] Failed for {trades_csv}: {e}")
 
-def add_trade_metrics(run_ids, results_dir: Path, summary_csv_path: Path, instrument_ids):
-    """aggregates per-instrument trade_metrics into global per-run metrics and appends to all_backtest_results.csv"""
-    import pandas as _pd
-    import re  # NEW
-
-    # NEW: proactively create missing trade_metrics.csv first
-    compute_missing_trade_metrics(run_ids, results_dir, instrument_ids)
-
-    if not summary_csv_path.exists():
-        print("[add_trade_metrics] summary CSV not found -> skipped")
-        return
-
-    df_all = _pd.read_csv(summary_csv_path)
-
-    # Ensure run_id column exists
-    if "run_id" not in df_all.columns:
-        print("[add_trade_metrics] run_id column missing in summary CSV -> skipped")
-        return
-
-    # Pre-create column names
-    cols = [
-        "global_final_realized_pnl",
-        "global_winrate",
-        "global_winrate_long",
-        "global_winrate_short",
-        "global_pnl_long",
-        "global_pnl_short",
-        "global_long_short_ratio",
-        "global_n_trades",
-        "global_n_long_trades",
-        "global_n_short_trades",
-        "global_avg_win",
-        "global_avg_loss",
-        "global_max_win",
-        "global_max_loss",
-        "global_max_consecutive_wins",
-        "global_max_consecutive_losses",
-        "global_commissions",
-    ]
-    for c in cols:
-        if c not in df_all.columns:
-            df_all[c] = None
-
-    def _parse_number(val):
-        if val is None:
-            return 0.0
-        if isinstance(val, (int, float)):
-            return float(val)
-        s = str(val)
-        m = re.search(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?', s)
-        return float(m.group(0)) if m else 0.0
-
-    def _max_streak(mask_iterable):
-        mx = cur = 0
-        for v in mask_iterable:
-            if v:
-                cur += 1
-                if cur > mx:
-                    mx = cur
-            else:
-                cur = 0
-        return mx
-
-    def _compute_trade_metrics_from_trades(df_tr: _pd.DataFrame) -> dict:
-        if df_tr.empty:
-            return {}
-        # Normalize numeric columns
-        for col in ["realized_pnl", "fee", "tradesize"]:
-            if col in df_tr.columns:
-                df_tr[col] = df_tr[col].apply(_parse_number)
-            else:
-                df_tr[col] = 0.0
-
-        # Direction detection: prefer 'action' (LONG/SHORT); fallback to tradesize sign
-        if "action" in df_tr.columns:
-            actions = df_tr["action"].astype(str).str.upper()
-            is_long = actions.eq("LONG")
-            is_short = actions.eq("SHORT")
-        else:
-            is_long = df_tr["tradesize"] > 0
-            is_short = df_tr["tradesize"] < 0
-
-        # Sort for streak calculation (prefer closed_timestamp)
-        sort_col = "closed_timestamp" if "closed_timestamp" in df_tr.columns else "timestamp"
-        if sort_col in df_tr.columns:
-            df_tr = df_tr.sort_values(sort_col)
-
-        realized = df_tr["realized_pnl"].astype(float)
-        fees = df_tr["fee"].astype(float)
-
-        wins = realized > 0
-        losses = realized < 0
-
-        n_trades = len(df_tr)
-        n_long = int(is_long.sum())
-        n_short = int(is_short.sum())
-
-        long_realized = realized[is_long]
-        short_realized = realized[is_short]
-
-        long_wins = (long_realized > 0).sum()
-        short_wins = (short_realized > 0).sum()
-
-        metrics = {
-            "final_realized_pnl": float(realized.sum()),
-            "winrate": float((wins.sum() / n_trades) if n_trades else 0.0),
-            "winrate_long": float((long_wins / n_long) if n_long else 0.0),
-            "winrate_short": float((short_wins / n_short) if n_short else 0.0),
-            "pnl_long": float(long_realized.sum()),
-            "pnl_short": float(short_realized.sum()),
-            "n_trades": int(n_trades),
-            "n_long_trades": int(n_long),
-            "n_short_trades": int(n_short),
-            "avg_win": float(realized[wins].mean() if wins.any() else 0.0),
-            "avg_loss": float(realized[losses].mean() if losses.any() else 0.0),
-            "max_win": float(realized.max() if not realized.empty else 0.0),
-            "max_loss": float(realized.min() if not realized.empty else 0.0),
-            "max_consecutive_wins": int(_max_streak(wins)),
-            "max_consecutive_losses": int(_max_streak(losses)),
-            "commissions": float(fees.sum()),
-        }
-        return metrics
-
+def add_trade_metrics(run_ids, results_dir: Path, instrument_ids, ledger: ResultsLedger):
+    """
+    aggregates the trades of all instruments into global per-run metrics and records them in the ledger
+    (all_backtest_results.csv is exported from the ledger afterwards)
+    every trades.csv is read once: missing trade_metrics.csv, all_trades.csv and the global metrics come from the same arrays
+    """
+    global_rows = {}
     for run_id in run_ids:
         run_path = results_dir / run_id
         if not run_path.exists():
             continue
 
-        # Aggregators
-        total_final_realized = 0.0
-        total_pnl_long = 0.0
-        total_pnl_short = 0.0
-        total_trades = 0
-        total_long_trades = 0
-        total_short_trades = 0
-        total_commissions = 0.0
-
-        # For weighted averages
-        total_wins = 0.0      # count wins
-        total_long_wins = 0.0
-        total_short_wins = 0.0
-
-        sum_wins_amount = 0.0    # sum of winning trade PnL for avg_win computation
-        sum_losses_amount = 0.0  # sum of losing trade PnL for avg_loss computation (negative)
-        est_total_losses = 0.0   # count of losing trades (estimated, see note)
-
-        global_max_win = None
-        global_max_loss = None
-        global_max_consec_wins = 0
-        global_max_consec_losses = 0
-
-        any_file = False
-
-        # NEW: collect all trades across instruments for this run
         combined_trades_dfs = []
-
+        arrays_per_inst = []
+        metrics_per_inst = []
         for inst in instrument_ids:
             inst_str = str(inst)
             inst_dir = run_path / inst_str
-            metrics_csv = inst_dir / "trade_metrics.csv"
             trades_csv = inst_dir / "trades.csv"
-
-            # Collect trades for combined file & create metrics if missing
-            df_tr = None
-            if trades_csv.exists():
-                try:
-                    df_tr = _pd.read_csv(trades_csv)
-                    if not df_tr.empty:
-                        df_tr["instrument"] = inst_str
-                        combined_trades_dfs.append(df_tr.copy())
-                        if not metrics_csv.exists():
-                            metrics_dict = _compute_trade_metrics_from_trades(df_tr.copy())
-                            if metrics_dict:
-                                _pd.DataFrame([metrics_dict]).to_csv(metrics_csv, index=False)
-                                print(f"[add_trade_metrics] Created {metrics_csv}")
-                except Exception as e:
-                    print(f"[add_trade_metrics] Failed reading {trades_csv}: {e}")
-
-            if not metrics_csv.exists():
-                continue  # still no metrics -> skip
-
-            try:
-                dfm = _pd.read_csv(metrics_csv)
-                if dfm.empty:
-                    continue
-                row = dfm.iloc[0]
-                any_file = True
-
-                frp = float(row.get("final_realized_pnl", 0) or 0)
-                wl = float(row.get("winrate_long", 0) or 0)
-                ws = float(row.get("winrate_short", 0) or 0)
-                wr = float(row.get("winrate", 0) or 0)
-                pnl_l = float(row.get("pnl_long", 0) or 0)
-                pnl_s = float(row.get("pnl_short", 0) or 0)
-                n_tr = int(row.get("n_trades", 0) or 0)
-                n_long = int(row.get("n_long_trades", 0) or 0)
-                n_short = int(row.get("n_short_trades", 0) or 0)
-                avg_win_inst = float(row.get("avg_win", 0) or 0)
-                avg_loss_inst = float(row.get("avg_loss", 0) or 0)
-                max_win_inst = float(row.get("max_win", 0) or 0)
-                max_loss_inst = float(row.get("max_loss", 0) or 0)
-                cons_w = int(row.get("max_consecutive_wins", 0) or 0)
-                cons_l = int(row.get("max_consecutive_losses", 0) or 0)
-                commissions_inst = float(row.get("commissions", 0) or 0)
-
-                # Derived counts
-                wins_inst = wr * n_tr  # includes assumption: winrate = wins / total trades
-                # Loss count approximation (ignores breakeven trades if any)
-                losses_inst = max(n_tr - wins_inst, 0)
-
-                # Weighted sums
-                sum_wins_amount += avg_win_inst * wins_inst
-                sum_losses_amount += avg_loss_inst * losses_inst
-                total_wins += wins_inst
-                est_total_losses += losses_inst
-
-                # Long / short wins
-                long_wins_inst = wl * n_long if n_long > 0 else 0
-                short_wins_inst = ws * n_short if n_short > 0 else 0
-                total_long_wins += long_wins_inst
-                total_short_wins += short_wins_inst
-
-                # Simple sums
-                total_final_realized += frp
-                total_pnl_long += pnl_l
-                total_pnl_short += pnl_s
-                total_trades += n_tr
-                total_long_trades += n_long
-                total_short_trades += n_short
-                total_commissions += commissions_inst
-
-                # Extremes
-                if global_max_win is None or max_win_inst > global_max_win:
-                    global_max_win = max_win_inst
-                if global_max_loss is None or max_loss_inst < global_max_loss:
-                    global_max_loss = max_loss_inst
-                if cons_w > global_max_consec_wins:
-                    global_max_consec_wins = cons_w
-                if cons_l > global_max_consec_losses:
-                    global_max_consec_losses = cons_l
-
-            except Exception as e:
-                print(f"[add_trade_metrics] Failed reading {metrics_csv}: {e}")
-
-        # After instrument loop: write combined trades.csv for this run
-        if combined_trades_dfs:
+            metrics_csv = inst_dir / "trade_metrics.csv"
             try:
-                combined_trades = _pd.concat(combined_trades_dfs, ignore_index=True, sort=False)
-                if "timestamp" in combined_trades.columns:
-                    combined_trades = combined_trades.sort_values("timestamp")
-                out_path = run_path / "all_trades.csv"  # renamed
-                combined_trades.to_csv(out_path, index=False)
-                print(f"[add_trade_metrics] Combined trades saved: {out_path}")
+                df_tr, arrays = _read_trades(trades_csv)
             except Exception as e:
-                print(f"[add_trade_metrics] Failed writing combined trades for {run_id}: {e}")
+                print(f"[add_trade_metrics] Failed reading {trades_csv}: {e}")
+                continue
+            if arrays is None:
+                continue
+            df_tr["instrument"] = inst_str
+            combined_trades_dfs.append(df_tr)
+            arrays_per_inst.append(arrays)
+            metrics_per_inst.append(compute_trade_metrics(**arrays))
+            if not metrics_csv.exists():
+                pd.DataFrame([metrics_per_inst[-1]]).to_csv(metrics_csv, index=False)
+                print(f"[add_trade_metrics] Created {metrics_csv}")
 
-        if not any_file:
+        if not arrays_per_inst:
             continue
 
-        # Aggregated winrates (avoid division by zero)
-        global_winrate = (total_wins / total_trades) if total_trades > 0 else 0.0
-        global_winrate_long = (total_long_wins / total_long_trades) if total_long_trades > 0 else 0.0
-        global_winrate_short = (total_short_wins / total_short_trades) if total_short_trades > 0 else 0.0
-
-        # Weighted averages
-        global_avg_win = (sum_wins_amount / total_wins) if total_wins > 0 else 0.0
-        global_avg_loss = (sum_losses_amount / est_total_losses) if est_total_losses > 0 else 0.0
+        # write combined trades.csv for this run
+        try:
+            combined_trades = pd.concat(combined_trades_dfs, ignore_index=True, sort=False)
+            if "timestamp" in combined_trades.columns:
+                combined_trades = combined_trades.sort_values("timestamp")
+            out_path = run_path / "all_trades.csv"  # renamed
+            combined_trades.to_csv(out_path, index=False)
+            print(f"[add_trade_metrics] Combined trades saved: {out_path}")
+        except Exception as e:
+            print(f"[add_trade_metrics] Failed writing combined trades for {run_id}: {e}")
 
-        # Ratio
-        if total_short_trades > 0:
-            global_long_short_ratio = total_long_trades / total_short_trades
+        # exakt über alle Trades des Runs, Streaks bleiben das Maximum je Instrument
+        if len(arrays_per_inst) == 1:
+            metrics = metrics_per_inst[0]
         else:
-            global_long_short_ratio = float("inf") if total_long_trades > 0 else 0.0
-
-        # Assign into df_all row
-        mask = df_all["run_id"] == run_id
-        df_all.loc[mask, "global_final_realized_pnl"] = total_final_realized
-        df_all.loc[mask, "global_winrate"] = global_winrate
-        df_all.loc[mask, "global_winrate_long"] = global_winrate_long
-        df_all.loc[mask, "global_winrate_short"] = global_winrate_short
-        df_all.loc[mask, "global_pnl_long"] = total_pnl_long
-        df_all.loc[mask, "global_pnl_short"] = total_pnl_short
-        df_all.loc[mask, "global_long_short_ratio"] = global_long_short_ratio
-        df_all.loc[mask, "global_n_trades"] = total_trades
-        df_all.loc[mask, "global_n_long_trades"] = total_long_trades
-        df_all.loc[mask, "global_n_short_trades"] = total_short_trades
-        df_all.loc[mask, "global_avg_win"] = global_avg_win
-        df_all.loc[mask, "global_avg_loss"] = global_avg_loss
-        df_all.loc[mask, "global_max_win"] = global_max_win
-        df_all.loc[mask, "global_max_loss"] = global_max_loss
-        df_all.loc[mask, "global_max_consecutive_wins"] = global_max_consec_wins
-        df_all.loc[mask, "global_max_consecutive_losses"] = global_max_consec_losses
-        df_all.loc[mask, "global_commissions"] = total_commissions
-
-    df_all.to_csv(summary_csv_path, index=False)
-    print("[add_trade_metrics] Global trade metrics appended.")
+            metrics = compute_trade_metrics(**concat_trade_arrays(arrays_per_inst))
+            metrics["max_consecutive_wins"] = max(m["max_consecutive_wins"] for m in metrics_per_inst)
+            metrics["max_consecutive_losses"] = max(m["max_consecutive_losses"] for m in metrics_per_inst)
+        global_rows[run_id] = {f"global_{k}": metrics[k] for k in GLOBAL_TRADE_METRIC_KEYS}
+
+    # Runs ohne Trades bekommen leere Spalten, damit der Export immer alle global_* Spalten hat
+    empty_row = {f"global_{k}": None for k in GLOBAL_TRADE_METRIC_KEYS}
+    for run_id in run_ids:
+        ledger.record_metrics(run_id, global_rows.get(run_id, empty_row), kind="trade_metrics")
+    print("[add_trade_metrics] Global trade metrics recorded.")
 
 def _resolve_data_cls(value):
     """resolves data class from string format (module:Class or module.Class) or returns class if already imported"""
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 def create_tags(type=None, action=None, sl=None, tp=None):
     tags = []
     if sl is not None:
@@ -42,3 +44,9 @@ def extract_interval_from_bar_type(bar_type_str: str, instrument_id: str) -> str
     suffix = unit_map.get(unit, unit[0])  # Fallback: erster Buchstabe
     return f"{step}{suffix}"
 
+
+
+@lru_cache(maxsize=None)
+def interval_from_bar_type(bar_type) -> str:
+    """cached extract_interval_from_bar_type per BarType object (hashable), parses the string only once"""
+    return extract_interval_from_bar_type(str(bar_type), str(bar_type.instrument_id))
@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")  # kein GUI Backend in Worker-Prozessen
+except Exception:
+    pass
+
+DAILY_RETURNS_FILE = "daily_returns.parquet"
+
+
+def equity_csv_path(run_dir: Path) -> Path:
+    return Path(run_dir) / "general" / "indicators" / "total_equity.csv"
+
+
+def daily_returns_path(run_dir: Path) -> Path:
+    return Path(run_dir) / "general" / DAILY_RETURNS_FILE
+
+
+def report_path(run_dir: Path, benchmark_symbol: Optional[str] = None) -> Path:
+    suffix = f"_{benchmark_symbol.replace('^', '').replace('=', '')}" if benchmark_symbol else ""
+    return Path(run_dir) / f"quantstats_report{suffix}.html"
+
+
+def daily_returns_from_equity_csv(equity_csv: Path) -> pd.Series:
+    """loads total_equity.csv, resamples to daily closes and returns the daily pct returns"""
+    equity_df = pd.read_csv(equity_csv, usecols=["timestamp", "value"])
+    equity = pd.Series(equity_df["value"].values, index=pd.to_datetime(equity_df["timestamp"], unit="ns"))
+    equity = equity[~equity.index.duplicated(keep="first")]
+    # Resample auf Tagesbasis, damit QuantStats mit Yahoo-Finance-Benchmark funktioniert
+    equity_daily = equity.resample("1D").last().dropna()
+    returns = equity_daily.pct_change(fill_method=None).dropna()
+    returns.name = "returns"
+    return returns
+
+
+def load_daily_returns(run_dir: Path) -> Optional[pd.Series]:
+    """returns the cached daily returns of a run, (re)builds the cache when total_equity.csv is newer"""
+    equity_csv = equity_csv_path(run_dir)
+    cache = daily_returns_path(run_dir)
+    if cache.exists() and (not equity_csv.exists() or cache.stat().st_mtime >= equity_csv.stat().st_mtime):
+        return pd.read_parquet(cache)["returns"]
+    if not equity_csv.exists():
+        return None
+    returns = daily_returns_from_equity_csv(equity_csv)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    returns.to_frame().to_parquet(cache)
+    return returns
+
+
+def load_benchmark_returns(benchmark_symbol: Optional[str]) -> Optional[pd.Series]:
+    if not benchmark_symbol:
+        return None
+    import quantstats as qs
+    return qs.utils.download_returns(benchmark_symbol)
+
+
+def report_is_fresh(run_dir: Path, benchmark_symbol: Optional[str] = None) -> bool:
+    """true if the html report exists and is newer than the daily returns cache"""
+    out_file = report_path(run_dir, benchmark_symbol)
+    cache = daily_returns_path(run_dir)
+    return out_file.exists() and cache.exists() and out_file.stat().st_mtime >= cache.stat().st_mtime
+
+
+def write_quantstats_report(
+    run_dir: Path,
+    run_id: str,
+    benchmark: Optional[pd.Series] = None,
+    benchmark_symbol: Optional[str] = None,
+    force: bool = False,
+) -> Optional[Path]:
+    """
+    writes the html report of one run (reuses an existing report unless force), None if no equity data
+    benchmark None (download failed) -> report ohne Benchmark-Suffix, damit er nie als Benchmark-Report gecacht wird
+    """
+    import quantstats as qs
+
+    if not force and report_is_fresh(run_dir, benchmark_symbol):
+        return report_path(run_dir, benchmark_symbol)
+    if benchmark is None:
+        benchmark_symbol = None
+        if not force and report_is_fresh(run_dir):
+            return report_path(run_dir)
+    out_file = report_path(run_dir, benchmark_symbol)
+
+    returns = load_daily_returns(run_dir)
+    if returns is None or returns.empty:
+        return None
+    if benchmark is not None:
+        # Benchmark auf die gleichen Tage beschränken
+        benchmark = benchmark[returns.index.min():returns.index.max()]
+    qs.reports.html(returns, benchmark=benchmark, output=str(out_file), title=f"QuantStats Report - {run_id}")
+    return out_file
+
+
+def _report_worker(run_dir: str, run_id: str, benchmark, benchmark_symbol, force: bool):
+    # top-level function so it can be pickled into the process pool
+    return run_id, write_quantstats_report(Path(run_dir), run_id, benchmark, benchmark_symbol, force)
+
+
+def cache_daily_returns(run_dirs: Sequence[Path]) -> Dict[str, int]:
+    """builds the daily returns cache for every run (cheap, done right after the sweep)"""
+    counts = {"cached": 0, "missing": 0}
+    for run_dir in run_dirs:
+        try:
+            returns = load_daily_returns(run_dir)
+            counts["cached" if returns is not None else "missing"] += 1
+        except Exception as e:
+            counts["missing"] += 1
+            print(f"[QuantStats] Daily returns failed for {Path(run_dir).name}: {e}")
+    return counts
+
+
+def generate_reports_parallel(
+    run_dirs: Sequence[Path],
+    run_ids: Sequence[str],
+    benchmark_symbol: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Path]:
+    """generates quantstats reports for many runs in a process pool, benchmark is downloaded only once"""
+    benchmark = None
+    if benchmark_symbol:
+        try:
+            benchmark = load_benchmark_returns(benchmark_symbol)
+        except Exception as e:
+            print(f"[QuantStats] Benchmark {benchmark_symbol} unavailable: {e}")
+    if benchmark is None:
+        benchmark_symbol = None
+
+    max_workers = max_workers or max(1, min(len(run_ids), (os.cpu_count() or 2) - 1))
+    written: Dict[str, Path] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_report_worker, str(run_dir), run_id, benchmark, benchmark_symbol, force)
+            for run_dir, run_id in zip(run_dirs, run_ids)
+        ]
+        for fut in as_completed(futures):
+            try:
+                run_id, out_file = fut.result()
+            except Exception as e:
+                print(f"[QuantStats] Report failed: {e}")
+                continue
+            if out_file is None:
+                print(f"[QuantStats] total_equity.csv missing for {run_id} -> skipped")
+                continue
+            written[run_id] = out_file
+            print(f"[QuantStats] Report written: {out_file}")
+    return written
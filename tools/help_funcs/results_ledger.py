@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+LEDGER_FILE = "results_ledger.sqlite"
+
+
+def _zero_if_null(x):
+    # Covers: None, float NaN, numpy NaN, string "nan"/"NaN"
+    if x is None:
+        return 0
+    try:
+        if pd.isna(x):
+            return 0
+    except Exception:
+        pass
+    if isinstance(x, str) and x.strip().lower() == "nan":
+        return 0
+    return x
+
+
+def metrics_from_stats(stats_pnls: Optional[Dict[str, Dict[str, Any]]], stats_returns: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """flattens nautilus pnl/returns stats the same way for the strategy (on_stop) and the post-run result"""
+    metrics = {}
+    if stats_pnls:
+        for currency in ["USD", "USDT"]:
+            if currency in stats_pnls:
+                for k, v in stats_pnls[currency].items():
+                    metrics[f"USDT_{k}"] = _zero_if_null(v)
+                break
+    if stats_returns:
+        for k, v in stats_returns.items():
+            metrics[k] = _zero_if_null(v)
+    return metrics
+
+
+class DrawdownTracker:
+    """running peak / max drawdown (0..1) over a streamed equity curve"""
+
+    def __init__(self):
+        self.peak = None
+        self.max_drawdown = 0.0
+
+    def update(self, equity: float) -> None:
+        if equity is None or equity != equity:
+            return
+        if self.peak is None or equity > self.peak:
+            self.peak = equity
+        if self.peak and self.peak > 0:
+            dd = (self.peak - equity) / self.peak
+            if dd > self.max_drawdown:
+                self.max_drawdown = dd
+
+    @property
+    def value(self) -> float:
+        return float(round(self.max_drawdown, 6))
+
+
+class ResultsLedger:
+    """
+    append-only sqlite ledger of a sweep (results/results_ledger.sqlite)
+    - run_backtest registers the params of each run up front
+    - every strategy appends its metrics in on_stop, so partial sweeps can be read while it runs
+    - later entries of a run override earlier keys (e.g. the final BacktestResult)
+    """
+
+    def __init__(self, results_dir: Path):
+        self.path = Path(results_dir) / LEDGER_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "seq INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, kind TEXT NOT NULL, "
+                    "written_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_run ON entries (run_id)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL: dashboard kann lesen während der Sweep schreibt
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def append(self, run_id: str, kind: str, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, default=str)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO entries (run_id, kind, written_at, payload) VALUES (?, ?, ?, ?)",
+                    (str(run_id), kind, time.time(), data),
+                )
+        finally:
+            conn.close()
+
+    def register_run(self, run_id: str, run_params: Dict[str, Any]) -> None:
+        self.append(run_id, "params", dict(run_params))
+
+    def record_metrics(self, run_id: str, metrics: Dict[str, Any], kind: str = "metrics") -> None:
+        self.append(run_id, kind, metrics)
+
+    def _rows(self, run_id: Optional[str] = None):
+        conn = self._connect()
+        try:
+            if run_id is None:
+                return conn.execute("SELECT run_id, kind, payload FROM entries ORDER BY seq").fetchall()
+            return conn.execute(
+                "SELECT run_id, kind, payload FROM entries WHERE run_id = ? ORDER BY seq", (str(run_id),)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def runs(self, finished_only: bool = True, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """one merged record per run in registration order (params first, then run_id and metrics)"""
+        rows = self._rows(run_id)
+        merged: Dict[str, Dict[str, Any]] = {}
+        finished = set()
+        for run_id, kind, payload in rows:
+            record = merged.setdefault(run_id, {})
+            record.update(json.loads(payload))
+            record.setdefault("run_id", run_id)
+            if kind != "params":
+                finished.add(run_id)
+        return [rec for rid, rec in merged.items() if not finished_only or rid in finished]
+
+    def get(self, run_id: str) -> Dict[str, Any]:
+        records = self.runs(finished_only=False, run_id=run_id)
+        return records[0] if records else {}
+
+    def to_frame(self, finished_only: bool = True) -> pd.DataFrame:
+        return pd.DataFrame(self.runs(finished_only=finished_only))
+
+    def export_csv(self, csv_path: Path) -> pd.DataFrame:
+        df = self.to_frame()
+        df.to_csv(csv_path, index=False)
+        return df
+
+
+def open_ledger(results_dir: Path) -> Optional[ResultsLedger]:
+    """existing ledger of a results dir or None (readers must not create one)"""
+    if not (Path(results_dir) / LEDGER_FILE).exists():
+        return None
+    return ResultsLedger(results_dir)
@@ -0,0 +1,184 @@
+from collections import deque
+from typing import Optional
+
+
+class RollingSum:
+    """fixed-size rolling sum with O(1) updates (deque + running total)"""
+
+    def __init__(self, window: int, resync_every: Optional[int] = None):
+        if window <= 0:
+            raise ValueError(f"window must be > 0, got {window}")
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        # periodically re-sum to keep floating point drift from add/subtract bounded
+        self.resync_every = resync_every if resync_every is not None else window * 64
+        self._updates_since_resync = 0
+
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.resync_every:
+            self.total = float(sum(self.values))
+            self._updates_since_resync = 0
+        return self.total
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / len(self.values) if self.values else None
+
+    def reset(self) -> None:
+        self.values.clear()
+        self.total = 0.0
+        self._updates_since_resync = 0
+
+
+def _is_valid(value) -> bool:
+    return value is not None and value == value and value not in (float("inf"), float("-inf"))
+
+
+class RollingMoments:
+    """
+    rolling mean / sample variance over a fixed window (welford with eviction)
+    None/NaN/inf values occupy a slot but are not accumulated, `invalid_count` tells how many are in the window
+    """
+
+    def __init__(self, window: int, resync_every: Optional[int] = None):
+        if window <= 0:
+            raise ValueError(f"window must be > 0, got {window}")
+        self.window = window
+        self.values = deque()
+        self.n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.invalid_count = 0
+        self.resync_every = resync_every if resync_every is not None else window * 64
+        self._updates_since_resync = 0
+
+    def update(self, value) -> None:
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(value)
+        self._add(value)
+
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.resync_every:
+            self._resync()
+
+    def _add(self, x) -> None:
+        if not _is_valid(x):
+            self.invalid_count += 1
+            return
+        self.n += 1
+        delta = x - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (x - self._mean)
+
+    def _remove(self, x) -> None:
+        if not _is_valid(x):
+            self.invalid_count -= 1
+            return
+        if self.n <= 1:
+            self.n = 0
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        old_mean = self._mean
+        self.n -= 1
+        self._mean = (old_mean * (self.n + 1) - x) / self.n
+        self._m2 -= (x - self._mean) * (x - old_mean)
+        if self._m2 < 0.0:
+            self._m2 = 0.0
+
+    def _resync(self) -> None:
+        values = list(self.values)
+        self.n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.invalid_count = 0
+        for v in values:
+            self._add(v)
+        self._updates_since_resync = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """sample variance (ddof=1), 0.0 with fewer than 2 values"""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+    def reset(self) -> None:
+        self.values.clear()
+        self.n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.invalid_count = 0
+        self._updates_since_resync = 0
+
+
+class RollingExtremes:
+    """rolling max / min over a fixed window via monotonic deques (amortized O(1) per update)"""
+
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError(f"window must be > 0, got {window}")
+        self.window = window
+        self._index = 0
+        self._max = deque()  # (index, value), values decreasing
+        self._min = deque()  # (index, value), values increasing
+
+    def update(self, value: float) -> None:
+        i = self._index
+        self._index += 1
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((i, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((i, value))
+
+        oldest = i - self.window
+        if self._max[0][0] <= oldest:
+            self._max.popleft()
+        if self._min[0][0] <= oldest:
+            self._min.popleft()
+
+    @property
+    def count(self) -> int:
+        return min(self._index, self.window)
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    def reset(self) -> None:
+        self._index = 0
+        self._max.clear()
+        self._min.clear()
@@ -0,0 +1,253 @@
+import ast
+import hashlib
+import importlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_RUN_CACHE_DIR = PROJECT_ROOT / "data" / "DATA_STORAGE" / "run_cache"
+CACHE_META_FILE = "cache_meta.json"
+
+# LRU bound: Zugriffszeit = mtime von cache_meta.json (restore touched sie), älteste Einträge fliegen zuerst
+RUN_CACHE_MAX_ENTRIES = 2000
+RUN_CACHE_MAX_BYTES = 20 * 1024 ** 3
+
+# strategy modules list extra input files outside the catalog here (CSV listen, event logs ...)
+RUN_CACHE_INPUTS_ATTR = "RUN_CACHE_INPUTS"
+
+# keys der run config die das Ergebnis nicht beeinflussen (nur Ausgabe / Anzeige)
+NON_RESULT_KEYS = {"run_id", "visualize", "load_qs", "qs_bench", "reuse_cached_runs"}
+
+
+def _sha256(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _file_entries(root: Path, directory: Path):
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            path = Path(dirpath) / name
+            st = path.stat()
+            yield path.relative_to(root).as_posix(), f"{path.relative_to(root).as_posix()}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def _tree_bytes(directory: Path) -> int:
+    return sum((Path(dirpath) / name).stat().st_size for dirpath, _, names in os.walk(directory) for name in names)
+
+
+def _input_entries(input_files: Iterable[Any]) -> List[str]:
+    entries = []
+    for path in input_files:
+        path = Path(path).resolve()
+        if not path.is_file():
+            entries.append(f"input|missing:{path}")
+            continue
+        st = path.stat()
+        entries.append(f"input|{path}|{st.st_size}|{st.st_mtime_ns}")
+    return entries
+
+
+def strategy_input_files(strategy_path: str) -> List[Path]:
+    """extra input files the strategy module declares in RUN_CACHE_INPUTS (empty if it declares none)"""
+    module = importlib.import_module(str(strategy_path).split(":", 1)[0])
+    return [Path(p) for p in getattr(module, RUN_CACHE_INPUTS_ATTR, ())]
+
+
+def data_fingerprint(catalog_path: str, identifiers: Iterable[str], data_configs: Optional[Iterable[Any]] = None,
+                     input_files: Optional[Iterable[Any]] = None) -> str:
+    """
+    cheap fingerprint of the catalog files a sweep reads (relative path, size, mtime)
+    - data_configs: per config its data/<data type> folder (custom data incl.), files matching the config's
+      instrument ids / bar types, the whole folder if none match (custom data mit eigenem identifier)
+    - without data_configs: files whose path contains one of the identifiers; whole catalog if nothing matches
+    - input_files: files read outside the catalog (see strategy_input_files), always part of the fingerprint
+    """
+    from nautilus_trader.persistence.funcs import class_to_filename, urisafe_identifier
+
+    inputs = _input_entries(input_files or [])
+    root = Path(catalog_path)
+    if not root.exists():
+        return _sha256("\n".join([f"missing:{root}"] + sorted(inputs)))
+    idents = [str(i) for i in identifiers if i]
+    entries = set()
+    for config in data_configs or []:
+        config_root = Path(getattr(config, "catalog_path", None) or root)
+        data_type = getattr(config, "data_type", None)
+        if data_type is None:
+            continue
+        directory = config_root / "data" / class_to_filename(data_type)
+        if not directory.exists():
+            entries.add(f"missing:{directory}")
+            continue
+        config_idents = [str(i) for i in list(config.instrument_ids or []) + list(config.bar_types or [])]
+        if config.instrument_id:
+            config_idents.append(str(config.instrument_id))
+        config_idents += [urisafe_identifier(i) for i in config_idents]
+        files = list(_file_entries(config_root, directory))
+        matched = [entry for rel, entry in files if any(ident in rel for ident in config_idents)]
+        entries.update(f"{config_root}|{entry}" for entry in (matched or [entry for _, entry in files]))
+    if data_configs:
+        return _sha256("\n".join(sorted(entries) + sorted(inputs)))
+    fallback = []
+    for rel, entry in _file_entries(root, root):
+        fallback.append(entry)
+        if any(ident in rel for ident in idents):
+            entries.add(entry)
+    return _sha256("\n".join(sorted(entries or fallback) + sorted(inputs)))
+
+
+def _module_file(name: str) -> Optional[Path]:
+    """source file of a project module (PROJECT_ROOT), None for stdlib / site-packages"""
+    base = PROJECT_ROOT.joinpath(*name.split("."))
+    for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _imported_modules(path: Path, module_name: str) -> List[str]:
+    """module names imported anywhere in the file (auch lokale Imports in Funktionen)"""
+    try:
+        tree = ast.parse(path.read_bytes())
+    except (SyntaxError, ValueError):
+        return []
+    package = module_name if path.name == "__init__.py" else module_name.rpartition(".")[0]
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split(".") if package else []
+                parts = parts[:len(parts) - (node.level - 1)] if node.level > 1 else parts
+                base = ".".join(parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                names.append(base)
+                # from pkg import submodule
+                names += [f"{base}.{alias.name}" for alias in node.names if alias.name != "*"]
+    return names
+
+
+def project_sources(module_name: str) -> Dict[str, Path]:
+    """module -> file for the module and all project modules it imports transitively (incl. package __init__)"""
+    found: Dict[str, Path] = {}
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        path = _module_file(name)
+        if path is None:
+            continue
+        found[name] = path
+        pending += _imported_modules(path, name)
+        # Eltern-Pakete werden beim Import mit ausgeführt
+        parent = name.rpartition(".")[0]
+        if parent:
+            pending.append(parent)
+    return found
+
+
+def code_fingerprint(strategy_path: str) -> str:
+    """hash of the strategy module and every project module it imports (tools/, core/, custom data ...)"""
+    module_name = str(strategy_path).split(":", 1)[0]
+    sources = project_sources(module_name)
+    if module_name not in sources:
+        return _sha256(f"unresolved:{strategy_path}")
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(name.encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(sources[name].read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def run_cache_key(run_config_dict: Dict[str, Any], data_fp: str, code_fp: str) -> str:
+    """content address of a run: resolved run config (without run_id) + data + strategy code"""
+    config = {k: v for k, v in run_config_dict.items() if k not in NON_RESULT_KEYS}
+    payload = json.dumps({"config": config, "data": data_fp, "code": code_fp}, sort_keys=True, default=str)
+    return _sha256(payload)[:20]
+
+
+class RunCache:
+    """
+    content-addressed store of finished runs (data/DATA_STORAGE/run_cache/<key>/)
+    results/ bleibt die Ansicht des aktuellen Sweeps: Treffer werden nach results/runN kopiert statt neu gerechnet
+    bounded LRU: after every store the least recently used entries are evicted beyond max_entries / max_bytes
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_entries: int = RUN_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RUN_CACHE_MAX_BYTES):
+        self.root = Path(root or DEFAULT_RUN_CACHE_DIR)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def entry_dir(self, key: str) -> Path:
+        return self.root / key
+
+    def has(self, key: str) -> bool:
+        return (self.entry_dir(key) / CACHE_META_FILE).exists()
+
+    def store(self, key: str, run_dir: Path, metrics: Dict[str, Any]) -> None:
+        """copies a finished run dir into the cache, meta file is written last (marks the entry complete)"""
+        target = self.entry_dir(key)
+        tmp = target.with_name(f"{key}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.copytree(run_dir, tmp)
+        meta = {"metrics": metrics, "bytes": _tree_bytes(tmp)}
+        (tmp / CACHE_META_FILE).write_text(json.dumps(meta, default=str), encoding="utf-8")
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        self.evict(keep=key)
+
+    def restore(self, key: str, run_dir: Path, run_id: str) -> Dict[str, Any]:
+        """copies a cached run into run_dir under the new run_id and returns its metrics (run_config.yaml is rewritten by the caller)"""
+        source = self.entry_dir(key)
+        meta_path = source / CACHE_META_FILE
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        os.utime(meta_path)  # LRU: Treffer zählt als Zugriff
+        shutil.rmtree(run_dir, ignore_errors=True)
+        shutil.copytree(source, run_dir, ignore=shutil.ignore_patterns(CACHE_META_FILE))
+        metrics = dict(meta["metrics"])
+        metrics["run_id"] = run_id
+        pd.DataFrame([metrics]).to_csv(run_dir / "performance_metrics.csv", index=False)
+        return metrics
+
+    def _entries(self) -> List[tuple]:
+        """(last access, key, bytes) of every complete entry, oldest first"""
+        if not self.root.exists():
+            return []
+        entries = []
+        for entry in self.root.iterdir():
+            meta_path = entry / CACHE_META_FILE
+            if not meta_path.is_file():
+                continue
+            try:
+                size = json.loads(meta_path.read_text(encoding="utf-8"))["bytes"]
+            except (KeyError, ValueError):
+                size = _tree_bytes(entry)  # Einträge von vor dem LRU-Bound
+            entries.append((meta_path.stat().st_mtime_ns, entry.name, size))
+        return sorted(entries)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """removes least recently used entries until the cache fits max_entries / max_bytes, returns their keys"""
+        entries = self._entries()
+        count, total = len(entries), sum(size for _, _, size in entries)
+        evicted = []
+        for _, key, size in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            evicted.append(key)
+            count, total = count - 1, total - size
+        if evicted:
+            print(f"[RunCache] evicted {len(evicted)} least recently used entries")
+        return evicted
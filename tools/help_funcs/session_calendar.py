@@ -0,0 +1,43 @@
+from typing import Tuple
+
+NS_PER_SECOND = 1_000_000_000
+SECONDS_PER_DAY = 86_400
+NS_PER_DAY = SECONDS_PER_DAY * NS_PER_SECOND
+# 1970-01-01 was a thursday -> shift by 3 days so weeks start on monday (iso)
+_EPOCH_WEEKDAY_OFFSET = 3
+
+
+class SessionCalendar:
+    """
+    answers rth / day / week questions directly on ts_event nanoseconds (utc) with integer math
+    rth window is inclusive on both ends and compared at second resolution (same as datetime.time compare)
+    """
+
+    def __init__(self, rth_start: Tuple[int, int] = (14, 30), rth_end: Tuple[int, int] = (21, 0)):
+        self.rth_start = tuple(rth_start)
+        self.rth_end = tuple(rth_end)
+        self.rth_start_sec = rth_start[0] * 3600 + rth_start[1] * 60
+        self.rth_end_sec = rth_end[0] * 3600 + rth_end[1] * 60
+
+    @staticmethod
+    def second_of_day(ts_ns: int) -> int:
+        return (ts_ns // NS_PER_SECOND) % SECONDS_PER_DAY
+
+    @staticmethod
+    def day_index(ts_ns: int) -> int:
+        """days since epoch, changes exactly at utc midnight"""
+        return ts_ns // NS_PER_DAY
+
+    @staticmethod
+    def week_index(ts_ns: int) -> int:
+        """iso weeks since epoch, changes exactly at monday 00:00 utc"""
+        return (ts_ns // NS_PER_DAY + _EPOCH_WEEKDAY_OFFSET) // 7
+
+    @staticmethod
+    def weekday(ts_ns: int) -> int:
+        """0 = monday ... 6 = sunday"""
+        return (ts_ns // NS_PER_DAY + _EPOCH_WEEKDAY_OFFSET) % 7
+
+    def is_rth(self, ts_ns: int) -> bool:
+        sec = (ts_ns // NS_PER_SECOND) % SECONDS_PER_DAY
+        return self.rth_start_sec <= sec <= self.rth_end_sec
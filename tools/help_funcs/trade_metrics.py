@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+# erste Zahl in Strings wie "12.34 USDT" / "-0.5 USD"
+_NUMBER_PATTERN = r'([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)'
+
+TRADE_METRIC_KEYS = [
+    "final_realized_pnl",
+    "winrate",
+    "winrate_long",
+    "winrate_short",
+    "pnl_long",
+    "pnl_short",
+    "long_short_ratio",
+    "n_trades",
+    "n_long_trades",
+    "n_short_trades",
+    "avg_win",
+    "avg_loss",
+    "max_win",
+    "max_loss",
+    "max_consecutive_wins",
+    "max_consecutive_losses",
+    "commissions",
+    "expectancy",
+    "profit_factor",
+    "avg_r_multiple",
+    "avg_holding_time_s",
+    "median_holding_time_s",
+    "max_holding_time_s",
+]
+
+# global_* Spalten in all_backtest_results.csv: gleiche Keys, ohne die Haltedauer-Verteilung
+GLOBAL_TRADE_METRIC_KEYS = [k for k in TRADE_METRIC_KEYS if k not in ("median_holding_time_s", "max_holding_time_s")]
+
+
+def _optional_float(values) -> np.ndarray:
+    """float array from numbers / Money strings ("12.5 USDT"), missing or unparseable -> NaN (vectorized, no per-cell regex)"""
+    s = pd.Series(values)
+    if s.dtype == object:
+        # Money-Format "<zahl> <währung>": Zahl vor dem Leerzeichen, Regex nur für den Rest
+        out = pd.to_numeric(s.astype(str).str.partition(" ")[0], errors="coerce")
+    else:
+        out = pd.to_numeric(s, errors="coerce")
+    todo = out.isna() & s.notna()
+    if todo.any():
+        extracted = s[todo].astype(str).str.extract(_NUMBER_PATTERN, expand=False)
+        out[todo] = pd.to_numeric(extracted, errors="coerce")
+    return out.to_numpy(dtype="float64")
+
+
+def parse_numeric(values) -> np.ndarray:
+    """like _optional_float, missing -> 0.0 (pnl, fees)"""
+    out = _optional_float(values)
+    out[np.isnan(out)] = 0.0
+    return out
+
+
+def _timestamps_ns(values) -> np.ndarray:
+    s = pd.Series(values)
+    numeric = pd.to_numeric(s, errors="coerce")
+    if numeric.notna().sum() >= s.notna().sum():
+        return numeric.to_numpy(dtype="float64")
+    ts = pd.to_datetime(s, errors="coerce", utc=True)
+    return np.where(ts.isna(), np.nan, ts.to_numpy().view("int64").astype("float64"))
+
+
+def _direction(actions=None, qty=None, n=0) -> np.ndarray:
+    """+1 long / -1 short / 0 unknown; prefers the action column (BUY/LONG, SHORT/SELL), else sign of qty"""
+    if actions is not None:
+        act = pd.Series(actions).astype(str).str.upper()
+        return np.where(act.isin(["BUY", "LONG"]), 1, np.where(act.isin(["SHORT", "SELL"]), -1, 0)).astype("int8")
+    if qty is not None:
+        return np.sign(np.nan_to_num(np.asarray(qty, dtype="float64"))).astype("int8")
+    return np.zeros(n, dtype="int8")
+
+
+def max_streak(mask: np.ndarray) -> int:
+    """longest run of True values"""
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max())
+
+
+def _ratio(num: float, den: float) -> float:
+    if den > 0:
+        return float(num / den)
+    return float("inf") if num > 0 else 0.0
+
+
+def compute_trade_metrics(
+    realized_pnl,
+    fees=None,
+    direction=None,
+    entry_price=None,
+    exit_price=None,
+    qty=None,
+    sl=None,
+    entry_ts=None,
+    exit_ts=None,
+) -> dict:
+    """
+    trade metrics kernel on typed arrays (one row per trade)
+    - streaks follow exit_ts order (open trades last), otherwise the given order
+    - R-multiple = direction * (exit - entry) / |entry - sl|, only for closed trades with a stop
+    - holding times in seconds from ns timestamps
+    """
+    pnl = np.asarray(realized_pnl, dtype="float64")
+    n = len(pnl)
+    if n == 0:
+        return {k: 0 if k.startswith(("n_", "max_consecutive")) else 0.0 for k in TRADE_METRIC_KEYS}
+
+    fees = np.zeros(n) if fees is None else np.asarray(fees, dtype="float64")
+    if direction is None:
+        direction = _direction(qty=qty, n=n) if qty is not None else np.zeros(n, dtype="int8")
+    direction = np.asarray(direction)
+
+    if exit_ts is not None:
+        exit_ts = np.asarray(exit_ts, dtype="float64")
+        order = np.argsort(np.where(np.isnan(exit_ts), np.inf, exit_ts), kind="stable")
+        pnl_sorted = pnl[order]
+    else:
+        pnl_sorted = pnl
+
+    wins = pnl > 0
+    losses = pnl < 0
+    is_long = direction > 0
+    is_short = direction < 0
+    n_wins = int(wins.sum())
+    n_losses = int(losses.sum())
+    n_long = int(is_long.sum())
+    n_short = int(is_short.sum())
+    gross_profit = float(pnl[wins].sum())
+    gross_loss = float(-pnl[losses].sum())
+
+    # R-multiples
+    avg_r = 0.0
+    if entry_price is not None and exit_price is not None and sl is not None:
+        entry = np.asarray(entry_price, dtype="float64")
+        risk = np.abs(entry - np.asarray(sl, dtype="float64"))
+        move = direction * (np.asarray(exit_price, dtype="float64") - entry)
+        valid = np.isfinite(risk) & (risk > 0) & np.isfinite(move) & (direction != 0)
+        if valid.any():
+            avg_r = float((move[valid] / risk[valid]).mean())
+
+    # Haltedauer
+    avg_hold = median_hold = max_hold = 0.0
+    if entry_ts is not None and exit_ts is not None:
+        hold = (exit_ts - np.asarray(entry_ts, dtype="float64")) / 1e9
+        hold = hold[np.isfinite(hold) & (hold >= 0)]
+        if hold.size:
+            avg_hold = float(hold.mean())
+            median_hold = float(np.median(hold))
+            max_hold = float(hold.max())
+
+    return {
+        "final_realized_pnl": float(pnl.sum()),
+        "winrate": float(n_wins / n),
+        "winrate_long": float((wins & is_long).sum() / n_long) if n_long else 0.0,
+        "winrate_short": float((wins & is_short).sum() / n_short) if n_short else 0.0,
+        "pnl_long": float(pnl[is_long].sum()),
+        "pnl_short": float(pnl[is_short].sum()),
+        "long_short_ratio": _ratio(n_long, n_short),
+        "n_trades": int(n),
+        "n_long_trades": n_long,
+        "n_short_trades": n_short,
+        "avg_win": gross_profit / n_wins if n_wins else 0.0,
+        "avg_loss": -gross_loss / n_losses if n_losses else 0.0,
+        "max_win": float(pnl[wins].max()) if n_wins else 0.0,
+        "max_loss": float(pnl[losses].min()) if n_losses else 0.0,
+        "max_consecutive_wins": max_streak(pnl_sorted > 0),
+        "max_consecutive_losses": max_streak(pnl_sorted < 0),
+        "commissions": float(np.nansum(fees)),
+        "expectancy": float(pnl.mean()),
+        "profit_factor": _ratio(gross_profit, gross_loss),
+        "avg_r_multiple": avg_r,
+        "avg_holding_time_s": avg_hold,
+        "median_holding_time_s": median_hold,
+        "max_holding_time_s": max_hold,
+    }
+
+
+def trade_arrays_from_frame(df: pd.DataFrame) -> dict:
+    """typed kernel inputs from a trades.csv frame (missing columns -> None / zeros)"""
+    n = len(df)
+    col = lambda name: df[name] if name in df.columns else None
+    qty = _optional_float(col("tradesize")) if "tradesize" in df.columns else None
+    return {
+        "realized_pnl": parse_numeric(col("realized_pnl")) if "realized_pnl" in df.columns else np.zeros(n),
+        "fees": parse_numeric(col("fee")) if "fee" in df.columns else np.zeros(n),
+        "direction": _direction(col("action"), qty, n),
+        "entry_price": _optional_float(col("open_price_actual")) if "open_price_actual" in df.columns else None,
+        "exit_price": _optional_float(col("close_price_actual")) if "close_price_actual" in df.columns else None,
+        "qty": qty,
+        "sl": _optional_float(col("sl")) if "sl" in df.columns else None,
+        "entry_ts": _timestamps_ns(col("timestamp")) if "timestamp" in df.columns else None,
+        "exit_ts": _timestamps_ns(col("closed_timestamp")) if "closed_timestamp" in df.columns else None,
+    }
+
+
+def concat_trade_arrays(parts: list) -> dict:
+    """concatenates kernel inputs of several instruments (None where any part lacks the column)"""
+    merged = {}
+    for key in parts[0].keys():
+        values = [p[key] for p in parts]
+        merged[key] = None if any(v is None for v in values) else np.concatenate(values)
+    return merged
+
+
+def trade_metrics_from_frame(df: pd.DataFrame) -> dict:
+    return compute_trade_metrics(**trade_arrays_from_frame(df))
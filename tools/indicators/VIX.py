@@ -1,5 +1,5 @@
-import yfinance as yf
 import pandas as pd
+from tools.help_funcs.external_data_cache import load_yfinance_daily
 
 class VIX:
     def __init__(
@@ -11,11 +11,16 @@ class VIX:
         # Robust: Nur das Datum extrahieren, falls Zeitanteil vorhanden ist
         start_clean = start.split("T")[0]
         end_clean = end.split("T")[0]
-        self.data = yf.download("^VIX", start=start_clean, end=end_clean)
+        # über den lokalen Cache (offline-fähig, nur fehlende Tage werden nachgeladen)
+        history = load_yfinance_daily("^VIX", start_clean, end_clean)
+        self.data = history.set_index("timestamp")
         self.data.index = pd.to_datetime(self.data.index).date
         self.fear_threshold = fear_threshold
 
     def get_latest_value(self) -> float:
+        # leerer Cache (offline ohne Daten) -> kein Wert
+        if self.data.empty:
+            return None
         return float(self.data["Close"].iloc[-1])
 
     def get_value_on_date(self, date: str) -> float:
@@ -32,4 +37,6 @@ class VIX:
     def is_market_in_fear(self, value: float = None) -> bool:
         if value is None:
             value = self.get_latest_value()
+        if value is None:
+            return False
         return value >= self.fear_threshold
\ No newline at end of file
@@ -1,8 +1,9 @@
 import numpy as np
 from collections import deque
-import datetime
 from typing import Optional, Tuple
 
+from tools.help_funcs.session_calendar import SessionCalendar
+
 class VWAPZScoreHTFAnchored:
     def __init__(
         self,
@@ -31,6 +32,7 @@ class VWAPZScoreHTFAnchored:
         self.gap_threshold_pct = gap_threshold_pct
         self.rth_start = rth_start
         self.rth_end = rth_end
+        self.session_calendar = SessionCalendar(rth_start=rth_start, rth_end=rth_end)
         
         self.last_date = None
         self.last_week = None
@@ -111,7 +113,7 @@ class VWAPZScoreHTFAnchored:
         return False
 
     def _detect_new_day(self, bar) -> bool:
-        bar_date = datetime.datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=datetime.timezone.utc).date()
+        bar_date = SessionCalendar.day_index(bar.ts_event)
         
         if self.last_date is None:
             self.last_date = bar_date
@@ -124,8 +126,7 @@ class VWAPZScoreHTFAnchored:
         return False
 
     def _detect_new_week(self, bar) -> bool:
-        bar_datetime = datetime.datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=datetime.timezone.utc)
-        current_week = bar_datetime.isocalendar()[:2]
+        current_week = SessionCalendar.week_index(bar.ts_event)
         
         if self.last_week is None:
             self.last_week = current_week
@@ -138,10 +139,7 @@ class VWAPZScoreHTFAnchored:
         return False
 
     def is_rth(self, bar):
-        t = datetime.datetime.fromtimestamp(bar.ts_event // 1_000_000_000, tz=datetime.timezone.utc).time()
-        rth_start = datetime.time(*self.rth_start)
-        rth_end = datetime.time(*self.rth_end)
-        return rth_start <= t <= rth_end
+        return self.session_calendar.is_rth(bar.ts_event)
 
     def _should_anchor_new_segment(self, bar, current_price: float, open_price: float = None) -> Tuple[bool, str]:
         if self.anchor_method == "rolling":
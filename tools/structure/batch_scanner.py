@@ -0,0 +1,396 @@
+# vectorized batch versions of the structure detectors (fvg, ttt breakout, vscbr, choch)
+# used to pre-screen symbols/dates for signals before running a full BacktestNode sweep
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def bars_to_arrays(bars: Sequence) -> Dict[str, np.ndarray]:
+    """converts a sequence of nautilus Bars into float/int64 numpy arrays"""
+    n = len(bars)
+    out = {
+        "open": np.empty(n, dtype=np.float64),
+        "high": np.empty(n, dtype=np.float64),
+        "low": np.empty(n, dtype=np.float64),
+        "close": np.empty(n, dtype=np.float64),
+        "volume": np.empty(n, dtype=np.float64),
+        "ts_event": np.empty(n, dtype=np.int64),
+    }
+    for i, bar in enumerate(bars):
+        out["open"][i] = bar.open.as_double()
+        out["high"][i] = bar.high.as_double()
+        out["low"][i] = bar.low.as_double()
+        out["close"][i] = bar.close.as_double()
+        out["volume"][i] = bar.volume.as_double()
+        out["ts_event"][i] = bar.ts_event
+    return out
+
+
+def load_bar_arrays(catalog_path: str, bar_type: str, start=None, end=None) -> Dict[str, np.ndarray]:
+    """loads all bars of one bar type from the catalog as numpy arrays"""
+    from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+    catalog = ParquetDataCatalog(str(catalog_path))
+    bars = catalog.bars(bar_types=[str(bar_type)], start=start, end=end)
+    return bars_to_arrays(bars)
+
+
+def rolling_zscore(values: np.ndarray, window: int) -> np.ndarray:
+    """(x - trailing mean) / trailing std (population) over `window` values, NaN until full or std == 0"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if window <= 1 or len(values) < window:
+        return out
+    win = np.lib.stride_tricks.sliding_window_view(values, window)
+    std = win.std(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[window - 1:] = np.where(std > 0, (values[window - 1:] - win.mean(axis=1)) / np.where(std > 0, std, 1.0), np.nan)
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """true range per bar, first bar falls back to high - low"""
+    prev_close = np.empty_like(close)
+    prev_close[0] = close[0] if len(close) else np.nan
+    prev_close[1:] = close[:-1]
+    return np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """trailing mean over `window` values (inclusive), NaN until the window is full"""
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    csum = np.cumsum(np.insert(values.astype(np.float64), 0, 0.0))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+# -------------------------------------------------
+# Fair Value Gaps (FVG_Analyser)
+# -------------------------------------------------
+def fvg_events(high: np.ndarray, low: np.ndarray, min_size: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    bullish: low[i] > high[i-2] -> gap from high[i-2] (gap_low) to low[i] (gap_high)
+    bearish: high[i] < low[i-2] -> gap from high[i] (gap_low) to low[i-2] (gap_high)
+    with min_size == 0: same signals as calling FVG_Analyser.is_bullish_fvg/is_bearish_fvg after every update_bars
+    min_size > 0 additionally drops gaps smaller than min_size (FVG_Analyser ignores its min_size)
+    """
+    n = len(high)
+    bullish = np.zeros(n, dtype=bool)
+    bearish = np.zeros(n, dtype=bool)
+    gap_high = np.zeros(n)
+    gap_low = np.zeros(n)
+    if n >= 3:
+        bull = low[2:] > high[:-2]
+        bear = high[2:] < low[:-2]
+        if min_size > 0:
+            bull &= (low[2:] - high[:-2]) >= min_size
+            bear &= (low[:-2] - high[2:]) >= min_size
+        bullish[2:] = bull
+        bearish[2:] = bear
+        gap_high[2:] = np.where(bull, low[2:], np.where(bear, low[:-2], 0.0))
+        gap_low[2:] = np.where(bull, high[:-2], np.where(bear, high[2:], 0.0))
+    return {"bullish": bullish, "bearish": bearish, "gap_high": gap_high, "gap_low": gap_low}
+
+
+# -------------------------------------------------
+# TTT Breakout (TTTBreakout_Analyser)
+# -------------------------------------------------
+def ttt_breakout_events(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    lookback: int = 10,
+    atr_mult: float = 1.5,
+    max_counter: int = 8,
+) -> np.ndarray:
+    """
+    returns int8 array: +1 long breakout, -1 short breakout, 0 nothing
+    atr and strong-candle detection are vectorized, the state machine jumps straight
+    to the next strong candle instead of visiting every bar in SEARCH_STRONG
+    """
+    n = len(close)
+    out = np.zeros(n, dtype=np.int8)
+    if n <= lookback:
+        return out
+
+    # streaming ATR averages the last `lookback` TRs and needs lookback + 1 bars
+    atr = rolling_mean(true_range(high, low, close), lookback)
+    atr[:lookback] = np.nan
+
+    body = close - open_
+    with np.errstate(invalid="ignore"):
+        strong_long = (body > 0) & (body > atr_mult * atr)
+        strong_short = (body < 0) & (-body > atr_mult * atr)
+    strong_idx = np.flatnonzero(strong_long | strong_short)
+
+    bull = body > 0
+    bear = body < 0
+
+    i = lookback
+    while i < n:
+        # SEARCH_STRONG
+        k = np.searchsorted(strong_idx, i)
+        if k >= len(strong_idx):
+            break
+        s = int(strong_idx[k])
+        is_long = bool(strong_long[s])
+        counter_dir = bear if is_long else bull
+        i = s + 1
+
+        # COUNT_BEARISH / COUNT_BULLISH
+        counter = 0
+        ok = False
+        while i < n:
+            if counter_dir[i]:
+                counter += 1
+                i += 1
+                if counter > max_counter:
+                    break
+            else:
+                ok = counter >= 2
+                i += 1
+                break
+        if not ok:
+            continue
+        boundary = close[s]
+
+        # WAIT_BULLISH / WAIT_BEARISH
+        same_dir = bull if is_long else bear
+        while i < n and not same_dir[i]:
+            i += 1
+        if i >= n:
+            break
+        range_open = open_[i]
+        i += 1
+        if i >= n:
+            break
+
+        # CONFIRM_RANGE
+        c = close[i]
+        if is_long:
+            invalid = c > boundary or c < range_open
+        else:
+            invalid = c < boundary or c > range_open
+        i += 1
+        if invalid:
+            continue
+
+        # ACTIVE_RANGE: first close away from the effective boundary
+        while i < n and close[i] == range_open:
+            i += 1
+        if i >= n:
+            break
+        out[i] = 1 if close[i] > range_open else -1
+        i += 1
+    return out
+
+
+# -------------------------------------------------
+# VolSpike CloseBias Reversal (VSCBRReversal)
+# -------------------------------------------------
+def vscbr_events(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    zscore: np.ndarray,
+    tr_factor: float,
+    vol_factor: float,
+    zscore_threshold: float,
+    atr_window: int,
+    volume_window: int,
+    long_rel_close_threshold: float = 0.75,
+    short_rel_close_threshold: float = 0.25,
+) -> Dict[str, np.ndarray]:
+    """
+    bar i is compared against the averages of the previous atr_window/volume_window bars,
+    i.e. VSCBRReversal.is_signal(bar, zscore) called before update(bar)
+    """
+    n = len(close)
+    tr = true_range(high, low, close)
+
+    avg_tr = np.full(n, np.nan)
+    avg_vol = np.full(n, np.nan)
+    if n > atr_window:
+        avg_tr[atr_window:] = rolling_mean(tr, atr_window)[atr_window - 1:-1]
+    if n > volume_window:
+        avg_vol[volume_window:] = rolling_mean(volume, volume_window)[volume_window - 1:-1]
+
+    rng = high - low
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel_close = np.where(rng > 0, (close - low) / np.where(rng > 0, rng, 1.0), 0.5)
+        base = (tr > tr_factor * avg_tr) & (volume > vol_factor * avg_vol)
+    long_signal = base & (rel_close >= long_rel_close_threshold) & (zscore < -zscore_threshold)
+    short_signal = base & (rel_close <= short_rel_close_threshold) & (zscore > zscore_threshold)
+    return {"long": long_signal, "short": short_signal}
+
+
+# -------------------------------------------------
+# Change of Character
+# -------------------------------------------------
+def swing_pivots(high: np.ndarray, low: np.ndarray, strength: int) -> Dict[str, np.ndarray]:
+    """
+    fractal pivots: high[j] strictly above the `strength` bars on each side (low analogous)
+    a pivot at j is only known at bar j + strength, the returned masks are at pivot position
+    """
+    n = len(high)
+    is_high = np.zeros(n, dtype=bool)
+    is_low = np.zeros(n, dtype=bool)
+    w = 2 * strength + 1
+    if strength <= 0 or n < w:
+        return {"high": is_high, "low": is_low}
+    hw = np.lib.stride_tricks.sliding_window_view(high, w)
+    lw = np.lib.stride_tricks.sliding_window_view(low, w)
+    centre_h = hw[:, strength]
+    centre_l = lw[:, strength]
+    side_h = np.maximum(hw[:, :strength].max(axis=1), hw[:, strength + 1:].max(axis=1))
+    side_l = np.minimum(lw[:, :strength].min(axis=1), lw[:, strength + 1:].min(axis=1))
+    is_high[strength:n - strength] = centre_h > side_h
+    is_low[strength:n - strength] = centre_l < side_l
+    return {"high": is_high, "low": is_low}
+
+
+def _last_two_confirmed(mask: np.ndarray, values: np.ndarray, delay: int):
+    """per bar: last and previous confirmed pivot value (NaN if none yet)"""
+    n = len(mask)
+    pos = np.flatnonzero(mask)
+    confirm_at = pos + delay
+    last = np.full(n, np.nan)
+    prev = np.full(n, np.nan)
+    if len(pos) == 0:
+        return last, prev
+    # index of the newest pivot confirmed at or before bar i
+    k = np.searchsorted(confirm_at, np.arange(n), side="right") - 1
+    has_last = k >= 0
+    has_prev = k >= 1
+    last[has_last] = values[pos[k[has_last]]]
+    prev[has_prev] = values[pos[k[has_prev] - 1]]
+    return last, prev
+
+
+def choch_events(high: np.ndarray, low: np.ndarray, close: np.ndarray, swing_strength: int = 3) -> np.ndarray:
+    """
+    returns int8 array: +1 bullish choch, -1 bearish choch, 0 nothing
+    trend comes from the last two confirmed pivots (HH+HL up, LH+LL down), a choch fires on the
+    first close beyond the last swing high (in a downtrend) or last swing low (in an uptrend)
+    """
+    n = len(close)
+    out = np.zeros(n, dtype=np.int8)
+    piv = swing_pivots(high, low, swing_strength)
+    last_h, prev_h = _last_two_confirmed(piv["high"], high, swing_strength)
+    last_l, prev_l = _last_two_confirmed(piv["low"], low, swing_strength)
+
+    with np.errstate(invalid="ignore"):
+        uptrend = (last_h > prev_h) & (last_l > prev_l)
+        downtrend = (last_h < prev_h) & (last_l < prev_l)
+        bull = downtrend & (close > last_h)
+        bear = uptrend & (close < last_l)
+
+    # only the first bar of each break counts
+    bull[1:] &= ~bull[:-1]
+    bear[1:] &= ~bear[:-1]
+    out[bull] = 1
+    out[bear] = -1
+    return out
+
+
+# -------------------------------------------------
+# Pre-Screening
+# -------------------------------------------------
+def _vscbr_zscore(spec, window: int, arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """zscore input for vscbr: callable(arrays), array of this bar set, or None -> rolling zscore of close"""
+    if spec is None:
+        zscore = rolling_zscore(arrays["close"], window)
+    elif callable(spec):
+        zscore = np.asarray(spec(arrays), dtype=np.float64)
+    else:
+        zscore = np.asarray(spec, dtype=np.float64)
+    if len(zscore) != len(arrays["close"]):
+        raise ValueError(f"vscbr zscore has {len(zscore)} values for {len(arrays['close'])} bars")
+    return zscore
+
+
+def scan_arrays(arrays: Dict[str, np.ndarray], scanners: Optional[Dict[str, dict]] = None) -> pd.DataFrame:
+    """
+    runs the selected scanners on one bar array set and returns one row per event
+    scanners: {"fvg": {...}, "ttt": {...}, "choch": {...}, "vscbr": {...}} with kwargs per scanner
+    vscbr "zscore": array aligned to these bars, callable(arrays) -> array, or omitted -> rolling zscore of
+    close over "zscore_window" bars
+    """
+    scanners = scanners if scanners is not None else {"fvg": {}, "ttt": {}, "choch": {}}
+    ts = arrays["ts_event"]
+    frames: List[pd.DataFrame] = []
+
+    def _add(name: str, idx: np.ndarray, direction: np.ndarray):
+        if len(idx):
+            frames.append(pd.DataFrame({"ts_event": ts[idx], "event": name, "direction": direction}))
+
+    if "fvg" in scanners:
+        res = fvg_events(arrays["high"], arrays["low"], **scanners["fvg"])
+        _add("fvg", np.flatnonzero(res["bullish"]), np.ones(int(res["bullish"].sum()), dtype=np.int8))
+        _add("fvg", np.flatnonzero(res["bearish"]), -np.ones(int(res["bearish"].sum()), dtype=np.int8))
+    if "ttt" in scanners:
+        res = ttt_breakout_events(arrays["open"], arrays["high"], arrays["low"], arrays["close"], **scanners["ttt"])
+        idx = np.flatnonzero(res)
+        _add("ttt", idx, res[idx])
+    if "choch" in scanners:
+        res = choch_events(arrays["high"], arrays["low"], arrays["close"], **scanners["choch"])
+        idx = np.flatnonzero(res)
+        _add("choch", idx, res[idx])
+    if "vscbr" in scanners:
+        kwargs = dict(scanners["vscbr"])
+        zscore = _vscbr_zscore(kwargs.pop("zscore", None), kwargs.pop("zscore_window", 20), arrays)
+        res = vscbr_events(arrays["high"], arrays["low"], arrays["close"], arrays["volume"], zscore, **kwargs)
+        _add("vscbr", np.flatnonzero(res["long"]), np.ones(int(res["long"].sum()), dtype=np.int8))
+        _add("vscbr", np.flatnonzero(res["short"]), -np.ones(int(res["short"].sum()), dtype=np.int8))
+
+    if not frames:
+        return pd.DataFrame(columns=["ts_event", "event", "direction"])
+    return pd.concat(frames, ignore_index=True).sort_values("ts_event", kind="stable").reset_index(drop=True)
+
+
+def prescreen_catalog(
+    catalog_path: str,
+    bar_types: Iterable[str],
+    start=None,
+    end=None,
+    scanners: Optional[Dict[str, dict]] = None,
+) -> pd.DataFrame:
+    """
+    counts signal events per bar_type, date and scanner over the catalog
+    bar types / dates without any row never produce a signal and can be dropped from the grid
+    vscbr "zscore" is resolved per bar type: {bar_type: array} (every bar type required), callable(arrays)
+    or omitted (rolling zscore)
+    """
+    bar_types = list(bar_types)
+    vscbr_zscore = (scanners or {}).get("vscbr", {}).get("zscore")
+    if vscbr_zscore is not None and not callable(vscbr_zscore) and not isinstance(vscbr_zscore, dict):
+        raise ValueError("prescreen_catalog: vscbr zscore must be a dict per bar type or a callable")
+    if isinstance(vscbr_zscore, dict):
+        missing = [str(bt) for bt in bar_types if str(bt) not in vscbr_zscore]
+        if missing:
+            raise KeyError(f"prescreen_catalog: no vscbr zscore for bar types {missing}")
+    rows = []
+    for bar_type in bar_types:
+        arrays = load_bar_arrays(catalog_path, bar_type, start=start, end=end)
+        if len(arrays["close"]) == 0:
+            continue
+        bar_scanners = scanners
+        if isinstance(vscbr_zscore, dict):
+            bar_scanners = dict(scanners)
+            bar_scanners["vscbr"] = dict(scanners["vscbr"], zscore=vscbr_zscore[str(bar_type)])
+        events = scan_arrays(arrays, bar_scanners)
+        if events.empty:
+            continue
+        events["date"] = pd.to_datetime(events["ts_event"], unit="ns", utc=True).dt.date
+        counts = events.groupby(["date", "event"]).size().rename("n_events").reset_index()
+        counts.insert(0, "bar_type", str(bar_type))
+        rows.append(counts)
+    if not rows:
+        return pd.DataFrame(columns=["bar_type", "date", "event", "n_events"])
+    return pd.concat(rows, ignore_index=True)